@@ -1,5 +1,5 @@
 """Main entry point for pydeptree package"""
-from .cli import main
+from .cli import cli
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    cli()
\ No newline at end of file
@@ -0,0 +1,718 @@
+"""
+Per-file source analysis shared by the project-wide indexes
+
+A single AST pass over each file produces a ``ModuleRecord`` that is cached
+on disk by file fingerprint, so unchanged files are never re-read.
+"""
+import ast
+import io
+import json
+import re
+import sqlite3
+import sys
+import tokenize
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .cache import ensure_schema, file_fingerprint, open_cache_db, open_existing_cache_db
+from .git import clean_blob_ids
+
+ANALYSIS_NAME = 'analysis'
+ANALYSIS_VERSION = 4
+
+_TABLES = ('analysis_records', 'analysis_blobs')
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS analysis_records '
+    '(path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, data TEXT NOT NULL)',
+    # Records of files that are clean in git, by blob id
+    'CREATE TABLE IF NOT EXISTS analysis_blobs (oid TEXT PRIMARY KEY, data TEXT NOT NULL)',
+)
+
+
+@dataclass
+class Definition:
+    """A class or function definition found in a module"""
+    name: str
+    qualname: str  # Dotted path within the module, e.g. 'Client.get'
+    kind: str  # 'class', 'function' or 'async function'
+    lineno: int
+    end_lineno: int
+    complexity: int
+
+
+@dataclass
+class ImportRef:
+    """An import statement found in a module"""
+    module: str  # Imported module ('' for 'from . import x')
+    level: int = 0  # Number of leading dots in relative imports
+    names: List[str] = field(default_factory=list)  # Names of a from-import
+    lineno: int = 0
+
+
+@dataclass
+class ModuleRecord:
+    """Cached analysis results for a single source file"""
+    size: int
+    lines: int
+    complexity: int = 0
+    functions: int = 0
+    classes: int = 0
+    statements: int = 0  # Top-level statements, executed when the module is imported
+    imports: List[ImportRef] = field(default_factory=list)
+    definitions: List[Definition] = field(default_factory=list)
+    todos: List[Tuple[int, str]] = field(default_factory=list)  # Line number and TODO text
+    syntax_error: bool = False
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ModuleRecord':
+        data = dict(data)
+        data['imports'] = [ImportRef(**item) for item in data.get('imports', [])]
+        data['definitions'] = [Definition(**item) for item in data.get('definitions', [])]
+        data['todos'] = [tuple(item) for item in data.get('todos', [])]
+        return cls(**data)
+
+
+def calculate_complexity(tree: ast.AST) -> int:
+    """Calculate cyclomatic complexity of an AST"""
+    complexity = 1  # Base complexity
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.If, ast.While, ast.For, ast.ExceptHandler)):
+            complexity += 1
+        elif isinstance(node, ast.BoolOp):
+            complexity += len(node.values) - 1
+        elif isinstance(node, ast.comprehension):
+            complexity += sum(1 for _ in node.ifs) + 1
+
+    return complexity
+
+
+def _end_lineno(node: ast.AST) -> int:
+    """Get the last line of a node (end_lineno is only available on 3.8+)"""
+    end = getattr(node, 'end_lineno', None)
+    if end is not None:
+        return end
+    return max((getattr(child, 'lineno', 0) for child in ast.walk(node)), default=0)
+
+
+def _string_value(node: ast.AST) -> Optional[str]:
+    """Get the value of a string literal (parsed as ``ast.Str`` before Python 3.8)"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if sys.version_info < (3, 8) and isinstance(node, ast.Str):
+        return node.s
+    return None
+
+
+_DEFINITION_KINDS = {
+    ast.ClassDef: 'class',
+    ast.FunctionDef: 'function',
+    ast.AsyncFunctionDef: 'async function',
+}
+
+
+def collect_definitions(tree: ast.AST) -> List[Definition]:
+    """Collect every class and function definition, including nested ones"""
+    definitions = []
+
+    def visit(node: ast.AST, scope: Tuple[str, ...]) -> None:
+        for child in ast.iter_child_nodes(node):
+            kind = _DEFINITION_KINDS.get(type(child))
+            if kind is None:
+                visit(child, scope)
+                continue
+
+            qualname = '.'.join(scope + (child.name,))
+            definitions.append(Definition(
+                name=child.name,
+                qualname=qualname,
+                kind=kind,
+                lineno=child.lineno,
+                end_lineno=_end_lineno(child),
+                complexity=calculate_complexity(child),
+            ))
+            visit(child, scope + (child.name,))
+
+    visit(tree, ())
+    return definitions
+
+
+def _is_type_checking(test: ast.AST) -> bool:
+    """Check whether an ``if`` test is ``TYPE_CHECKING`` or ``typing.TYPE_CHECKING``"""
+    if isinstance(test, ast.Name):
+        return test.id == 'TYPE_CHECKING'
+    return isinstance(test, ast.Attribute) and test.attr == 'TYPE_CHECKING'
+
+
+def _module_level_nodes(tree: ast.AST) -> Iterable[ast.AST]:
+    """Walk the nodes executed when a module is imported
+
+    Function bodies and ``if TYPE_CHECKING:`` blocks are skipped.
+    """
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        yield node
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+                continue
+            if isinstance(child, ast.If) and _is_type_checking(child.test):
+                stack.extend(child.orelse)
+                continue
+            stack.append(child)
+
+
+def collect_imports(tree: ast.AST, module_level: bool = False) -> List[ImportRef]:
+    """Collect every import statement in an AST
+
+    With ``module_level`` only imports that run when the module is imported
+    are collected.
+    """
+    imports = []
+
+    for node in (_module_level_nodes(tree) if module_level else ast.walk(tree)):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.append(ImportRef(module=alias.name, lineno=node.lineno))
+        elif isinstance(node, ast.ImportFrom):
+            imports.append(ImportRef(
+                module=node.module or '',
+                level=node.level or 0,
+                names=[alias.name for alias in node.names],
+                lineno=node.lineno,
+            ))
+
+    imports.sort(key=lambda ref: ref.lineno)
+    return imports
+
+
+@dataclass
+class SideEffect:
+    """A module-level statement that does work when the module is imported"""
+    lineno: int
+    kind: str  # 'io', 'call', 'loop' or 'literal'
+    description: str
+
+
+# Literals with at least this many elements are reported as side effects
+LARGE_LITERAL_ELEMENTS = 100
+
+# Calls that only declare something and are cheap enough to ignore at module level
+DECLARATION_CALLS = frozenset({
+    'getLogger', 'TypeVar', 'ParamSpec', 'TypeVarTuple', 'NewType', 'namedtuple', 'NamedTuple',
+    'TypedDict', 'Enum', 'IntEnum', 'field', 'object', 'frozenset', 'set', 'dict', 'list', 'tuple',
+    'compile', 'ContextVar', 'Lock', 'RLock', 'local', 'partial', 'cast', 'overload',
+})
+
+# Call names and module prefixes that touch files, processes or the network
+IO_CALLS = frozenset({
+    'open', 'connect', 'urlopen', 'create_connection', 'getaddrinfo', 'system', 'popen',
+    'create_engine', 'read_csv', 'read_json', 'read_parquet', 'read_text', 'read_bytes',
+    'load_dotenv',
+})
+IO_MODULES = frozenset({
+    'requests', 'httpx', 'aiohttp', 'urllib', 'socket', 'subprocess', 'boto3', 'redis',
+})
+
+
+def _call_name(func: ast.AST) -> str:
+    """Get the dotted name of a called function, e.g. 'requests.get'"""
+    parts = []
+    while isinstance(func, ast.Attribute):
+        parts.append(func.attr)
+        func = func.value
+    if isinstance(func, ast.Name):
+        parts.append(func.id)
+    elif isinstance(func, ast.Call):
+        parts.append(_call_name(func.func) + '()')
+    return '.'.join(reversed(parts))
+
+
+def _literal_size(node: ast.AST) -> int:
+    """Count the elements of a (nested) literal container"""
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return len(node.elts) + sum(_literal_size(elt) for elt in node.elts)
+    if isinstance(node, ast.Dict):
+        return len(node.values) + sum(_literal_size(value) for value in node.values)
+    return 0
+
+
+def _evaluated_nodes(node: ast.AST) -> Iterable[ast.AST]:
+    """Walk an expression without entering lambda bodies, which are not run"""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        if isinstance(node, ast.Lambda):
+            stack.extend(node.args.defaults)
+            continue
+        stack.extend(ast.iter_child_nodes(node))
+
+
+def _expression_side_effect(node: ast.AST) -> Optional[Tuple[str, str]]:
+    """Classify the work done by evaluating an expression, heaviest kind first"""
+    nodes = list(_evaluated_nodes(node))
+    calls = [child for child in nodes if isinstance(child, ast.Call)]
+    for call in calls:
+        name = _call_name(call.func)
+        if name.rpartition('.')[2] in IO_CALLS or name.partition('.')[0] in IO_MODULES:
+            return 'io', f"{name}()"
+    comprehensions = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+    if any(isinstance(child, comprehensions) for child in nodes):
+        return 'loop', 'comprehension'
+    for call in calls:
+        name = _call_name(call.func)
+        if name.rpartition('.')[2] not in DECLARATION_CALLS:
+            return 'call', f"{name}()"
+    size = max((_literal_size(child) for child in nodes
+                if isinstance(child, (ast.List, ast.Tuple, ast.Set, ast.Dict))), default=0)
+    if size >= LARGE_LITERAL_ELEMENTS:
+        return 'literal', f"literal with {size} elements"
+    return None
+
+
+def _is_main_guard(test: ast.AST) -> bool:
+    """Check whether an ``if`` test is ``__name__ == '__main__'``"""
+    return (isinstance(test, ast.Compare) and isinstance(test.left, ast.Name)
+            and test.left.id == '__name__' and len(test.comparators) == 1
+            and _string_value(test.comparators[0]) == '__main__')
+
+
+def find_side_effects(tree: ast.Module) -> List[SideEffect]:
+    """Find module-level statements that do work beyond defining names and importing
+
+    Top-level calls (other than declarations such as ``TypeVar`` or
+    ``getLogger``), loops, comprehensions and large literals are reported,
+    with calls that look like file, process or network access marked 'io'.
+    Class bodies run at import time and are included; function bodies,
+    ``if TYPE_CHECKING:`` and ``if __name__ == '__main__':`` blocks are not.
+    """
+    effects = []
+
+    def visit(body: List[ast.stmt]) -> None:
+        for node in body:
+            if isinstance(node, (ast.Import, ast.ImportFrom, ast.FunctionDef, ast.AsyncFunctionDef,
+                                 ast.Pass, ast.Global, ast.Nonlocal)):
+                continue
+            if isinstance(node, ast.ClassDef):
+                visit(node.body)
+            elif isinstance(node, ast.If):
+                if _is_main_guard(node.test):
+                    continue
+                if not _is_type_checking(node.test):
+                    check(node, node.test)
+                    visit(node.body)
+                visit(node.orelse)
+            elif isinstance(node, ast.Try):
+                for block in (node.body, node.orelse, node.finalbody,
+                              *(handler.body for handler in node.handlers)):
+                    visit(block)
+            elif isinstance(node, (ast.With, ast.AsyncWith)):
+                for item in node.items:
+                    check(node, item.context_expr)
+                visit(node.body)
+            elif isinstance(node, (ast.For, ast.AsyncFor, ast.While)):
+                loop = f"{type(node).__name__.lower()} loop"
+                effects.append(SideEffect(node.lineno, 'loop', loop))
+            elif isinstance(node, ast.Expr) and (isinstance(node.value, ast.Constant)
+                                                 or _string_value(node.value) is not None):
+                continue  # Docstring
+            else:
+                check(node, node)
+
+    def check(statement: ast.stmt, expression: ast.AST) -> None:
+        found = _expression_side_effect(expression)
+        if found is not None:
+            effects.append(SideEffect(statement.lineno, *found))
+
+    visit(tree.body)
+    return effects
+
+
+@dataclass
+class LazyImport:
+    """A module-level import whose names are only used inside functions"""
+    ref: ImportRef
+    names: List[str]  # Names bound by the import
+    functions: List[str]  # Functions using them
+
+
+def _top_level_imports(body: List[ast.stmt]) -> Iterable[ast.stmt]:
+    """Get the import statements that bind module globals, outside ``if TYPE_CHECKING:``"""
+    for node in body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            yield node
+        elif isinstance(node, ast.If):
+            if not _is_type_checking(node.test):
+                yield from _top_level_imports(node.body)
+            yield from _top_level_imports(node.orelse)
+        elif isinstance(node, ast.Try):
+            for block in (node.body, node.orelse, node.finalbody, *(h.body for h in node.handlers)):
+                yield from _top_level_imports(block)
+        elif isinstance(node, (ast.With, ast.AsyncWith)):
+            yield from _top_level_imports(node.body)
+
+
+def _exported_names(tree: ast.Module) -> Set[str]:
+    """Get the string entries of a literal ``__all__``"""
+    names = set()
+    for node in tree.body:
+        if (isinstance(node, (ast.Assign, ast.AugAssign, ast.AnnAssign)) and node.value is not None
+                and any(isinstance(target, ast.Name) and target.id == '__all__'
+                        for target in getattr(node, 'targets', [getattr(node, 'target', None)]))
+                and isinstance(node.value, (ast.List, ast.Tuple))):
+            names.update(name for name in map(_string_value, node.value.elts) if name is not None)
+    return names
+
+
+def find_lazy_imports(tree: ast.Module) -> List[LazyImport]:
+    """Find module-level imports that could be moved into the functions using them
+
+    An import qualifies when every name it binds is used inside function or
+    method bodies only. Decorators, default values, annotations and class
+    bodies run at import time and count as module-level uses (annotations
+    only without ``from __future__ import annotations``), as does listing a
+    name in ``__all__``. Imports of a module that is also imported by a
+    module-level statement that does not qualify are skipped, since moving
+    them would not avoid loading it.
+    """
+    # Bound name -> (module key, ImportRef); module key identifies what gets loaded
+    bindings: Dict[str, Tuple[Tuple[int, str], ImportRef]] = {}
+    statements: Dict[Tuple[int, str], List[Tuple[ImportRef, List[str]]]] = {}
+    ambiguous: Set[str] = set()
+
+    for node in _top_level_imports(tree.body):
+        if isinstance(node, ast.Import):
+            groups = [(ImportRef(module=alias.name, lineno=node.lineno),
+                       [alias.asname or alias.name.partition('.')[0]]) for alias in node.names]
+        elif node.module == '__future__' or any(alias.name == '*' for alias in node.names):
+            continue
+        else:
+            ref = ImportRef(module=node.module or '', level=node.level or 0,
+                            names=[alias.name for alias in node.names], lineno=node.lineno)
+            groups = [(ref, [alias.asname or alias.name for alias in node.names])]
+
+        for ref, names in groups:
+            key = (ref.level, ref.module)
+            statements.setdefault(key, []).append((ref, names))
+            for name in names:
+                if name in bindings:
+                    ambiguous.add(name)
+                bindings[name] = (key, ref)
+
+    module_uses: Set[str] = _exported_names(tree)
+    function_uses: Dict[str, Set[str]] = {}
+    postponed_annotations = any(
+        isinstance(node, ast.ImportFrom) and node.module == '__future__'
+        and any(alias.name == 'annotations' for alias in node.names)
+        for node in tree.body)
+
+    def visit(node: ast.AST, function: Optional[str], scope: str = '') -> None:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            # Decorators, defaults and annotations are evaluated where the function is defined
+            args = node.args
+            evaluated = [*args.defaults, *filter(None, args.kw_defaults)]
+            if not isinstance(node, ast.Lambda):
+                evaluated += node.decorator_list
+            if not isinstance(node, ast.Lambda) and not postponed_annotations:
+                # posonlyargs is only available on 3.8+
+                evaluated += [arg.annotation
+                              for arg in (*getattr(args, 'posonlyargs', []), *args.args,
+                                          *args.kwonlyargs, args.vararg, args.kwarg)
+                              if arg is not None and arg.annotation is not None]
+                if node.returns is not None:
+                    evaluated.append(node.returns)
+            for child in evaluated:
+                visit(child, function, scope)
+            qualified = scope + getattr(node, 'name', '<lambda>')
+            for child in (node.body if isinstance(node.body, list) else [node.body]):
+                visit(child, qualified, qualified + '.')
+            return
+
+        if isinstance(node, ast.ClassDef):
+            # Class bodies run where the class is defined
+            for child in (*node.decorator_list, *node.bases, *node.keywords):
+                visit(child, function, scope)
+            for child in node.body:
+                visit(child, function, f"{scope}{node.name}.")
+            return
+
+        if isinstance(node, ast.Name):
+            if function is None:
+                module_uses.add(node.id)
+            else:
+                function_uses.setdefault(node.id, set()).add(function)
+        elif isinstance(node, ast.If) and function is None and _is_type_checking(node.test):
+            for child in node.orelse:
+                visit(child, function, scope)
+            return
+
+        for child in ast.iter_child_nodes(node):
+            visit(child, function, scope)
+
+    for node in tree.body:
+        visit(node, None)
+
+    def qualifies(names: List[str]) -> bool:
+        return all(name in function_uses and name not in module_uses and name not in ambiguous
+                   for name in names)
+
+    candidates = []
+    for group in statements.values():
+        if not all(qualifies(names) for _, names in group):
+            continue
+        for ref, names in group:
+            functions = sorted(set().union(*(function_uses[name] for name in names)))
+            candidates.append(LazyImport(ref=ref, names=names, functions=functions))
+
+    candidates.sort(key=lambda candidate: candidate.ref.lineno)
+    return candidates
+
+
+TODO_TAGS = ('TODO', 'FIXME', 'HACK', 'XXX', 'NOTE', 'OPTIMIZE', 'BUG')
+
+_TAG_PATTERN = '|'.join(TODO_TAGS)
+_COMMENT_TODO = re.compile(rf'#\s*({_TAG_PATTERN})\b:?\s*(.*)', re.IGNORECASE)
+_STRING_TODO = re.compile(rf'\s*({_TAG_PATTERN})\b(:?)\s*(.*)', re.IGNORECASE)
+_TRIPLE_QUOTE_START = re.compile(r'[rRbBuUfF]*(\"\"\"|\'\'\')')
+
+
+def _find_comment_todos(content: str, first_line: int = 1) -> List[Tuple[int, str]]:
+    """Line-based fallback for the part of a file that cannot be tokenized"""
+    todos = []
+    for i, line in enumerate(content.split('\n'), 1):
+        if i < first_line:
+            continue
+        match = _COMMENT_TODO.search(line)
+        if match:
+            todos.append((i, f"{match.group(1).upper()}: {match.group(2).strip()}"))
+    return todos
+
+
+def find_todos(content: str) -> List[Tuple[int, str]]:
+    """Find TODO/FIXME/HACK markers in comments and docstrings
+
+    Uses a single ``tokenize`` pass, so markers inside multi-line
+    triple-quoted strings are found on the line where they appear.
+    """
+    todos = []
+    last_row = 0
+
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(content).readline):
+            last_row = token.end[0]
+            if token.type == tokenize.COMMENT:
+                match = _COMMENT_TODO.match(token.string)
+                if match:
+                    todos.append((token.start[0],
+                                  f"{match.group(1).upper()}: {match.group(2).strip()}"))
+
+            elif token.type == tokenize.STRING:
+                opening = _TRIPLE_QUOTE_START.match(token.string)
+                if not opening:
+                    continue
+                body = token.string[opening.end():]
+                if body.endswith(opening.group(1)):
+                    body = body[:-3]
+
+                for offset, line in enumerate(body.split('\n')):
+                    # Prose such as "note that ..." only counts with a colon
+                    match = _STRING_TODO.match(line)
+                    if match and (match.group(1).isupper() or match.group(2)):
+                        todos.append((token.start[0] + offset,
+                                      f"{match.group(1).upper()}: {match.group(3).strip()}"))
+    except (tokenize.TokenError, SyntaxError):
+        todos.extend(_find_comment_todos(content, first_line=last_row + 1))
+
+    return todos
+
+
+def analyze_source(source: str) -> ModuleRecord:
+    """Analyze Python source code in a single AST pass"""
+    record = ModuleRecord(size=len(source.encode('utf-8')), lines=len(source.splitlines()))
+    record.todos = find_todos(source)
+
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        record.syntax_error = True
+        return record
+
+    record.statements = len(tree.body)
+    record.imports = collect_imports(tree)
+    record.definitions = collect_definitions(tree)
+    record.complexity = calculate_complexity(tree)
+    record.functions = sum(1 for d in record.definitions if d.kind == 'function')
+    record.classes = sum(1 for d in record.definitions if d.kind == 'class')
+    return record
+
+
+def analyze_imports(source: str) -> ModuleRecord:
+    """Collect only the size and the module-level imports of Python source code
+
+    A much cheaper analysis for third-party code, where definitions,
+    complexity and TODOs are not needed.
+    """
+    record = ModuleRecord(size=len(source.encode('utf-8')), lines=source.count('\n'))
+    try:
+        tree = ast.parse(source)
+        record.statements = len(tree.body)
+        record.imports = collect_imports(tree, module_level=True)
+    except (SyntaxError, ValueError):
+        record.syntax_error = True
+    return record
+
+
+class AnalysisCache:
+    """On-disk cache of ``ModuleRecord``s
+
+    Files that are tracked and unmodified in git are keyed by their blob id,
+    read from one ``git ls-files`` call, so they are neither opened nor
+    hashed and stay cached when a fresh clone gives them new mtimes. Other
+    files are keyed by path and fingerprint (mtime and size).
+    """
+
+    def __init__(self, project_root: Path, conn: Optional[sqlite3.Connection] = None,
+                 read_only: bool = False):
+        self.project_root = Path(project_root).resolve()
+        self.conn = conn if conn is not None else open_cache_db(self.project_root)
+        if not read_only:
+            ensure_schema(self.conn, ANALYSIS_NAME, ANALYSIS_VERSION, _TABLES, _SCHEMA)
+        self._rows: Optional[Dict[str, Tuple[List[int], str]]] = None
+        self._blob_rows: Optional[Dict[str, str]] = None
+        self._blob_ids: Optional[Dict[str, str]] = None
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def open_existing(cls, project_root: Path) -> Optional['AnalysisCache']:
+        """Open the project's cache read-only, or get ``None`` if it has no usable one
+
+        Nothing is written, not even the cache directory, so records can be
+        looked up but not stored.
+        """
+        conn = open_existing_cache_db(project_root)
+        if conn is None:
+            return None
+        try:
+            row = conn.execute('SELECT version FROM cache_meta WHERE name = ?',
+                               (ANALYSIS_NAME,)).fetchone()
+        except sqlite3.Error:
+            row = None
+        if row is None or row[0] != ANALYSIS_VERSION:
+            conn.close()
+            return None
+        return cls(project_root, conn, read_only=True)
+
+    @property
+    def blob_ids(self) -> Dict[str, str]:
+        """Blob ids of the project files that are clean in git, by relative path"""
+        if self._blob_ids is None:
+            self._blob_ids = clean_blob_ids(self.project_root)
+        return self._blob_ids
+
+    def _load_rows(self) -> Dict[str, Tuple[List[int], str]]:
+        if self._rows is None:
+            self._rows = {
+                path: ([mtime_ns, size], data)
+                for path, mtime_ns, size, data in self.conn.execute(
+                    'SELECT path, mtime_ns, size, data FROM analysis_records')
+            }
+        return self._rows
+
+    def _load_blob_rows(self) -> Dict[str, str]:
+        if self._blob_rows is None:
+            self._blob_rows = dict(self.conn.execute('SELECT oid, data FROM analysis_blobs'))
+        return self._blob_rows
+
+    @staticmethod
+    def _decode(data: str) -> Optional[ModuleRecord]:
+        try:
+            return ModuleRecord.from_dict(json.loads(data))
+        except (ValueError, TypeError):
+            return None
+
+    def get(self, rel_path: str, fingerprint: Optional[List[int]]) -> Optional[ModuleRecord]:
+        """Get a cached record if the file has not changed since it was stored"""
+        row = self._load_rows().get(rel_path)
+        if row is None or fingerprint is None or row[0] != fingerprint:
+            return None
+        return self._decode(row[1])
+
+    def put(self, rel_path: str, fingerprint: Optional[List[int]], record: ModuleRecord) -> None:
+        """Store a record for a file"""
+        if fingerprint is None:
+            return
+        data = json.dumps(record.to_dict(), separators=(',', ':'))
+        self.conn.execute(
+            'INSERT OR REPLACE INTO analysis_records (path, mtime_ns, size, data) '
+            'VALUES (?, ?, ?, ?)', (rel_path, fingerprint[0], fingerprint[1], data))
+        self._load_rows()[rel_path] = (list(fingerprint), data)
+
+    def get_blob(self, oid: str) -> Optional[ModuleRecord]:
+        """Get the cached record of a git blob"""
+        data = self._load_blob_rows().get(oid)
+        return None if data is None else self._decode(data)
+
+    def put_blob(self, oid: str, record: ModuleRecord) -> None:
+        data = json.dumps(record.to_dict(), separators=(',', ':'))
+        self.conn.execute('INSERT OR REPLACE INTO analysis_blobs (oid, data) VALUES (?, ?)',
+                          (oid, data))
+        self._load_blob_rows()[oid] = data
+
+    def analyze(self, file_path: Path) -> ModuleRecord:
+        """Get the record for a file, re-analyzing it only if it changed"""
+        try:
+            rel_path = file_path.relative_to(self.project_root).as_posix()
+        except ValueError:
+            rel_path = file_path.resolve().relative_to(self.project_root).as_posix()
+
+        oid = self.blob_ids.get(rel_path)
+        if oid is not None:
+            fingerprint = None
+            record = self.get_blob(oid)
+        else:
+            fingerprint = file_fingerprint(file_path)
+            record = self.get(rel_path, fingerprint)
+        if record is not None:
+            self.hits += 1
+            return record
+
+        self.misses += 1
+        try:
+            with open(file_path, encoding='utf-8') as f:
+                source = f.read()
+        except (OSError, UnicodeDecodeError):
+            return ModuleRecord(size=0, lines=0, syntax_error=True)
+
+        record = analyze_source(source)
+        if oid is not None:
+            self.put_blob(oid, record)
+        else:
+            self.put(rel_path, fingerprint, record)
+        return record
+
+    def prune(self, keep: Iterable[str]) -> None:
+        """Drop records for files that no longer exist, and for blobs no file uses any more"""
+        keep = set(keep)
+        stale = [path for path in self._load_rows() if path not in keep]
+        for path in stale:
+            self.conn.execute('DELETE FROM analysis_records WHERE path = ?', (path,))
+            del self._rows[path]
+
+        used = {oid for path, oid in self.blob_ids.items() if path in keep}
+        stale = [oid for oid in self._load_blob_rows() if oid not in used]
+        for oid in stale:
+            self.conn.execute('DELETE FROM analysis_blobs WHERE oid = ?', (oid,))
+            del self._blob_rows[oid]
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
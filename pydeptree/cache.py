@@ -0,0 +1,130 @@
+"""
+Persistent on-disk caches shared by the PyDepTree analyzers
+"""
+import hashlib
+import os
+import sqlite3
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+CACHE_DIR_NAME = '.pydeptree_cache'
+CACHE_DIR_ENV = 'PYDEPTREE_CACHE_DIR'
+CACHE_DB_NAME = 'cache.sqlite3'
+SHARED_CACHE_DIR_NAME = 'shared'
+
+
+def cache_dir_path(project_root: Path) -> Path:
+    """Get the path of a project's cache directory, without creating it
+
+    Defaults to ``.pydeptree_cache`` inside the project root. When the
+    ``PYDEPTREE_CACHE_DIR`` environment variable is set, each project gets a
+    subdirectory there instead, keyed by its resolved path.
+    """
+    root = Path(project_root).resolve()
+    override = os.environ.get(CACHE_DIR_ENV)
+    if override:
+        digest = hashlib.sha1(str(root).encode('utf-8')).hexdigest()[:16]
+        return Path(override) / digest
+    return root / CACHE_DIR_NAME
+
+
+def get_cache_dir(project_root: Path) -> Path:
+    """Get the cache directory for a project (see ``cache_dir_path``), creating it if needed"""
+    cache_dir = cache_dir_path(project_root)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    # Keep the cache out of version control, like ruff and mypy do
+    gitignore = cache_dir / '.gitignore'
+    if not gitignore.exists():
+        try:
+            gitignore.write_text('*\n', encoding='utf-8')
+        except OSError:
+            pass
+
+    return cache_dir
+
+
+def get_user_cache_dir() -> Path:
+    """Get the per-user cache directory shared by every project, creating it if needed
+
+    Used for results that do not depend on a project, such as the analysis of
+    installed distributions. Defaults to ``$XDG_CACHE_HOME/pydeptree`` (or
+    ``~/.cache/pydeptree``; ``%LOCALAPPDATA%\\pydeptree`` on Windows), or a
+    ``shared`` subdirectory of ``PYDEPTREE_CACHE_DIR`` when that is set.
+    """
+    override = os.environ.get(CACHE_DIR_ENV)
+    if override:
+        cache_dir = Path(override) / SHARED_CACHE_DIR_NAME
+    elif os.name == 'nt' and os.environ.get('LOCALAPPDATA'):
+        cache_dir = Path(os.environ['LOCALAPPDATA']) / 'pydeptree'
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        cache_dir = Path(base) / 'pydeptree'
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def _connect(get_dir, db_name: str) -> sqlite3.Connection:
+    try:
+        db_path = get_dir() / db_name
+        conn = sqlite3.connect(str(db_path), timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+    except (OSError, sqlite3.Error):
+        conn = sqlite3.connect(':memory:')
+    return conn
+
+
+def open_cache_db(project_root: Path) -> sqlite3.Connection:
+    """Open the project's cache database
+
+    Falls back to an in-memory database when the cache directory is not
+    writable, so callers never have to special-case a missing cache.
+    """
+    return _connect(lambda: get_cache_dir(project_root), CACHE_DB_NAME)
+
+
+def open_existing_cache_db(project_root: Path) -> Optional[sqlite3.Connection]:
+    """Open the project's cache database read-only, or get ``None`` if it does not exist
+
+    Nothing is created, for commands that must not write to the project.
+    """
+    db_path = cache_dir_path(project_root) / CACHE_DB_NAME
+    if not db_path.is_file():
+        return None
+    try:
+        return sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True, timeout=30)
+    except sqlite3.Error:
+        return None
+
+
+def open_user_cache_db(db_name: str = CACHE_DB_NAME) -> sqlite3.Connection:
+    """Open a database in the per-user cache directory, with the same fallback"""
+    return _connect(get_user_cache_dir, db_name)
+
+
+def ensure_schema(conn: sqlite3.Connection, name: str, version: int,
+                  tables: Sequence[str], statements: Sequence[str]) -> None:
+    """Create a cache's tables, dropping stale ones when its schema version changed"""
+    conn.execute('CREATE TABLE IF NOT EXISTS cache_meta '
+                 '(name TEXT PRIMARY KEY, version INTEGER NOT NULL)')
+    row = conn.execute('SELECT version FROM cache_meta WHERE name = ?', (name,)).fetchone()
+
+    if row is None or row[0] != version:
+        for table in tables:
+            conn.execute(f'DROP TABLE IF EXISTS {table}')
+        conn.execute('INSERT OR REPLACE INTO cache_meta (name, version) VALUES (?, ?)',
+                     (name, version))
+
+    for statement in statements:
+        conn.execute(statement)
+    conn.commit()
+
+
+def file_fingerprint(file_path: Path) -> Optional[List[int]]:
+    """Get a cheap fingerprint (mtime in ns, size) used to detect changed files"""
+    try:
+        stat = file_path.stat()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
@@ -3,6 +3,7 @@
 Python Dependency Tree Analyzer - Rich version with enhanced UI
 """
 import ast
+import importlib
 import os
 import sys
 from pathlib import Path
@@ -210,8 +211,61 @@ def main(file_path: Path, depth: int, project_root: Path, show_code: bool):
                 console.print()
 
 
-# Create CLI alias for entry point
-cli = main
+class DefaultCommandGroup(click.Group):
+    """Command group that loads subcommands lazily and falls back to a default command
+
+    ``pydeptree FILE`` keeps working as before, while ``pydeptree symbols ...``
+    and friends only import their modules when they are actually used.
+    """
+
+    def __init__(self, *args, default_command: Optional[str] = None,
+                 lazy_commands: Optional[Dict[str, str]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        if cmd_name in self.lazy_commands:
+            module_name, attr = self.lazy_commands[cmd_name].split(':')
+            return getattr(importlib.import_module(module_name), attr)
+        return super().get_command(ctx, cmd_name)
+
+    def parse_args(self, ctx: click.Context, args: List[str]) -> List[str]:
+        if (args and self.default_command and args[0] not in self.list_commands(ctx)
+                and args[0] not in ctx.help_option_names):
+            args = [self.default_command] + list(args)
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=DefaultCommandGroup, default_command='analyze', lazy_commands={
+    'symbols': 'pydeptree.symbols:symbols',
+    'todos': 'pydeptree.todos:todos',
+    'reqcheck': 'pydeptree.reqcheck:reqcheck',
+    'prune-report': 'pydeptree.prune:prune_report',
+    'loads': 'pydeptree.thirdparty:loads',
+    'importtime': 'pydeptree.importtime:importtime',
+    'critical-path': 'pydeptree.critical_path:critical_path',
+    'daemon': 'pydeptree.daemon:daemon',
+    'query': 'pydeptree.daemon:query',
+    'serve': 'pydeptree.server:serve',
+    'lsp': 'pydeptree.lsp:lsp',
+    'precommit': 'pydeptree.precommit:precommit',
+    'snapshot': 'pydeptree.snapshot:snapshot',
+    'diff': 'pydeptree.diff:diff',
+    'history': 'pydeptree.history:history',
+})
+def cli():
+    """Python Dependency Tree Analyzer
+
+    Run "pydeptree FILE_PATH" (short for "pydeptree analyze FILE_PATH") to show
+    the dependency tree of a file, or use one of the commands below.
+    """
+
+
+cli.add_command(main, 'analyze')
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    cli()
\ No newline at end of file
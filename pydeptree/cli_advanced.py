@@ -8,7 +8,7 @@ import sys
 import subprocess
 import re
 from pathlib import Path
-from typing import Set, Dict, List, Optional, Tuple, Any, Union
+from typing import TYPE_CHECKING, Set, Dict, List, Optional, Tuple, Any, Union
 from dataclasses import dataclass, field
 import time
 from datetime import datetime
@@ -26,6 +26,33 @@ from rich.text import Text
 from rich.highlighter import RegexHighlighter
 from rich.prompt import Prompt, Confirm
 
+from .analysis import (
+    ImportRef,
+    LazyImport,
+    SideEffect,
+    calculate_complexity,
+    collect_definitions,
+    find_lazy_imports,
+    find_side_effects,
+    find_todos,
+)
+from .cache import file_fingerprint
+from .environment import DistributionIndex, format_pin, format_size, get_default_index
+from .graph import build_project_graph
+from .importtime import format_us
+from .options import (
+    environment_options,
+    infer_target_python,
+    open_environment_index,
+    target_python_option,
+)
+from .project import module_name_for_path
+from .stdlib import PythonVersion, is_stdlib_module
+from .watch import DEFAULT_POLL_INTERVAL
+
+if TYPE_CHECKING:
+    from .runtime_profile import ModuleProfile
+
 
 console = Console()
 
@@ -59,6 +86,9 @@ class FileInfo:
     search_matches: List[Tuple[int, str]] = field(default_factory=list)  # Search results
     lint_error_details: List[dict] = field(default_factory=list)  # Detailed lint errors
     lint_warning_details: List[dict] = field(default_factory=list)  # Detailed lint warnings
+    lazy_imports: List[LazyImport] = field(default_factory=list)  # Only used inside functions
+    side_effects: List[SideEffect] = field(default_factory=list)  # Work done at import time
+    profile: Optional['ModuleProfile'] = None  # Runtime cost from --profile-data
 
 
 def detect_file_type(file_path: Path) -> str:
@@ -123,54 +153,23 @@ def get_file_type_icon(file_type: str) -> str:
     return icons.get(file_type, '📄')
 
 
-def calculate_complexity(tree: ast.AST) -> int:
-    """Calculate cyclomatic complexity of an AST"""
-    complexity = 1  # Base complexity
-    
-    for node in ast.walk(tree):
-        if isinstance(node, (ast.If, ast.While, ast.For, ast.ExceptHandler)):
-            complexity += 1
-        elif isinstance(node, ast.BoolOp):
-            complexity += len(node.values) - 1
-        elif isinstance(node, ast.comprehension):
-            complexity += sum(1 for _ in node.ifs) + 1
-            
-    return complexity
-
-
 def count_functions_and_classes(tree: ast.AST) -> Tuple[int, int]:
     """Count functions and classes in an AST"""
-    functions = 0
-    classes = 0
-    
-    for node in ast.walk(tree):
-        if isinstance(node, ast.FunctionDef):
-            functions += 1
-        elif isinstance(node, ast.ClassDef):
-            classes += 1
-            
+    definitions = collect_definitions(tree)
+    functions = sum(1 for d in definitions if d.kind == 'function')
+    classes = sum(1 for d in definitions if d.kind == 'class')
     return functions, classes
 
 
-def find_todos(content: str) -> List[Tuple[int, str]]:
-    """Find TODO/FIXME/HACK comments in file content"""
-    todos = []
-    patterns = [
-        r'#\s*(TODO|FIXME|HACK|XXX|NOTE|OPTIMIZE|BUG):?\s*(.*)',
-        r'""".*?(TODO|FIXME|HACK|XXX|NOTE|OPTIMIZE|BUG):?\s*(.*?)"""',
-        r"'''.*?(TODO|FIXME|HACK|XXX|NOTE|OPTIMIZE|BUG):?\s*(.*?)'''"
-    ]
-    
-    lines = content.split('\n')
-    for i, line in enumerate(lines, 1):
-        for pattern in patterns:
-            matches = re.finditer(pattern, line, re.IGNORECASE)
-            for match in matches:
-                todo_type = match.group(1).upper()
-                todo_text = match.group(2).strip() if match.lastindex >= 2 else ""
-                todos.append((i, f"{todo_type}: {todo_text}"))
-                
-    return todos
+def build_search_pattern(search_pattern: str, search_type: str) -> str:
+    """Build the regular expression used for a search type"""
+    if search_type == 'class':
+        return rf'class\s+{search_pattern}'
+    elif search_type == 'function':
+        return rf'def\s+{search_pattern}'
+    elif search_type == 'import':
+        return rf'(from|import).*{search_pattern}'
+    return search_pattern
 
 
 def search_in_file(file_path: Path, search_pattern: str, search_type: str) -> List[Tuple[int, str]]:
@@ -182,14 +181,7 @@ def search_in_file(file_path: Path, search_pattern: str, search_type: str) -> Li
             content = f.read()
             
         # Build pattern based on search type
-        if search_type == 'class':
-            pattern = rf'class\s+{search_pattern}'
-        elif search_type == 'function':
-            pattern = rf'def\s+{search_pattern}'
-        elif search_type == 'import':
-            pattern = rf'(from|import).*{search_pattern}'
-        else:
-            pattern = search_pattern
+        pattern = build_search_pattern(search_pattern, search_type)
             
         # Search line by line
         lines = content.split('\n')
@@ -297,8 +289,14 @@ def run_ruff_check(file_path: Path, detailed: bool = False) -> Union[Tuple[int,
 
 
 def analyze_file(file_path: Path, project_root: Path, search_pattern: Optional[str] = None, 
-                search_type: str = 'text', check_git: bool = True, collect_lint_details: bool = False) -> FileInfo:
-    """Analyze a Python file and return file information"""
+                search_type: str = 'text', check_git: bool = True,
+                collect_lint_details: bool = False, collect_lazy_imports: bool = False,
+                collect_side_effects: bool = False) -> FileInfo:
+    """Analyze a Python file and return file information
+
+    Imports only used inside functions are looked for with ``collect_lazy_imports``
+    and module-level work with ``collect_side_effects``.
+    """
     try:
         stat = file_path.stat()
         size = stat.st_size
@@ -308,6 +306,7 @@ def analyze_file(file_path: Path, project_root: Path, search_pattern: Optional[s
             lines = len(content.splitlines())
             
         # Parse AST
+        tree = None
         try:
             tree = ast.parse(content)
             imports = sum(1 for node in ast.walk(tree) 
@@ -319,6 +318,20 @@ def analyze_file(file_path: Path, project_root: Path, search_pattern: Optional[s
             complexity = 0
             functions = 0
             classes = 0
+
+        # Optional passes, each guarded so that a failure there does not hide the metrics above
+        lazy_imports = []
+        if collect_lazy_imports and tree is not None:
+            try:
+                lazy_imports = find_lazy_imports(tree)
+            except Exception:
+                pass
+        side_effects = []
+        if collect_side_effects and tree is not None:
+            try:
+                side_effects = find_side_effects(tree)
+            except Exception:
+                pass
             
         # Find TODOs
         todos = find_todos(content)
@@ -356,7 +369,9 @@ def analyze_file(file_path: Path, project_root: Path, search_pattern: Optional[s
             git_status=git_status,
             search_matches=search_matches,
             lint_error_details=error_details,
-            lint_warning_details=warning_details
+            lint_warning_details=warning_details,
+            lazy_imports=lazy_imports,
+            side_effects=side_effects
         )
     except Exception as e:
         # Return minimal info on error
@@ -431,6 +446,21 @@ def format_file_label(file_info: FileInfo, project_root: Path, show_metrics: boo
             if file_info.todos:
                 label.append(f" 📌{len(file_info.todos)}", style="bright_blue")
                 
+            # Module-level side effects
+            if file_info.side_effects:
+                io_effects = any(effect.kind == 'io' for effect in file_info.side_effects)
+                label.append(f" ⚡{len(file_info.side_effects)}",
+                             style="bold red" if io_effects else "yellow")
+
+            # Runtime profile, including everything the file imports
+            if file_info.profile is not None:
+                if file_info.profile.cumulative_time > 0:
+                    cpu_us = int(file_info.profile.cumulative_time * 1_000_000)
+                    label.append(f" ⏱{format_us(cpu_us)}", style="bold magenta")
+                if file_info.profile.cumulative_memory > 0:
+                    label.append(f" 💾{format_size(file_info.profile.cumulative_memory)}",
+                                 style="magenta")
+
             # Git status
             if file_info.git_status:
                 git_style = "red" if file_info.git_status in ['M', 'MM'] else "green"
@@ -486,8 +516,14 @@ def extract_imports(file_path: Path) -> Set[str]:
     return imports
 
 
-def extract_external_dependencies(file_stats: Dict[str, FileInfo], project_root: Path) -> Dict[str, Set[str]]:
-    """Extract external (non-project) dependencies from all analyzed files"""
+def extract_external_dependencies(
+        file_stats: Dict[str, FileInfo], project_root: Path,
+        target_python: Optional[PythonVersion] = None) -> Dict[str, Set[str]]:
+    """Extract external (non-project) dependencies from all analyzed files
+
+    Standard library modules are those of ``target_python`` (default: the
+    running interpreter).
+    """
     external_deps = {}
     
     # Get all project module names
@@ -516,7 +552,7 @@ def extract_external_dependencies(file_stats: Dict[str, FileInfo], project_root:
             top_level = imp.split('.')[0]
             
             # Check if it's external (not in stdlib, not project module)
-            if top_level not in project_modules and not is_stdlib_module(top_level):
+            if top_level not in project_modules and not is_stdlib_module(top_level, target_python):
                 file_external_deps.add(top_level)
         
         if file_external_deps:
@@ -525,42 +561,14 @@ def extract_external_dependencies(file_stats: Dict[str, FileInfo], project_root:
     return external_deps
 
 
-def is_stdlib_module(module_name: str) -> bool:
-    """Check if a module is part of Python standard library"""
-    stdlib_modules = {
-        'abc', 'aifc', 'argparse', 'array', 'ast', 'asynchat', 'asyncio', 'asyncore',
-        'atexit', 'audioop', 'base64', 'bdb', 'binascii', 'binhex', 'bisect', 'builtins',
-        'bz2', 'calendar', 'cgi', 'cgitb', 'chunk', 'cmath', 'cmd', 'code', 'codecs',
-        'codeop', 'collections', 'colorsys', 'compileall', 'concurrent', 'configparser',
-        'contextlib', 'contextvars', 'copy', 'copyreg', 'crypt', 'csv', 'ctypes', 'curses',
-        'dataclasses', 'datetime', 'dbm', 'decimal', 'difflib', 'dis', 'distutils',
-        'doctest', 'dummy_threading', 'email', 'encodings', 'ensurepip', 'enum', 'errno',
-        'faulthandler', 'fcntl', 'filecmp', 'fileinput', 'fnmatch', 'formatter', 'fractions',
-        'ftplib', 'functools', 'gc', 'getopt', 'getpass', 'gettext', 'glob', 'grp', 'gzip',
-        'hashlib', 'heapq', 'hmac', 'html', 'http', 'imaplib', 'imghdr', 'imp', 'importlib',
-        'inspect', 'io', 'ipaddress', 'itertools', 'json', 'keyword', 'lib2to3', 'linecache',
-        'locale', 'logging', 'lzma', 'mailbox', 'mailcap', 'marshal', 'math', 'mimetypes',
-        'mmap', 'modulefinder', 'msilib', 'msvcrt', 'multiprocessing', 'netrc', 'nis',
-        'nntplib', 'numbers', 'operator', 'optparse', 'os', 'ossaudiodev', 'parser', 'pathlib',
-        'pdb', 'pickle', 'pickletools', 'pipes', 'pkgutil', 'platform', 'plistlib', 'poplib',
-        'posix', 'posixpath', 'pprint', 'profile', 'pstats', 'pty', 'pwd', 'py_compile',
-        'pyclbr', 'pydoc', 'queue', 'quopri', 'random', 're', 'readline', 'reprlib',
-        'resource', 'rlcompleter', 'runpy', 'sched', 'secrets', 'select', 'selectors',
-        'shelve', 'shlex', 'shutil', 'signal', 'site', 'smtpd', 'smtplib', 'sndhdr',
-        'socket', 'socketserver', 'spwd', 'sqlite3', 'ssl', 'stat', 'statistics', 'string',
-        'stringprep', 'struct', 'subprocess', 'sunau', 'symbol', 'symtable', 'sys',
-        'sysconfig', 'syslog', 'tabnanny', 'tarfile', 'telnetlib', 'tempfile', 'termios',
-        'test', 'textwrap', 'threading', 'time', 'timeit', 'tkinter', 'token', 'tokenize',
-        'trace', 'traceback', 'tracemalloc', 'tty', 'turtle', 'types', 'typing', 'unicodedata',
-        'unittest', 'urllib', 'uu', 'uuid', 'venv', 'warnings', 'wave', 'weakref',
-        'webbrowser', 'winreg', 'winsound', 'wsgiref', 'xdrlib', 'xml', 'xmlrpc', 'zipapp',
-        'zipfile', 'zipimport', 'zlib', '_thread', '__future__'
-    }
-    return module_name in stdlib_modules
-
+def get_package_info(package_name: str,
+                     index: Optional[DistributionIndex] = None) -> Dict[str, Optional[str]]:
+    """Get detailed package information including version, summary, and dependencies
 
-def get_package_info(package_name: str) -> Dict[str, Optional[str]]:
-    """Get detailed package information including version, summary, and dependencies"""
+    Reads the metadata from ``index`` (default: the running interpreter's
+    environment) without spawning a process; ``pip show`` is only used when
+    ``importlib.metadata`` is unavailable.
+    """
     info = {
         'version': None,
         'summary': None,
@@ -569,6 +577,20 @@ def get_package_info(package_name: str) -> Dict[str, Optional[str]]:
         'author': None
     }
     
+    if index is None:
+        index = get_default_index()
+    if index.available:
+        dist = index.get(package_name)
+        if dist is not None:
+            info.update(
+                version=dist.version,
+                summary=dist.summary,
+                requires=dist.dependencies,
+                home_page=dist.home_page,
+                author=dist.author,
+            )
+        return info
+
     try:
         result = subprocess.run(
             [sys.executable, '-m', 'pip', 'show', package_name],
@@ -614,10 +636,48 @@ def get_installed_package_version(package_name: str) -> Optional[str]:
     return info.get('version')
 
 
+def resolve_dependency_versions(
+        dependencies: Set[str],
+        index: Optional[DistributionIndex] = None) -> Dict[str, Tuple[str, Optional[str]]]:
+    """Resolve the distribution name and installed version of many imports in one batch
+
+    Returns a mapping of import name to (distribution name, version). Uses the
+    in-process distribution index, falling back to ``pip show`` per package
+    only when ``importlib.metadata`` is unavailable.
+    """
+    if index is None:
+        index = get_default_index()
+    resolved = {}
+
+    for dep in dependencies:
+        if index.available:
+            info = index.get(dep)
+            resolved[dep] = (info.name, info.version) if info else (dep, None)
+        else:
+            resolved[dep] = (dep, get_installed_package_version(dep))
+
+    return resolved
+
+
 def generate_requirements_content(external_deps: Dict[str, Set[str]], 
                                 include_versions: bool = True,
-                                add_comments: bool = True) -> str:
-    """Generate requirements.txt content from external dependencies"""
+                                add_comments: bool = True,
+                                resolved: Optional[Dict[str, Tuple[str, Optional[str]]]] = None,
+                                pin: str = '==',
+                                include_hashes: bool = False,
+                                index: Optional[DistributionIndex] = None) -> str:
+    """Generate requirements.txt content from external dependencies
+
+    ``resolved`` is the output of ``resolve_dependency_versions``; pass it in
+    to reuse versions that were already looked up. ``pin`` is the version
+    operator ('==', '>=' or '~='). ``include_hashes`` adds ``--hash`` options
+    when every distribution was installed from an archive whose hash pip
+    recorded; pip refuses a file where only some requirements have a hash, so
+    otherwise none are written and a warning is printed. ``index`` selects the
+    environment to read versions from.
+    """
+    if index is None:
+        index = get_default_index()
     # Collect all unique dependencies
     all_deps = set()
     dep_to_files = {}
@@ -629,33 +689,68 @@ def generate_requirements_content(external_deps: Dict[str, Set[str]],
                 dep_to_files[dep] = []
             dep_to_files[dep].append(file_path)
     
-    # Sort dependencies
-    sorted_deps = sorted(all_deps)
-    
+    if include_versions and resolved is None:
+        resolved = resolve_dependency_versions(all_deps, index)
+
+    # Several import names can come from one distribution (setuptools, pkg_resources)
+    requirements: Dict[str, Tuple[Optional[str], List[str]]] = {}  # Name -> (version, files)
+    for dep in sorted(all_deps):
+        name, version = resolved.get(dep, (dep, None)) if include_versions else (dep, None)
+        files = requirements.setdefault(name, (version, []))[1]
+        files.extend(f for f in dep_to_files[dep] if f not in files)
+    sorted_names = sorted(requirements, key=str.lower)
+
+    hashes = {}
+    missing_hashes = []
+    if include_hashes and include_versions:
+        for name in sorted_names:
+            info = index.get(name) if requirements[name][0] else None
+            archive_hash = info.archive_hash() if info else None
+            if archive_hash:
+                hashes[name] = archive_hash
+            else:
+                missing_hashes.append(name)
+        if missing_hashes:
+            hashes = {}
+            console.print(f"[yellow]Warning: no archive hash recorded for "
+                          f"{', '.join(missing_hashes)}; writing requirements without --hash, "
+                          f"since pip refuses a file where only some lines have one[/yellow]")
+
     # Build content
     lines = []
     
     if add_comments:
         lines.append(f"# Generated by PyDepTree on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        lines.append(f"# Found {len(sorted_deps)} external dependencies in {len(external_deps)} files")
+        lines.append(f"# Found {len(sorted_names)} external dependencies "
+                     f"in {len(external_deps)} files")
+        if missing_hashes:
+            lines.append(f"# --hash omitted: no archive hash recorded for "
+                         f"{', '.join(missing_hashes)}")
         lines.append("")
     
-    for dep in sorted_deps:
-        if include_versions:
-            version = get_installed_package_version(dep)
-            if version:
-                line = f"{dep}=={version}"
-            else:
-                line = f"{dep}  # Version not found"
-        else:
-            line = dep
-            
-        if add_comments and len(dep_to_files[dep]) <= 3:
+    for name in sorted_names:
+        version, used_in = requirements[name]
+        file_comment = ""
+        if add_comments and len(used_in) <= 3:
             # Add file references for small number of files
-            files = [Path(f).name for f in dep_to_files[dep]]
-            line += f"  # Used in: {', '.join(files)}"
-            
-        lines.append(line)
+            files = [Path(f).name for f in used_in]
+            file_comment = f"  # Used in: {', '.join(files)}"
+
+        if not include_versions:
+            line = name
+        elif version:
+            line = format_pin(name, version, '==' if hashes else pin)
+        else:
+            line = f"{name}  # Version not found"
+
+        if name in hashes:
+            # A comment cannot follow a line continuation, so it goes above
+            if file_comment:
+                lines.append(file_comment.strip())
+            lines.append(f"{line} \\")
+            lines.append(f"    --hash={hashes[name]}")
+        else:
+            lines.append(line + file_comment)
     
     return '\n'.join(lines)
 
@@ -834,8 +929,9 @@ def write_requirements_file(content: str, output_path: Optional[Path] = None,
         return None
 
 
-def build_package_dependency_tree(packages: Set[str], max_depth: int = 2) -> Dict[str, Dict]:
-    """Build a dependency tree for external packages"""
+def build_package_dependency_tree(packages: Set[str], max_depth: int = 2,
+                                  index: Optional[DistributionIndex] = None) -> Dict[str, Dict]:
+    """Build a dependency tree for external packages installed in ``index``'s environment"""
     package_tree = {}
     seen = set()
     
@@ -844,7 +940,7 @@ def build_package_dependency_tree(packages: Set[str], max_depth: int = 2) -> Dic
             return {}
             
         seen.add(pkg_name)
-        info = get_package_info(pkg_name)
+        info = get_package_info(pkg_name, index)
         
         pkg_data = {
             'version': info.get('version'),
@@ -870,8 +966,13 @@ def build_package_dependency_tree(packages: Set[str], max_depth: int = 2) -> Dic
     return package_tree
 
 
-def display_package_dependency_tree(package_tree: Dict[str, Dict], console: Console):
-    """Display package dependency tree in johnnydep style"""
+def display_package_dependency_tree(package_tree: Dict[str, Dict], console: Console,
+                                    environment: Optional[str] = None):
+    """Display package dependency tree in johnnydep style
+
+    ``environment`` describes the target environment passed with --python or
+    --site-packages, if any.
+    """
     console.print("\n[bold]Package Dependency Analysis:[/bold]")
     
     # Check if all packages are not installed and warn about virtual environment
@@ -896,8 +997,13 @@ def display_package_dependency_tree(package_tree: Dict[str, Dict], console: Cons
     
     if check_all_packages_not_installed(package_tree):
         console.print("\n[bold yellow]⚠️  Warning: All dependencies show as 'not installed'[/bold yellow]")
-        console.print("[dim]This usually means the virtual environment is not activated.[/dim]")
-        console.print("[dim]Try running: [bold]source <venv>/bin/activate[/bold] (Linux/Mac) or [bold]<venv>\\Scripts\\activate[/bold] (Windows)[/dim]")
+        if environment:
+            console.print(f"[dim]None of them were found in {environment}.[/dim]")
+        else:
+            console.print("[dim]This usually means the virtual environment is not activated.[/dim]")
+            console.print("[dim]Try running: [bold]source <venv>/bin/activate[/bold] (Linux/Mac) "
+                          "or [bold]<venv>\\Scripts\\activate[/bold] (Windows)[/dim]")
+            console.print("[dim]Or point at it with [bold]--python <venv>/bin/python[/bold][/dim]")
         console.print()
     
     # Create a summary table first
@@ -968,18 +1074,86 @@ def display_package_dependency_tree(package_tree: Dict[str, Dict], console: Cons
     console.print(summary_table)
 
 
+class FileAnalysisCache:
+    """Analysis results kept in memory and reused while a file's fingerprint is unchanged
+
+    Used by watch mode, so that after an edit only the changed files are
+    parsed, linted and checked against git again.
+    """
+
+    def __init__(self):
+        self._infos: Dict[Path, Tuple[Optional[List[int]], tuple, FileInfo]] = {}
+        self._imports: Dict[Path, Tuple[Optional[List[int]], Set[str]]] = {}
+        self.analyzed = 0  # Files analyzed since the last reset_counts()
+
+    def analyze(self, file_path: Path, project_root: Path, search_pattern: Optional[str] = None,
+                search_type: str = 'text', check_git: bool = True,
+                collect_lint_details: bool = False, collect_lazy_imports: bool = False,
+                collect_side_effects: bool = False) -> FileInfo:
+        """Same as analyze_file, for files that changed since their last analysis"""
+        key = file_path.resolve()
+        fingerprint = file_fingerprint(file_path)
+        options = (search_pattern, search_type, check_git, collect_lint_details,
+                   collect_lazy_imports, collect_side_effects)
+        cached = self._infos.get(key)
+        if cached is not None and cached[0] == fingerprint and cached[1] == options:
+            return cached[2]
+
+        file_info = analyze_file(file_path, project_root, *options)
+        self._infos[key] = (fingerprint, options, file_info)
+        self.analyzed += 1
+        return file_info
+
+    def imports(self, file_path: Path) -> Set[str]:
+        """Same as extract_imports, for files that changed since they were last parsed"""
+        key = file_path.resolve()
+        fingerprint = file_fingerprint(file_path)
+        cached = self._imports.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
+        imports = extract_imports(file_path)
+        self._imports[key] = (fingerprint, imports)
+        return imports
+
+    def reset_counts(self) -> None:
+        self.analyzed = 0
+
+
 def build_dependency_tree(file_path: Path, project_root: Path, depth: int, 
                          check_lint: bool = True, search_pattern: Optional[str] = None,
                          search_type: str = 'text', check_git: bool = True,
                          show_metrics: bool = True, show_imports_inline: bool = False,
-                         collect_lint_details: bool = False) -> Tuple[Tree, Dict[str, FileInfo], int]:
-    """Build a dependency tree for a Python file"""
+                         collect_lint_details: bool = False,
+                         collect_lazy_imports: bool = False,
+                         collect_side_effects: bool = False,
+                         search_candidates: Optional[Set[Path]] = None,
+                         profiles: Optional[Dict[Path, 'ModuleProfile']] = None,
+                         analysis_cache: Optional[FileAnalysisCache] = None,
+                         ) -> Tuple[Tree, Dict[str, FileInfo], int]:
+    """Build a dependency tree for a Python file
+
+    When ``search_candidates`` is given (e.g. from the trigram search index),
+    files outside that set are known not to match and are not searched.
+    ``profiles`` maps resolved file paths to their runtime cost. With an
+    ``analysis_cache``, unchanged files are not analyzed again.
+    """
+    analyze = analysis_cache.analyze if analysis_cache is not None else analyze_file
+    imports_of = analysis_cache.imports if analysis_cache is not None else extract_imports
     seen = set()
     file_stats = {}
     total_files = 0
     
+    def search_for(path: Path) -> Optional[str]:
+        if search_candidates is None or path.resolve() in search_candidates:
+            return search_pattern
+        return None
+
     # Analyze root file
-    root_info = analyze_file(file_path, project_root, search_pattern, search_type, check_git, collect_lint_details)
+    root_info = analyze(file_path, project_root, search_for(file_path), search_type, check_git,
+                        collect_lint_details, collect_lazy_imports, collect_side_effects)
+    if profiles:
+        root_info.profile = profiles.get(file_path.resolve())
     file_stats[str(file_path)] = root_info
     
     root_label = format_file_label(root_info, project_root, show_metrics)
@@ -993,7 +1167,7 @@ def build_dependency_tree(file_path: Path, project_root: Path, depth: int,
         if current_depth >= depth:
             return
             
-        imports = extract_imports(current_file)
+        imports = imports_of(current_file)
         
         for import_name in sorted(imports):
             import_parts = import_name.split('.')
@@ -1012,8 +1186,12 @@ def build_dependency_tree(file_path: Path, project_root: Path, depth: int,
                         transient=True,
                     ) as progress:
                         task = progress.add_task(f"Analyzing {potential_path.name}...", total=1)
-                        file_info = analyze_file(potential_path, project_root, 
-                                               search_pattern, search_type, check_git, collect_lint_details)
+                        file_info = analyze(potential_path, project_root, 
+                                          search_for(potential_path), search_type, check_git,
+                                          collect_lint_details, collect_lazy_imports,
+                                          collect_side_effects)
+                        if profiles:
+                            file_info.profile = profiles.get(potential_path.resolve())
                         progress.advance(task)
                     
                     file_stats[str(potential_path)] = file_info
@@ -1085,8 +1263,10 @@ def build_dependency_tree(file_path: Path, project_root: Path, depth: int,
                             transient=True,
                         ) as progress:
                             task = progress.add_task(f"Analyzing {py_file.name}...", total=1)
-                            file_info = analyze_file(py_file, project_root,
-                                                   search_pattern, search_type, check_git)
+                            file_info = analyze(py_file, project_root,
+                                              search_for(py_file), search_type, check_git)
+                            if profiles:
+                                file_info.profile = profiles.get(py_file.resolve())
                             progress.advance(task)
                         
                         file_stats[str(py_file)] = file_info
@@ -1101,7 +1281,8 @@ def build_dependency_tree(file_path: Path, project_root: Path, depth: int,
     return tree, file_stats, total_files
 
 
-def display_summary_table(file_stats: Dict[str, FileInfo], show_search: bool = False):
+def display_summary_table(file_stats: Dict[str, FileInfo], show_search: bool = False,
+                          show_profile: bool = False, show_side_effects: bool = False):
     """Display a summary table of file statistics"""
     # Group by file type
     type_stats = {}
@@ -1117,7 +1298,10 @@ def display_summary_table(file_stats: Dict[str, FileInfo], show_search: bool = F
                 'errors': 0,
                 'warnings': 0,
                 'todos': 0,
-                'search_matches': 0
+                'side_effects': 0,
+                'search_matches': 0,
+                'cpu_time': 0.0,
+                'memory': 0
             }
         
         stats = type_stats[file_info.file_type]
@@ -1129,7 +1313,11 @@ def display_summary_table(file_stats: Dict[str, FileInfo], show_search: bool = F
         stats['errors'] += file_info.lint_errors
         stats['warnings'] += file_info.lint_warnings
         stats['todos'] += len(file_info.todos)
+        stats['side_effects'] += len(file_info.side_effects)
         stats['search_matches'] += len(file_info.search_matches)
+        if file_info.profile is not None:
+            stats['cpu_time'] += file_info.profile.time
+            stats['memory'] += file_info.profile.memory
     
     # Create table
     table = Table(title="File Statistics Summary", show_header=True, header_style="bold cyan")
@@ -1141,12 +1329,18 @@ def display_summary_table(file_stats: Dict[str, FileInfo], show_search: bool = F
     table.add_column("Classes", justify="right")
     table.add_column("Avg Complexity", justify="right")
     table.add_column("TODOs", justify="right", style="bright_blue")
+    if show_side_effects:
+        table.add_column("Side Effects", justify="right", style="yellow")
     table.add_column("Errors", justify="right", style="red")
     table.add_column("Warnings", justify="right", style="yellow")
     
     if show_search:
         table.add_column("Matches", justify="right", style="magenta")
     
+    if show_profile:
+        table.add_column("CPU", justify="right", style="bold magenta")
+        table.add_column("Memory", justify="right", style="magenta")
+
     # Sort by type
     type_order = ['main', 'model', 'service', 'utils', 'config', 'test', 'other']
     
@@ -1160,7 +1354,10 @@ def display_summary_table(file_stats: Dict[str, FileInfo], show_search: bool = F
         'errors': 0,
         'warnings': 0,
         'todos': 0,
-        'search_matches': 0
+        'side_effects': 0,
+        'search_matches': 0,
+        'cpu_time': 0.0,
+        'memory': 0
     }
     
     for file_type in type_order:
@@ -1181,6 +1378,10 @@ def display_summary_table(file_stats: Dict[str, FileInfo], show_search: bool = F
                 str(stats['total_classes']),
                 f"{avg_complexity:.1f}",
                 str(stats['todos']) if stats['todos'] > 0 else "-",
+            ]
+            if show_side_effects:
+                row.append(str(stats['side_effects']) if stats['side_effects'] > 0 else "-")
+            row += [
                 str(stats['errors']) if stats['errors'] > 0 else "-",
                 str(stats['warnings']) if stats['warnings'] > 0 else "-"
             ]
@@ -1188,6 +1389,11 @@ def display_summary_table(file_stats: Dict[str, FileInfo], show_search: bool = F
             if show_search:
                 row.append(str(stats['search_matches']) if stats['search_matches'] > 0 else "-")
             
+            if show_profile:
+                row.append(format_us(int(stats['cpu_time'] * 1_000_000))
+                           if stats['cpu_time'] > 0 else "-")
+                row.append(format_size(stats['memory']) if stats['memory'] > 0 else "-")
+
             table.add_row(*row)
             
             # Update totals
@@ -1209,6 +1415,10 @@ def display_summary_table(file_stats: Dict[str, FileInfo], show_search: bool = F
             str(total_stats['total_classes']),
             f"{avg_complexity:.1f}",
             str(total_stats['todos']) if total_stats['todos'] > 0 else "-",
+        ]
+        if show_side_effects:
+            row.append(str(total_stats['side_effects']) if total_stats['side_effects'] > 0 else "-")
+        row += [
             str(total_stats['errors']) if total_stats['errors'] > 0 else "-",
             str(total_stats['warnings']) if total_stats['warnings'] > 0 else "-"
         ]
@@ -1216,6 +1426,11 @@ def display_summary_table(file_stats: Dict[str, FileInfo], show_search: bool = F
         if show_search:
             row.append(str(total_stats['search_matches']) if total_stats['search_matches'] > 0 else "-")
         
+        if show_profile:
+            row.append(format_us(int(total_stats['cpu_time'] * 1_000_000))
+                       if total_stats['cpu_time'] > 0 else "-")
+            row.append(format_size(total_stats['memory']) if total_stats['memory'] > 0 else "-")
+
         table.add_row(*row, style="bold")
     
     console.print(table)
@@ -1277,6 +1492,211 @@ def display_todos_summary(file_stats: Dict[str, FileInfo]):
                 console.print(f"  ... and {len(todos) - 5} more")
 
 
+def aggregate_side_effects(file_stats: Dict[str, FileInfo], project_root: Path) -> Dict[str, int]:
+    """Count the side effects each analyzed file triggers when imported, including its imports
+
+    Every project module in the file's import closure is counted once, so
+    modules shared by several branches of the tree are not double-counted.
+    """
+    graph = build_project_graph(project_root)
+    own_counts = {}
+    modules = {}
+    for key, info in file_stats.items():
+        try:
+            rel_path = info.path.resolve().relative_to(project_root.resolve())
+        except ValueError:
+            rel_path = Path(info.path.name)
+        modules[key] = module_name_for_path(rel_path.as_posix())
+        own_counts[modules[key]] = len(info.side_effects)
+
+    return {key: sum(own_counts.get(name, 0) for name in graph.closure(module) | {module})
+            for key, module in modules.items()}
+
+
+def display_side_effects_summary(file_stats: Dict[str, FileInfo], project_root: Path,
+                                 limit: int = 15):
+    """Display the modules doing work at import time, heaviest subtree first"""
+    totals = aggregate_side_effects(file_stats, project_root)
+    rows = [(key, info) for key, info in file_stats.items() if totals.get(key)]
+    if not rows:
+        return
+    rows.sort(key=lambda row: (-totals[row[0]], -len(row[1].side_effects), str(row[1].path)))
+
+    table = Table(title="Import-Time Side Effects", show_header=True, header_style="bold cyan")
+    table.add_column("File", style="cyan")
+    table.add_column("Own", justify="right")
+    table.add_column("With Imports", justify="right", style="bold")
+    table.add_column("Statements", style="dim")
+
+    for key, info in rows[:limit]:
+        path = (info.path.relative_to(project_root) if info.path.is_relative_to(project_root)
+                else info.path)
+        statements = Text()
+        for i, effect in enumerate(info.side_effects[:3]):
+            if i:
+                statements.append("\n")
+            statements.append(f"{effect.lineno}: ", style="dim")
+            statements.append(effect.description, style="bold red" if effect.kind == 'io' else "")
+        if len(info.side_effects) > 3:
+            statements.append(f"\n... and {len(info.side_effects) - 3} more", style="dim")
+        table.add_row(str(path), str(len(info.side_effects)) if info.side_effects else "-",
+                      str(totals[key]), statements)
+
+    console.print()
+    console.print(table)
+    if len(rows) > limit:
+        console.print(f"[dim]... and {len(rows) - limit} more[/dim]")
+
+
+def load_runtime_profiles(profile_paths: Tuple[Path, ...],
+                          project_root: Path) -> Dict[Path, 'ModuleProfile']:
+    """Attribute --profile-data files to project files, keyed by resolved path"""
+    from .runtime_profile import attribute_profile, load_profile_data
+    profile = load_profile_data(profile_paths)
+    graph = build_project_graph(project_root)
+    return {(graph.project_root / graph.paths[module]).resolve(): module_profile
+            for module, module_profile in attribute_profile(profile, graph).items()}
+
+
+def display_profile_summary(file_stats: Dict[str, FileInfo], project_root: Path, limit: int = 15):
+    """Display the files whose subtrees cost the most CPU time and memory at runtime"""
+    rows = [info for info in file_stats.values() if info.profile is not None]
+    if not rows:
+        console.print("\n[yellow]No profiled code matches the files in the dependency "
+                      "tree[/yellow]")
+        return
+    rows.sort(key=lambda info: (-info.profile.cumulative_time, -info.profile.cumulative_memory,
+                                str(info.path)))
+
+    show_time = any(info.profile.cumulative_time for info in rows)
+    show_memory = any(info.profile.cumulative_memory for info in rows)
+
+    table = Table(title="Runtime Profile", show_header=True, header_style="bold cyan")
+    table.add_column("File", style="cyan")
+    if show_time:
+        table.add_column("Self Time", justify="right")
+        table.add_column("With Imports", justify="right", style="bold magenta")
+        table.add_column("Calls", justify="right", style="dim")
+    if show_memory:
+        table.add_column("Memory", justify="right")
+        table.add_column("With Imports", justify="right", style="magenta")
+
+    for info in rows[:limit]:
+        path = (info.path.relative_to(project_root) if info.path.is_relative_to(project_root)
+                else info.path)
+        row = [str(path)]
+        if show_time:
+            row += [format_us(int(info.profile.time * 1_000_000)),
+                    format_us(int(info.profile.cumulative_time * 1_000_000)),
+                    f"{info.profile.calls:,}"]
+        if show_memory:
+            row += [format_size(info.profile.memory), format_size(info.profile.cumulative_memory)]
+        table.add_row(*row)
+
+    console.print()
+    console.print(table)
+    if len(rows) > limit:
+        console.print(f"[dim]... and {len(rows) - limit} more[/dim]")
+
+
+def format_import_statement(ref: ImportRef, names: List[str]) -> str:
+    """Rebuild the source of an import statement"""
+    if ref.level == 0 and not ref.names:
+        alias = names[0] if names else ref.module
+        if alias == ref.module.partition('.')[0]:
+            return f"import {ref.module}"
+        return f"import {ref.module} as {alias}"
+    return f"from {'.' * ref.level}{ref.module} import {', '.join(ref.names)}"
+
+
+def weigh_lazy_imports(
+        file_stats: Dict[str, FileInfo], project_root: Path,
+        index: Optional[DistributionIndex] = None,
+        target_python: Optional[PythonVersion] = None,
+) -> List[Tuple[FileInfo, LazyImport, int, int]]:
+    """Weigh each lazy-import candidate by the transitive closure of what it imports
+
+    Returns (file, candidate, project modules, installed modules) rows, where
+    the counts are the modules that would no longer be loaded at import time
+    if nothing else imported them. Standard library modules are not counted.
+    """
+    candidates = [(info, lazy) for info in file_stats.values() for lazy in info.lazy_imports]
+    if not candidates:
+        return []
+
+    from .thirdparty import DistributionGraphs, external_import_targets
+    graph = build_project_graph(project_root)
+    local_names = graph.local_top_level_names()
+    graphs = DistributionGraphs(index or get_default_index(), target_python=target_python)
+    rows = []
+    try:
+        for info, lazy in candidates:
+            try:
+                rel_path = info.path.resolve().relative_to(project_root.resolve())
+            except ValueError:
+                rel_path = Path(info.path.name)
+            module = module_name_for_path(rel_path.as_posix())
+
+            project_modules = graph.resolve_imports(module, [lazy.ref])
+            for target in list(project_modules):
+                project_modules |= graph.closure(target)
+            project_modules.discard(module)
+
+            external = set()
+            base = graph.resolve_import_base(module, lazy.ref)
+            if lazy.ref.level == 0 and base.partition('.')[0] not in local_names:
+                external.add(base)
+                external.update(f"{base}.{name}" for name in lazy.ref.names)
+            for name in project_modules:
+                external.update(external_import_targets(graph, name, local_names))
+
+            rows.append((info, lazy, len(project_modules), len(graphs.load(external))))
+    finally:
+        graphs.close()
+
+    rows.sort(key=lambda row: (-(row[2] + row[3]), str(row[0].path), row[1].ref.lineno))
+    return rows
+
+
+def display_lazy_candidates(rows: List[Tuple[FileInfo, LazyImport, int, int]], project_root: Path,
+                            target_python: Optional[PythonVersion] = None, limit: int = 20):
+    """Display module-level imports that could be moved into the functions using them"""
+    if not rows:
+        console.print("\n[green]No lazy-import candidates: every top-level import is used at "
+                      "module level[/green]")
+        return
+
+    table = Table(title="Lazy Import Candidates", show_header=True, header_style="bold cyan")
+    table.add_column("Location", style="cyan")
+    table.add_column("Import", style="bright_cyan")
+    table.add_column("Used In", style="dim")
+    table.add_column("Project", justify="right")
+    table.add_column("Installed", justify="right")
+    table.add_column("Closure", justify="right", style="bold")
+
+    for info, lazy, project_count, installed_count in rows[:limit]:
+        path = (info.path.relative_to(project_root) if info.path.is_relative_to(project_root)
+                else info.path)
+        used_in = ", ".join(lazy.functions[:3])
+        if len(lazy.functions) > 3:
+            used_in += f" (+{len(lazy.functions) - 3} more)"
+        closure = project_count + installed_count
+        if (closure == 0 and lazy.ref.level == 0
+                and is_stdlib_module(lazy.ref.module, target_python)):
+            closure_text = Text("stdlib", style="dim")
+        else:
+            closure_text = Text(str(closure))
+        table.add_row(f"{path}:{lazy.ref.lineno}", format_import_statement(lazy.ref, lazy.names),
+                      used_in, str(project_count), str(installed_count), closure_text)
+
+    console.print()
+    console.print(table)
+    if len(rows) > limit:
+        console.print(f"[dim]... and {len(rows) - limit} more[/dim]")
+    console.print("[dim]Closure: modules loaded by the import (project + installed packages), "
+                  "which moving it into the functions listed defers until first use[/dim]")
+
+
 def display_detailed_lint_issues(file_stats: Dict[str, FileInfo], show_errors: bool, show_warnings: bool):
     """Display detailed lint errors and warnings with file names and line numbers"""
     if show_errors:
@@ -1468,8 +1888,13 @@ def display_lint_statistics(project_root: Path):
 @click.option('--search', '-S', help='Search for text/pattern in files')
 @click.option('--search-type', type=click.Choice(['text', 'class', 'function', 'import']), 
               default='text', help='Type of search to perform')
+@click.option('--search-index/--no-search-index', default=False,
+              help='Use a persistent trigram index to skip files that cannot match --search')
 @click.option('--show-todos/--no-show-todos', default=True,
               help='Show/hide TODO comments')
+@click.option('--show-side-effects/--no-show-side-effects', default=False,
+              help='Show module-level statements that do work at import time '
+                   '(scans the whole project)')
 @click.option('--check-git/--no-check-git', default=True,
               help='Show/hide git status')
 @click.option('--show-metrics/--no-show-metrics', default=True,
@@ -1486,17 +1911,43 @@ def display_lint_statistics(project_root: Path):
               help='Show/hide lint rule statistics summary (enabled by default)')
 @click.option('--no-versions', is_flag=True,
               help='Generate requirements.txt without version numbers')
+@click.option('--pin', type=click.Choice(['==', '>=', '~=']), default='==',
+              help='Version operator used in the generated requirements.txt (default: ==)')
+@click.option('--hashes', 'include_hashes', is_flag=True,
+              help='Add --hash options when every package\'s install archive hash is recorded')
 @click.option('--no-interactive', is_flag=True,
               help='Don\'t prompt for confirmation when requirements.txt exists')
 @click.option('--analyze-deps', is_flag=True,
               help='Show detailed dependency analysis like johnnydep')
 @click.option('--dep-depth', default=2, type=int,
               help='Maximum depth for dependency analysis (default: 2)')
+@click.option('--profile-data', 'profile_data', multiple=True,
+              type=click.Path(exists=True, dir_okay=False, path_type=Path),
+              help='cProfile/pstats dump or tracemalloc snapshot to overlay on the tree '
+                   '(repeatable)')
+@click.option('--watch', '-w', is_flag=True,
+              help='Keep running and re-render the tree and summary when project files change')
+@click.option('--poll-interval', default=DEFAULT_POLL_INTERVAL, type=float, show_default=True,
+              help='Seconds between checks for changes in --watch mode '
+                   'when watchfiles is not installed')
+@click.option('--lazy-candidates', is_flag=True,
+              help='List top-level imports only used inside functions, '
+                   'weighted by what they import')
+@click.option('--footprint', is_flag=True,
+              help='Show how many modules and bytes each external import statically loads')
+@target_python_option
+@environment_options
 def cli(file_path: Path, depth: int, project_root: Optional[Path], show_code_param: Optional[str], 
         check_lint: bool, show_stats: bool, search: Optional[str], search_type: str,
-        show_todos: bool, check_git: bool, show_metrics: bool,
-        generate_requirements: bool, requirements_output: Optional[Path], no_versions: bool,
-        no_interactive: bool, analyze_deps: bool, dep_depth: int, show_errors: bool, show_warnings: bool, show_lint_stats: bool):
+        search_index: bool, show_todos: bool, show_side_effects: bool, check_git: bool,
+        show_metrics: bool, generate_requirements: bool, requirements_output: Optional[Path],
+        no_versions: bool, pin: str, include_hashes: bool,
+        no_interactive: bool, analyze_deps: bool, dep_depth: int,
+        profile_data: Tuple[Path, ...], watch: bool, poll_interval: float,
+        lazy_candidates: bool, footprint: bool, show_errors: bool, show_warnings: bool,
+        show_lint_stats: bool,
+        target_python: Optional[PythonVersion], target_interpreter: Optional[Path],
+        site_packages: Tuple[Path, ...]):
     """Advanced Python Dependency Tree Analyzer with search, complexity, and more
     
     Analyzes Python dependencies starting from a file or directory. When a directory
@@ -1505,6 +1956,13 @@ def cli(file_path: Path, depth: int, project_root: Optional[Path], show_code_par
     # Map parameter to show_code for consistency
     show_code = show_code_param
     
+    # Installed packages are read from the target environment's metadata
+    environment_index = open_environment_index(target_interpreter, site_packages)
+    environment = None
+    if environment_index.paths is not None:
+        environment = ", ".join(environment_index.paths)
+        target_python = infer_target_python(environment_index, target_python)
+
     # Handle directory input - find entry point file
     original_input = file_path
     if file_path.is_dir():
@@ -1524,115 +1982,183 @@ def cli(file_path: Path, depth: int, project_root: Optional[Path], show_code_par
         if project_root is None:
             project_root = file_path.parent
     
-    # Display header
-    header = Panel(
-        f"[bold]Advanced Python Dependency Analyzer[/bold]\n\n"
-        f"File: [cyan]{file_path}[/cyan]\n"
-        f"Project root: [green]{project_root}[/green]\n"
-        f"Max depth: [yellow]{depth}[/yellow]\n"
-        f"Lint checking: [{'green' if check_lint else 'red'}]{'enabled' if check_lint else 'disabled'}[/]\n"
-        f"Git status: [{'green' if check_git else 'red'}]{'enabled' if check_git else 'disabled'}[/]" +
-        (f"\nSearch: [magenta]{search}[/magenta] (type: {search_type})" if search else ""),
-        title="Analysis Settings",
-        border_style="blue"
-    )
-    console.print(header)
-    
-    # Display legend
-    legend_items = [
-        "📊 Models", "🌐 Services", "🔧 Utils", "🧪 Tests", "🚀 Main", "⚙️ Config"
-    ]
+    def show_header():
+        # Display header
+        header = Panel(
+            f"[bold]Advanced Python Dependency Analyzer[/bold]\n\n"
+            f"File: [cyan]{file_path}[/cyan]\n"
+            f"Project root: [green]{project_root}[/green]\n"
+            f"Max depth: [yellow]{depth}[/yellow]\n"
+            f"Lint checking: [{'green' if check_lint else 'red'}]"
+            f"{'enabled' if check_lint else 'disabled'}[/]\n"
+            f"Git status: [{'green' if check_git else 'red'}]"
+            f"{'enabled' if check_git else 'disabled'}[/]" +
+            (f"\nSearch: [magenta]{search}[/magenta] (type: {search_type})" if search else "") +
+            (f"\nEnvironment: [cyan]{environment}[/cyan]" if environment else ""),
+            title="Analysis Settings",
+            border_style="blue"
+        )
+        console.print(header)
     
-    if show_metrics:
-        legend_items.extend([
-            "Size", "Lines", "Imports↓", "C:Complexity",
-            "[Nc/Nf]", "E:Errors", "W:Warnings", "📌TODOs"
-        ])
+        # Display legend
+        legend_items = [
+            "📊 Models", "🌐 Services", "🔧 Utils", "🧪 Tests", "🚀 Main", "⚙️ Config"
+        ]
+
+        if show_metrics:
+            legend_items.extend([
+                "Size", "Lines", "Imports↓", "C:Complexity",
+                "[Nc/Nf]", "E:Errors", "W:Warnings", "📌TODOs", "⚡Side effects"
+            ])
         
-    if check_git:
-        legend_items.append("[M]:Modified")
+        if check_git:
+            legend_items.append("[M]:Modified")
         
-    if search:
-        legend_items.append("🔍:Matches")
-    
-    console.print("\n[bold]Legend:[/bold]")
-    console.print(" | ".join(legend_items))
-    
-    # Build dependency tree
-    start_time = time.time()
-    
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        console=console,
-        transient=True
-    ) as progress:
-        task = progress.add_task("Building dependency tree...", total=None)
-        tree, file_stats, total_files = build_dependency_tree(
-            file_path, project_root, depth, check_lint, 
-            search, search_type, check_git, show_metrics, 
-            show_imports_inline=(show_code in ['inline', 'both']),
-            collect_lint_details=(show_errors or show_warnings)
-        )
-        progress.update(task, completed=True)
-    
-    # Display tree
-    console.print("\n", Panel(tree, title="Dependency Tree", border_style="green"))
-    
-    # Display summary
-    elapsed_time = time.time() - start_time
-    console.print(f"\nFound [cyan]{total_files}[/cyan] files with "
-                 f"[green]{sum(f.imports for f in file_stats.values())}[/green] total dependencies "
-                 f"in [yellow]{elapsed_time:.2f}s[/yellow]")
-    
-    # Display statistics table
-    if show_stats:
-        console.print()
-        display_summary_table(file_stats, show_search=bool(search))
-    
-    # Display lint summary
-    if check_lint:
-        display_lint_summary(file_stats)
-    
-    # Display detailed lint issues if requested
-    if (show_errors or show_warnings) and check_lint:
-        display_detailed_lint_issues(file_stats, show_errors, show_warnings)
+        if search:
+            legend_items.append("🔍:Matches")
     
-    # Display lint statistics if requested
-    if show_lint_stats and check_lint:
-        display_lint_statistics(project_root)
-    
-    # Display TODOs summary
-    if show_todos and not search:
-        display_todos_summary(file_stats)
-    
-    # Display search results summary
-    if search:
-        total_matches = sum(len(f.search_matches) for f in file_stats.values())
-        if total_matches > 0:
-            console.print(f"\n[bold magenta]Search Results:[/bold magenta] Found {total_matches} matches for '{search}'")
-        else:
-            console.print(f"\n[bold red]No matches found for '{search}'[/bold red]")
+        if profile_data:
+            legend_items.extend(["⏱CPU time", "💾Memory"])
     
-    # Display import statements at bottom if requested
-    if show_code in ['below', 'both']:
-        console.print("\n[bold]Import Statements:[/bold]")
-        for file_path_str, file_info in list(file_stats.items())[:10]:
-            if file_info.imports > 0:
-                console.print(f"\n[cyan]{file_info.path.name}:[/cyan]")
-                try:
-                    with open(file_info.path, 'r') as f:
-                        lines = f.readlines()
-                        for i, line in enumerate(lines):
-                            if line.strip().startswith(('import ', 'from ')):
-                                syntax = Syntax(line.strip(), "python", theme="monokai", line_numbers=False)
-                                console.print(f"  ", syntax, end="")
-                except Exception:
-                    console.print("  [red]Error reading file[/red]")
+        console.print("\n[bold]Legend:[/bold]")
+        console.print(" | ".join(legend_items))
+
+    # Attribute runtime profiles to project files before labelling the tree
+    profiles = None
+    if profile_data:
+        try:
+            profiles = load_runtime_profiles(profile_data, project_root)
+        except (OSError, ValueError) as e:
+            raise click.BadParameter(str(e), param_hint="'--profile-data'") from e
+
+    # Kept between runs in watch mode so only changed files are re-analyzed
+    analysis_cache = FileAnalysisCache() if watch else None
+    
+    def render() -> Dict[str, FileInfo]:
+        # Build dependency tree
+        start_time = time.time()
+    
+        # Narrow the files to search using the trigram index
+        search_candidates = None
+        if search and search_index:
+            from .search_index import TrigramIndex
+            index = TrigramIndex(project_root)
+            try:
+                reindexed = index.update()
+                search_candidates = index.candidates(build_search_pattern(search, search_type))
+            finally:
+                index.close()
+            if search_candidates is not None:
+                console.print(f"[dim]Search index: {len(search_candidates)} candidate files "
+                              f"({reindexed} reindexed)[/dim]")
+
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=console,
+            transient=True
+        ) as progress:
+            task = progress.add_task("Building dependency tree...", total=None)
+            tree, file_stats, total_files = build_dependency_tree(
+                file_path, project_root, depth, check_lint, 
+                search, search_type, check_git, show_metrics, 
+                show_imports_inline=(show_code in ['inline', 'both']),
+                collect_lint_details=(show_errors or show_warnings),
+                collect_lazy_imports=lazy_candidates,
+                collect_side_effects=show_side_effects,
+                search_candidates=search_candidates,
+                profiles=profiles,
+                analysis_cache=analysis_cache
+            )
+            progress.update(task, completed=True)
+
+        # Display tree
+        console.print("\n", Panel(tree, title="Dependency Tree", border_style="green"))
+
+        # Display summary
+        elapsed_time = time.time() - start_time
+        console.print(f"\nFound [cyan]{total_files}[/cyan] files with "
+                     f"[green]{sum(f.imports for f in file_stats.values())}[/green] "
+                     f"total dependencies in [yellow]{elapsed_time:.2f}s[/yellow]" +
+                     (f" [dim]({analysis_cache.analyzed} analyzed)[/dim]"
+                      if analysis_cache is not None else ""))
+
+        # Display statistics table
+        if show_stats:
+            console.print()
+            display_summary_table(file_stats, show_search=bool(search),
+                                  show_profile=bool(profile_data),
+                                  show_side_effects=show_side_effects)
+
+        # Display lint summary
+        if check_lint:
+            display_lint_summary(file_stats)
+
+        # Display detailed lint issues if requested
+        if (show_errors or show_warnings) and check_lint:
+            display_detailed_lint_issues(file_stats, show_errors, show_warnings)
+
+        # Display lint statistics if requested
+        if show_lint_stats and check_lint:
+            display_lint_statistics(project_root)
+
+        # Display TODOs summary
+        if show_todos and not search:
+            display_todos_summary(file_stats)
+
+        # Display the runtime cost of each file's subtree
+        if profile_data:
+            display_profile_summary(file_stats, project_root)
+
+        # Display work done at import time, aggregated over each file's imports
+        if show_side_effects:
+            display_side_effects_summary(file_stats, project_root)
+
+        # Display imports that could be deferred into functions
+        if lazy_candidates:
+            display_lazy_candidates(
+                weigh_lazy_imports(file_stats, project_root, environment_index, target_python),
+                project_root, target_python)
+
+        # Display search results summary
+        if search:
+            total_matches = sum(len(f.search_matches) for f in file_stats.values())
+            if total_matches > 0:
+                console.print(f"\n[bold magenta]Search Results:[/bold magenta] "
+                              f"Found {total_matches} matches for '{search}'")
+            else:
+                console.print(f"\n[bold red]No matches found for '{search}'[/bold red]")
+
+        # Display import statements at bottom if requested
+        if show_code in ['below', 'both']:
+            console.print("\n[bold]Import Statements:[/bold]")
+            for file_path_str, file_info in list(file_stats.items())[:10]:
+                if file_info.imports > 0:
+                    console.print(f"\n[cyan]{file_info.path.name}:[/cyan]")
+                    try:
+                        with open(file_info.path, 'r') as f:
+                            lines = f.readlines()
+                            for i, line in enumerate(lines):
+                                if line.strip().startswith(('import ', 'from ')):
+                                    syntax = Syntax(line.strip(), "python", theme="monokai",
+                                                    line_numbers=False)
+                                    console.print(f"  ", syntax, end="")
+                    except Exception:
+                        console.print("  [red]Error reading file[/red]")
+
+        return file_stats
+
+    # Snapshot the project before the first render, so files saved while it runs are seen
+    if watch:
+        from .watch import create_watcher
+        watcher = create_watcher(project_root, poll_interval)
+
+    show_header()
+    file_stats = render()
     
     # Extract external dependencies if needed for either requirements or analysis
-    if generate_requirements or analyze_deps:
-        external_deps = extract_external_dependencies(file_stats, project_root)
+    if generate_requirements or analyze_deps or footprint:
+        external_deps = extract_external_dependencies(file_stats, project_root, target_python)
         
         if external_deps:
             # Display found dependencies
@@ -1642,6 +2168,11 @@ def cli(file_path: Path, depth: int, project_root: Optional[Path], show_code_par
             
             console.print(f"\nFound [cyan]{len(all_deps)}[/cyan] external dependencies:")
             
+            # Resolve every version once and reuse it for the table and the file
+            resolved = None
+            if generate_requirements and not no_versions:
+                resolved = resolve_dependency_versions(all_deps, environment_index)
+
             # Show enhanced dependency analysis if requested
             if analyze_deps:
                 console.print("\n[bold]Building dependency tree...[/bold]")
@@ -1654,12 +2185,13 @@ def cli(file_path: Path, depth: int, project_root: Optional[Path], show_code_par
                     task = progress.add_task("Analyzing package dependencies...", total=None)
                     
                     # Build package dependency tree
-                    package_tree = build_package_dependency_tree(all_deps, dep_depth)
+                    package_tree = build_package_dependency_tree(all_deps, dep_depth,
+                                                                 environment_index)
                     
                     progress.update(task, completed=True)
                 
                 # Display the dependency tree
-                display_package_dependency_tree(package_tree, console)
+                display_package_dependency_tree(package_tree, console, environment)
             elif generate_requirements:
                 # Show simple table only if generating requirements
                 deps_table = Table(show_header=True, header_style="bold cyan")
@@ -1668,14 +2200,14 @@ def cli(file_path: Path, depth: int, project_root: Optional[Path], show_code_par
                 deps_table.add_column("Used In", style="dim")
                 
                 dep_to_files = {}
-                for file_path, deps in external_deps.items():
+                for dep_file, deps in external_deps.items():
                     for dep in deps:
                         if dep not in dep_to_files:
                             dep_to_files[dep] = []
-                        dep_to_files[dep].append(Path(file_path).name)
+                        dep_to_files[dep].append(Path(dep_file).name)
                 
                 for dep in sorted(all_deps):
-                    version = get_installed_package_version(dep) if not no_versions else "N/A"
+                    version = resolved[dep][1] if resolved is not None else "N/A"
                     files = dep_to_files[dep]
                     files_str = ", ".join(files[:3])
                     if len(files) > 3:
@@ -1685,6 +2217,31 @@ def cli(file_path: Path, depth: int, project_root: Optional[Path], show_code_par
                 
                 console.print(deps_table)
             
+            # Show what each external import costs, from its installed files
+            if footprint:
+                from .thirdparty import DistributionGraphs, display_import_footprints
+                graphs = DistributionGraphs(environment_index, target_python=target_python)
+                try:
+                    with Progress(
+                        SpinnerColumn(),
+                        TextColumn("[progress.description]{task.description}"),
+                        console=console,
+                        transient=True
+                    ) as progress:
+                        task = progress.add_task("Scanning installed packages...", total=None)
+                        footprints = [graphs.footprint(dep) for dep in sorted(all_deps)]
+                        progress.update(task, completed=True)
+                finally:
+                    graphs.close()
+
+                console.print()
+                display_import_footprints([item for item in footprints if item is not None],
+                                          console)
+                not_installed = [dep for dep, item in zip(sorted(all_deps), footprints)
+                                 if item is None]
+                if not_installed:
+                    console.print(f"[dim]Not installed: {', '.join(not_installed)}[/dim]")
+
             # Generate requirements file if requested
             if generate_requirements:
                 console.print("\n[bold]Generating Requirements File...[/bold]")
@@ -1693,7 +2250,11 @@ def cli(file_path: Path, depth: int, project_root: Optional[Path], show_code_par
                 content = generate_requirements_content(
                     external_deps, 
                     include_versions=not no_versions,
-                    add_comments=True
+                    add_comments=True,
+                    resolved=resolved,
+                    pin=pin,
+                    include_hashes=include_hashes,
+                    index=environment_index
                 )
                 
                 # Write file
@@ -1714,6 +2275,28 @@ def cli(file_path: Path, depth: int, project_root: Optional[Path], show_code_par
             console.print("\n[yellow]No external dependencies found.[/yellow]")
             console.print("All imports appear to be from the standard library or internal modules.")
 
+    # Re-render the tree and summary whenever project files change
+    if watch:
+        console.print(f"\n[dim]Watching {project_root} for changes "
+                      f"({type(watcher).__name__.replace('Watcher', '').lower()}); "
+                      f"press Ctrl+C to stop[/dim]")
+        try:
+            while True:
+                changed = watcher.wait()
+                if not changed:
+                    continue
+                analysis_cache.reset_counts()
+                console.clear()
+                show_header()
+                console.print(f"\n[dim]{datetime.now():%H:%M:%S} changed: "
+                              f"{', '.join(sorted(changed)[:5])}"
+                              f"{f' (+{len(changed) - 5} more)' if len(changed) > 5 else ''}[/dim]")
+                render()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
+
 
 if __name__ == '__main__':
     cli()
\ No newline at end of file
@@ -0,0 +1,239 @@
+"""
+Weighted critical path of module import chains
+"""
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from .graph import ProjectGraph
+from .importtime import format_us, parse_importtime
+from .options import open_project_graph, rev_option
+from .project import resolve_entry
+
+console = Console()
+
+WEIGHT_METRICS = ('lines', 'bytes', 'statements')
+
+# A dependency between two components of the condensed graph
+ComponentEdge = Tuple[int, int]
+
+
+def static_weights(graph: ProjectGraph, metric: str = 'lines') -> Dict[str, float]:
+    """Weigh each module by a static cost proxy: 'lines', 'bytes' or top-level 'statements'"""
+    attribute = {'lines': 'lines', 'bytes': 'size', 'statements': 'statements'}[metric]
+    return {module: float(getattr(record, attribute)) for module, record in graph.records.items()}
+
+
+def load_weights_file(path: Path) -> Dict[str, float]:
+    """Load measured module weights
+
+    Accepts a raw ``python -X importtime`` log or the JSON output of
+    ``pydeptree importtime --json`` (weights are self times in microseconds),
+    or a JSON object mapping module names to weights.
+    """
+    text = Path(path).read_text(encoding='utf-8')
+    if 'import time:' in text and not text.lstrip().startswith('{'):
+        return {module: float(timing.self_us) for module, timing in parse_importtime(text).items()}
+
+    data = json.loads(text)
+    if isinstance(data, dict) and isinstance(data.get('timings'), list):
+        return {item['module']: float(item['self_us']) for item in data['timings']}
+    if isinstance(data, dict):
+        return {module: float(weight) for module, weight in data.items()}
+    raise ValueError(f"{path}: expected an importtime log or a JSON object of module weights")
+
+
+@dataclass
+class CriticalPath:
+    """The heaviest import chain from an entry module"""
+    entry: str
+    weight: float
+    steps: List[List[str]] = field(default_factory=list)  # Modules per step; several for a cycle
+    step_weights: List[float] = field(default_factory=list)
+
+
+@dataclass
+class LazyEdgeCandidate:
+    """Imports that, deferred together, shorten the critical path"""
+    imports: List[Tuple[str, str, List[int]]]  # (importer, imported, line numbers)
+    saving: float
+    new_weight: float
+
+
+class CriticalPathAnalysis:
+    """Longest weighted path through the import graph after collapsing cycles"""
+
+    def __init__(self, graph: ProjectGraph, weights: Dict[str, float]):
+        self.graph = graph
+        self.weights = weights
+        self.components, self.component_of, self.component_edges = graph.condensation()
+        self.component_weights = [sum(weights.get(module, 0.0) for module in component)
+                                  for component in self.components]
+
+    def _longest_from(self, start: int,
+                      removed: Optional[ComponentEdge] = None) -> Tuple[float, List[int]]:
+        """Longest path from a component, optionally without one component edge"""
+        best: Dict[int, float] = {}
+        next_step: Dict[int, Optional[int]] = {}
+
+        # Iterative post-order DFS; the condensation is acyclic
+        stack = [(start, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if node in best:
+                continue
+            children = [child for child in self.component_edges[node] if (node, child) != removed]
+            if not children_done:
+                stack.append((node, True))
+                stack.extend((child, False) for child in children if child not in best)
+                continue
+
+            heaviest, heaviest_child = 0.0, None
+            for child in sorted(children, key=lambda c: self.components[c]):
+                if best[child] > heaviest:
+                    heaviest, heaviest_child = best[child], child
+            best[node] = self.component_weights[node] + heaviest
+            next_step[node] = heaviest_child
+
+        path = [start]
+        while next_step[path[-1]] is not None:
+            path.append(next_step[path[-1]])
+        return best[start], path
+
+    def critical_path(self, entry: str) -> CriticalPath:
+        """Get the heaviest import chain starting at an entry module"""
+        weight, path = self._longest_from(self.component_of[entry])
+        return CriticalPath(
+            entry=entry,
+            weight=weight,
+            steps=[self.components[component] for component in path],
+            step_weights=[self.component_weights[component] for component in path],
+        )
+
+    def lazy_candidates(self, entry: str, limit: int = 10) -> List[LazyEdgeCandidate]:
+        """Rank the dependencies on the critical path by how much deferring them saves
+
+        Only edges on the current critical path can shorten it, so each of
+        those is removed in turn and the longest path recomputed.
+        """
+        start = self.component_of[entry]
+        weight, path = self._longest_from(start)
+
+        candidates = []
+        for source, target in zip(path, path[1:]):
+            new_weight, _ = self._longest_from(start, removed=(source, target))
+            if new_weight >= weight:
+                continue
+            imports = []
+            for module in self.components[source]:
+                for imported in sorted(self.graph.edges.get(module, ())):
+                    if self.component_of[imported] == target:
+                        imports.append((module, imported,
+                                        self.graph.import_lines(module, imported)))
+            candidates.append(LazyEdgeCandidate(imports=imports, saving=weight - new_weight,
+                                                new_weight=new_weight))
+
+        candidates.sort(key=lambda candidate: -candidate.saving)
+        return candidates[:limit]
+
+
+def display_critical_path(graph: ProjectGraph, critical: CriticalPath,
+                          candidates: List[LazyEdgeCandidate], unit: str) -> None:
+    """Display the critical path and the best imports to defer"""
+    def fmt(value: float) -> str:
+        return format_us(int(value)) if unit == 'us' else f"{value:,.0f} {unit}"
+
+    table = Table(title=f"Critical import path from {critical.entry}", show_header=True,
+                  header_style="bold cyan")
+    table.add_column("#", justify="right", style="dim")
+    table.add_column("Module", style="cyan")
+    table.add_column("Weight", justify="right")
+    table.add_column("Remaining", justify="right", style="dim")
+
+    remaining = critical.weight
+    for i, (modules, weight) in enumerate(zip(critical.steps, critical.step_weights), 1):
+        if len(modules) > 1:
+            name = f"[yellow]cycle:[/yellow] {', '.join(graph.paths[m] for m in modules)}"
+        else:
+            name = graph.paths[modules[0]]
+        table.add_row(str(i), name, fmt(weight), fmt(remaining))
+        remaining -= weight
+
+    console.print(table)
+    console.print(f"Critical path weight: [bold]{fmt(critical.weight)}[/bold] "
+                  f"over {len(critical.steps)} steps")
+
+    if not candidates:
+        console.print("[green]No single deferred import shortens the critical path[/green]")
+        return
+
+    table = Table(title="Imports to make lazy", show_header=True, header_style="bold cyan")
+    table.add_column("Import", style="cyan")
+    table.add_column("Location", style="green")
+    table.add_column("Saves", justify="right", style="bold")
+    table.add_column("New Critical Path", justify="right", style="dim")
+
+    for candidate in candidates:
+        names = "\n".join(f"{importer} → {imported}" for importer, imported, _ in candidate.imports)
+        locations = "\n".join(f"{graph.paths[importer]}:{','.join(map(str, lines))}"
+                              for importer, _, lines in candidate.imports)
+        table.add_row(names, locations, fmt(candidate.saving), fmt(candidate.new_weight))
+
+    console.print(table)
+
+
+@click.command('critical-path')
+@click.argument('entry')
+@click.option('-r', '--root', 'project_root',
+              type=click.Path(exists=True, file_okay=False, path_type=Path), default='.',
+              help='Project root directory (default: current directory)')
+@click.option('-w', '--weight', 'metric', type=click.Choice(WEIGHT_METRICS), default='lines',
+              help='Static cost of each module (default: lines)')
+@click.option('--weights-file', type=click.Path(exists=True, dir_okay=False, path_type=Path),
+              help='Measured weights: a -X importtime log, "pydeptree importtime --json" output '
+                   'or a JSON object of module weights (overrides --weight)')
+@click.option('-n', '--top', default=10,
+              help='Number of lazy-import candidates to show (default: 10)')
+@rev_option
+@click.option('--json', 'as_json', is_flag=True, help='Output the result as JSON')
+def critical_path(entry: str, project_root: Path, metric: str, weights_file: Optional[Path],
+                  top: int, rev: Optional[str], as_json: bool):
+    """Find the heaviest import chain from ENTRY and the imports worth deferring
+
+    Import cycles are collapsed into single steps. Each dependency on the
+    critical path is then removed in turn to see how much making that import
+    lazy (moving it into the function that uses it) would save.
+    """
+    module, project_root = resolve_entry(entry, project_root)
+    graph = open_project_graph(project_root, rev)
+    if module not in graph.paths:
+        raise click.BadParameter(f"'{module}' is not a module of {project_root}",
+                                 param_hint="'ENTRY'")
+
+    if weights_file is not None:
+        try:
+            weights = load_weights_file(weights_file)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            raise click.BadParameter(str(e), param_hint="'--weights-file'") from e
+        unit = 'us'
+    else:
+        weights = static_weights(graph, metric)
+        unit = metric
+
+    analysis = CriticalPathAnalysis(graph, weights)
+    critical = analysis.critical_path(module)
+    candidates = analysis.lazy_candidates(module, top)
+
+    if as_json:
+        click.echo(json.dumps({
+            'unit': unit,
+            'critical_path': asdict(critical),
+            'lazy_candidates': [asdict(candidate) for candidate in candidates],
+        }, indent=2))
+    else:
+        display_critical_path(graph, critical, candidates, unit)
@@ -0,0 +1,273 @@
+"""
+Incremental import cycle detection under edge insertions and deletions
+
+``CycleTracker`` keeps the strongly connected components of a changing
+graph together with a topological order of the components, maintained with
+the Pearce–Kelly algorithm. Inserting an edge that agrees with the order
+costs nothing; otherwise only the components between its endpoints in the
+order are searched, and the ones that now lie on a cycle are merged.
+Deleting an edge inside a component re-runs Tarjan's algorithm on that
+component alone. Work is proportional to the affected region, not to the
+size of the graph.
+"""
+from bisect import bisect_right, insort
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from .graph import strongly_connected_components
+
+Edge = Tuple[str, str]
+
+# Spacing between the order positions of components, leaving room for splits
+_ORDER_GAP = 1 << 16
+
+
+@dataclass
+class CycleChange:
+    """Cycles formed and dissolved by a batch of edge changes
+
+    A cycle that grows or shrinks shows up as dissolved (its old members)
+    and formed (its new members).
+    """
+    formed: List[List[str]] = field(default_factory=list)
+    dissolved: List[List[str]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.formed or self.dissolved)
+
+
+class CycleTracker:
+    """Strongly connected components of a directed graph, maintained as edges change"""
+
+    def __init__(self, edges: Optional[Dict[str, Iterable[str]]] = None):
+        self.successors: Dict[str, Set[str]] = {}
+        self.predecessors: Dict[str, Set[str]] = {}
+        self.component_of: Dict[str, int] = {}
+        self.members: Dict[int, Set[str]] = {}
+        self.order: Dict[int, int] = {}  # Component -> position; edges go from lower to higher
+        self._positions: List[int] = []  # Sorted positions in use
+        self._next_id = 0
+        # Components created and removed by the batch being applied
+        self._created: Set[FrozenSet[str]] = set()
+        self._removed: Set[FrozenSet[str]] = set()
+
+        for module, targets in (edges or {}).items():
+            self.successors.setdefault(module, set()).update(targets)
+            self.predecessors.setdefault(module, set())
+            for target in targets:
+                self.successors.setdefault(target, set())
+                self.predecessors.setdefault(target, set()).add(module)
+
+        # Tarjan lists sinks first, so the reversed list is a topological order
+        components = strongly_connected_components(self.successors)
+        for position, component in enumerate(reversed(components)):
+            self._add_component(set(component), position * _ORDER_GAP)
+        self._created.clear()
+
+    # Queries
+
+    def cycles(self) -> List[List[str]]:
+        """Get every group of nodes that import each other in a cycle"""
+        return sorted(sorted(members) for members in self.members.values() if len(members) > 1)
+
+    def cycle_of(self, node: str) -> Set[str]:
+        """Get the other nodes in a cycle with a node"""
+        component = self.component_of.get(node)
+        if component is None:
+            return set()
+        return self.members[component] - {node}
+
+    def closure_sizes(self) -> Dict[str, int]:
+        """Get the number of nodes reachable from each node
+
+        Components are visited in reverse topological order, so the
+        maintained order saves recomputing the condensation.
+        """
+        bits = {node: 1 << i for i, node in enumerate(self.component_of)}
+        reach: Dict[int, int] = {}
+        sizes = {}
+        for component in sorted(self.order, key=self.order.get, reverse=True):
+            mask = 0
+            for node in self.members[component]:
+                mask |= bits[node]
+                for target in self.successors[node]:
+                    other = self.component_of[target]
+                    if other != component:
+                        mask |= reach[other]
+            reach[component] = mask
+            size = bin(mask).count('1') - 1  # Not counting the node itself
+            for node in self.members[component]:
+                sizes[node] = size
+        return sizes
+
+    def precedes(self, a: str, b: str) -> bool:
+        """Check whether ``a`` comes before ``b`` in the maintained topological order"""
+        return self.order[self.component_of[a]] < self.order[self.component_of[b]]
+
+    # Updates
+
+    def add_node(self, node: str) -> None:
+        if node in self.component_of:
+            return
+        self.successors[node] = set()
+        self.predecessors[node] = set()
+        position = self._positions[-1] + _ORDER_GAP if self._positions else 0
+        self._add_component({node}, position)
+
+    def remove_node(self, node: str) -> CycleChange:
+        """Remove a node and its edges"""
+        if node not in self.component_of:
+            return CycleChange()
+        edges = [(node, target) for target in self.successors[node]]
+        edges += [(source, node) for source in self.predecessors[node]]
+        change = self.update(removed=edges)
+        self._remove_component(self.component_of.pop(node))
+        self._removed.clear()
+        del self.successors[node], self.predecessors[node]
+        return change
+
+    def update(self, added: Iterable[Edge] = (), removed: Iterable[Edge] = ()) -> CycleChange:
+        """Apply a batch of edge deletions and insertions and report how the cycles changed"""
+        self._created.clear()
+        self._removed.clear()
+        for source, target in removed:
+            self._remove_edge(source, target)
+        for source, target in added:
+            self._add_edge(source, target)
+
+        change = CycleChange(
+            formed=sorted(sorted(members) for members in self._created - self._removed
+                          if len(members) > 1),
+            dissolved=sorted(sorted(members) for members in self._removed - self._created
+                             if len(members) > 1),
+        )
+        self._created.clear()
+        self._removed.clear()
+        return change
+
+    def add_edge(self, source: str, target: str) -> CycleChange:
+        return self.update(added=[(source, target)])
+
+    def remove_edge(self, source: str, target: str) -> CycleChange:
+        return self.update(removed=[(source, target)])
+
+    # Components
+
+    def _add_component(self, members: Set[str], position: int) -> int:
+        component = self._next_id
+        self._next_id += 1
+        self.members[component] = members
+        self.order[component] = position
+        insort(self._positions, position)
+        for node in members:
+            self.component_of[node] = component
+        key = frozenset(members)
+        if key in self._removed:
+            self._removed.discard(key)  # Recreated within the batch: no change
+        else:
+            self._created.add(key)
+        return component
+
+    def _remove_component(self, component: int) -> None:
+        members = self.members.pop(component)
+        position = self.order.pop(component)
+        del self._positions[bisect_right(self._positions, position) - 1]
+        key = frozenset(members)
+        if key in self._created:
+            self._created.discard(key)
+        else:
+            self._removed.add(key)
+
+    def _renumber(self, gap: int = _ORDER_GAP) -> None:
+        """Spread the component positions out again when a split runs out of room"""
+        by_position = sorted(self.order, key=self.order.get)
+        for index, component in enumerate(by_position):
+            self.order[component] = index * gap
+        self._positions = [index * gap for index in range(len(by_position))]
+
+    # Insertion (Pearce–Kelly)
+
+    def _add_edge(self, source: str, target: str) -> None:
+        self.add_node(source)
+        self.add_node(target)
+        if target in self.successors[source] or source == target:
+            return
+        self.successors[source].add(target)
+        self.predecessors[target].add(source)
+
+        head, tail = self.component_of[source], self.component_of[target]
+        if head == tail or self.order[head] < self.order[tail]:
+            return  # The order is still topological
+
+        # Components reachable from the target that are not after the source...
+        forward = self._search(tail, self.successors,
+                               lambda component: self.order[component] <= self.order[head])
+        # ...and components reaching the source that are not before the target
+        backward = self._search(head, self.predecessors,
+                                lambda component: self.order[component] >= self.order[tail])
+
+        # Components on both sides now lie on a cycle through the new edge
+        merged = forward & backward
+        positions = sorted(self.order[c] for c in forward | backward)
+        before = sorted(backward - merged, key=self.order.get)
+        after = sorted(forward - merged, key=self.order.get)
+
+        # Reuse the affected positions: what reaches the source takes the lowest ones and what the
+        # target reaches the highest, so neither moves past an unaffected neighbor; the merged
+        # cycle goes in between and the positions of the other merged components are freed
+        for component in before + after:
+            self._positions.remove(self.order[component])
+        cycle_members = set().union(*(self.members[c] for c in merged))
+        for component in merged:
+            self._remove_component(component)
+        placement = (list(zip(before, positions))
+                     + list(zip(after, positions[len(positions) - len(after):])))
+        for component, position in placement:
+            self.order[component] = position
+            insort(self._positions, position)
+        if merged:
+            self._add_component(cycle_members, positions[len(before)])
+
+    def _search(self, start: int, adjacency: Dict[str, Set[str]], within) -> Set[int]:
+        """Get the components reachable from ``start`` through components satisfying ``within``"""
+        seen = {start}
+        stack = [start]
+        while stack:
+            component = stack.pop()
+            for node in self.members[component]:
+                for neighbor in adjacency[node]:
+                    other = self.component_of[neighbor]
+                    if other not in seen and within(other):
+                        seen.add(other)
+                        stack.append(other)
+        return seen
+
+    # Deletion
+
+    def _remove_edge(self, source: str, target: str) -> None:
+        if target not in self.successors.get(source, ()):
+            return
+        self.successors[source].discard(target)
+        self.predecessors[target].discard(source)
+
+        component = self.component_of[source]
+        if self.component_of[target] != component:
+            return  # Deleting an edge never invalidates a topological order
+
+        members = self.members[component]
+        parts = strongly_connected_components(self.successors, members)
+        if len(parts) == 1:
+            return
+
+        # The parts take the place of the component, in topological order
+        index = bisect_right(self._positions, self.order[component])
+        if (index < len(self._positions)
+                and self._positions[index] - self.order[component] < len(parts)):
+            self._renumber(max(_ORDER_GAP, len(parts)))
+        position = self.order[component]
+        following = (self._positions[index] if index < len(self._positions)
+                     else position + _ORDER_GAP)
+        step = max(1, (following - position) // len(parts))
+        self._remove_component(component)
+        for offset, part in enumerate(reversed(parts)):
+            self._add_component(set(part), position + offset * step)
@@ -0,0 +1,244 @@
+"""
+Resident daemon answering dependency queries over a Unix domain socket
+
+The protocol is one JSON object per line in each direction. A request is
+``{"method": "dependents", "params": {"module": "app.models"}}`` and the
+reply is ``{"result": ...}`` or ``{"error": "..."}``, so any client that
+can write to a socket (e.g. ``socat`` or ``nc -U``) can query it.
+"""
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import click
+
+from .cache import get_cache_dir
+from .watch import DEFAULT_POLL_INTERVAL
+
+SOCKET_NAME = 'daemon.sock'
+
+# Unix socket paths are limited to about 100 bytes
+_MAX_SOCKET_PATH = 100
+
+
+class DaemonError(Exception):
+    """The daemon could not be reached or reported an error"""
+
+
+def default_socket_path(project_root: Path) -> Path:
+    """Get the socket of a project's daemon, in its cache directory
+
+    Falls back to the temporary directory when that path would be too long
+    for a Unix socket.
+    """
+    path = get_cache_dir(project_root) / SOCKET_NAME
+    if len(str(path)) > _MAX_SOCKET_PATH:
+        digest = hashlib.sha1(str(Path(project_root).resolve()).encode('utf-8')).hexdigest()[:16]
+        path = Path(tempfile.gettempdir()) / f"pydeptree-{digest}.sock"
+    return path
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    return json.dumps(message, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        from .service import QueryError
+
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                method = request.get('method')
+                if method == 'shutdown':
+                    self.wfile.write(encode_message({'result': 'stopping'}))
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                    return
+                response = {'result': self.server.service.call(method, request.get('params'))}
+            except (ValueError, AttributeError, QueryError) as e:
+                response = {'error': str(e)}
+            self.wfile.write(encode_message(response))
+            self.wfile.flush()
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded Unix socket server answering queries from a ``ProjectService``"""
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, service, poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.socket_path = Path(socket_path)
+        self.service = service
+        self.poll_interval = poll_interval
+        self._stopped = threading.Event()
+        _remove_stale_socket(self.socket_path)
+        super().__init__(str(self.socket_path), _RequestHandler)
+        os.chmod(self.socket_path, 0o600)
+
+    def serve(self) -> None:
+        """Serve requests and watch for changes until shut down"""
+        watch_thread = threading.Thread(target=self.service.watch,
+                                        args=(self._stopped, self.poll_interval), daemon=True)
+        watch_thread.start()
+        try:
+            self.serve_forever()
+        finally:
+            self._stopped.set()
+            self.server_close()
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            self.socket_path.unlink()
+        except OSError:
+            pass
+
+
+def _remove_stale_socket(socket_path: Path) -> None:
+    """Remove a socket left behind by a daemon that is no longer running
+
+    A socket that accepts connections is kept, whatever answers on it.
+    """
+    if not socket_path.exists():
+        return
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(1.0)
+            sock.connect(str(socket_path))
+    except OSError:
+        socket_path.unlink()
+        return
+    raise DaemonError(f"A daemon is already listening on {socket_path}")
+
+
+def query_daemon(socket_path: Path, method: str, params: Optional[Dict[str, Any]] = None,
+                 timeout: float = 30.0) -> Any:
+    """Send one query to a running daemon and return its result"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path))
+            sock.sendall(encode_message({'method': method, 'params': params or {}}))
+            with sock.makefile('rb') as reader:
+                line = reader.readline()
+    except OSError as e:
+        raise DaemonError(f"Cannot reach the daemon at {socket_path}: {e}") from e
+
+    if not line:
+        raise DaemonError(f"The daemon at {socket_path} closed the connection")
+    try:
+        response = json.loads(line)
+        if 'error' not in response:
+            return response['result']
+    except (ValueError, KeyError, TypeError) as e:
+        # Not a pydeptree daemon, or a truncated reply
+        raise DaemonError(f"Invalid reply from {socket_path}: {line[:80]!r}") from e
+    raise DaemonError(response['error'])
+
+
+def _require_unix_sockets() -> None:
+    if not hasattr(socket, 'AF_UNIX'):
+        raise click.ClickException("The daemon needs Unix domain sockets, "
+                                   "which this platform does not support")
+
+
+def _socket_for(project_root: Path, socket_path: Optional[Path]) -> Path:
+    return socket_path if socket_path is not None else default_socket_path(project_root)
+
+
+@click.command('daemon')
+@click.option('-r', '--root', 'project_root',
+              type=click.Path(exists=True, file_okay=False, path_type=Path), default='.',
+              help='Project root directory (default: current directory)')
+@click.option('--socket', 'socket_path', type=click.Path(dir_okay=False, path_type=Path),
+              help='Socket path (default: daemon.sock in the project cache directory)')
+@click.option('--poll-interval', default=DEFAULT_POLL_INTERVAL, type=float, show_default=True,
+              help='Seconds between checks for changes when watchfiles is not installed')
+def daemon(project_root: Path, socket_path: Optional[Path], poll_interval: float):
+    """Keep the project graph in memory and answer queries over a Unix socket
+
+    Files are analyzed once; afterwards only changed files are re-read.
+    Query the daemon with ``pydeptree query`` or by writing JSON lines to
+    the socket. Stop it with Ctrl+C or ``pydeptree query shutdown``.
+    """
+    _require_unix_sockets()
+    from .service import ProjectService
+
+    socket_path = _socket_for(project_root, socket_path)
+    start = time.perf_counter()
+    service = ProjectService(project_root)
+    try:
+        server = DaemonServer(socket_path, service, poll_interval)
+    except DaemonError as e:
+        raise click.ClickException(str(e)) from e
+
+    status = service.status()
+    click.echo(f"Loaded {status['modules']} modules in {time.perf_counter() - start:.2f}s; "
+               f"listening on {socket_path}", err=True)
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        pass
+
+
+def _query_params(method: str, targets: Tuple[str, ...], depth: Optional[int], transitive: bool,
+                  match: Optional[str], limit: Optional[int]) -> Dict[str, Any]:
+    """Map command-line arguments onto a query's parameters"""
+    params: Dict[str, Any] = {}
+    if method == 'impact':
+        params['paths'] = list(targets)
+    elif method == 'search':
+        params['query'] = ' '.join(targets)
+    elif targets:
+        params['module'] = targets[0]
+    if depth is not None:
+        params['depth'] = depth
+    if transitive:
+        params['transitive'] = True
+    if match is not None:
+        params['match'] = match
+    if limit is not None:
+        params['limit'] = limit
+    return params
+
+
+@click.command('query')
+@click.argument('method')
+@click.argument('targets', nargs=-1)
+@click.option('-r', '--root', 'project_root',
+              type=click.Path(exists=True, file_okay=False, path_type=Path), default='.',
+              help='Project root directory (default: current directory)')
+@click.option('--socket', 'socket_path', type=click.Path(dir_okay=False, path_type=Path),
+              help='Socket path (default: daemon.sock in the project cache directory)')
+@click.option('-d', '--depth', type=int, help='Depth of a tree query')
+@click.option('-t', '--transitive', is_flag=True,
+              help='Follow dependencies/dependents transitively')
+@click.option('--match', type=click.Choice(['exact', 'prefix', 'fuzzy']),
+              help='Match mode of a search query')
+@click.option('-n', '--limit', type=int, help='Maximum number of search results')
+def query(method: str, targets: Tuple[str, ...], project_root: Path, socket_path: Optional[Path],
+          depth: Optional[int], transitive: bool, match: Optional[str], limit: Optional[int]):
+    """Query a running ``pydeptree daemon`` and print the JSON result
+
+    METHOD is one of status, nodes, edges, metrics, tree, dependencies,
+    dependents, cycles, search, impact or shutdown. TARGETS is the module
+    (dotted name or file path), the search text, or the changed files for
+    impact.
+    """
+    _require_unix_sockets()
+    params = _query_params(method, targets, depth, transitive, match, limit)
+    try:
+        result = query_daemon(_socket_for(project_root, socket_path), method, params)
+    except DaemonError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+    click.echo(json.dumps(result, indent=2))
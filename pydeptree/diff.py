@@ -0,0 +1,234 @@
+"""
+Architecture drift between two versions of a project: modules, import edges, cycles and metrics
+
+Either side is a git revision or a saved snapshot ("pydeptree snapshot -o").
+Revisions are read through one shared ``BlobAnalyzer``, so a blob present on
+both sides (or in a snapshot that recorded blob ids) is parsed and linted
+once; only the files that changed cost any work.
+"""
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from .cycles import CycleChange
+from .git import GitError, find_git_root
+from .revision import BlobAnalyzer
+from .snapshot import SUMMARY_LABELS, ProjectSnapshot, take_snapshot
+
+console = Console()
+
+Edge = Tuple[str, str]
+
+
+@dataclass
+class ModuleChange:
+    """Metrics of a module present on both sides whose content changed"""
+    module: str
+    path: str
+    lines: Tuple[int, int]
+    complexity: Tuple[int, int]
+    lint_errors: Optional[Tuple[int, int]] = None
+    lint_warnings: Optional[Tuple[int, int]] = None
+
+
+@dataclass
+class GraphDiff:
+    added_modules: List[str] = field(default_factory=list)
+    removed_modules: List[str] = field(default_factory=list)
+    added_edges: List[Edge] = field(default_factory=list)
+    removed_edges: List[Edge] = field(default_factory=list)
+    cycles: CycleChange = field(default_factory=CycleChange)
+    changed_modules: List[ModuleChange] = field(default_factory=list)
+    # Before, after
+    summary: Dict[str, Tuple[Optional[float], Optional[float]]] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            'added_modules': self.added_modules,
+            'removed_modules': self.removed_modules,
+            'added_edges': [list(edge) for edge in self.added_edges],
+            'removed_edges': [list(edge) for edge in self.removed_edges],
+            'new_cycles': self.cycles.formed,
+            'broken_cycles': self.cycles.dissolved,
+            'changed_modules': [
+                {'module': change.module, 'path': change.path, 'lines': list(change.lines),
+                 'complexity': list(change.complexity),
+                 'lint_errors': None if change.lint_errors is None else list(change.lint_errors),
+                 'lint_warnings': (None if change.lint_warnings is None
+                                   else list(change.lint_warnings))}
+                for change in self.changed_modules
+            ],
+            'summary': {key: list(values) for key, values in self.summary.items()},
+        }
+
+
+def _edge_set(snapshot: ProjectSnapshot) -> set:
+    return {(module, target)
+            for module, targets in snapshot.graph.edges.items() for target in targets}
+
+
+def _changed(before: ProjectSnapshot, after: ProjectSnapshot, rel_path: str) -> bool:
+    if rel_path in before.blobs and rel_path in after.blobs:
+        return before.blobs[rel_path] != after.blobs[rel_path]
+    return before.records[rel_path] != after.records[rel_path]
+
+
+def compare_snapshots(before: ProjectSnapshot, after: ProjectSnapshot) -> GraphDiff:
+    """Compare two snapshots of a project"""
+    old, new = before.graph, after.graph
+    old_edges, new_edges = _edge_set(before), _edge_set(after)
+    old_cycles = {frozenset(cycle) for cycle in old.cycles()}
+    new_cycles = {frozenset(cycle) for cycle in new.cycles()}
+
+    changed_modules = []
+    for module in sorted(old.paths.keys() & new.paths.keys()):
+        rel_path = new.paths[module]
+        if old.paths[module] != rel_path or not _changed(before, after, rel_path):
+            continue
+        lint = before.lint is not None and after.lint is not None
+        old_record, new_record = old.records[module], new.records[module]
+        changed_modules.append(ModuleChange(
+            module=module,
+            path=rel_path,
+            lines=(old_record.lines, new_record.lines),
+            complexity=(old_record.complexity, new_record.complexity),
+            lint_errors=(before.lint[rel_path][0], after.lint[rel_path][0]) if lint else None,
+            lint_warnings=(before.lint[rel_path][1], after.lint[rel_path][1]) if lint else None,
+        ))
+
+    old_summary, new_summary = before.summary(), after.summary()
+    return GraphDiff(
+        added_modules=sorted(new.paths.keys() - old.paths.keys()),
+        removed_modules=sorted(old.paths.keys() - new.paths.keys()),
+        added_edges=sorted(new_edges - old_edges),
+        removed_edges=sorted(old_edges - new_edges),
+        cycles=CycleChange(
+            formed=sorted(sorted(cycle) for cycle in new_cycles - old_cycles),
+            dissolved=sorted(sorted(cycle) for cycle in old_cycles - new_cycles),
+        ),
+        changed_modules=changed_modules,
+        summary={key: (old_summary[key], new_summary[key]) for key in old_summary},
+    )
+
+
+def _seed_analyzer(analyzer: BlobAnalyzer, snapshot: ProjectSnapshot) -> None:
+    """Let a revision reuse the records of a saved snapshot for the blobs they share"""
+    for rel_path, oid in snapshot.blobs.items():
+        analyzer.records.setdefault(oid, snapshot.records[rel_path])
+        if snapshot.lint is not None:
+            analyzer.lint_counts.setdefault((oid, rel_path), snapshot.lint[rel_path])
+
+
+def load_sides(project_root: Path, specs: Tuple[str, str],
+               lint: bool = False) -> Tuple[ProjectSnapshot, ProjectSnapshot]:
+    """Get the two sides of a comparison, each a saved snapshot file or a git revision"""
+    project_root = Path(project_root).resolve()
+    sides: List[Optional[ProjectSnapshot]] = [
+        ProjectSnapshot.load(Path(spec), project_root) if Path(spec).is_file() else None
+        for spec in specs]
+    if all(side is not None for side in sides):
+        return sides[0], sides[1]
+
+    git_root = find_git_root(project_root)
+    with BlobAnalyzer(git_root, project_root) as analyzer:
+        for side in sides:
+            if side is not None:
+                _seed_analyzer(analyzer, side)
+        for index, spec in enumerate(specs):
+            if sides[index] is None:
+                sides[index] = take_snapshot(project_root, spec, lint, analyzer)
+    return sides[0], sides[1]
+
+
+def _format_number(value) -> str:
+    return '-' if value is None else f"{value:g}"
+
+
+def _format_delta(before, after) -> str:
+    if before is None or after is None or before == after:
+        return ''
+    delta = after - before
+    return f"{'+' if delta > 0 else ''}{delta:g}" if isinstance(delta, int) else f"{delta:+.2f}"
+
+
+def display_diff(diff: GraphDiff, labels: Tuple[str, str]) -> None:
+    table = Table(title='Project Metrics', show_header=True, header_style='bold magenta')
+    table.add_column('Metric', style='cyan')
+    table.add_column(labels[0], justify='right')
+    table.add_column(labels[1], justify='right')
+    table.add_column('Change', justify='right')
+    for key, (before, after) in diff.summary.items():
+        if before is None and after is None:
+            continue
+        table.add_row(SUMMARY_LABELS[key], _format_number(before), _format_number(after),
+                      _format_delta(before, after))
+    console.print(table)
+
+    for module in diff.added_modules:
+        console.print(f"[green]+ module[/green] {module}")
+    for module in diff.removed_modules:
+        console.print(f"[red]- module[/red] {module}")
+    for module, target in diff.added_edges:
+        console.print(f"[green]+ import[/green] {module} → {target}")
+    for module, target in diff.removed_edges:
+        console.print(f"[red]- import[/red] {module} → {target}")
+    for cycle in diff.cycles.formed:
+        console.print(f"[red]✗ New import cycle:[/red] {', '.join(cycle)}")
+    for cycle in diff.cycles.dissolved:
+        console.print(f"[green]✓ Broken import cycle:[/green] {', '.join(cycle)}")
+
+    if diff.changed_modules:
+        changes = Table(title='Changed Modules', show_header=True, header_style='bold magenta')
+        changes.add_column('Module', style='cyan')
+        changes.add_column('Lines', justify='right')
+        changes.add_column('Complexity', justify='right')
+        show_lint = diff.changed_modules[0].lint_errors is not None
+        if show_lint:
+            changes.add_column('Errors', justify='right')
+            changes.add_column('Warnings', justify='right')
+        for change in diff.changed_modules:
+            row = [change.module] + [f"{before} → {after}" if before != after else str(after)
+                                     for before, after in (change.lines, change.complexity)]
+            if show_lint:
+                row += [f"{before} → {after}" if before != after else str(after)
+                        for before, after in (change.lint_errors, change.lint_warnings)]
+            changes.add_row(*row)
+        console.print(changes)
+
+    if not (diff.added_modules or diff.removed_modules or diff.added_edges or diff.removed_edges
+            or diff.cycles or diff.changed_modules):
+        console.print('[green]✓ No changes to modules or imports[/green]')
+
+
+@click.command('diff')
+@click.argument('before')
+@click.argument('after')
+@click.option('-r', '--root', 'project_root',
+              type=click.Path(exists=True, file_okay=False, path_type=Path), default='.',
+              help='Project root directory (default: current directory)')
+@click.option('--lint', is_flag=True, help='Also compare ruff error and warning counts')
+@click.option('--json', 'as_json', is_flag=True, help='Output the differences as JSON')
+def diff(before: str, after: str, project_root: Path, lint: bool, as_json: bool):
+    """Show how the import graph and metrics changed from BEFORE to AFTER
+
+    Each side is a git revision (commit, tag or branch) or a snapshot file
+    saved with "pydeptree snapshot -o". Revisions are read straight from git
+    and files that are the same on both sides are analyzed only once.
+    """
+    try:
+        sides = load_sides(project_root, (before, after), lint)
+    except (GitError, ValueError) as e:
+        console.print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+
+    result = compare_snapshots(*sides)
+    if as_json:
+        click.echo(json.dumps(result.to_dict(), indent=2))
+    else:
+        display_diff(result, (before, after))
@@ -0,0 +1,435 @@
+"""
+In-process index of the distributions installed in a Python environment
+
+Reads dist-info metadata directly instead of spawning ``pip show`` once per
+package, so every lookup after the first is a dictionary access.
+"""
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:
+    from importlib import metadata as importlib_metadata
+except ImportError:  # pragma: no cover - Python 3.7
+    try:
+        import importlib_metadata  # type: ignore
+    except ImportError:
+        importlib_metadata = None  # type: ignore
+
+
+_REQUIREMENT_NAME = re.compile(r'^\s*([A-Za-z0-9][A-Za-z0-9._-]*)')
+_EXTRA_MARKER = re.compile(r'\bextra\s*==')
+_VERSIONED_LIB_DIR = re.compile(r'^(?:python|pypy)(\d+)\.(\d+)')
+
+# Well-known import names that differ from their distribution's name, used
+# when the distribution is not installed and its metadata cannot be read
+KNOWN_DISTRIBUTION_NAMES = {
+    'attr': 'attrs',
+    'bs4': 'beautifulsoup4',
+    'cv2': 'opencv-python',
+    'dateutil': 'python-dateutil',
+    'dotenv': 'python-dotenv',
+    'fitz': 'PyMuPDF',
+    'gi': 'PyGObject',
+    'jose': 'python-jose',
+    'jwt': 'PyJWT',
+    'magic': 'python-magic',
+    'MySQLdb': 'mysqlclient',
+    'OpenSSL': 'pyOpenSSL',
+    'PIL': 'Pillow',
+    'pkg_resources': 'setuptools',
+    'psycopg2': 'psycopg2-binary',
+    'serial': 'pyserial',
+    'sklearn': 'scikit-learn',
+    'skimage': 'scikit-image',
+    'usb': 'pyusb',
+    'win32api': 'pywin32',
+    'yaml': 'PyYAML',
+    'zmq': 'pyzmq',
+}
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a distribution name as described in PEP 503"""
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+def parse_requirement_name(requirement: str) -> Optional[str]:
+    """Get the distribution name from a requirement string such as 'rich>=12; python_version<"4"'"""
+    match = _REQUIREMENT_NAME.match(requirement)
+    return match.group(1) if match else None
+
+
+def is_extra_requirement(requirement: str) -> bool:
+    """Check whether a Requires-Dist entry only applies when an extra is requested"""
+    _, _, marker = requirement.partition(';')
+    return bool(_EXTRA_MARKER.search(marker))
+
+
+@dataclass
+class DistributionInfo:
+    """Metadata of an installed distribution"""
+    name: str
+    version: str
+    summary: Optional[str] = None
+    home_page: Optional[str] = None
+    author: Optional[str] = None
+    requires: List[str] = field(default_factory=list)  # Raw Requires-Dist entries
+    _dist: object = field(default=None, repr=False, compare=False)
+    _module_names: Optional[Set[str]] = field(default=None, repr=False, compare=False)
+
+    @property
+    def dependencies(self) -> List[str]:
+        """Names of the distributions this one always requires (extras excluded)"""
+        names = []
+        for requirement in self.requires:
+            name = parse_requirement_name(requirement)
+            if name and not is_extra_requirement(requirement) and name not in names:
+                names.append(name)
+        return names
+
+    def archive_hash(self) -> Optional[str]:
+        """Get the 'algorithm:digest' hash pip recorded for the installed archive, if any"""
+        if self._dist is None:
+            return None
+        return _read_archive_hash(self._dist)
+
+    def disk_size(self) -> int:
+        """Get the total size in bytes of the files this distribution installed
+
+        Uses the sizes recorded in RECORD, falling back to the file system for
+        entries without one (e.g. ``.pyc`` files).
+        """
+        dist = self._dist
+        if dist is None:
+            return 0
+
+        total = 0
+        for entry in dist.files or ():
+            if entry.size is not None:
+                total += entry.size
+                continue
+            try:
+                total += Path(entry.locate()).stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def record_digest(self) -> str:
+        """Get a digest of RECORD, which lists the hash of every installed file
+
+        Empty when the distribution has no RECORD (e.g. legacy egg installs).
+        """
+        text = self._dist.read_text('RECORD') if self._dist is not None else None
+        if not text:
+            return ''
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    @property
+    def location(self) -> Optional[Path]:
+        """Get the directory the distribution is installed into (its site-packages)"""
+        if self._dist is None:
+            return None
+        return Path(str(self._dist.locate_file('')))
+
+    def module_files(self) -> List[Tuple[str, Path]]:
+        """Get the Python and extension modules this distribution installed
+
+        Returns (path relative to the install location, absolute path) pairs;
+        scripts and metadata are left out.
+        """
+        dist = self._dist
+        if dist is None:
+            return []
+
+        modules = []
+        for entry in dist.files or ():
+            parts = entry.parts
+            if not parts or parts[0] == '..' or '__pycache__' in parts:
+                continue
+            if parts[0].endswith(('.dist-info', '.egg-info', '.data')):
+                continue
+            if parts[-1].endswith(('.py', '.so', '.pyd')):
+                modules.append(('/'.join(parts), Path(str(entry.locate()))))
+        return modules
+
+    def module_names(self) -> Set[str]:
+        """Get the dotted names of the modules and packages this distribution installed files for"""
+        if self._module_names is None:
+            names = set()
+            for rel_path, _ in self.module_files():
+                parts = rel_path.split('/')
+                stem = parts[-1].split('.')[0]  # Also drops extension module ABI tags
+                parts = parts[:-1] if stem == '__init__' else parts[:-1] + [stem]
+                for i in range(1, len(parts) + 1):
+                    names.add('.'.join(parts[:i]))
+            self._module_names = names
+        return self._module_names
+
+    def top_level_names(self) -> List[str]:
+        """Get the top-level import names this distribution provides"""
+        dist = self._dist
+        if dist is None:
+            return []
+
+        text = dist.read_text('top_level.txt')
+        if text:
+            return [line.strip() for line in text.splitlines() if line.strip()]
+
+        # No top_level.txt (e.g. wheels built by flit or hatch): derive from RECORD
+        names = []
+        for entry in dist.files or ():
+            parts = entry.parts
+            if not parts or parts[0] in ('..', '__pycache__') or parts[0].endswith(
+                    ('.dist-info', '.egg-info', '.data')):
+                continue
+            if len(parts) == 1:
+                if parts[0].endswith('.py'):
+                    name = parts[0][:-3]
+                elif parts[0].endswith(('.so', '.pyd')):
+                    name = parts[0].split('.')[0]
+                else:
+                    continue
+            else:
+                name = parts[0]
+            if name.isidentifier() and name not in names:
+                names.append(name)
+        return names
+
+
+def _read_archive_hash(dist) -> Optional[str]:
+    """Read the archive hash pip records in direct_url.json for file/URL installs"""
+    try:
+        text = dist.read_text('direct_url.json')
+        if not text:
+            return None
+        archive_info = json.loads(text).get('archive_info', {})
+    except (ValueError, AttributeError):
+        return None
+
+    hashes = archive_info.get('hashes') or {}
+    if 'sha256' in hashes:
+        return f"sha256:{hashes['sha256']}"
+    legacy = archive_info.get('hash', '')
+    if '=' in legacy:
+        algorithm, digest = legacy.split('=', 1)
+        return f"{algorithm}:{digest}"
+    return None
+
+
+class DistributionIndex:
+    """Index of the distributions installed on a set of sys.path entries
+
+    With ``paths=None`` the running interpreter's ``sys.path`` is used.
+    """
+
+    def __init__(self, paths: Optional[Sequence[str]] = None):
+        self.paths = list(paths) if paths is not None else None
+        self.available = importlib_metadata is not None
+        self.distributions: Dict[str, DistributionInfo] = {}
+        self._import_map: Optional[Dict[str, List[str]]] = None
+
+        if not self.available:
+            return
+
+        if self.paths is None:
+            dists = importlib_metadata.distributions()
+        else:
+            dists = importlib_metadata.distributions(path=self.paths)
+
+        for dist in dists:
+            try:
+                meta = dist.metadata
+                name = meta.get('Name')
+            except Exception:
+                continue
+            if not name:
+                continue
+            key = normalize_name(name)
+            if key in self.distributions:
+                # Earlier sys.path entries shadow later ones, as at import time
+                continue
+            self.distributions[key] = DistributionInfo(
+                name=name,
+                version=meta.get('Version') or '',
+                summary=meta.get('Summary'),
+                home_page=meta.get('Home-page'),
+                author=meta.get('Author'),
+                requires=list(meta.get_all('Requires-Dist') or []),
+                _dist=dist,
+            )
+
+    def import_map(self) -> Dict[str, List[str]]:
+        """Map top-level import names to the distributions that provide them"""
+        if self._import_map is None:
+            self._import_map = {}
+            for key, info in self.distributions.items():
+                for top_level in info.top_level_names():
+                    self._import_map.setdefault(top_level, []).append(key)
+        return self._import_map
+
+    def providers(self, module: str) -> List[DistributionInfo]:
+        """Get the distributions providing a dotted module name
+
+        Namespace packages (e.g. ``google``) are split over several
+        distributions, so the one installing files for the longest prefix of
+        the module wins. Every provider of the top-level name is returned
+        when that does not settle it, as for ``import google`` itself.
+        """
+        keys = self.import_map().get(module.partition('.')[0], ())
+        providers = [self.distributions[key] for key in keys]
+        if len(providers) > 1:
+            parts = module.split('.')
+            for i in range(len(parts), 1, -1):
+                prefix = '.'.join(parts[:i])
+                matching = [info for info in providers if prefix in info.module_names()]
+                if matching:
+                    return matching
+        return providers
+
+    def get(self, name: str) -> Optional[DistributionInfo]:
+        """Look up a distribution by distribution name or (dotted) import name
+
+        Returns ``None`` when several distributions provide the import name;
+        use ``providers`` to get all of them.
+        """
+        info = self.distributions.get(normalize_name(name))
+        if info is not None:
+            return info
+        providers = self.providers(name)
+        return providers[0] if len(providers) == 1 else None
+
+    def resolve(self, names: Iterable[str]) -> Dict[str, Optional[DistributionInfo]]:
+        """Resolve many import or distribution names in one pass"""
+        return {name: self.get(name) for name in names}
+
+    def distribution_name(self, import_name: str) -> str:
+        """Get the distribution name providing an import name
+
+        Falls back to well-known names, then to the import name itself, when
+        no installed distribution (or more than one) provides it.
+        """
+        info = self.get(import_name)
+        if info is not None:
+            return info.name
+        return KNOWN_DISTRIBUTION_NAMES.get(import_name, import_name)
+
+    def requirement_closure(self, names: Iterable[str]) -> Dict[str, str]:
+        """Get the installed distributions required, directly or not, by some distributions
+
+        Returns a mapping of normalized distribution name to the normalized
+        name of the requested distribution that first pulled it in. Requested
+        distributions map to themselves.
+        """
+        closure: Dict[str, str] = {}
+        stack = []
+        for name in names:
+            key = normalize_name(name)
+            if key not in closure:
+                closure[key] = key
+                stack.append(key)
+
+        while stack:
+            key = stack.pop()
+            info = self.distributions.get(key)
+            if info is None:
+                continue
+            for dependency in info.dependencies:
+                dependency_key = normalize_name(dependency)
+                if dependency_key not in closure:
+                    closure[dependency_key] = closure[key]
+                    stack.append(dependency_key)
+
+        return closure
+
+
+@lru_cache(maxsize=None)
+def get_default_index() -> DistributionIndex:
+    """Get the (shared) index of the running interpreter's environment"""
+    return DistributionIndex()
+
+
+def find_site_packages(python: Path) -> List[Path]:
+    """Locate the site-packages directories of a virtualenv from its interpreter path
+
+    The directory layout is inspected instead of running the interpreter:
+    ``<venv>/lib/pythonX.Y/site-packages`` on POSIX (plus ``lib64``) and
+    ``<venv>/Lib/site-packages`` on Windows. ``python`` may also be the
+    environment directory itself.
+    """
+    python = Path(python)
+    if python.is_dir():
+        env_dir = python
+    else:
+        # <venv>/bin/python or <venv>/Scripts/python.exe
+        env_dir = python.parent.parent
+
+    found = []
+    seen = set()
+    candidates = []
+    for lib_name in ('lib', 'lib64'):
+        lib_dir = env_dir / lib_name
+        if lib_dir.is_dir():
+            candidates.extend(candidate / 'site-packages' for candidate in sorted(lib_dir.iterdir())
+                              if _VERSIONED_LIB_DIR.match(candidate.name))
+    candidates.append(env_dir / 'Lib' / 'site-packages')
+
+    for site_dir in candidates:
+        # lib64 is usually a symlink to lib
+        if site_dir.is_dir() and site_dir.resolve() not in seen:
+            seen.add(site_dir.resolve())
+            found.append(site_dir)
+
+    return found
+
+
+def site_packages_python_version(site_packages: Path) -> Optional[Tuple[int, int]]:
+    """Infer the Python version from a ``lib/pythonX.Y/site-packages`` path"""
+    match = _VERSIONED_LIB_DIR.match(Path(site_packages).parent.name)
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    return None
+
+
+def get_environment_index(python: Optional[Path] = None,
+                          site_packages: Sequence[Path] = ()) -> DistributionIndex:
+    """Get the distribution index of a target environment
+
+    Without a target this is the running interpreter's environment. Raises
+    ``ValueError`` if ``python`` does not point into a recognizable virtualenv.
+    """
+    paths = [Path(path) for path in site_packages]
+    if python is not None:
+        found = find_site_packages(python)
+        if not found:
+            raise ValueError(f"No site-packages directory found for {python}")
+        paths.extend(found)
+
+    if not paths:
+        return get_default_index()
+    return DistributionIndex(paths=[str(path) for path in paths])
+
+
+def format_pin(name: str, version: Optional[str], pin: str = '==') -> str:
+    """Format a requirement pin using '==', '>=' or '~='"""
+    if not version:
+        return name
+    if pin == '~=' and len(version.split('.')) < 2:
+        # A compatible-release clause needs at least two version components
+        pin = '>='
+    return f"{name}{pin}{version}"
+
+
+def format_size(num_bytes: int) -> str:
+    """Format a byte count as B, KB, MB or GB"""
+    if num_bytes < 1024:
+        return f"{num_bytes}B"
+    if num_bytes < 1024 * 1024:
+        return f"{num_bytes / 1024:.1f}KB"
+    if num_bytes < 1024 * 1024 * 1024:
+        return f"{num_bytes / (1024 * 1024):.1f}MB"
+    return f"{num_bytes / (1024 * 1024 * 1024):.1f}GB"
@@ -0,0 +1,139 @@
+"""
+Thin wrappers around the git command line
+
+Each helper runs a single git process: file lists are read NUL-separated
+with ``-z`` and file contents through one long-running ``git cat-file
+--batch`` instead of a ``git show`` per file.
+"""
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+
+class GitError(Exception):
+    """A git command failed or git is not available"""
+
+
+def run_git(args: List[str], cwd: Path, input: Optional[bytes] = None) -> bytes:
+    """Run a git command and return its standard output"""
+    try:
+        result = subprocess.run(['git', *args], cwd=cwd, input=input, capture_output=True)
+    except OSError as e:
+        raise GitError(f"Cannot run git: {e}") from e
+    if result.returncode != 0:
+        message = result.stderr.decode('utf-8', errors='replace').strip()
+        raise GitError(message or f"git {args[0]} failed with exit code {result.returncode}")
+    return result.stdout
+
+
+def find_git_root(path: Path) -> Path:
+    """Get the top-level directory of the work tree containing a path"""
+    output = run_git(['rev-parse', '--show-toplevel'], cwd=path)
+    return Path(output.decode('utf-8').strip()).resolve()
+
+
+def split_nul(output: bytes) -> List[str]:
+    """Split the output of a ``-z`` git command into paths"""
+    return [entry.decode('utf-8', errors='surrogateescape')
+            for entry in output.split(b'\0') if entry]
+
+
+def staged_paths(git_root: Path) -> List[str]:
+    """Get the files added, copied, modified or renamed in the index, relative to the work tree"""
+    return split_nul(run_git(['diff', '--cached', '--name-only', '-z', '--diff-filter=ACMR'],
+                             cwd=git_root))
+
+
+def clean_blob_ids(cwd: Path) -> Dict[str, str]:
+    """Get the blob id of every tracked file under a directory whose content matches the index
+
+    One ``git ls-files`` lists the index entries (tag ``H``) together with
+    the files that are modified or deleted in the work tree (tag ``C``).
+    Git only re-reads a file whose stat data differs from the index, so a
+    clean checkout costs a ``stat`` per file. Paths are relative to ``cwd``;
+    conflicted, symlinked, assume-unchanged and skip-worktree entries are
+    left out. Returns an empty dict outside a git work tree.
+    """
+    try:
+        output = run_git(['ls-files', '-t', '-c', '-m', '-s', '-z'], cwd=cwd)
+    except GitError:
+        return {}
+
+    blob_ids, modified = {}, set()
+    for entry in split_nul(output):
+        info, _, path = entry.partition('\t')
+        tag, mode, oid, stage = info.split()
+        if tag == 'H' and stage == '0' and mode in ('100644', '100755'):
+            blob_ids[path] = oid
+        elif tag != 'H':
+            modified.add(path)
+    for path in modified:
+        blob_ids.pop(path, None)
+    return blob_ids
+
+
+class BlobReader:
+    """Read objects through a persistent ``git cat-file --batch`` process
+
+    Objects are named like anything ``git cat-file`` accepts: ``HEAD:path``,
+    ``:path`` for the index version or a blob id.
+    """
+
+    def __init__(self, git_root: Path):
+        try:
+            self._process = subprocess.Popen(
+                ['git', 'cat-file', '--batch'], cwd=git_root,
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            )
+        except OSError as e:
+            raise GitError(f"Cannot run git: {e}") from e
+
+    def read(self, name: str) -> Optional[bytes]:
+        """Get the content of an object, or ``None`` if it does not exist"""
+        if '\n' in name:
+            raise ValueError(f"Invalid object name: {name!r}")
+        self._process.stdin.write(name.encode('utf-8', errors='surrogateescape') + b'\n')
+        self._process.stdin.flush()
+
+        header = self._process.stdout.readline()
+        if not header:
+            raise GitError('git cat-file exited unexpectedly')
+        parts = header.split()
+        if len(parts) != 3:
+            return None  # "<name> missing" or "<name> ambiguous"
+        size = int(parts[2])
+        content = self._process.stdout.read(size)
+        self._process.stdout.read(1)  # Trailing newline
+        return content
+
+    def read_text(self, name: str) -> Optional[str]:
+        content = self.read(name)
+        return None if content is None else content.decode('utf-8', errors='replace')
+
+    def close(self) -> None:
+        if self._process.poll() is None:
+            self._process.stdin.close()
+            self._process.wait()
+        self._process.stdout.close()
+
+    def __enter__(self) -> 'BlobReader':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def relative_to_project(paths: List[str], git_root: Path, project_root: Path) -> List[str]:
+    """Convert paths relative to the work tree root into paths relative to a project inside it"""
+    try:
+        prefix = Path(project_root).resolve().relative_to(git_root).as_posix()
+    except ValueError:
+        return []
+    if prefix == '.':
+        return list(paths)
+    return [path[len(prefix) + 1:] for path in paths if path.startswith(prefix + '/')]
+
+
+def git_path(git_root: Path, project_root: Path, rel_path: Union[str, Path]) -> str:
+    """Convert a project-relative path into a path relative to the work tree root"""
+    return (Path(project_root).resolve() / rel_path).relative_to(git_root).as_posix()
@@ -0,0 +1,378 @@
+"""
+Project-wide module import graph built from cached per-file analysis
+"""
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .analysis import AnalysisCache, ImportRef, ModuleRecord
+from .project import iter_python_files, module_name_for_path
+
+
+@dataclass
+class ProjectGraph:
+    """Import graph between the modules of a project"""
+    project_root: Path
+    paths: Dict[str, str] = field(default_factory=dict)  # Module name -> relative path
+    records: Dict[str, ModuleRecord] = field(default_factory=dict)  # Module name -> analysis
+    edges: Dict[str, Set[str]] = field(default_factory=dict)  # Module -> imported modules
+    reverse_edges: Dict[str, Set[str]] = field(default_factory=dict)  # Module -> importers
+    # Module -> top-level names of absolute imports outside the project (stdlib included)
+    external_imports: Dict[str, Set[str]] = field(default_factory=dict)
+    # local_top_level_names(), kept by replace_record since the set of modules does not change there
+    _local_names: Optional[Set[str]] = field(default=None, init=False, repr=False, compare=False)
+    # package_roots(), cached for the same reason
+    _roots: Optional[Dict[str, str]] = field(default=None, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_records(cls, project_root: Path, records: Dict[str, ModuleRecord]) -> 'ProjectGraph':
+        """Build a graph from analysis records keyed by relative file path"""
+        graph = cls(project_root=Path(project_root))
+        for rel_path, record in records.items():
+            module = module_name_for_path(rel_path)
+            graph.paths[module] = rel_path
+            graph.records[module] = record
+
+        for module in graph.records:
+            graph.edges[module] = set()
+            graph.reverse_edges.setdefault(module, set())
+
+        for module, record in graph.records.items():
+            targets = graph.resolve_imports(module, record.imports)
+            graph.edges[module] = targets
+            for target in targets:
+                graph.reverse_edges.setdefault(target, set()).add(module)
+
+        graph._local_names = graph.local_top_level_names()
+        for module in graph.records:
+            graph.external_imports[module] = {
+                ref.module.partition('.')[0] for ref in graph.external_import_refs(module)
+            }
+
+        return graph
+
+    def replace_record(self, module: str, record: ModuleRecord) -> Tuple[Set[str], Set[str]]:
+        """Update a module's analysis and outgoing edges after its source changed
+
+        Only the module's own edges are recomputed. The set of modules must
+        not change: adding or removing a file can change how other modules'
+        imports resolve, so that needs a rebuild with ``from_records``.
+        Returns the modules the module started and stopped importing.
+        """
+        previous = self.edges.get(module, set())
+        for target in previous:
+            self.reverse_edges.get(target, set()).discard(module)
+
+        self.records[module] = record
+        targets = self.resolve_imports(module, record.imports)
+        self.edges[module] = targets
+        for target in targets:
+            self.reverse_edges.setdefault(target, set()).add(module)
+
+        self.external_imports[module] = {
+            ref.module.partition('.')[0] for ref in self.external_import_refs(module)
+        }
+        return targets - previous, previous - targets
+
+    def external_import_refs(self, module: str) -> List[ImportRef]:
+        """Get a module's absolute imports of modules outside the project (stdlib included)"""
+        if self._local_names is None:
+            self._local_names = self.local_top_level_names()
+        return [ref for ref in self.records[module].imports
+                if ref.level == 0 and ref.module.partition('.')[0] not in self._local_names]
+
+    def local_top_level_names(self) -> Set[str]:
+        """Get the top-level names under which project modules can be imported
+
+        Besides the first component of every module, a package whose parent
+        directory is not a package (e.g. ``src/pkg``) is importable by its own
+        name.
+        """
+        return {module.partition('.')[0] for module in self.paths} | set(self.package_roots())
+
+    def package_roots(self) -> Dict[str, str]:
+        """Map the names of packages importable by their own name to their module
+
+        A package whose parent directory is not a package (e.g. ``src/pkg``,
+        named ``src.pkg``) is imported as ``pkg``. Names that are already the
+        first component of a module are left out, and the shallowest package
+        wins when several share a name.
+        """
+        top_level = {module.partition('.')[0] for module in self.paths}
+        roots: Dict[str, str] = {}
+        for module in sorted(self.paths, key=lambda module: (module.count('.'), module)):
+            parent, _, name = module.rpartition('.')
+            if (parent and name not in top_level and self.is_package(module)
+                    and not self.is_package(parent)):
+                roots.setdefault(name, module)
+        return roots
+
+    def all_external_imports(self) -> Dict[str, Set[str]]:
+        """Map each external top-level import name to the modules importing it"""
+        importers: Dict[str, Set[str]] = {}
+        for module, names in self.external_imports.items():
+            for name in names:
+                importers.setdefault(name, set()).add(module)
+        return importers
+
+    def is_package(self, module: str) -> bool:
+        """Check whether a module is a package (an ``__init__.py`` file)"""
+        return self.paths.get(module, '').endswith('__init__.py')
+
+    def containing_module(self, name: str) -> Optional[str]:
+        """Get the known module a dotted name refers to (its longest known prefix)"""
+        parts = name.split('.')
+        for i in range(len(parts), 0, -1):
+            candidate = '.'.join(parts[:i])
+            if candidate in self.paths:
+                return candidate
+        return None
+
+    def resolve_import_base(self, module: str, ref: ImportRef) -> Optional[str]:
+        """Get the absolute module name an import statement refers to
+
+        Absolute imports of a package found below a non-package directory are
+        mapped to its module name (``pkg.mod`` to ``src.pkg.mod``). Returns
+        ``None`` for a relative import reaching above the top of the project.
+        """
+        if ref.level == 0:
+            if self._roots is None:
+                self._roots = self.package_roots()
+            top, dot, rest = ref.module.partition('.')
+            return self._roots[top] + dot + rest if top in self._roots else ref.module
+
+        package_parts = module.split('.') if self.is_package(module) else module.split('.')[:-1]
+        if ref.level - 1 > len(package_parts):
+            return None
+        if ref.level > 1:
+            package_parts = package_parts[:len(package_parts) - (ref.level - 1)]
+        if ref.module:
+            package_parts = package_parts + ref.module.split('.')
+        return '.'.join(package_parts)
+
+    def resolve_imports(self, module: str, imports: Iterable[ImportRef]) -> Set[str]:
+        """Resolve a module's import statements to the project modules they load"""
+        targets = set()
+
+        for ref in imports:
+            base = self.resolve_import_base(module, ref)
+            if base is None:
+                continue
+            if not base:
+                # 'from . import x' at the top of the project
+                for name in ref.names:
+                    if name in self.paths:
+                        targets.add(name)
+                continue
+
+            # 'from package import submodule' loads the submodule
+            resolved_all_names = bool(ref.names)
+            for name in ref.names:
+                submodule = f"{base}.{name}"
+                if submodule in self.paths:
+                    targets.add(submodule)
+                else:
+                    resolved_all_names = False
+
+            if not resolved_all_names:
+                target = self.containing_module(base)
+                if target:
+                    targets.add(target)
+
+        targets.discard(module)
+        return targets
+
+    def fan_out(self, module: str) -> int:
+        """Number of project modules imported by a module"""
+        return len(self.edges.get(module, ()))
+
+    def fan_in(self, module: str) -> int:
+        """Number of project modules importing a module"""
+        return len(self.reverse_edges.get(module, ()))
+
+    def closure(self, module: str) -> Set[str]:
+        """Get every module transitively imported by a module"""
+        return _reachable(module, self.edges)
+
+    def dependents(self, module: str) -> Set[str]:
+        """Get every module that transitively imports a module"""
+        return _reachable(module, self.reverse_edges)
+
+    def cycle_of(self, module: str) -> Set[str]:
+        """Get the other modules in an import cycle with a module
+
+        Only the module's own import closure is searched, which is much
+        cheaper than computing every cycle of a large graph.
+        """
+        return self.closure(module) & self.dependents(module)
+
+    def cycle_path(self, module: str, target: str) -> List[str]:
+        """Get the shortest import chain from ``target`` back to ``module``, if there is one"""
+        previous: Dict[str, str] = {target: ''}
+        queue = [target]
+        for node in queue:
+            if node == module:
+                path = [node]
+                while previous[path[-1]]:
+                    path.append(previous[path[-1]])
+                return path[::-1]
+            for child in sorted(self.edges.get(node, ())):
+                if child not in previous:
+                    previous[child] = node
+                    queue.append(child)
+        return []
+
+    def strongly_connected_components(self) -> List[List[str]]:
+        """Get the strongly connected components of the graph (Tarjan's algorithm)"""
+        return strongly_connected_components(self.edges)
+
+    def cycles(self) -> List[List[str]]:
+        """Get groups of modules that import each other in a cycle"""
+        return [component for component in self.strongly_connected_components()
+                if len(component) > 1]
+
+    def condensation(self) -> Tuple[List[List[str]], Dict[str, int], Dict[int, Set[int]]]:
+        """Collapse every import cycle into a single node
+
+        Returns the components, the component index of each module and the
+        edges between components, which form a DAG.
+        """
+        components = self.strongly_connected_components()
+        component_of = {module: i for i, component in enumerate(components) for module in component}
+        component_edges: Dict[int, Set[int]] = {i: set() for i in range(len(components))}
+        for module, targets in self.edges.items():
+            source = component_of[module]
+            for target in targets:
+                if component_of[target] != source:
+                    component_edges[source].add(component_of[target])
+        return components, component_of, component_edges
+
+    def closure_sizes(self) -> Dict[str, int]:
+        """Get the size of every module's import closure, in one pass over the condensed graph"""
+        components, _, component_edges = self.condensation()
+        bits = {module: 1 << i for i, module in enumerate(self.edges)}
+        reach: List[int] = []
+        sizes = {}
+        # Tarjan lists every component after the components it imports
+        for index, component in enumerate(components):
+            mask = 0
+            for module in component:
+                mask |= bits[module]
+            for child in component_edges[index]:
+                mask |= reach[child]
+            reach.append(mask)
+            size = bin(mask).count('1') - 1  # Not counting the module itself
+            for module in component:
+                sizes[module] = size
+        return sizes
+
+    def import_lines(self, module: str, target: str) -> List[int]:
+        """Get the line numbers of the import statements in ``module`` that load ``target``"""
+        return [ref.lineno for ref in self.records[module].imports
+                if target in self.resolve_imports(module, [ref])]
+
+
+def strongly_connected_components(edges: Dict[str, Set[str]],
+                                   nodes: Optional[Iterable[str]] = None) -> List[List[str]]:
+    """Get the strongly connected components of a graph with Tarjan's algorithm
+
+    Components come out in reverse topological order: a component never
+    imports one listed after it. With ``nodes`` only the subgraph induced by
+    those nodes is considered.
+    """
+    if nodes is None:
+        nodes = edges.keys()
+    nodes = set(nodes)
+
+    def children(node: str) -> Iterable[str]:
+        return iter(sorted(child for child in edges.get(node, ()) if child in nodes))
+
+    index_of: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    on_stack: Set[str] = set()
+    stack: List[str] = []
+    components: List[List[str]] = []
+    counter = 0
+
+    for start in sorted(nodes):
+        if start in index_of:
+            continue
+
+        # Iterative DFS to stay clear of the recursion limit on big projects
+        work = [(start, children(start))]
+        index_of[start] = lowlink[start] = counter
+        counter += 1
+        stack.append(start)
+        on_stack.add(start)
+
+        while work:
+            node, pending = work[-1]
+            advanced = False
+            for child in pending:
+                if child not in index_of:
+                    index_of[child] = lowlink[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, children(child)))
+                    advanced = True
+                    break
+                elif child in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[child])
+            if advanced:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+            if lowlink[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(sorted(component))
+
+    return components
+
+
+def _reachable(start: str, adjacency: Dict[str, Set[str]]) -> Set[str]:
+    seen: Set[str] = set()
+    stack = list(adjacency.get(start, ()))
+    while stack:
+        node = stack.pop()
+        if node in seen:
+            continue
+        seen.add(node)
+        stack.extend(adjacency.get(node, ()))
+    seen.discard(start)
+    return seen
+
+
+def build_project_graph(project_root: Path, cache: Optional[AnalysisCache] = None) -> ProjectGraph:
+    """Build the import graph of every Python file in a project
+
+    Files are analyzed through the on-disk analysis cache, so only files that
+    changed since the last run are parsed.
+    """
+    project_root = Path(project_root).resolve()
+    own_cache = cache is None
+    if own_cache:
+        cache = AnalysisCache(project_root)
+
+    records = {}
+    try:
+        for file_path in iter_python_files(project_root):
+            rel_path = file_path.relative_to(project_root).as_posix()
+            records[rel_path] = cache.analyze(file_path)
+        cache.prune(records)
+        cache.commit()
+    finally:
+        if own_cache:
+            cache.close()
+
+    return ProjectGraph.from_records(project_root, records)
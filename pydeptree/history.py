@@ -0,0 +1,309 @@
+"""
+Time series of project metrics across git history
+
+The commits are read with one ``git log --first-parent --raw`` call, so each
+step only touches the files the commit changed. Blobs are analyzed (and
+linted) once through a shared ``BlobAnalyzer``, the import graph is updated
+module by module and import cycles are maintained by a ``CycleTracker``.
+Walking thousands of commits costs about as much as analyzing the distinct
+blobs they contain.
+"""
+import csv
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from .cycles import CycleTracker
+from .git import GitError, find_git_root, run_git
+from .graph import ProjectGraph
+from .project import module_name_for_path
+from .revision import (
+    BlobAnalyzer,
+    list_revision_files,
+    project_prefix,
+    project_source_path,
+    resolve_commit,
+)
+from .snapshot import SUMMARY_LABELS
+
+console = Console()
+
+
+@dataclass
+class HistoryPoint:
+    """Project metrics at one commit"""
+    commit: str
+    timestamp: int  # Committer date, seconds since the epoch
+    modules: int
+    edges: int
+    cycles: int
+    average_complexity: float
+    max_closure: int
+    lint_errors: Optional[int] = None
+    lint_warnings: Optional[int] = None
+
+    @property
+    def date(self) -> str:
+        return datetime.fromtimestamp(self.timestamp, timezone.utc).strftime('%Y-%m-%d %H:%M')
+
+
+@dataclass
+class CommitChanges:
+    """A commit and the project files it changed relative to its first parent"""
+    commit: str
+    parent: Optional[str]
+    timestamp: int
+    changes: Dict[str, Optional[str]]  # Project-relative path -> new blob id, or None if removed
+
+
+def iter_commit_changes(git_root: Path, prefix: str, start: Optional[str],
+                        end: str) -> Iterator[CommitChanges]:
+    """Get the first-parent commits after ``start`` up to ``end``, oldest first, with changes"""
+    revisions = [end] if start is None else [f"{start}..{end}"]
+    output = run_git(['log', '--first-parent', '--reverse', '--no-renames', '--raw', '--no-abbrev',
+                      '-z', '--diff-merges=first-parent', '--format=commit %H %ct %P', *revisions,
+                      '--'], cwd=git_root)
+
+    current: Optional[CommitChanges] = None
+    entries = iter(output.decode('utf-8', errors='surrogateescape').split('\0'))
+    for entry in entries:
+        entry = entry.lstrip('\n')
+        if entry.startswith('commit '):
+            if current is not None:
+                yield current
+            commit, timestamp, *parents = entry.split()[1:]
+            current = CommitChanges(commit, parents[0] if parents else None, int(timestamp), {})
+        elif entry.startswith(':') and current is not None:
+            # ":old_mode new_mode old_oid new_oid status", then the path
+            _, new_mode, _, new_oid, status = entry[1:].split()
+            rel_path = project_source_path(next(entries), prefix)
+            if rel_path is not None:
+                removed = status == 'D' or new_mode not in ('100644', '100755')
+                current.changes[rel_path] = None if removed else new_oid
+    if current is not None:
+        yield current
+
+
+class MetricsWalker:
+    """Project metrics kept up to date while the files of a project change commit by commit"""
+
+    def __init__(self, project_root: Path, analyzer: BlobAnalyzer, lint: bool = False):
+        self.project_root = Path(project_root).resolve()
+        self.analyzer = analyzer
+        self.lint = lint
+        self.files: Dict[str, str] = {}  # Project-relative path -> blob id
+        self._pending: Dict[str, Optional[str]] = {}  # Changes since the last measurement
+        self._graph: Optional[ProjectGraph] = None
+        self._graph_files: set = set()  # Paths of the modules in the graph
+        self._tracker: Optional[CycleTracker] = None
+        self._edges = 0
+        self._max_closure = 0
+
+    def reset(self, files: Dict[str, str]) -> None:
+        """Start over from a complete list of files"""
+        self.files = dict(files)
+        self._pending.clear()
+        self._graph = None
+
+    def apply(self, changes: Dict[str, Optional[str]]) -> None:
+        for rel_path, oid in changes.items():
+            if oid is None:
+                self.files.pop(rel_path, None)
+            else:
+                self.files[rel_path] = oid
+            self._pending[rel_path] = oid
+
+    def _rebuild(self) -> None:
+        self._graph = ProjectGraph.from_records(self.project_root,
+                                                self.analyzer.analyze_files(self.files))
+        self._graph_files = set(self.files)
+        self._tracker = CycleTracker(self._graph.edges)
+        self._edges = sum(len(targets) for targets in self._graph.edges.values())
+        self._max_closure = max(self._tracker.closure_sizes().values(), default=0)
+
+    def _update(self) -> None:
+        """Re-analyze only the changed modules
+
+        A file added or removed can change how imports resolve, so it rebuilds
+        the graph.
+        """
+        if self._graph is None or any(oid is None or rel_path not in self._graph_files
+                                      for rel_path, oid in self._pending.items()):
+            self._rebuild()
+            return
+
+        added, removed = [], []
+        for rel_path, oid in self._pending.items():
+            module = module_name_for_path(rel_path)
+            gained, lost = self._graph.replace_record(module, self.analyzer.analyze(oid))
+            added += [(module, target) for target in gained]
+            removed += [(module, target) for target in lost]
+        if added or removed:
+            self._tracker.update(added=added, removed=removed)
+            self._edges += len(added) - len(removed)
+            self._max_closure = max(self._tracker.closure_sizes().values(), default=0)
+
+    def measure(self, commit: str, timestamp: int) -> HistoryPoint:
+        """Get the metrics of the files as they are now"""
+        self._update()
+        self._pending.clear()
+        records = self._graph.records.values()
+        point = HistoryPoint(
+            commit=commit,
+            timestamp=timestamp,
+            modules=len(records),
+            edges=self._edges,
+            cycles=sum(1 for members in self._tracker.members.values() if len(members) > 1),
+            average_complexity=(round(sum(r.complexity for r in records) / len(records), 2)
+                                if records else 0.0),
+            max_closure=self._max_closure,
+        )
+        if self.lint:
+            counts = self.analyzer.lint_files(self.files)
+            if all(value is not None for value in counts.values()):
+                point.lint_errors = sum(errors for errors, _ in counts.values())
+                point.lint_warnings = sum(warnings for _, warnings in counts.values())
+        return point
+
+
+def walk_history(project_root: Path, start: Optional[str], end: str = 'HEAD', every: int = 1,
+                 lint: bool = False, analyzer: Optional[BlobAnalyzer] = None) -> List[HistoryPoint]:
+    """Measure the project at every ``every``-th first-parent commit from ``start`` to ``end``
+
+    Without ``start`` the walk begins at the first commit.
+
+    ``start`` and the last commit are always measured.
+    """
+    project_root = Path(project_root).resolve()
+    git_root = find_git_root(project_root)
+    prefix = project_prefix(git_root, project_root)
+    if prefix is None:
+        raise GitError(f"{project_root} is not inside {git_root}")
+    end_commit = resolve_commit(git_root, end)
+    start_commit = resolve_commit(git_root, start) if start is not None else None
+
+    own_analyzer = analyzer is None
+    if own_analyzer:
+        analyzer = BlobAnalyzer(git_root, project_root)
+    walker = MetricsWalker(project_root, analyzer, lint)
+    points = []
+    try:
+        base = start_commit
+        if start_commit is not None:
+            walker.reset(list_revision_files(git_root, project_root, start_commit))
+            timestamp = int(run_git(['log', '-1', '--format=%ct', start_commit], cwd=git_root))
+            points.append(walker.measure(start_commit, timestamp))
+
+        last: Optional[Tuple[str, int]] = None
+        steps = iter_commit_changes(git_root, prefix, start_commit, end_commit)
+        for index, step in enumerate(steps, 1):
+            if step.parent != base:
+                # The first commit after --from does not descend from it along first parents
+                walker.reset(list_revision_files(git_root, project_root, step.parent)
+                             if step.parent else {})
+            walker.apply(step.changes)
+            base = step.commit
+            if index % every == 0:
+                points.append(walker.measure(step.commit, step.timestamp))
+                last = None
+            else:
+                last = (step.commit, step.timestamp)
+        if last is not None:
+            points.append(walker.measure(*last))
+    finally:
+        if own_analyzer:
+            analyzer.close()
+    return points
+
+
+COLUMNS = [f.name for f in fields(HistoryPoint)]
+
+
+def write_series(points: List[HistoryPoint], output: Path) -> None:
+    """Save a time series as CSV (for a .csv file) or JSON"""
+    if output.suffix.lower() == '.csv':
+        with open(output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['commit', 'date'] + COLUMNS[1:])
+            for point in points:
+                row = asdict(point)
+                writer.writerow([point.commit, point.date] + ['' if row[key] is None else row[key]
+                                                              for key in COLUMNS[1:]])
+    else:
+        output.write_text(json.dumps([asdict(point) for point in points], indent=2),
+                          encoding='utf-8')
+
+
+def display_series(points: List[HistoryPoint], lint: bool) -> None:
+    table = Table(title='Project History', show_header=True, header_style='bold magenta')
+    table.add_column('Commit', style='cyan')
+    table.add_column('Date', style='dim')
+    keys = [key for key in SUMMARY_LABELS if lint or not key.startswith('lint_')]
+    for key in keys:
+        table.add_column(SUMMARY_LABELS[key], justify='right')
+
+    previous = None
+    for point in points:
+        cells = []
+        for key in keys:
+            value = getattr(point, key)
+            text = '-' if value is None else str(value)
+            if previous is not None and value is not None and getattr(previous, key) is not None:
+                if value > getattr(previous, key):
+                    text = f"[yellow]{text}[/yellow]"
+                elif value < getattr(previous, key):
+                    text = f"[green]{text}[/green]"
+            cells.append(text)
+        table.add_row(point.commit[:10], point.date[:10], *cells)
+        previous = point
+    console.print(table)
+
+
+@click.command('history')
+@click.option('-r', '--root', 'project_root',
+              type=click.Path(exists=True, file_okay=False, path_type=Path), default='.',
+              help='Project root directory (default: current directory)')
+@click.option('--from', 'start', metavar='REV',
+              help='First commit to measure (default: the first commit)')
+@click.option('--to', 'end', metavar='REV', default='HEAD',
+              help='Last commit to measure (default: HEAD)')
+@click.option('--every', type=click.IntRange(min=1), default=1,
+              help='Measure every Nth commit (default: 1)')
+@click.option('--lint', is_flag=True, help='Also record ruff error and warning totals')
+@click.option('-o', '--output', type=click.Path(dir_okay=False, path_type=Path),
+              help='Write the time series to this file (CSV for .csv, JSON otherwise)')
+@click.option('--json', 'as_json', is_flag=True, help='Output the time series as JSON')
+def history(project_root: Path, start: Optional[str], end: str, every: int, lint: bool,
+            output: Optional[Path], as_json: bool):
+    """Track module, import, cycle, complexity and lint metrics across commits
+
+    Follows first parents from --from to --to. Each file version is analyzed
+    once however many commits contain it, so long histories are cheap to
+    backfill; --every N thins out the series.
+    """
+    started = time.perf_counter()
+    try:
+        points = walk_history(project_root, start, end, every, lint)
+    except GitError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+
+    if output is not None:
+        write_series(points, output)
+    if as_json:
+        click.echo(json.dumps([asdict(point) for point in points], indent=2))
+        return
+
+    display_series(points, lint)
+    if output is not None:
+        console.print(f"[green]Wrote {len(points)} points to {output}[/green]")
+    console.print(f"[dim]Measured {len(points)} commits "
+                  f"in {time.perf_counter() - started:.2f}s[/dim]")
@@ -0,0 +1,305 @@
+"""
+Measured import times (``python -X importtime``) overlaid on the import graph
+"""
+import fnmatch
+import json
+import os
+import re
+import subprocess
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import click
+from rich.console import Console
+from rich.table import Table
+from rich.text import Text
+from rich.tree import Tree
+
+from .graph import ProjectGraph, build_project_graph
+from .project import resolve_entry
+
+console = Console()
+
+# Cumulative import times (in microseconds) from which a module is shown as slow
+SLOW_IMPORT_US = 100_000
+MODERATE_IMPORT_US = 20_000
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|( *)(\S+)\s*$')
+_BUDGET_VALUE = re.compile(r'^(\d+(?:\.\d+)?)\s*(us|ms|s)?$')
+
+
+@dataclass
+class ImportTiming:
+    """Time spent importing one module, as reported by ``-X importtime``"""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int = 0  # Nesting level in the import chain (0 = imported by the entry point)
+
+
+@dataclass
+class BudgetViolation:
+    """A module whose cumulative import time exceeds its budget"""
+    module: str
+    cumulative_us: int
+    budget_us: int
+    pattern: str
+
+
+def parse_importtime(log: str) -> Dict[str, ImportTiming]:
+    """Parse the stderr output of ``python -X importtime`` into timings per module"""
+    timings = {}
+    for line in log.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        # Modules are only imported once; the first entry is the real one
+        if module not in timings:
+            timings[module] = ImportTiming(module, int(self_us), int(cumulative_us),
+                                           max(len(indent) - 1, 0) // 2)
+    return timings
+
+
+def run_importtime(module: str, project_root: Path, python: str = sys.executable,
+                   timeout: int = 120) -> Tuple[Dict[str, ImportTiming], int, str]:
+    """Import a module once in a fresh interpreter with ``-X importtime``
+
+    Returns the timings, the interpreter's exit status and its stderr with the
+    timing lines removed (e.g. a traceback if the import failed).
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(project_root), env.get('PYTHONPATH')]))
+    env.pop('PYTHONPROFILEIMPORTTIME', None)
+
+    result = subprocess.run(
+        [python, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=str(project_root),
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+    other_output = '\n'.join(line for line in result.stderr.splitlines()
+                             if not line.startswith('import time:'))
+    return parse_importtime(result.stderr), result.returncode, other_output
+
+
+def parse_budget_value(value: str) -> int:
+    """Parse a budget such as '150ms', '0.5s', '8000us' or '150' (milliseconds) into microseconds"""
+    match = _BUDGET_VALUE.match(value.strip().lower())
+    if not match:
+        raise ValueError(f"Invalid import time budget: {value!r} (expected e.g. 150ms)")
+    amount, unit = float(match.group(1)), match.group(2) or 'ms'
+    return int(amount * {'us': 1, 'ms': 1000, 's': 1_000_000}[unit])
+
+
+def parse_budget_file(path: Path) -> List[Tuple[str, int]]:
+    """Parse a budget file into (module pattern, budget in microseconds) pairs
+
+    Each line holds a module name or glob pattern and its budget, separated
+    by whitespace, ':' or '=' (e.g. ``app.models.* 50ms``). Blank lines and
+    ``#`` comments are ignored. JSON objects mapping patterns to budgets are
+    accepted too.
+    """
+    text = Path(path).read_text(encoding='utf-8')
+    if text.lstrip().startswith('{'):
+        return [(pattern, parse_budget_value(str(value)))
+                for pattern, value in json.loads(text).items()]
+
+    budgets = []
+    for lineno, line in enumerate(text.splitlines(), 1):
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        parts = re.split(r'\s*[:=]\s*|\s+', line, maxsplit=1)
+        if len(parts) != 2:
+            raise ValueError(f"{path}:{lineno}: expected '<module> <budget>'")
+        try:
+            budgets.append((parts[0], parse_budget_value(parts[1])))
+        except ValueError as e:
+            raise ValueError(f"{path}:{lineno}: {e}") from e
+    return budgets
+
+
+def check_budgets(timings: Dict[str, ImportTiming],
+                  budgets: List[Tuple[str, int]]) -> List[BudgetViolation]:
+    """Find modules over budget; the first pattern matching a module sets its budget"""
+    violations = []
+    for module, timing in sorted(timings.items()):
+        for pattern, budget_us in budgets:
+            if fnmatch.fnmatchcase(module, pattern):
+                if timing.cumulative_us > budget_us:
+                    violations.append(BudgetViolation(module, timing.cumulative_us, budget_us,
+                                                      pattern))
+                break
+    return violations
+
+
+def format_us(microseconds: int) -> str:
+    """Format microseconds as us, ms or s"""
+    if microseconds < 1000:
+        return f"{microseconds}us"
+    if microseconds < 1_000_000:
+        return f"{microseconds / 1000:.1f}ms"
+    return f"{microseconds / 1_000_000:.2f}s"
+
+
+def _cost_style(cumulative_us: int) -> str:
+    if cumulative_us >= SLOW_IMPORT_US:
+        return 'bold red'
+    if cumulative_us >= MODERATE_IMPORT_US:
+        return 'yellow'
+    return 'green'
+
+
+def _timing_label(name: str, timing: Optional[ImportTiming], style: str = '') -> Text:
+    label = Text(name, style=style)
+    if timing is None:
+        label.append("  not imported", style='dim')
+    else:
+        label.append(f"  {format_us(timing.cumulative_us)}",
+                     style=_cost_style(timing.cumulative_us))
+        label.append(f" (self {format_us(timing.self_us)})", style='dim')
+    return label
+
+
+def build_importtime_tree(graph: ProjectGraph, entry: str, timings: Dict[str, ImportTiming],
+                          sort_by: str = 'cost', show_external: bool = True) -> Tree:
+    """Build the project's import tree from ``entry``, labelled with measured import times
+
+    Children are sorted by cumulative time ('cost') or by name. Each project
+    module is expanded once; third-party and standard library modules it
+    imports directly are shown as leaves.
+    """
+    def cost(module: str) -> int:
+        timing = timings.get(module)
+        return timing.cumulative_us if timing else -1
+
+    def ordered(modules) -> List[str]:
+        if sort_by == 'name':
+            return sorted(modules)
+        return sorted(modules, key=lambda module: (-cost(module), module))
+
+    tree = Tree(_timing_label(graph.paths.get(entry, entry), timings.get(entry), 'bold'))
+    expanded: Set[str] = {entry}
+    stack = [(tree, entry)]
+
+    while stack:
+        node, module = stack.pop()
+        children = []
+        for child in ordered(graph.edges.get(module, ())):
+            if child in expanded:
+                children.append((node.add(_timing_label(f"{graph.paths[child]} (see above)",
+                                                        timings.get(child), 'dim')), None))
+                continue
+            expanded.add(child)
+            children.append((node.add(_timing_label(graph.paths[child], timings.get(child),
+                                                    'cyan')), child))
+
+        if show_external:
+            local_names = graph.local_top_level_names()
+            external = {ref.module for ref in graph.records[module].imports
+                        if ref.level == 0 and ref.module.partition('.')[0] not in local_names}
+            for name in ordered(name for name in external if name in timings):
+                node.add(_timing_label(name, timings[name], 'magenta'))
+
+        # Depth-first, in display order
+        stack.extend((child_node, child) for child_node, child in reversed(children)
+                     if child is not None)
+
+    return tree
+
+
+@click.command('importtime')
+@click.argument('entry')
+@click.option('-r', '--root', 'project_root',
+              type=click.Path(exists=True, file_okay=False, path_type=Path), default='.',
+              help='Project root directory (default: current directory)')
+@click.option('--python', 'python', default=sys.executable, show_default='current interpreter',
+              help='Interpreter used to import ENTRY')
+@click.option('--budget', 'budget_file',
+              type=click.Path(exists=True, dir_okay=False, path_type=Path),
+              help='Budget file of "<module pattern> <time>" lines; '
+                   'exit with status 1 if any is exceeded')
+@click.option('--sort', 'sort_by', type=click.Choice(['cost', 'name']), default='cost',
+              help='Order imports by cumulative time or by name (default: cost)')
+@click.option('--external/--no-external', 'show_external', default=True,
+              help='Show third-party and standard library imports as leaves')
+@click.option('--top', default=15, help='Number of slowest modules to list (default: 15)')
+@click.option('--json', 'as_json', is_flag=True,
+              help='Output timings and budget violations as JSON')
+def importtime(entry: str, project_root: Path, python: str, budget_file: Optional[Path],
+               sort_by: str, show_external: bool, top: int, as_json: bool):
+    """Measure how long importing ENTRY takes, module by module
+
+    ENTRY (a file or a dotted module name) is imported once in a fresh
+    interpreter with ``python -X importtime``, and the self and cumulative
+    time of every module is shown on the project's import tree.
+    """
+    try:
+        budgets = parse_budget_file(budget_file) if budget_file else []
+    except (OSError, ValueError) as e:
+        raise click.BadParameter(str(e), param_hint="'--budget'") from e
+
+    module, project_root = resolve_entry(entry, project_root)
+    try:
+        timings, returncode, errors = run_importtime(module, project_root, python)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise click.ClickException(f"Could not run {python}: {e}") from e
+
+    violations = check_budgets(timings, budgets)
+
+    if as_json:
+        click.echo(json.dumps({
+            'entry': module,
+            'returncode': returncode,
+            'timings': [asdict(timing) for timing in timings.values()],
+            'violations': [asdict(violation) for violation in violations],
+        }, indent=2))
+    else:
+        if returncode != 0:
+            console.print(f"[yellow]Importing {module} failed (exit status {returncode}); "
+                          f"timings cover the modules imported before the error[/yellow]")
+            if errors:
+                console.print(f"[dim]{errors.strip().splitlines()[-1]}[/dim]")
+
+        graph = build_project_graph(project_root)
+        if module in graph.paths:
+            console.print(build_importtime_tree(graph, module, timings, sort_by, show_external))
+
+        table = Table(title="Slowest imports", show_header=True, header_style="bold cyan")
+        table.add_column("Module", style="cyan")
+        table.add_column("Cumulative", justify="right")
+        table.add_column("Self", justify="right", style="dim")
+        slowest = sorted(timings.values(), key=lambda timing: -timing.cumulative_us)[:top]
+        for timing in slowest:
+            cumulative = Text(format_us(timing.cumulative_us),
+                              style=_cost_style(timing.cumulative_us))
+            table.add_row(timing.module, cumulative, format_us(timing.self_us))
+        console.print(table)
+
+        total = timings.get(module)
+        if total is not None:
+            console.print(f"\nImporting [bold]{module}[/bold] took "
+                          f"[bold]{format_us(total.cumulative_us)}[/bold] "
+                          f"across {len(timings)} modules")
+
+        if violations:
+            table = Table(title="Import time budget exceeded", show_header=True,
+                          header_style="bold red")
+            table.add_column("Module", style="red")
+            table.add_column("Cumulative", justify="right")
+            table.add_column("Budget", justify="right")
+            table.add_column("Rule", style="dim")
+            for violation in violations:
+                table.add_row(violation.module, format_us(violation.cumulative_us),
+                              format_us(violation.budget_us), violation.pattern)
+            console.print(table)
+        elif budgets:
+            console.print("[green]All modules are within their import time budget[/green]")
+
+    if violations:
+        sys.exit(1)
@@ -0,0 +1,59 @@
+"""
+Batched ruff runs for commands that lint many files or sources that are not on disk
+"""
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+LINT_TIMEOUT = 60  # Seconds for one ruff run
+
+
+def ruff_command() -> List[str]:
+    """Get the command running ruff: the executable on PATH or the module of this interpreter"""
+    ruff = shutil.which('ruff')
+    return [ruff] if ruff else [sys.executable, '-m', 'ruff']
+
+
+def _run_ruff(args: List[str], cwd: Path, input: Optional[str] = None) -> Optional[List[dict]]:
+    try:
+        result = subprocess.run(
+            ruff_command() + ['check', '--output-format=json', '--exit-zero', *args],
+            cwd=cwd, input=input, capture_output=True, text=True, timeout=LINT_TIMEOUT,
+        )
+        return json.loads(result.stdout) if result.returncode == 0 else None
+    except (subprocess.TimeoutExpired, OSError, ValueError):
+        return None
+
+
+def lint_files(paths: Sequence[Path], cwd: Path) -> Optional[Dict[Path, List[dict]]]:
+    """Lint files with a single ruff run
+
+    Returns issues by resolved path, or ``None`` if ruff is unavailable.
+    """
+    if not paths:
+        return {}
+    issues = _run_ruff(['--', *map(str, paths)], cwd)
+    if issues is None:
+        return None
+    by_path: Dict[Path, List[dict]] = {Path(path).resolve(): [] for path in paths}
+    for issue in issues:
+        by_path.setdefault(Path(issue['filename']).resolve(), []).append(issue)
+    return by_path
+
+
+def lint_source(source: str, filename: Path, cwd: Path) -> Optional[List[dict]]:
+    """Lint source code that is not on disk, configured as if it were ``filename``"""
+    return _run_ruff(['--stdin-filename', str(filename), '-'], cwd, input=source)
+
+
+def split_issues(issues: Sequence[dict]) -> Tuple[List[dict], List[dict]]:
+    """Split ruff issues into errors (pycodestyle E codes and syntax errors) and warnings"""
+    errors, warnings = [], []
+    for issue in issues:
+        code = issue.get('code') or ''
+        is_error = not code or code.startswith('E') or code == 'invalid-syntax'
+        (errors if is_error else warnings).append(issue)
+    return errors, warnings
@@ -0,0 +1,453 @@
+"""
+Language server giving editors dependency information about import statements
+
+Implements a small subset of the Language Server Protocol over stdio:
+hover on imports, diagnostics for import cycles and forbidden imports, and
+a ``pydeptree.showDependents`` command. Open buffers are analyzed from the
+text the editor sends on every change, so answers never wait for disk.
+"""
+import ast
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Sequence
+from urllib.parse import unquote, urlsplit
+from urllib.request import url2pathname
+
+import click
+
+from .analysis import ImportRef, collect_imports
+from .options import forbid_option
+from .project import is_project_source, module_name_for_path
+from .rules import ForbiddenImport, find_forbidden_rule, load_forbidden_imports
+from .service import ProjectService, QueryError
+from .stdlib import is_stdlib_module
+from .watch import DEFAULT_POLL_INTERVAL
+
+SHOW_DEPENDENTS_COMMAND = 'pydeptree.showDependents'
+
+# LSP constants
+TEXT_DOCUMENT_SYNC_FULL = 1
+DIAGNOSTIC_ERROR = 1
+DIAGNOSTIC_WARNING = 2
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_NOT_INITIALIZED = -32002
+
+
+class RpcError(Exception):
+    """An error reported to the client in a JSON-RPC response"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+def read_message(stream: BinaryIO) -> Optional[dict]:
+    """Read one LSP message (``Content-Length`` framed JSON); ``None`` at end of input"""
+    length = None
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            break
+        name, _, value = line.decode('ascii', errors='replace').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value.strip())
+    if length is None:
+        raise RpcError(INVALID_REQUEST, 'Missing Content-Length header')
+    body = stream.read(length)
+    try:
+        return json.loads(body)
+    except ValueError as e:
+        raise RpcError(PARSE_ERROR, f"Invalid JSON: {e}") from e
+
+
+def write_message(stream: BinaryIO, message: dict) -> None:
+    body = json.dumps(message, separators=(',', ':')).encode('utf-8')
+    stream.write(f"Content-Length: {len(body)}\r\n\r\n".encode('ascii') + body)
+    stream.flush()
+
+
+def uri_to_path(uri: str) -> Optional[Path]:
+    """Get the local path of a ``file:`` URI"""
+    url = urlsplit(uri)
+    if url.scheme != 'file':
+        return None
+    return Path(url2pathname(unquote(url.path)))
+
+
+def imports_at_line(text: str, line: int) -> List[ImportRef]:
+    """Get the import statement covering a line (0-based) of a buffer
+
+    Falls back to parsing the line alone when the buffer does not parse,
+    which is common while it is being edited.
+    """
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        tree = None
+    if tree is not None:
+        for node in ast.walk(tree):
+            if (isinstance(node, (ast.Import, ast.ImportFrom))
+                    and node.lineno - 1 <= line <= getattr(node, 'end_lineno', node.lineno) - 1):
+                return collect_imports(node)
+        return []
+
+    lines = text.splitlines()
+    if line >= len(lines):
+        return []
+    try:
+        refs = collect_imports(ast.parse(lines[line].strip()))
+    except (SyntaxError, ValueError):
+        return []
+    for ref in refs:
+        ref.lineno = line + 1
+    return refs
+
+
+def _line_range(lines: Sequence[str], lineno: int) -> dict:
+    """Get the LSP range of a source line (1-based), without its indentation"""
+    text = lines[lineno - 1] if 0 < lineno <= len(lines) else ''
+    return {
+        'start': {'line': lineno - 1, 'character': len(text) - len(text.lstrip())},
+        'end': {'line': lineno - 1, 'character': len(text)},
+    }
+
+
+class LanguageServer:
+    """Dispatches LSP messages to a ``ProjectService`` holding the project graph"""
+
+    def __init__(self, reader: BinaryIO, writer: BinaryIO, project_root: Optional[Path] = None,
+                 rules: Sequence[ForbiddenImport] = (), watch: bool = True,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.reader = reader
+        self.writer = writer
+        self.project_root = Path(project_root).resolve() if project_root is not None else None
+        self.extra_rules = list(rules)
+        self.rules: List[ForbiddenImport] = list(rules)
+        self.watch = watch
+        self.poll_interval = poll_interval
+        self.service: Optional[ProjectService] = None
+        self.documents: Dict[str, str] = {}  # URI -> text of open project files
+        self.published: Dict[str, List[dict]] = {}  # URI -> last diagnostics sent
+        self.lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._shutdown_requested = False
+
+        self.requests: Dict[str, Callable[[dict], Any]] = {
+            'initialize': self.initialize,
+            'shutdown': self.shutdown,
+            'textDocument/hover': self.hover,
+            'workspace/executeCommand': self.execute_command,
+        }
+        self.notifications: Dict[str, Callable[[dict], None]] = {
+            'initialized': lambda params: None,
+            'exit': lambda params: self._stopped.set(),
+            'textDocument/didOpen': self.did_open,
+            'textDocument/didChange': self.did_change,
+            'textDocument/didSave': self.did_save,
+            'textDocument/didClose': self.did_close,
+        }
+
+    # Transport
+
+    def send(self, message: dict) -> None:
+        message['jsonrpc'] = '2.0'
+        with self._write_lock:
+            write_message(self.writer, message)
+
+    def notify(self, method: str, params: Any) -> None:
+        self.send({'method': method, 'params': params})
+
+    def log_error(self, message: str) -> None:
+        self.notify('window/logMessage', {'type': 1, 'message': f"pydeptree: {message}"})
+
+    def run(self) -> int:
+        """Handle messages until ``exit`` or the end of input; returns the process exit code"""
+        while not self._stopped.is_set():
+            try:
+                message = read_message(self.reader)
+            except RpcError as e:
+                self.send({'id': None, 'error': {'code': e.code, 'message': str(e)}})
+                continue
+            if message is None:
+                break
+            self.handle(message)
+        self._stopped.set()
+        return 0 if self._shutdown_requested else 1
+
+    def handle(self, message: dict) -> None:
+        method = message.get('method')
+        if method is None:
+            return  # A response to a request of ours; none are sent
+
+        params = message.get('params') or {}
+        if 'id' not in message:
+            handler = self.notifications.get(method)
+            if handler is not None and (self.service is not None or method == 'exit'):
+                try:
+                    handler(params)
+                except Exception as e:
+                    # Notifications have no response to carry an error, and must not stop the server
+                    self.log_error(f"{method} failed: {e!r}")
+            return
+
+        try:
+            handler = self.requests.get(method)
+            if handler is None:
+                raise RpcError(METHOD_NOT_FOUND, f"Unsupported method: {method}")
+            if self.service is None and method != 'initialize':
+                raise RpcError(SERVER_NOT_INITIALIZED, 'The server is not initialized')
+            response = {'id': message['id'], 'result': handler(params)}
+        except RpcError as e:
+            response = {'id': message['id'], 'error': {'code': e.code, 'message': str(e)}}
+        except (KeyError, TypeError, ValueError) as e:
+            response = {'id': message['id'],
+                        'error': {'code': INVALID_PARAMS, 'message': f"Invalid params: {e}"}}
+        self.send(response)
+
+    # Lifecycle
+
+    def initialize(self, params: dict) -> dict:
+        if self.project_root is None:
+            root_uri = params.get('rootUri')
+            root = uri_to_path(root_uri) if root_uri else params.get('rootPath')
+            self.project_root = Path(root or '.').resolve()
+
+        start = time.perf_counter()
+        self.service = ProjectService(self.project_root)
+        try:
+            self.rules = load_forbidden_imports(self.project_root) + self.extra_rules
+        except (RuntimeError, ValueError) as e:
+            self.notify('window/logMessage',
+                        {'type': 2, 'message': f"pydeptree: ignoring import rules: {e}"})
+        self.notify('window/logMessage', {
+            'type': 4,
+            'message': f"pydeptree: loaded {len(self.service.graph.paths)} modules "
+                       f"in {time.perf_counter() - start:.2f}s",
+        })
+
+        if self.watch:
+            threading.Thread(target=self.service.watch,
+                             args=(self._stopped, self.poll_interval, self._on_disk_change),
+                             daemon=True).start()
+
+        return {
+            'capabilities': {
+                'textDocumentSync': {'openClose': True, 'change': TEXT_DOCUMENT_SYNC_FULL,
+                                     'save': {'includeText': True}},
+                'hoverProvider': True,
+                'executeCommandProvider': {'commands': [SHOW_DEPENDENTS_COMMAND]},
+            },
+            'serverInfo': {'name': 'pydeptree'},
+        }
+
+    def shutdown(self, params: dict) -> None:
+        self._shutdown_requested = True
+        return None
+
+    # Documents
+
+    def relative_path(self, uri: str) -> Optional[str]:
+        """Get the project-relative path of a document, or ``None`` if it is not a project source"""
+        path = uri_to_path(uri)
+        if path is None:
+            return None
+        try:
+            rel_path = path.resolve().relative_to(self.project_root).as_posix()
+        except ValueError:
+            return None
+        return rel_path if is_project_source(rel_path) else None
+
+    def _update(self, uri: str, text: str) -> None:
+        rel_path = self.relative_path(uri)
+        if rel_path is None:
+            return
+        with self.lock:
+            self.documents[uri] = text
+            self.service.update_source(rel_path, text)
+        self.publish_diagnostics()
+
+    def did_open(self, params: dict) -> None:
+        document = params['textDocument']
+        self._update(document['uri'], document['text'])
+
+    def did_change(self, params: dict) -> None:
+        changes = params['contentChanges']
+        if changes:
+            # Full document sync: the last change holds the whole text
+            self._update(params['textDocument']['uri'], changes[-1]['text'])
+
+    def did_save(self, params: dict) -> None:
+        if 'text' in params:
+            self._update(params['textDocument']['uri'], params['text'])
+
+    def did_close(self, params: dict) -> None:
+        uri = params['textDocument']['uri']
+        rel_path = self.relative_path(uri)
+        with self.lock:
+            if self.documents.pop(uri, None) is None or rel_path is None:
+                return
+            self.service.discard_source(rel_path)
+            if self.published.pop(uri, None):
+                self.notify('textDocument/publishDiagnostics', {'uri': uri, 'diagnostics': []})
+        self.publish_diagnostics()
+
+    def _on_disk_change(self, changed) -> None:
+        # Runs on the watch thread, which an exception would silently end
+        try:
+            self.publish_diagnostics()
+        except Exception as e:
+            self.log_error(f"updating diagnostics after a file change failed: {e!r}")
+
+    # Diagnostics
+
+    def diagnostics(self, uri: str) -> List[dict]:
+        """Get the import cycle and forbidden import diagnostics of an open document"""
+        rel_path = self.relative_path(uri)
+        graph = self.service.graph
+        module = module_name_for_path(rel_path)
+        record = graph.records.get(module)
+        if record is None:
+            return []
+
+        lines = self.documents[uri].splitlines()
+        cycle = self.service.cycle_tracker.cycle_of(module)
+        diagnostics = []
+        for ref in record.imports:
+            for target in sorted(graph.resolve_imports(module, [ref])):
+                rule = find_forbidden_rule(self.rules, module, target)
+                if rule is not None:
+                    diagnostics.append({
+                        'range': _line_range(lines, ref.lineno),
+                        'severity': DIAGNOSTIC_ERROR,
+                        'source': 'pydeptree',
+                        'code': 'forbidden-import',
+                        'message': f"Forbidden import of {target}: {rule.describe()}",
+                    })
+                if target in cycle:
+                    chain = [module] + graph.cycle_path(module, target)
+                    diagnostics.append({
+                        'range': _line_range(lines, ref.lineno),
+                        'severity': DIAGNOSTIC_WARNING,
+                        'source': 'pydeptree',
+                        'code': 'import-cycle',
+                        'message': f"Import cycle: {' → '.join(chain)}",
+                    })
+        return diagnostics
+
+    def publish_diagnostics(self) -> None:
+        """Send the diagnostics of every open document whose diagnostics changed
+
+        A change in one file can create or break a cycle through the others,
+        so all open documents are checked; unchanged ones are not resent.
+        """
+        with self.lock, self.service.lock:
+            for uri in list(self.documents):
+                diagnostics = self.diagnostics(uri)
+                if diagnostics != self.published.get(uri, []):
+                    self.published[uri] = diagnostics
+                    self.notify('textDocument/publishDiagnostics',
+                                {'uri': uri, 'diagnostics': diagnostics})
+
+    # Requests
+
+    def hover(self, params: dict) -> Optional[dict]:
+        uri = params['textDocument']['uri']
+        line = params['position']['line']
+        rel_path = self.relative_path(uri)
+        with self.lock:
+            text = self.documents.get(uri)
+        if rel_path is None or text is None:
+            return None
+
+        refs = imports_at_line(text, line)
+        if not refs:
+            return None
+        with self.service.lock:
+            sections = self._describe_imports(module_name_for_path(rel_path), refs)
+        return {
+            'contents': {'kind': 'markdown', 'value': '\n\n---\n\n'.join(sections)},
+            'range': _line_range(text.splitlines(), refs[0].lineno),
+        }
+
+    def _describe_imports(self, module: str, refs: List[ImportRef]) -> List[str]:
+        graph = self.service.graph
+        sections = []
+        for ref in refs:
+            targets = sorted(graph.resolve_imports(module, [ref]))
+            for target in targets:
+                record = graph.records[target]
+                cycle = self.service.cycle_tracker.cycle_of(target)
+                text = (f"**{target}** · `{graph.paths[target]}`\n\n"
+                        f"{record.lines} lines · complexity {record.complexity} · "
+                        f"{record.classes} classes, {record.functions} functions\n\n"
+                        f"Imports {graph.fan_out(target)} project modules "
+                        f"({len(graph.closure(target))} transitively) · "
+                        f"imported by {graph.fan_in(target)} "
+                        f"({len(graph.dependents(target))} transitively)")
+                if cycle:
+                    text += f"\n\nIn an import cycle with {', '.join(sorted(cycle))}"
+                rule = find_forbidden_rule(self.rules, module, target)
+                if rule is not None:
+                    text += f"\n\nForbidden: {rule.describe()}"
+                sections.append(text)
+            if not targets and ref.level == 0:
+                kind = ('standard library module' if is_stdlib_module(ref.module)
+                        else 'external module')
+                sections.append(f"**{ref.module}** · {kind}")
+        return sections
+
+    def execute_command(self, params: dict) -> Any:
+        command = params['command']
+        if command != SHOW_DEPENDENTS_COMMAND:
+            raise RpcError(INVALID_PARAMS, f"Unknown command: {command}")
+        arguments = params.get('arguments') or []
+        if not arguments:
+            raise RpcError(INVALID_PARAMS, f"{command} needs a document URI or module name")
+
+        target = arguments[0]
+        transitive = bool(arguments[1]) if len(arguments) > 1 else False
+        if target.startswith('file:'):
+            target = self.relative_path(target) or target
+        try:
+            dependents = self.service.dependents(target, transitive=transitive)
+        except QueryError as e:
+            raise RpcError(INVALID_PARAMS, str(e)) from e
+        paths = self.service.graph.paths
+        return [{'module': module, 'path': paths[module],
+                 'uri': (self.project_root / paths[module]).as_uri()}
+                for module in dependents if module in paths]
+
+
+@click.command('lsp')
+@click.option('-r', '--root', 'project_root',
+              type=click.Path(exists=True, file_okay=False, path_type=Path),
+              help='Project root directory (default: the root sent by the editor)')
+@forbid_option
+@click.option('--no-watch', is_flag=True,
+              help='Do not pick up changes made on disk outside the editor')
+@click.option('--poll-interval', default=DEFAULT_POLL_INTERVAL, type=float, show_default=True,
+              help='Seconds between checks for changes when watchfiles is not installed')
+def lsp(project_root: Optional[Path], rules: List[ForbiddenImport], no_watch: bool,
+        poll_interval: float):
+    """Run a language server on stdin/stdout for editor integration
+
+    Provides hover information on import statements, diagnostics for import
+    cycles and forbidden imports (from --forbid and [tool.pydeptree]
+    forbidden-imports in pyproject.toml), and the pydeptree.showDependents
+    command. Unsaved buffers are analyzed from the editor's text.
+    """
+    server = LanguageServer(sys.stdin.buffer, sys.stdout.buffer, project_root, rules,
+                            watch=not no_watch, poll_interval=poll_interval)
+    sys.exit(server.run())
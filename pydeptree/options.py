@@ -0,0 +1,108 @@
+"""
+Click options shared by several commands
+"""
+from pathlib import Path
+from typing import Optional, Sequence
+
+import click
+
+from .environment import DistributionIndex, get_environment_index, site_packages_python_version
+from .git import GitError
+from .graph import ProjectGraph, build_project_graph
+from .revision import build_revision_graph
+from .rules import parse_forbidden_import
+from .stdlib import PythonVersion, parse_python_version
+
+
+def _parse_target_python(ctx: click.Context, param: click.Parameter,
+                         value: Optional[str]) -> Optional[PythonVersion]:
+    """Validate the --target-python option"""
+    if value is None:
+        return None
+    try:
+        return parse_python_version(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from e
+
+
+def target_python_option(func):
+    """Add the --target-python option (passed as ``target_python``)"""
+    return click.option(
+        '--target-python', callback=_parse_target_python, metavar='X.Y',
+        help='Classify standard library imports for this Python version '
+             '(default: running interpreter)',
+    )(func)
+
+
+def environment_options(func):
+    """Add the --python and --site-packages options selecting the target environment
+
+    They are passed as ``target_interpreter`` and ``site_packages``; see
+    ``open_environment_index``.
+    """
+    func = click.option(
+        '--site-packages', 'site_packages', multiple=True,
+        type=click.Path(exists=True, file_okay=False, path_type=Path),
+        help='Read installed packages from this site-packages directory (repeatable)',
+    )(func)
+    func = click.option(
+        '--python', 'target_interpreter', type=click.Path(exists=True, path_type=Path),
+        help='Read installed packages from the virtualenv of this interpreter (not executed)',
+    )(func)
+    return func
+
+
+def open_environment_index(target_interpreter: Optional[Path],
+                           site_packages: Sequence[Path]) -> DistributionIndex:
+    """Get the distribution index selected by the environment options"""
+    try:
+        return get_environment_index(target_interpreter, site_packages)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'--python'") from e
+
+
+def infer_target_python(index: DistributionIndex,
+                        target_python: Optional[PythonVersion]) -> Optional[PythonVersion]:
+    """Default --target-python to the version of the target environment, if known"""
+    if target_python is not None or index.paths is None:
+        return target_python
+    # e.g. lib/python3.9/site-packages
+    for path in index.paths:
+        version = site_packages_python_version(Path(path))
+        if version:
+            return version
+    return None
+
+
+def _parse_forbidden_imports(ctx: click.Context, param: click.Parameter, values):
+    try:
+        return [parse_forbidden_import(value) for value in values]
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from e
+
+
+def forbid_option(func):
+    """Add the repeatable --forbid SOURCE:TARGET option (passed as ``rules``)"""
+    return click.option(
+        '--forbid', 'rules', multiple=True, callback=_parse_forbidden_imports,
+        metavar='SOURCE:TARGET',
+        help='Forbid modules matching SOURCE to import modules matching TARGET (repeatable)',
+    )(func)
+
+
+def rev_option(func):
+    """Add the --rev REV option (passed as ``rev``); see ``open_project_graph``"""
+    return click.option(
+        '--rev', metavar='REV',
+        help='Analyze the project as of this git revision, without checking it out',
+    )(func)
+
+
+def open_project_graph(project_root: Path, rev: Optional[str] = None) -> ProjectGraph:
+    """Build the import graph of a project, from the work tree or the revision selected by --rev"""
+    if rev is None:
+        return build_project_graph(project_root)
+    try:
+        return build_revision_graph(project_root, rev)
+    except GitError as e:
+        raise click.BadParameter(str(e), param_hint="'--rev'") from e
@@ -0,0 +1,313 @@
+"""
+Fast pre-commit check of staged files: lint, complexity, new import cycles and forbidden imports
+
+Only the staged files are read (from the index, through one ``git cat-file``
+process) and linted. Of the rest of the project, only the modules the
+staged files import, directly or not, are analyzed (through the analysis
+cache), so the hook stays fast on large projects even with a cold cache.
+Cycles and forbidden imports are only reported when the staged changes
+introduce them, by comparing the graph against the staged files' HEAD
+versions.
+"""
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from .analysis import AnalysisCache, ModuleRecord, analyze_source
+from .git import BlobReader, GitError, find_git_root, git_path, relative_to_project, staged_paths
+from .graph import ProjectGraph
+from .lint import lint_files, lint_source, split_issues
+from .options import forbid_option
+from .project import is_project_source, iter_python_files, module_name_for_path
+from .rules import ForbiddenImport, find_forbidden_rule, load_forbidden_imports
+
+console = Console()
+
+
+@dataclass
+class StagedFile:
+    """A staged Python file and its check results"""
+    path: str  # Relative to the project root
+    module: str
+    record: ModuleRecord
+    errors: List[dict] = field(default_factory=list)
+    warnings: List[dict] = field(default_factory=list)
+
+
+@dataclass
+class PrecommitReport:
+    files: List[StagedFile]
+    graph: ProjectGraph
+    new_cycles: List[List[str]]
+    forbidden: List[Tuple[str, str, ForbiddenImport]]
+    too_complex: List[StagedFile]
+    linted: bool
+
+    @property
+    def failed(self) -> bool:
+        return bool(self.new_cycles or self.forbidden or self.too_complex
+                    or any(staged.errors for staged in self.files))
+
+
+def read_staged_sources(
+        project_root: Path) -> Tuple[Path, Dict[str, str], Dict[str, Optional[str]]]:
+    """Get the staged Python files of a project, as staged and at HEAD
+
+    Returns the work tree root and the index and HEAD sources keyed by path
+    relative to the project root (``None`` for files new in the index).
+    """
+    git_root = find_git_root(project_root)
+    paths = [path for path in relative_to_project(staged_paths(git_root), git_root, project_root)
+             if is_project_source(path)]
+
+    staged, head = {}, {}
+    with BlobReader(git_root) as reader:
+        for rel_path in paths:
+            name = git_path(git_root, project_root, rel_path)
+            source = reader.read_text(f":{name}")
+            if source is not None:
+                staged[rel_path] = source
+                head[rel_path] = reader.read_text(f"HEAD:{name}")
+    return git_root, staged, head
+
+
+def staged_graphs(
+        project_root: Path, staged: Dict[str, str], head: Dict[str, Optional[str]],
+) -> Tuple[ProjectGraph, ProjectGraph, Dict[str, ModuleRecord]]:
+    """Build the import graph around the staged files, before and after the staged changes
+
+    A cycle through a staged module only passes through modules it imports,
+    directly or not, so only those are analyzed (through the analysis
+    cache). The other files are listed, since imports resolve against the
+    whole project, but never read. Returns the graph at HEAD, the staged
+    graph and the records of the staged files.
+    """
+    other = [file_path.relative_to(project_root).as_posix()
+             for file_path in iter_python_files(project_root)]
+    other = [rel_path for rel_path in other if rel_path not in staged]
+    staged_records = {rel_path: analyze_source(source) for rel_path, source in staged.items()}
+    head_records = {rel_path: analyze_source(source) for rel_path, source in head.items()
+                    if source is not None}
+
+    cache = AnalysisCache(project_root)
+    records: Dict[str, ModuleRecord] = {}
+
+    def record_of(rel_path: str) -> ModuleRecord:
+        if rel_path not in records:
+            records[rel_path] = cache.analyze(project_root / rel_path)
+        return records[rel_path]
+
+    def reachable_graph(own_records: Dict[str, ModuleRecord]) -> ProjectGraph:
+        paths = {module_name_for_path(rel_path): rel_path for rel_path in [*other, *own_records]}
+        graph = ProjectGraph(project_root=project_root, paths=paths)
+        stack = [module_name_for_path(rel_path) for rel_path in own_records]
+        while stack:
+            module = stack.pop()
+            if module not in graph.records:
+                rel_path = paths[module]
+                record = own_records[rel_path] if rel_path in own_records else record_of(rel_path)
+                stack.extend(graph.replace_record(module, record)[0])
+        return graph
+
+    try:
+        after = reachable_graph(staged_records)
+        before = reachable_graph(head_records)
+        cache.commit()
+    finally:
+        cache.close()
+    return before, after, staged_records
+
+
+def new_cycles(before: ProjectGraph, after: ProjectGraph, modules: List[str]) -> List[List[str]]:
+    """Get the import cycles through some modules that are new or larger than before
+
+    A new cycle needs a new import edge, which starts in a changed module, so
+    only the cycles through those modules are computed. Each cycle is given
+    as an import chain from a changed module back to itself.
+    """
+    cycles, seen = [], set()
+    for module in sorted(modules):
+        members = after.cycle_of(module)
+        if not members:
+            continue
+        members.add(module)
+        if frozenset(members) in seen:
+            continue
+        seen.add(frozenset(members))
+        previous = before.cycle_of(module) | {module} if module in before.paths else set()
+        if not members <= previous:
+            # Prefer a new edge as the first step, so the chain shows what was added
+            targets = sorted(after.edges[module] & members,
+                             key=lambda target: (target in before.edges.get(module, ()), target))
+            cycles.append([module] + after.cycle_path(module, targets[0]))
+    return cycles
+
+
+def new_forbidden_imports(before: ProjectGraph, after: ProjectGraph, modules: List[str],
+                          rules: List[ForbiddenImport]) -> List[Tuple[str, str, ForbiddenImport]]:
+    """Get the forbidden import edges added by some modules"""
+    violations = []
+    for module in sorted(modules):
+        for target in sorted(after.edges.get(module, set()) - before.edges.get(module, set())):
+            rule = find_forbidden_rule(rules, module, target)
+            if rule is not None:
+                violations.append((module, target, rule))
+    return violations
+
+
+def lint_staged(project_root: Path, staged: Dict[str, str]) -> Optional[Dict[str, List[dict]]]:
+    """Lint the staged version of files, with one ruff run for files without unstaged changes
+
+    Files whose work tree content differs from the index are linted from the
+    staged source through ruff's standard input.
+    """
+    clean, dirty = [], []
+    for rel_path, source in staged.items():
+        try:
+            on_disk = (project_root / rel_path).read_text(encoding='utf-8', errors='replace')
+        except OSError:
+            on_disk = None
+        (clean if on_disk == source else dirty).append(rel_path)
+
+    by_path = lint_files([project_root / rel_path for rel_path in clean], project_root)
+    if by_path is None:
+        return None
+    issues = {rel_path: by_path.get((project_root / rel_path).resolve(), []) for rel_path in clean}
+    for rel_path in dirty:
+        file_issues = lint_source(staged[rel_path], project_root / rel_path, project_root)
+        if file_issues is None:
+            return None
+        issues[rel_path] = file_issues
+    return issues
+
+
+def check_staged(project_root: Path, rules: List[ForbiddenImport],
+                 max_complexity: Optional[int] = None, lint: bool = True) -> PrecommitReport:
+    """Run every check on the staged files of a project"""
+    project_root = Path(project_root).resolve()
+    _, staged, head = read_staged_sources(project_root)
+    before, after, records = staged_graphs(project_root, staged, head)
+
+    files = [StagedFile(rel_path, module_name_for_path(rel_path), records[rel_path])
+             for rel_path in sorted(staged)]
+    modules = [staged_file.module for staged_file in files]
+
+    issues = lint_staged(project_root, staged) if lint else None
+    if issues is not None:
+        for staged_file in files:
+            file_issues = issues.get(staged_file.path, [])
+            staged_file.errors, staged_file.warnings = split_issues(file_issues)
+
+    too_complex = [] if max_complexity is None else [
+        staged_file for staged_file in files if staged_file.record.complexity > max_complexity]
+    return PrecommitReport(
+        files=files,
+        graph=after,
+        new_cycles=new_cycles(before, after, modules),
+        forbidden=new_forbidden_imports(before, after, modules, rules),
+        too_complex=too_complex,
+        linted=issues is not None,
+    )
+
+
+def display_report(report: PrecommitReport, max_complexity: Optional[int],
+                   lint: bool = True) -> None:
+    table = Table(title='Staged Files', show_header=True, header_style='bold magenta')
+    table.add_column('File', style='cyan')
+    table.add_column('Lines', justify='right')
+    table.add_column('Complexity', justify='right')
+    table.add_column('Errors', justify='right')
+    table.add_column('Warnings', justify='right')
+
+    for staged_file in report.files:
+        complexity = str(staged_file.record.complexity)
+        if staged_file in report.too_complex:
+            complexity = f"[red]{complexity}[/red]"
+        table.add_row(
+            staged_file.path,
+            str(staged_file.record.lines),
+            complexity,
+            f"[red]{len(staged_file.errors)}[/red]" if staged_file.errors else '0',
+            f"[yellow]{len(staged_file.warnings)}[/yellow]" if staged_file.warnings else '0',
+        )
+    console.print(table)
+
+    for staged_file in report.files:
+        for issue in staged_file.errors:
+            location = issue.get('location') or {}
+            row, column = location.get('row', '?'), location.get('column', '?')
+            console.print(f"  [red]{staged_file.path}:{row}:{column}[/red] "
+                          f"[bold]{issue.get('code') or ''}[/bold] {issue.get('message', '')}")
+    if lint and not report.linted:
+        console.print('[yellow]ruff is not available; lint checks were skipped[/yellow]')
+
+    for staged_file in report.too_complex:
+        console.print(f"[red]✗ {staged_file.path} has complexity {staged_file.record.complexity} "
+                      f"(maximum {max_complexity})[/red]")
+
+    for cycle in report.new_cycles:
+        console.print(f"[red]✗ New import cycle:[/red] {' → '.join(cycle)}")
+    for module, target, rule in report.forbidden:
+        console.print(f"[red]✗ Forbidden import:[/red] {module} → {target} "
+                      f"[dim]({rule.describe()})[/dim]")
+
+    if not report.failed:
+        console.print('[green]✓ No new import cycles, forbidden imports or lint errors[/green]')
+
+
+@click.command('precommit')
+@click.option('-r', '--root', 'project_root',
+              type=click.Path(exists=True, file_okay=False, path_type=Path), default='.',
+              help='Project root directory (default: current directory)')
+@click.option('--max-complexity', type=int,
+              help='Fail when a staged file is more complex than this')
+@click.option('--no-lint', is_flag=True, help='Skip running ruff on the staged files')
+@forbid_option
+@click.option('--json', 'as_json', is_flag=True, help='Output the result as JSON')
+def precommit(project_root: Path, max_complexity: Optional[int], no_lint: bool,
+              rules: List[ForbiddenImport], as_json: bool):
+    """Check the files staged for commit, for use as a git pre-commit hook
+
+    Lints the staged version of each file and reports its complexity, then
+    fails if the staged changes add an import cycle, a forbidden import
+    (--forbid or [tool.pydeptree] forbidden-imports in pyproject.toml), a
+    lint error or, with --max-complexity, an overly complex file.
+    """
+    start = time.perf_counter()
+    try:
+        rules = load_forbidden_imports(project_root) + list(rules)
+        report = check_staged(project_root, rules, max_complexity, lint=not no_lint)
+    except (GitError, RuntimeError, ValueError) as e:
+        console.print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+
+    if as_json:
+        click.echo(json.dumps({
+            'files': [{'path': staged_file.path, 'module': staged_file.module,
+                       'lines': staged_file.record.lines,
+                       'complexity': staged_file.record.complexity,
+                       'errors': len(staged_file.errors), 'warnings': len(staged_file.warnings)}
+                      for staged_file in report.files],
+            'new_cycles': report.new_cycles,
+            'forbidden_imports': [{'module': module, 'target': target, 'rule': rule.describe()}
+                                  for module, target, rule in report.forbidden],
+            'too_complex': [staged_file.path for staged_file in report.too_complex],
+            'linted': report.linted,
+            'failed': report.failed,
+        }, indent=2))
+    elif not report.files:
+        console.print('[dim]No staged Python files[/dim]')
+    else:
+        display_report(report, max_complexity, lint=not no_lint)
+        console.print(f"[dim]Checked {len(report.files)} staged files "
+                      f"in {time.perf_counter() - start:.2f}s[/dim]")
+
+    if report.failed:
+        sys.exit(1)
@@ -0,0 +1,85 @@
+"""
+Helpers for discovering the Python files that make up a project
+"""
+import os
+from pathlib import Path
+from typing import Iterator, Tuple
+
+# Directories that never contain project sources
+SKIPPED_DIRECTORIES = {'__pycache__', 'node_modules', 'site-packages'}
+
+# File suffixes of compiled extension modules
+EXTENSION_SUFFIXES = ('.so', '.pyd')
+
+
+def iter_python_files(project_root: Path) -> Iterator[Path]:
+    """Yield every Python source file under the project root
+
+    Hidden directories, caches and virtual environments are skipped.
+    """
+    stack = [str(project_root)]
+
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        subdirectories = []
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+
+            try:
+                if entry.is_dir():
+                    if entry.name in SKIPPED_DIRECTORIES:
+                        continue
+                    if os.path.exists(os.path.join(entry.path, 'pyvenv.cfg')):
+                        continue
+                    subdirectories.append(entry.path)
+                elif entry.is_file() and entry.name.endswith('.py'):
+                    yield Path(entry.path)
+            except OSError:
+                continue
+
+        stack.extend(reversed(subdirectories))
+
+
+def is_project_source(rel_path: str) -> bool:
+    """Check whether a relative path is outside the directories ``iter_python_files`` skips
+
+    Virtual environments are only recognized by scanning, so they are not
+    excluded here.
+    """
+    parts = rel_path.replace('\\', '/').split('/')
+    return parts[-1].endswith('.py') and not any(part.startswith('.') or part in SKIPPED_DIRECTORIES
+                                                 for part in parts)
+
+
+def module_name_for_path(rel_path: str) -> str:
+    """Convert a path relative to the project root into a dotted module name"""
+    parts = rel_path.replace('\\', '/').split('/')
+    if parts[-1] == '__init__.py':
+        parts = parts[:-1]
+    elif parts[-1].endswith('.py'):
+        parts[-1] = parts[-1][:-3]
+    elif parts[-1].endswith(EXTENSION_SUFFIXES):
+        # e.g. _speedups.cpython-311-x86_64-linux-gnu.so
+        parts[-1] = parts[-1].split('.')[0]
+    return '.'.join(parts)
+
+
+def resolve_entry(entry: str, project_root: Path) -> Tuple[str, Path]:
+    """Get the module name and project root for an entry given as a file or a module name"""
+    path = Path(entry)
+    if path.suffix == '.py' or path.exists():
+        path = path.resolve()
+        if path.is_dir():
+            path = path / '__init__.py'
+        try:
+            rel_path = path.relative_to(project_root.resolve())
+        except ValueError:
+            project_root, rel_path = path.parent, Path(path.name)
+        return module_name_for_path(rel_path.as_posix()), project_root
+    return entry, project_root
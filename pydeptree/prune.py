@@ -0,0 +1,173 @@
+"""
+Report installed distributions that nothing in the project needs
+"""
+import json
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from .environment import DistributionIndex, format_size, normalize_name
+from .graph import ProjectGraph, build_project_graph
+from .options import (
+    environment_options,
+    infer_target_python,
+    open_environment_index,
+    target_python_option,
+)
+from .stdlib import PythonVersion, is_stdlib_module
+
+console = Console()
+
+# Installer tooling that an environment needs even though no code imports it
+DEFAULT_KEEP = ('pip', 'setuptools', 'wheel')
+
+
+@dataclass
+class PrunableDistribution:
+    """An installed distribution outside the project's dependency closure"""
+    name: str
+    version: str
+    size: int
+    required_by: List[str] = field(default_factory=list)  # Other prunable distributions needing it
+
+
+@dataclass
+class PruneReport:
+    """Installed distributions split by whether the project can reach them"""
+    roots: List[str] = field(default_factory=list)  # Distributions imported directly or kept
+    reachable: Dict[str, str] = field(default_factory=dict)  # Distribution -> root pulling it in
+    prunable: List[PrunableDistribution] = field(default_factory=list)
+    unresolved_imports: List[str] = field(default_factory=list)  # External imports nothing provides
+
+    @property
+    def prunable_size(self) -> int:
+        return sum(dist.size for dist in self.prunable)
+
+    def to_dict(self) -> dict:
+        return {
+            'roots': self.roots,
+            'reachable': self.reachable,
+            'prunable': [asdict(dist) for dist in self.prunable],
+            'prunable_size': self.prunable_size,
+            'unresolved_imports': self.unresolved_imports,
+        }
+
+
+def build_prune_report(graph: ProjectGraph, index: DistributionIndex,
+                       target_python: Optional[PythonVersion] = None,
+                       keep: Sequence[str] = DEFAULT_KEEP) -> PruneReport:
+    """Find the installed distributions outside the Requires-Dist closure of the project imports"""
+    report = PruneReport()
+    imported, unresolved = set(), set()
+
+    for module in graph.records:
+        for ref in graph.external_import_refs(module):
+            if is_stdlib_module(ref.module, target_python):
+                continue
+            top_level = ref.module.partition('.')[0]
+            for name in [f"{ref.module}.{name}" for name in ref.names] or [ref.module]:
+                # Resolved by the full module name, so the parts of a namespace package (e.g.
+                # 'google') are told apart; every distribution that may provide it is kept
+                providers = index.providers(name)
+                if not providers:
+                    info = index.get(top_level)  # Distributions without top-level metadata
+                    providers = [info] if info is not None else []
+                if not providers:
+                    unresolved.add(top_level)
+                imported.update(info.name for info in providers)
+
+    report.unresolved_imports = sorted(unresolved)
+    roots = sorted(imported, key=str.lower)
+
+    for name in keep:
+        info = index.get(name)
+        if info is not None and info.name not in roots:
+            roots.append(info.name)
+
+    report.roots = roots
+    closure = index.requirement_closure(roots)
+    report.reachable = {
+        index.distributions[key].name: index.distributions[root].name
+        for key, root in sorted(closure.items())
+        if key in index.distributions and root in index.distributions
+    }
+
+    prunable_keys = [key for key in sorted(index.distributions) if key not in closure]
+    for key in prunable_keys:
+        info = index.distributions[key]
+        report.prunable.append(PrunableDistribution(name=info.name, version=info.version,
+                                                    size=info.disk_size()))
+
+    # Show which prunable distributions only stay because other prunable ones need them
+    by_key = {normalize_name(dist.name): dist for dist in report.prunable}
+    for key in prunable_keys:
+        for dependency in index.distributions[key].dependencies:
+            dependent = by_key.get(normalize_name(dependency))
+            if dependent is not None:
+                dependent.required_by.append(index.distributions[key].name)
+
+    report.prunable.sort(key=lambda dist: (-dist.size, dist.name.lower()))
+    return report
+
+
+def display_prune_report(report: PruneReport, environment: str) -> None:
+    """Display prunable distributions, largest first"""
+    console.print(f"[dim]Environment: {environment}[/dim]")
+    console.print(f"[dim]{len(report.roots)} distributions imported or kept, "
+                  f"{len(report.reachable)} reachable through their requirements[/dim]")
+    for import_name in report.unresolved_imports:
+        console.print(f"[yellow]No installed distribution provides '{import_name}'[/yellow]")
+
+    if not report.prunable:
+        console.print("[green]Every installed distribution is reachable from the project's "
+                      "imports[/green]")
+        return
+
+    table = Table(title="Installed distributions not reachable from any import",
+                  show_header=True, header_style="bold cyan")
+    table.add_column("Distribution", style="cyan")
+    table.add_column("Version", style="green")
+    table.add_column("Size", justify="right")
+    table.add_column("Required By (also prunable)", style="dim")
+
+    for dist in report.prunable:
+        table.add_row(dist.name, dist.version, format_size(dist.size), ", ".join(dist.required_by))
+
+    console.print(table)
+    console.print(f"\n[bold]{len(report.prunable)}[/bold] distributions could be removed, "
+                  f"freeing [bold]{format_size(report.prunable_size)}[/bold]")
+
+
+@click.command('prune-report')
+@click.option('-r', '--root', 'project_root',
+              type=click.Path(exists=True, file_okay=False, path_type=Path), default='.',
+              help='Project root directory (default: current directory)')
+@click.option('--keep', multiple=True, default=DEFAULT_KEEP, show_default=True,
+              help='Distribution to treat as needed even if nothing imports it (repeatable)')
+@environment_options
+@target_python_option
+@click.option('--json', 'as_json', is_flag=True, help='Output the report as JSON')
+def prune_report(project_root: Path, keep: Sequence[str], target_interpreter: Optional[Path],
+                 site_packages: Sequence[Path], target_python: Optional[PythonVersion],
+                 as_json: bool):
+    """List installed distributions that no project import can reach
+
+    The project's external imports are expanded through the installed
+    distributions' Requires-Dist metadata; everything outside that closure
+    is reported with its size on disk. Nothing is uninstalled.
+    """
+    index = open_environment_index(target_interpreter, site_packages)
+    target_python = infer_target_python(index, target_python)
+
+    report = build_prune_report(build_project_graph(project_root), index, target_python, keep)
+
+    if as_json:
+        click.echo(json.dumps(report.to_dict(), indent=2))
+    else:
+        environment = ", ".join(index.paths) if index.paths is not None else sys.prefix
+        display_prune_report(report, environment)
@@ -0,0 +1,477 @@
+"""
+Compare a project's declared requirements against the imports in its code
+"""
+import configparser
+import json
+import re
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from .environment import DistributionIndex, normalize_name, parse_requirement_name
+from .graph import ProjectGraph, build_project_graph
+from .options import (
+    environment_options,
+    infer_target_python,
+    open_environment_index,
+    target_python_option,
+)
+from .stdlib import PythonVersion, is_stdlib_module
+
+try:
+    import tomllib
+except ImportError:  # pragma: no cover - Python < 3.11
+    try:
+        import tomli as tomllib  # type: ignore
+    except ImportError:
+        tomllib = None  # type: ignore
+
+
+console = Console()
+
+# Requirement files named with one of these words only hold development tools
+_DEV_FILE_MARKERS = {'dev', 'develop', 'test', 'tests', 'testing', 'doc', 'docs', 'lint', 'ci'}
+_EGG_FRAGMENT = re.compile(r'[#&]egg=([A-Za-z0-9][A-Za-z0-9._-]*)')
+
+
+@dataclass
+class DeclaredRequirement:
+    """A requirement declared in one of the project's requirement sources"""
+    name: str
+    requirement: str
+    source: str  # 'relative/path:line' or 'relative/path [section]'
+    group: Optional[str] = None  # Extra or development group; None for runtime requirements
+
+
+def _relative(path: Path, project_root: Path) -> str:
+    try:
+        return path.resolve().relative_to(project_root.resolve()).as_posix()
+    except ValueError:
+        return str(path)
+
+
+def _strip_comment(line: str) -> str:
+    # A '#' only starts a comment at the start of a line or after whitespace
+    match = re.search(r'(^|\s)#', line)
+    return line[:match.start()].strip() if match else line.strip()
+
+
+def parse_requirements_txt(path: Path, project_root: Path,
+                           _seen: Optional[Set[Path]] = None) -> List[DeclaredRequirement]:
+    """Parse a pip requirements file, following ``-r`` includes
+
+    Requirements from files named like ``requirements-dev.txt`` are put in the
+    'dev' group; an included file is grouped by its own name.
+    """
+    seen = _seen if _seen is not None else set()
+    if path.resolve() in seen or not path.is_file():
+        return []
+    seen.add(path.resolve())
+
+    words = set(re.split(r'[-_.]', path.stem.lower()))
+    if path.parent.name == 'requirements':
+        words.add(path.stem.lower())
+    group = 'dev' if words & _DEV_FILE_MARKERS else None
+
+    requirements = []
+    source = _relative(path, project_root)
+    logical_line = ''
+    start_lineno = 0
+
+    lines = path.read_text(encoding='utf-8', errors='replace').splitlines()
+    for lineno, raw_line in enumerate(lines, 1):
+        if not logical_line:
+            start_lineno = lineno
+        if raw_line.endswith('\\'):
+            logical_line += raw_line[:-1] + ' '
+            continue
+        line = _strip_comment(logical_line + raw_line)
+        logical_line = ''
+        if not line:
+            continue
+        location = f"{source}:{start_lineno}"
+
+        if line.startswith(('-r ', '--requirement')):
+            included = line.split(None, 1)[1] if ' ' in line else line.split('=', 1)[-1]
+            requirements.extend(parse_requirements_txt(path.parent / included.strip(), project_root,
+                                                       seen))
+            continue
+        if line.startswith(('-e ', '--editable')):
+            match = _EGG_FRAGMENT.search(line)
+            if match:
+                requirements.append(DeclaredRequirement(match.group(1), line, location, group))
+            continue
+        if line.startswith('-'):
+            # Constraints files and index options do not declare requirements
+            continue
+
+        # Drop per-requirement options such as --hash
+        requirement = re.split(r'\s--', line, maxsplit=1)[0].strip()
+        match = _EGG_FRAGMENT.search(requirement)
+        if '://' in requirement and ' @ ' not in requirement:
+            name = match.group(1) if match else None
+        else:
+            name = parse_requirement_name(requirement)
+        if name:
+            requirements.append(DeclaredRequirement(name, requirement, location, group))
+
+    return requirements
+
+
+def parse_setup_cfg(path: Path, project_root: Path) -> List[DeclaredRequirement]:
+    """Parse ``install_requires``, ``tests_require`` and ``extras_require`` from setup.cfg"""
+    parser = configparser.ConfigParser(interpolation=None)
+    try:
+        parser.read(path, encoding='utf-8')
+    except configparser.Error:
+        return []
+
+    source = _relative(path, project_root)
+    requirements = []
+
+    def add(value: str, section: str, group: Optional[str]):
+        # A dangling list, or a single line of ';'-separated requirements
+        lines = value.splitlines() if '\n' in value.strip() else value.split(';')
+        for line in lines:
+            line = _strip_comment(line)
+            name = parse_requirement_name(line) if line else None
+            if name:
+                requirements.append(DeclaredRequirement(name, line, f"{source} [{section}]", group))
+
+    if parser.has_option('options', 'install_requires'):
+        add(parser.get('options', 'install_requires'), 'options', None)
+    if parser.has_option('options', 'tests_require'):
+        add(parser.get('options', 'tests_require'), 'options', 'test')
+    if parser.has_section('options.extras_require'):
+        for extra, value in parser.items('options.extras_require'):
+            add(value, 'options.extras_require', extra)
+
+    return requirements
+
+
+def parse_pyproject_toml(path: Path, project_root: Path) -> List[DeclaredRequirement]:
+    """Parse PEP 621, PEP 735 and Poetry dependencies from pyproject.toml
+
+    Raises ``RuntimeError`` when no TOML parser is available (Python < 3.11
+    without ``tomli``).
+    """
+    if tomllib is None:
+        raise RuntimeError("reading pyproject.toml requires Python 3.11+ or the 'tomli' package")
+
+    with open(path, 'rb') as f:
+        data = tomllib.load(f)
+
+    source = _relative(path, project_root)
+    requirements = []
+
+    def add(entries, section: str, group: Optional[str]):
+        for entry in entries or ():
+            if isinstance(entry, str):
+                name = parse_requirement_name(entry)
+                if name:
+                    requirements.append(DeclaredRequirement(name, entry, f"{source} [{section}]",
+                                                            group))
+
+    project = data.get('project', {})
+    add(project.get('dependencies'), 'project', None)
+    for extra, entries in project.get('optional-dependencies', {}).items():
+        add(entries, 'project.optional-dependencies', extra)
+    for group, entries in data.get('dependency-groups', {}).items():
+        add(entries, 'dependency-groups', group)
+
+    poetry = data.get('tool', {}).get('poetry', {})
+    poetry_sections = [('tool.poetry.dependencies', None, poetry.get('dependencies', {})),
+                       ('tool.poetry.dev-dependencies', 'dev', poetry.get('dev-dependencies', {}))]
+    for group, group_data in poetry.get('group', {}).items():
+        poetry_sections.append((f"tool.poetry.group.{group}", group,
+                                group_data.get('dependencies', {})))
+    for section, group, entries in poetry_sections:
+        for name, spec in entries.items():
+            if name.lower() != 'python':
+                requirement = f"{name} {spec}" if isinstance(spec, str) else name
+                requirements.append(DeclaredRequirement(name, requirement, f"{source} [{section}]",
+                                                        group))
+
+    return requirements
+
+
+def find_requirement_sources(project_root: Path) -> List[Path]:
+    """Find the requirement sources at the top of a project"""
+    project_root = Path(project_root)
+    sources = sorted(project_root.glob('requirements*.txt'))
+    requirements_dir = project_root / 'requirements'
+    if requirements_dir.is_dir():
+        sources.extend(sorted(requirements_dir.glob('*.txt')))
+    for name in ('setup.cfg', 'pyproject.toml'):
+        if (project_root / name).is_file():
+            sources.append(project_root / name)
+    return sources
+
+
+def load_declared_requirements(
+        project_root: Path,
+        sources: Optional[Sequence[Path]] = None) -> Tuple[List[DeclaredRequirement], List[str]]:
+    """Parse every requirement source of a project
+
+    Returns the declared requirements and warnings about sources that could
+    not be read.
+    """
+    project_root = Path(project_root)
+    if sources is None:
+        sources = find_requirement_sources(project_root)
+
+    requirements: List[DeclaredRequirement] = []
+    warnings: List[str] = []
+    seen: Set[Path] = set()
+
+    for path in sources:
+        path = Path(path)
+        try:
+            if path.name == 'setup.cfg':
+                requirements.extend(parse_setup_cfg(path, project_root))
+            elif path.suffix == '.toml':
+                requirements.extend(parse_pyproject_toml(path, project_root))
+            else:
+                requirements.extend(parse_requirements_txt(path, project_root, _seen=seen))
+        except (OSError, ValueError, RuntimeError) as e:
+            warnings.append(f"Skipped {_relative(path, project_root)}: {e}")
+
+    return requirements, warnings
+
+
+def project_distribution_names(project_root: Path) -> Set[str]:
+    """Get the normalized name under which the project itself is distributed, if declared"""
+    names = set()
+    setup_cfg = Path(project_root) / 'setup.cfg'
+    if setup_cfg.is_file():
+        parser = configparser.ConfigParser(interpolation=None)
+        try:
+            parser.read(setup_cfg, encoding='utf-8')
+            if parser.has_option('metadata', 'name'):
+                names.add(normalize_name(parser.get('metadata', 'name')))
+        except configparser.Error:
+            pass
+    pyproject = Path(project_root) / 'pyproject.toml'
+    if pyproject.is_file() and tomllib is not None:
+        try:
+            with open(pyproject, 'rb') as f:
+                name = tomllib.load(f).get('project', {}).get('name')
+            if name:
+                names.add(normalize_name(name))
+        except (OSError, ValueError):
+            pass
+    return names
+
+
+@dataclass
+class RequirementStatus:
+    """How a distribution is declared and used by the project"""
+    name: str
+    imports: List[str] = field(default_factory=list)  # Modules imported from it
+    modules: List[str] = field(default_factory=list)  # Project files importing it
+    declared_in: List[str] = field(default_factory=list)
+    via: Optional[str] = None  # Declared requirement that pulls in a transitive dependency
+
+
+@dataclass
+class ReqCheckReport:
+    """Result of comparing declared requirements against the project's imports"""
+    used: List[RequirementStatus] = field(default_factory=list)
+    unused: List[RequirementStatus] = field(default_factory=list)
+    missing: List[RequirementStatus] = field(default_factory=list)
+    transitive: List[RequirementStatus] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+
+    @property
+    def has_problems(self) -> bool:
+        return bool(self.unused or self.missing)
+
+    def to_dict(self) -> dict:
+        return {
+            'used': [asdict(status) for status in self.used],
+            'unused': [asdict(status) for status in self.unused],
+            'missing': [asdict(status) for status in self.missing],
+            'transitive': [asdict(status) for status in self.transitive],
+            'warnings': self.warnings,
+        }
+
+
+def _providers(index: DistributionIndex, module: str, declared: Dict[str, list]) -> List[str]:
+    """Get the names of the distributions an imported module is credited to
+
+    A module several distributions could provide (e.g. ``import google``) is
+    credited to the declared ones among them, or to all of them if none is.
+    """
+    providers = [info.name for info in index.providers(module)]
+    if len(providers) > 1:
+        providers = [name for name in providers if normalize_name(name) in declared] or providers
+    return providers or [index.distribution_name(module.partition('.')[0])]
+
+
+def check_requirements(graph: ProjectGraph, declared: List[DeclaredRequirement],
+                       index: DistributionIndex,
+                       target_python: Optional[PythonVersion] = None,
+                       ignore: Sequence[str] = ()) -> ReqCheckReport:
+    """Classify requirements as used, unused, missing or transitively satisfied
+
+    - used: declared and imported
+    - unused: a runtime requirement that no project module imports
+    - missing: imported but neither declared nor installed as a dependency of
+      a declared requirement
+    - transitive: imported and not declared, but installed because a declared
+      requirement depends on it
+    """
+    report = ReqCheckReport()
+    ignored = {normalize_name(name) for name in ignore}
+    ignored |= project_distribution_names(graph.project_root)
+
+    declared_by_key: Dict[str, List[DeclaredRequirement]] = {}
+    for requirement in declared:
+        declared_by_key.setdefault(normalize_name(requirement.name), []).append(requirement)
+
+    # Map every external import to the distribution providing it, by the full module name so
+    # namespace packages split over several distributions (e.g. 'google') resolve correctly
+    imported: Dict[str, RequirementStatus] = {}
+    for module in sorted(graph.records):
+        for ref in graph.external_import_refs(module):
+            if is_stdlib_module(ref.module, target_python):
+                continue
+            names = [f"{ref.module}.{name}" for name in ref.names] or [ref.module]
+            for dist_name in sorted({dist_name for name in names
+                                     for dist_name in _providers(index, name, declared_by_key)}):
+                key = normalize_name(dist_name)
+                if key in ignored:
+                    continue
+                status = imported.setdefault(key, RequirementStatus(name=dist_name))
+                if ref.module not in status.imports:
+                    status.imports.append(ref.module)
+                if graph.paths[module] not in status.modules:
+                    status.modules.append(graph.paths[module])
+    for status in imported.values():
+        status.imports.sort()
+        status.modules.sort()
+
+    closure = index.requirement_closure(declared_by_key)
+
+    for key, status in sorted(imported.items()):
+        if key in declared_by_key:
+            status.declared_in = [requirement.source for requirement in declared_by_key[key]]
+            report.used.append(status)
+        elif key in closure and key in index.distributions:
+            via = closure[key]
+            status.via = declared_by_key[via][0].name
+            report.transitive.append(status)
+        else:
+            report.missing.append(status)
+
+    for key, requirements in sorted(declared_by_key.items()):
+        if key in imported or key in ignored:
+            continue
+        if any(requirement.group is None for requirement in requirements):
+            report.unused.append(RequirementStatus(
+                name=requirements[0].name,
+                declared_in=[requirement.source for requirement in requirements],
+            ))
+
+    return report
+
+
+def display_reqcheck_report(report: ReqCheckReport, sources: Sequence[str]) -> None:
+    """Display the requirement check as one table per category"""
+    if sources:
+        console.print(f"[dim]Requirement sources: {', '.join(sources)}[/dim]")
+    else:
+        console.print("[yellow]No requirement sources found[/yellow]")
+    for warning in report.warnings:
+        console.print(f"[yellow]{warning}[/yellow]")
+
+    def files_summary(files: List[str]) -> str:
+        summary = ", ".join(files[:3])
+        if len(files) > 3:
+            summary += f" (+{len(files) - 3} more)"
+        return summary
+
+    if report.missing:
+        table = Table(title="Missing requirements (imported, not declared)",
+                      header_style="bold red")
+        table.add_column("Distribution", style="red")
+        table.add_column("Imports", style="cyan")
+        table.add_column("Used In", style="dim")
+        for status in report.missing:
+            table.add_row(status.name, ", ".join(status.imports), files_summary(status.modules))
+        console.print(table)
+
+    if report.unused:
+        table = Table(title="Unused requirements (declared, never imported)",
+                      header_style="bold yellow")
+        table.add_column("Distribution", style="yellow")
+        table.add_column("Declared In", style="dim")
+        for status in report.unused:
+            table.add_row(status.name, ", ".join(status.declared_in))
+        console.print(table)
+
+    if report.transitive:
+        table = Table(title="Transitively satisfied (imported, installed by another requirement)",
+                      header_style="bold cyan")
+        table.add_column("Distribution", style="cyan")
+        table.add_column("Required By", style="green")
+        table.add_column("Used In", style="dim")
+        for status in report.transitive:
+            table.add_row(status.name, status.via or "", files_summary(status.modules))
+        console.print(table)
+
+    console.print(
+        f"\n[green]{len(report.used)} used[/green], "
+        f"[yellow]{len(report.unused)} unused[/yellow], "
+        f"[red]{len(report.missing)} missing[/red], "
+        f"[cyan]{len(report.transitive)} transitive[/cyan]"
+    )
+
+
+@click.command('reqcheck')
+@click.option('-r', '--root', 'project_root',
+              type=click.Path(exists=True, file_okay=False, path_type=Path), default='.',
+              help='Project root directory (default: current directory)')
+@click.option('--source', 'sources', multiple=True,
+              type=click.Path(exists=True, dir_okay=False, path_type=Path),
+              help='Requirement source to check '
+                   '(repeatable; default: requirements*.txt, setup.cfg, pyproject.toml)')
+@click.option('--ignore', multiple=True,
+              help='Distribution to leave out of the report (repeatable)')
+@environment_options
+@target_python_option
+@click.option('--strict', is_flag=True,
+              help='Exit with status 1 if requirements are unused or missing')
+@click.option('--json', 'as_json', is_flag=True, help='Output the report as JSON')
+def reqcheck(project_root: Path, sources: Sequence[Path], ignore: Sequence[str],
+             target_interpreter: Optional[Path], site_packages: Sequence[Path],
+             target_python: Optional[PythonVersion], strict: bool, as_json: bool):
+    """Find unused, missing and transitively satisfied requirements
+
+    Declared requirements are compared against the external imports of every
+    module in the project, mapped from import names to distribution names
+    using the installed packages' metadata.
+    """
+    index = open_environment_index(target_interpreter, site_packages)
+    target_python = infer_target_python(index, target_python)
+
+    source_paths = list(sources) if sources else find_requirement_sources(project_root)
+    declared, warnings = load_declared_requirements(project_root, source_paths)
+    graph = build_project_graph(project_root)
+
+    report = check_requirements(graph, declared, index, target_python, ignore)
+    report.warnings = warnings
+
+    if as_json:
+        click.echo(json.dumps(report.to_dict(), indent=2))
+    else:
+        display_reqcheck_report(report,
+                                [_relative(path, Path(project_root)) for path in source_paths])
+
+    if strict and report.has_problems:
+        sys.exit(1)
@@ -0,0 +1,183 @@
+"""
+Analyze a project as it exists at any git revision, without checking it out
+
+The file list comes from one ``git ls-tree -r -z`` and every blob from one
+persistent ``git cat-file --batch`` process; nothing is written to the work
+tree. Results are memoized by blob id, so files that are identical in
+several revisions (or clean in the work tree and already in the analysis
+cache) are parsed and linted once.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .analysis import AnalysisCache, ModuleRecord, analyze_source
+from .git import BlobReader, GitError, find_git_root, run_git
+from .graph import ProjectGraph
+from .lint import lint_files, lint_source, split_issues
+from .project import is_project_source
+
+
+def resolve_commit(git_root: Path, rev: str) -> str:
+    """Get the full id of the commit a revision names"""
+    try:
+        output = run_git(['rev-parse', '--verify', '--quiet', f"{rev}^{{commit}}"], cwd=git_root)
+    except GitError:
+        raise GitError(f"Unknown revision: {rev}") from None
+    return output.decode('ascii').strip()
+
+
+def project_prefix(git_root: Path, project_root: Path) -> Optional[str]:
+    """Get the path of a project inside its repository, as a prefix of git paths ('' at the top)"""
+    try:
+        prefix = Path(project_root).resolve().relative_to(git_root).as_posix()
+    except ValueError:
+        return None
+    return '' if prefix == '.' else prefix + '/'
+
+
+def project_source_path(path: str, prefix: str) -> Optional[str]:
+    """Get the project-relative path of a git path if it is a Python source of the project"""
+    if path.startswith(prefix) and is_project_source(path[len(prefix):]):
+        return path[len(prefix):]
+    return None
+
+
+def list_revision_files(git_root: Path, project_root: Path, commit: str) -> Dict[str, str]:
+    """Get the blob id of every Python source of a project at a commit, keyed by relative path"""
+    prefix = project_prefix(git_root, project_root)
+    if prefix is None:
+        return {}
+
+    files = {}
+    output = run_git(['ls-tree', '-r', '-z', '--full-tree', commit], cwd=git_root)
+    for entry in output.split(b'\0'):
+        if not entry:
+            continue
+        info, _, path = entry.partition(b'\t')
+        mode, object_type, oid = info.split()
+        if object_type != b'blob' or mode == b'120000':  # Skip submodules and symlinks
+            continue
+        rel_path = project_source_path(path.decode('utf-8', errors='surrogateescape'), prefix)
+        if rel_path is not None:
+            files[rel_path] = oid.decode('ascii')
+    return files
+
+
+def _count_issues(issues: Optional[List[dict]]) -> Optional[Tuple[int, int]]:
+    if issues is None:
+        return None
+    errors, warnings = split_issues(issues)
+    return len(errors), len(warnings)
+
+
+class BlobAnalyzer:
+    """Analyze and lint git blobs, remembering the results by blob id
+
+    One analyzer can serve many revisions of a repository; a blob is read
+    and parsed only the first time it is seen. Blobs that the project's
+    analysis cache already holds (files clean in the work tree) are not
+    read at all. The cache is only read, and only if it exists, so nothing
+    is written to the project.
+    """
+
+    def __init__(self, git_root: Path, project_root: Path, use_cache: bool = True):
+        self.git_root = git_root
+        self.project_root = Path(project_root).resolve()
+        self.records: Dict[str, ModuleRecord] = {}
+        self.lint_counts: Dict[Tuple[str, str], Optional[Tuple[int, int]]] = {}
+        self._reader: Optional[BlobReader] = None
+        self._cache: Optional[AnalysisCache] = None
+        self._use_cache = use_cache
+
+    def _read(self, oid: str) -> str:
+        if self._reader is None:
+            self._reader = BlobReader(self.git_root)
+        source = self._reader.read_text(oid)
+        return source if source is not None else ''
+
+    def analyze(self, oid: str) -> ModuleRecord:
+        record = self.records.get(oid)
+        if record is None:
+            if self._use_cache and self._cache is None:
+                self._cache = AnalysisCache.open_existing(self.project_root)
+                self._use_cache = self._cache is not None
+            record = self._cache.get_blob(oid) if self._cache is not None else None
+            if record is None:
+                record = analyze_source(self._read(oid))
+            self.records[oid] = record
+        return record
+
+    def analyze_files(self, files: Dict[str, str]) -> Dict[str, ModuleRecord]:
+        """Analyze the blobs of a revision, keyed like ``files`` (path -> blob id)"""
+        return {rel_path: self.analyze(oid) for rel_path, oid in files.items()}
+
+    def lint_files(self, files: Dict[str, str]) -> Dict[str, Optional[Tuple[int, int]]]:
+        """Get the lint error and warning counts of each blob, or ``None`` where ruff could not run
+
+        Blobs identical to their work tree file are linted in place with one
+        ruff run. The others are piped to ruff through ``--stdin-filename``,
+        so it applies the configuration that matches the file's path, with
+        one ruff process per blob run in parallel.
+        """
+        project_root = self.project_root
+        pending = [(rel_path, oid) for rel_path, oid in files.items()
+                   if (oid, rel_path) not in self.lint_counts]
+        sources = {oid: self._read(oid) for _, oid in pending}
+
+        in_place, piped = [], []
+        for rel_path, oid in pending:
+            try:
+                on_disk = (project_root / rel_path).read_text(encoding='utf-8', errors='replace')
+            except OSError:
+                on_disk = None
+            (in_place if on_disk == sources[oid] else piped).append((rel_path, oid))
+
+        by_path = lint_files([project_root / rel_path for rel_path, _ in in_place], project_root)
+        for rel_path, oid in in_place:
+            issues = (None if by_path is None
+                      else by_path.get((project_root / rel_path).resolve(), []))
+            self.lint_counts[(oid, rel_path)] = _count_issues(issues)
+
+        def lint(item: Tuple[str, str]) -> Optional[Tuple[int, int]]:
+            rel_path, oid = item
+            return _count_issues(lint_source(sources[oid], project_root / rel_path, project_root))
+
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as executor:
+            for (rel_path, oid), counts in zip(piped, executor.map(lint, piped)):
+                self.lint_counts[(oid, rel_path)] = counts
+        return {rel_path: self.lint_counts[(oid, rel_path)] for rel_path, oid in files.items()}
+
+    def close(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
+
+    def __enter__(self) -> 'BlobAnalyzer':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def build_revision_graph(project_root: Path, rev: str,
+                         analyzer: Optional[BlobAnalyzer] = None) -> ProjectGraph:
+    """Build the import graph of a project as of a git revision"""
+    project_root = Path(project_root).resolve()
+    git_root = find_git_root(project_root)
+    files = list_revision_files(git_root, project_root, resolve_commit(git_root, rev))
+
+    own_analyzer = analyzer is None
+    if own_analyzer:
+        analyzer = BlobAnalyzer(git_root, project_root)
+    try:
+        records = analyzer.analyze_files(files)
+    finally:
+        if own_analyzer:
+            analyzer.close()
+    return ProjectGraph.from_records(project_root, records)
+
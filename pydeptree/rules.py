@@ -0,0 +1,104 @@
+"""
+Forbidden import rules between project modules
+
+Rules are read from ``pyproject.toml``::
+
+    [tool.pydeptree]
+    forbidden-imports = [
+        {from = "app.models", to = "app.views", reason = "models stay independent of the UI"},
+        {from = "app.*", to = "tests"},
+    ]
+
+A pattern matches a module and all its submodules; ``*`` and ``?``
+wildcards are allowed.
+"""
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+try:
+    import tomllib
+except ImportError:  # pragma: no cover - Python < 3.11
+    try:
+        import tomli as tomllib  # type: ignore
+    except ImportError:
+        tomllib = None  # type: ignore
+
+
+@dataclass(frozen=True)
+class ForbiddenImport:
+    """A rule forbidding modules matching ``source`` to import modules matching ``target``"""
+    source: str
+    target: str
+    reason: str = ''
+
+    def matches(self, module: str, target: str) -> bool:
+        return module_matches(self.source, module) and module_matches(self.target, target)
+
+    def describe(self) -> str:
+        text = f"{self.source} must not import {self.target}"
+        return f"{text} ({self.reason})" if self.reason else text
+
+
+def module_matches(pattern: str, module: str) -> bool:
+    """Check whether a module is matched by a pattern, or is a submodule of a match"""
+    return fnmatchcase(module, pattern) or fnmatchcase(module, pattern + '.*')
+
+
+def parse_forbidden_import(spec: str) -> ForbiddenImport:
+    """Parse a ``SOURCE:TARGET`` rule given on the command line"""
+    source, sep, target = spec.partition(':')
+    if not sep or not source.strip() or not target.strip():
+        raise ValueError(f"Invalid rule {spec!r}, expected SOURCE:TARGET")
+    return ForbiddenImport(source.strip(), target.strip())
+
+
+def load_forbidden_imports(project_root: Path) -> List[ForbiddenImport]:
+    """Read the forbidden imports of a project from its ``pyproject.toml``
+
+    Raises ``RuntimeError`` when the file has rules but no TOML parser is
+    available (Python < 3.11 without ``tomli``), and ``ValueError`` for
+    malformed rules.
+    """
+    path = Path(project_root) / 'pyproject.toml'
+    if not path.is_file():
+        return []
+    if tomllib is None:
+        if 'forbidden-imports' in path.read_text(encoding='utf-8', errors='replace'):
+            raise RuntimeError(
+                "reading pyproject.toml requires Python 3.11+ or the 'tomli' package")
+        return []
+
+    with open(path, 'rb') as f:
+        entries = tomllib.load(f).get('tool', {}).get('pydeptree', {}).get('forbidden-imports', [])
+
+    rules = []
+    for entry in entries:
+        if not (isinstance(entry, dict) and isinstance(entry.get('from'), str)
+                and isinstance(entry.get('to'), str)):
+            raise ValueError(f"{path}: forbidden-imports entries need 'from' and 'to' strings, "
+                             f"got {entry!r}")
+        rules.append(ForbiddenImport(entry['from'], entry['to'], str(entry.get('reason', ''))))
+    return rules
+
+
+def find_forbidden_rule(rules: Iterable[ForbiddenImport], module: str,
+                        target: str) -> Optional[ForbiddenImport]:
+    """Get the first rule forbidding an import, if any"""
+    for rule in rules:
+        if rule.matches(module, target):
+            return rule
+    return None
+
+
+def forbidden_edges(edges: Iterable[Tuple[str, str]],
+                    rules: Iterable[ForbiddenImport]) -> List[Tuple[str, str, ForbiddenImport]]:
+    """Get the import edges that break a rule, with the rule they break"""
+    rules = list(rules)
+    violations = []
+    for module, target in edges:
+        rule = find_forbidden_rule(rules, module, target)
+        if rule is not None:
+            violations.append((module, target, rule))
+    return violations
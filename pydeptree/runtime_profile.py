@@ -0,0 +1,140 @@
+"""
+Runtime profiles (cProfile/pstats dumps and tracemalloc snapshots) attributed to project modules
+"""
+import pstats
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .graph import ProjectGraph
+
+
+@dataclass
+class FileCost:
+    """Runtime cost recorded for one source file"""
+    time: float = 0.0  # Seconds spent in the file's own code (pstats tottime)
+    calls: int = 0
+    memory: int = 0  # Bytes still allocated by the file's code in the snapshot
+    blocks: int = 0
+
+
+@dataclass
+class ModuleProfile:
+    """Runtime cost of a project module, on its own and with everything it imports"""
+    time: float = 0.0
+    calls: int = 0
+    memory: int = 0
+    cumulative_time: float = 0.0
+    cumulative_memory: int = 0
+
+
+@dataclass
+class RuntimeProfile:
+    """Costs per source file, merged from one or more profile files"""
+    files: Dict[str, FileCost] = field(default_factory=dict)
+    has_time: bool = False
+    has_memory: bool = False
+
+    def cost(self, filename: str) -> FileCost:
+        return self.files.setdefault(filename, FileCost())
+
+
+def load_profile_data(paths: Iterable[Path]) -> RuntimeProfile:
+    """Load cProfile/pstats dumps and tracemalloc snapshots
+
+    The format of each file is detected from its content: tracemalloc
+    snapshots are pickles, pstats dumps are marshal data.
+    """
+    profile = RuntimeProfile()
+    for path in paths:
+        with open(path, 'rb') as f:
+            is_pickle = f.read(1) == b'\x80'
+        try:
+            if is_pickle:
+                _add_tracemalloc_snapshot(profile, tracemalloc.Snapshot.load(str(path)))
+            else:
+                _add_pstats(profile, pstats.Stats(str(path)))
+        except (EOFError, TypeError, ValueError, AttributeError, ImportError) as e:
+            raise ValueError(f"{path}: not a pstats dump or tracemalloc snapshot ({e})") from e
+    return profile
+
+
+def _add_pstats(profile: RuntimeProfile, stats: pstats.Stats) -> None:
+    profile.has_time = True
+    for (filename, _lineno, _function), (_cc, calls, tottime, _ct, _callers) in stats.stats.items():
+        if filename.startswith(('<', '~')):
+            continue  # Built-ins and code without a source file
+        cost = profile.cost(filename)
+        cost.time += tottime
+        cost.calls += calls
+
+
+def _add_tracemalloc_snapshot(profile: RuntimeProfile, snapshot: tracemalloc.Snapshot) -> None:
+    profile.has_memory = True
+    for statistic in snapshot.statistics('filename'):
+        cost = profile.cost(statistic.traceback[0].filename)
+        cost.memory += statistic.size
+        cost.blocks += statistic.count
+
+
+def match_project_file(filename: str, rel_paths: Iterable[str],
+                       project_root: Optional[Path] = None) -> Optional[str]:
+    """Find the project file a profiled filename refers to
+
+    Profiles are often recorded on another machine or in a container, so
+    besides paths inside ``project_root`` the longest project path that the
+    filename ends with is accepted (e.g. ``/srv/app/pkg/mod.py`` matches
+    ``pkg/mod.py``).
+    """
+    normalized = filename.replace('\\', '/')
+    if project_root is not None:
+        try:
+            rel_path = Path(filename).resolve().relative_to(project_root.resolve()).as_posix()
+        except (ValueError, OSError):
+            rel_path = None
+        if rel_path is not None and rel_path in rel_paths:
+            return rel_path
+
+    best = None
+    for rel_path in rel_paths:
+        if (normalized == rel_path or normalized.endswith('/' + rel_path)) and (
+                best is None or len(rel_path) > len(best)):
+            best = rel_path
+    return best
+
+
+def attribute_profile(profile: RuntimeProfile, graph: ProjectGraph) -> Dict[str, ModuleProfile]:
+    """Attribute profiled costs to project modules and sum them over each module's imports
+
+    Cumulative values count every project module in the import closure
+    once, so time spent in a shared helper shows up under each subtree that
+    pulls it in, but never twice within one.
+    """
+    by_path = {rel_path: module for module, rel_path in graph.paths.items()}
+    # Index by file name so only plausible candidates are compared
+    by_name: Dict[str, List[str]] = {}
+    for rel_path in by_path:
+        by_name.setdefault(rel_path.rpartition('/')[2], []).append(rel_path)
+
+    own: Dict[str, ModuleProfile] = {}
+    for filename, cost in profile.files.items():
+        candidates = by_name.get(filename.replace('\\', '/').rpartition('/')[2], [])
+        rel_path = match_project_file(filename, candidates, graph.project_root)
+        if rel_path is None:
+            continue
+        module_profile = own.setdefault(by_path[rel_path], ModuleProfile())
+        module_profile.time += cost.time
+        module_profile.calls += cost.calls
+        module_profile.memory += cost.memory
+
+    profiles = {}
+    for module in graph.paths:
+        closure = (graph.closure(module) | {module}) & own.keys()
+        if not closure:
+            continue
+        module_profile = own.get(module, ModuleProfile())
+        module_profile.cumulative_time = sum(own[name].time for name in closure)
+        module_profile.cumulative_memory = sum(own[name].memory for name in closure)
+        profiles[module] = module_profile
+    return profiles
@@ -0,0 +1,185 @@
+"""
+Persistent trigram index used to narrow text searches across a project
+
+Every Python file is broken into lowercase three-character substrings. A
+search pattern is reduced to the trigrams that any match must contain, so
+only files holding all of them need to be scanned with the real regex.
+"""
+import re
+import sqlite3
+from pathlib import Path
+from typing import List, Optional, Set
+
+try:  # Python 3.11+
+    import re._constants as sre_constants
+    import re._parser as sre_parse
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_constants
+    import sre_parse
+
+from .cache import ensure_schema, file_fingerprint, open_cache_db
+from .project import iter_python_files
+
+INDEX_NAME = 'search_index'
+INDEX_VERSION = 1
+
+_TABLES = ('search_files', 'search_postings')
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS search_files '
+    '(id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, mtime_ns INTEGER, size INTEGER)',
+    'CREATE TABLE IF NOT EXISTS search_postings '
+    '(trigram TEXT NOT NULL, file_id INTEGER NOT NULL, PRIMARY KEY (trigram, file_id)) '
+    'WITHOUT ROWID',
+    'CREATE INDEX IF NOT EXISTS search_postings_file ON search_postings (file_id)',
+)
+
+_REPEAT_OPS = tuple(
+    op for op in (getattr(sre_constants, name, None)
+                  for name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT'))
+    if op is not None
+)
+
+
+def extract_trigrams(text: str) -> Set[str]:
+    """Get the set of lowercase trigrams in a piece of text"""
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _collect_literals(subpattern, literals: List[str]) -> None:
+    """Collect literal runs from the mandatory parts of a parsed regex"""
+    run: List[str] = []
+
+    def flush():
+        if run:
+            literals.append(''.join(run))
+            run.clear()
+
+    for op, av in subpattern:
+        if op is sre_constants.LITERAL:
+            run.append(chr(av))
+            continue
+
+        flush()
+        if op is sre_constants.SUBPATTERN:
+            _collect_literals(av[-1], literals)
+        elif op in _REPEAT_OPS:
+            min_count, _, item = av
+            if min_count >= 1:
+                _collect_literals(item, literals)
+        # Alternations, classes, anchors and wildcards give no guarantees
+
+    flush()
+
+
+def required_literals(pattern: str) -> List[str]:
+    """Get the literal substrings that every match of a regex must contain"""
+    try:
+        parsed = sre_parse.parse(pattern)
+    except (re.error, RecursionError, OverflowError):
+        return []
+
+    literals: List[str] = []
+    _collect_literals(parsed, literals)
+    return literals
+
+
+def required_trigrams(pattern: str) -> Set[str]:
+    """Get the trigrams that every match of a regex must contain"""
+    trigrams: Set[str] = set()
+    for literal in required_literals(pattern):
+        trigrams.update(extract_trigrams(literal))
+    return trigrams
+
+
+class TrigramIndex:
+    """On-disk trigram index of a project's Python files
+
+    The index lives in the project cache database and is refreshed
+    incrementally: only files whose fingerprint changed are re-read.
+    """
+
+    def __init__(self, project_root: Path, conn: Optional[sqlite3.Connection] = None):
+        self.project_root = Path(project_root).resolve()
+        self.conn = conn if conn is not None else open_cache_db(self.project_root)
+        ensure_schema(self.conn, INDEX_NAME, INDEX_VERSION, _TABLES, _SCHEMA)
+
+    def update(self) -> int:
+        """Bring the index up to date with the files on disk
+
+        Returns the number of files that were (re)indexed.
+        """
+        known = {
+            path: (file_id, [mtime_ns, size])
+            for file_id, path, mtime_ns, size in self.conn.execute(
+                'SELECT id, path, mtime_ns, size FROM search_files')
+        }
+        seen = set()
+        indexed = 0
+
+        for file_path in iter_python_files(self.project_root):
+            rel_path = file_path.relative_to(self.project_root).as_posix()
+            seen.add(rel_path)
+            fingerprint = file_fingerprint(file_path)
+            entry = known.get(rel_path)
+
+            if entry is not None and entry[1] == fingerprint:
+                continue
+
+            try:
+                content = file_path.read_text(encoding='utf-8', errors='replace')
+            except OSError:
+                content = ''
+
+            mtime_ns, size = fingerprint or [None, None]
+            if entry is not None:
+                file_id = entry[0]
+                self.conn.execute('DELETE FROM search_postings WHERE file_id = ?', (file_id,))
+                self.conn.execute('UPDATE search_files SET mtime_ns = ?, size = ? WHERE id = ?',
+                                  (mtime_ns, size, file_id))
+            else:
+                cursor = self.conn.execute(
+                    'INSERT INTO search_files (path, mtime_ns, size) VALUES (?, ?, ?)',
+                    (rel_path, mtime_ns, size))
+                file_id = cursor.lastrowid
+
+            self.conn.executemany(
+                'INSERT INTO search_postings (trigram, file_id) VALUES (?, ?)',
+                ((trigram, file_id) for trigram in extract_trigrams(content)))
+            indexed += 1
+
+        for rel_path in set(known) - seen:
+            file_id = known[rel_path][0]
+            self.conn.execute('DELETE FROM search_postings WHERE file_id = ?', (file_id,))
+            self.conn.execute('DELETE FROM search_files WHERE id = ?', (file_id,))
+
+        self.conn.commit()
+        return indexed
+
+    def candidates(self, pattern: str) -> Optional[Set[Path]]:
+        """Get the files that may match a regex
+
+        Returns None when the pattern has no required trigrams, meaning
+        every file has to be scanned.
+        """
+        trigrams = required_trigrams(pattern)
+        if not trigrams:
+            return None
+
+        file_ids: Optional[Set[int]] = None
+        for trigram in trigrams:
+            ids = {row[0] for row in self.conn.execute(
+                'SELECT file_id FROM search_postings WHERE trigram = ?', (trigram,))}
+            file_ids = ids if file_ids is None else file_ids & ids
+            if not file_ids:
+                return set()
+
+        paths = set()
+        for file_id, rel_path in self.conn.execute('SELECT id, path FROM search_files'):
+            if file_id in file_ids:
+                paths.add(self.project_root / rel_path)
+        return paths
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        self.conn.close()
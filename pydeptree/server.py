@@ -0,0 +1,170 @@
+"""
+Local HTTP server exposing the project graph as JSON endpoints
+
+Every endpoint is a ``ProjectService`` query: ``GET /<method>[/<module>]``
+with the remaining parameters in the query string, e.g.
+``/dependents/app.models?transitive=1`` or ``/search?query=User&match=prefix``.
+Responses carry an ETag derived from the graph version, so clients polling
+with ``If-None-Match`` get a 304 until a file actually changes.
+"""
+import json
+import secrets
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import click
+
+from .service import QUERY_METHODS, QueryError, UnknownModuleError
+from .watch import DEFAULT_POLL_INTERVAL
+
+# How query string values are converted to query parameters
+_PARAM_TYPES = {
+    'depth': int,
+    'limit': int,
+    'transitive': lambda value: value.lower() in ('1', 'true', 'yes'),
+}
+
+# Parameters taking every value given in the query string
+_LIST_PARAMS = {'paths'}
+
+
+def parse_request_path(request_path: str) -> Tuple[str, Dict[str, Any]]:
+    """Get the query method and parameters of a request path"""
+    url = urlsplit(request_path)
+    method, _, module = url.path.strip('/').partition('/')
+    params: Dict[str, Any] = {}
+    if module:
+        params['module'] = unquote(module)
+    for name, values in parse_qs(url.query).items():
+        if name in _LIST_PARAMS:
+            params[name] = values
+            continue
+        value = values[-1]
+        try:
+            params[name] = _PARAM_TYPES[name](value) if name in _PARAM_TYPES else value
+        except ValueError:
+            raise QueryError(f"Invalid value for {name}: {value}") from None
+    return method or 'status', params
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server_version = 'pydeptree'
+    protocol_version = 'HTTP/1.1'  # Keep-alive for polling clients; every response has a length
+
+    def do_GET(self) -> None:
+        service = self.server.service
+        # Read before answering: a refresh during the query only makes the ETag stale, never wrong
+        etag = f'"{self.server.instance}-{service.version}"'
+        try:
+            method, params = parse_request_path(self.path)
+            if method not in QUERY_METHODS:
+                self._send_json(HTTPStatus.NOT_FOUND, {'error': f"Unknown endpoint: /{method}"})
+                return
+            if etag in self._client_etags():
+                self._send(HTTPStatus.NOT_MODIFIED, etag=etag)
+                return
+            result = service.call(method, params)
+        except QueryError as e:
+            status = (HTTPStatus.NOT_FOUND if isinstance(e, UnknownModuleError)
+                      else HTTPStatus.BAD_REQUEST)
+            self._send_json(status, {'error': str(e)})
+            return
+        self._send_json(HTTPStatus.OK, result, etag=etag)
+
+    def _client_etags(self) -> Set[str]:
+        tags = {tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')}
+        return {tag[2:] if tag.startswith('W/') else tag for tag in tags if tag}
+
+    def _send_json(self, status: HTTPStatus, payload: Any, etag: Optional[str] = None) -> None:
+        self._send(status, json.dumps(payload).encode('utf-8'), etag)
+
+    def _send(self, status: HTTPStatus, body: bytes = b'', etag: Optional[str] = None) -> None:
+        self.send_response(status)
+        if etag is not None:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        if self.server.allow_origin:
+            self.send_header('Access-Control-Allow-Origin', self.server.allow_origin)
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class QueryHTTPServer(ThreadingHTTPServer):
+    """Threaded HTTP server answering queries from a ``ProjectService``"""
+    daemon_threads = True
+
+    def __init__(self, address, service, poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 allow_origin: Optional[str] = None, verbose: bool = False):
+        self.service = service
+        self.poll_interval = poll_interval
+        self.allow_origin = allow_origin
+        self.verbose = verbose
+        # Versions restart at each launch; the instance token keeps old ETags from matching
+        self.instance = secrets.token_hex(4)
+        self._stopped = threading.Event()
+        super().__init__(address, _RequestHandler)
+
+    def serve(self) -> None:
+        """Serve requests and watch for changes until shut down"""
+        watch_thread = threading.Thread(target=self.service.watch,
+                                        args=(self._stopped, self.poll_interval), daemon=True)
+        watch_thread.start()
+        try:
+            self.serve_forever()
+        finally:
+            self._stopped.set()
+            self.server_close()
+
+
+@click.command('serve')
+@click.option('-r', '--root', 'project_root',
+              type=click.Path(exists=True, file_okay=False, path_type=Path), default='.',
+              help='Project root directory (default: current directory)')
+@click.option('--host', default='127.0.0.1', show_default=True, help='Address to listen on')
+@click.option('-p', '--port', default=8765, type=int, show_default=True,
+              help='Port to listen on (0 picks a free one)')
+@click.option('--allow-origin',
+              help='Value of the Access-Control-Allow-Origin header, for browser dashboards')
+@click.option('--poll-interval', default=DEFAULT_POLL_INTERVAL, type=float, show_default=True,
+              help='Seconds between checks for changes when watchfiles is not installed')
+@click.option('-v', '--verbose', is_flag=True, help='Log every request')
+def serve(project_root: Path, host: str, port: int, allow_origin: Optional[str],
+          poll_interval: float, verbose: bool):
+    """Serve the project's dependency graph as JSON over HTTP
+
+    Endpoints: /status, /nodes, /edges, /cycles, /metrics/MODULE,
+    /tree/MODULE?depth=N, /dependencies/MODULE, /dependents/MODULE
+    (add ?transitive=1), /search?query=TEXT&match=prefix and
+    /impact?paths=FILE&paths=FILE. The graph is kept in memory and only
+    changed files are re-analyzed.
+    """
+    from .service import ProjectService
+
+    start = time.perf_counter()
+    service = ProjectService(project_root)
+    try:
+        server = QueryHTTPServer((host, port), service, poll_interval, allow_origin, verbose)
+    except OSError as e:
+        raise click.ClickException(f"Cannot listen on {host}:{port}: {e}") from e
+
+    bound_host, bound_port = server.server_address[:2]
+    click.echo(f"Loaded {service.status()['modules']} modules "
+               f"in {time.perf_counter() - start:.2f}s; "
+               f"serving on http://{bound_host}:{bound_port}/", err=True)
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        pass
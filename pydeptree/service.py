@@ -0,0 +1,291 @@
+"""
+In-memory project graph kept up to date incrementally, shared by the long-running servers
+
+The daemon, the HTTP server and the editor service all hold one
+``ProjectService``: files are analyzed once at startup and afterwards only
+the ones whose fingerprint changed are re-read, so queries never touch disk.
+"""
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from .analysis import AnalysisCache, ModuleRecord, analyze_source
+from .cache import file_fingerprint
+from .cycles import CycleChange, CycleTracker
+from .graph import ProjectGraph
+from .project import module_name_for_path
+from .symbols import SymbolIndex
+from .watch import DEFAULT_POLL_INTERVAL, changed_paths, create_watcher, snapshot_fingerprints
+
+# Query methods callable through ProjectService.call(), with their parameters
+QUERY_METHODS = {
+    'status': (),
+    'nodes': (),
+    'edges': (),
+    'metrics': ('module',),
+    'tree': ('module', 'depth'),
+    'dependencies': ('module', 'transitive'),
+    'dependents': ('module', 'transitive'),
+    'cycles': (),
+    'search': ('query', 'match', 'limit'),
+    'impact': ('paths',),
+}
+
+
+class QueryError(ValueError):
+    """A query that cannot be answered, e.g. an unknown module"""
+
+
+class UnknownModuleError(QueryError):
+    """A query names a module that is not part of the project"""
+
+
+class ProjectService:
+    """A project's import graph and per-module metrics, refreshed incrementally
+
+    All public methods are thread-safe.
+    """
+
+    def __init__(self, project_root: Path):
+        self.project_root = Path(project_root).resolve()
+        self.lock = threading.RLock()
+        self.version = 0  # Incremented whenever the graph changes
+        self.records: Dict[str, ModuleRecord] = {}  # Relative path -> analysis
+        self.fingerprints: Dict[str, List[int]] = {}
+        # Unsaved editor buffers by relative path; they win over the files on disk
+        self.overlays: Dict[str, str] = {}
+        self.graph = ProjectGraph(project_root=self.project_root)
+        self.cycle_tracker = CycleTracker()
+        self.last_cycle_change = CycleChange()  # Cycles formed and dissolved by the last update
+        self._symbols: Optional[SymbolIndex] = None
+        self.refresh()
+
+    def refresh(self, snapshot: Optional[Dict[str, List[int]]] = None) -> Set[str]:
+        """Re-analyze the files that changed on disk and return their relative paths"""
+        if snapshot is None:
+            snapshot = snapshot_fingerprints(self.project_root)
+        with self.lock:
+            changed = changed_paths(self.fingerprints, snapshot)
+            if not changed:
+                return set()
+
+            updated = {}
+            cache = AnalysisCache(self.project_root)
+            try:
+                for rel_path in (changed & snapshot.keys()) - self.overlays.keys():
+                    updated[rel_path] = cache.analyze(self.project_root / rel_path)
+                cache.prune(snapshot)
+            finally:
+                cache.close()
+
+            self.fingerprints = snapshot
+            self._apply(updated, changed - snapshot.keys() - self.overlays.keys())
+            return changed
+
+    def update_source(self, rel_path: str, source: str) -> None:
+        """Analyze an unsaved buffer in place of the file on disk, which is not read
+
+        While the buffer does not parse, the imports of its last analysis are
+        kept so the graph does not flicker as the user types.
+        """
+        with self.lock:
+            record = analyze_source(source)
+            previous = self.records.get(rel_path)
+            if record.syntax_error and previous is not None:
+                record.imports = previous.imports
+            self.overlays[rel_path] = source
+            self._apply({rel_path: record}, ())
+
+    def discard_source(self, rel_path: str) -> None:
+        """Drop the buffer of a file, going back to the version on disk"""
+        with self.lock:
+            if self.overlays.pop(rel_path, None) is None:
+                return
+            fingerprint = file_fingerprint(self.project_root / rel_path)
+            if fingerprint is None:
+                self._apply({}, (rel_path,))
+                return
+            self.fingerprints.pop(rel_path, None)
+            self.refresh({**self.fingerprints, rel_path: fingerprint})
+
+    def watch(self, stopped: threading.Event, poll_interval: float = DEFAULT_POLL_INTERVAL,
+              on_change: Optional[Callable[[Set[str]], None]] = None) -> None:
+        """Refresh whenever project files change, until ``stopped`` is set
+
+        ``on_change`` is called with the changed relative paths after each refresh.
+        """
+        watcher = create_watcher(self.project_root, poll_interval)
+        try:
+            while not stopped.is_set():
+                if watcher.wait(timeout=1.0):
+                    changed = self.refresh()
+                    if changed and on_change is not None:
+                        on_change(changed)
+        finally:
+            watcher.close()
+
+    def _apply(self, updated: Dict[str, ModuleRecord], removed: Iterable[str]) -> None:
+        """Update the graph with new records, rebuilding it only when files were added or removed"""
+        removed = set(removed) & self.records.keys()
+        added = updated.keys() - self.records.keys()
+        if not updated and not removed:
+            return
+        for rel_path in removed:
+            self.records.pop(rel_path, None)
+        self.records.update(updated)
+
+        if added or removed or not self.graph.paths:
+            previous = {frozenset(cycle) for cycle in self.cycle_tracker.cycles()}
+            self.graph = ProjectGraph.from_records(self.project_root, self.records)
+            self.cycle_tracker = CycleTracker(self.graph.edges)
+            current = {frozenset(cycle) for cycle in self.cycle_tracker.cycles()}
+            self.last_cycle_change = CycleChange(
+                formed=sorted(sorted(cycle) for cycle in current - previous),
+                dissolved=sorted(sorted(cycle) for cycle in previous - current))
+        else:
+            added_edges, removed_edges = [], []
+            for rel_path, record in updated.items():
+                module = module_name_for_path(rel_path)
+                gained, lost = self.graph.replace_record(module, record)
+                added_edges.extend((module, target) for target in gained)
+                removed_edges.extend((module, target) for target in lost)
+            self.last_cycle_change = self.cycle_tracker.update(added_edges, removed_edges)
+
+        self._symbols = None
+        self.version += 1
+
+    # Queries
+
+    def resolve_module(self, name: str) -> str:
+        """Get a module from its dotted name or its path (relative to the root or absolute)"""
+        if name in self.graph.paths:
+            return name
+        path = Path(name)
+        if path.is_absolute():
+            try:
+                path = path.resolve().relative_to(self.project_root)
+            except ValueError:
+                raise UnknownModuleError(f"{name} is outside {self.project_root}") from None
+        module = module_name_for_path(path.as_posix())
+        if module not in self.graph.paths:
+            raise UnknownModuleError(f"Unknown module: {name}")
+        return module
+
+    def status(self) -> dict:
+        with self.lock:
+            return {
+                'root': str(self.project_root),
+                'version': self.version,
+                'modules': len(self.graph.paths),
+                'edges': sum(len(targets) for targets in self.graph.edges.values()),
+            }
+
+    def _node(self, module: str) -> dict:
+        record = self.graph.records[module]
+        return {
+            'module': module,
+            'path': self.graph.paths[module],
+            'size': record.size,
+            'lines': record.lines,
+            'statements': record.statements,
+            'complexity': record.complexity,
+            'functions': record.functions,
+            'classes': record.classes,
+            'todos': len(record.todos),
+            'syntax_error': record.syntax_error,
+            'fan_in': self.graph.fan_in(module),
+            'fan_out': self.graph.fan_out(module),
+            'external_imports': sorted(self.graph.external_imports.get(module, ())),
+        }
+
+    def nodes(self) -> List[dict]:
+        with self.lock:
+            return [self._node(module) for module in sorted(self.graph.paths)]
+
+    def edges(self) -> List[List[str]]:
+        with self.lock:
+            return [[module, target] for module in sorted(self.graph.edges)
+                    for target in sorted(self.graph.edges[module])]
+
+    def metrics(self, module: str) -> dict:
+        with self.lock:
+            return self._node(self.resolve_module(module))
+
+    def tree(self, module: str, depth: int = 3) -> dict:
+        """Get the import tree of a module; modules already shown are not expanded again"""
+        with self.lock:
+            root = self.resolve_module(module)
+            seen = {root}
+
+            def build(name: str, level: int) -> dict:
+                node = {'module': name, 'path': self.graph.paths[name]}
+                if level < depth:
+                    children = []
+                    for child in sorted(self.graph.edges.get(name, ())):
+                        if child in seen:
+                            children.append({'module': child, 'path': self.graph.paths[child],
+                                             'seen': True})
+                        else:
+                            seen.add(child)
+                            children.append(build(child, level + 1))
+                    node['children'] = children
+                return node
+
+            return build(root, 0)
+
+    def dependencies(self, module: str, transitive: bool = False) -> List[str]:
+        with self.lock:
+            module = self.resolve_module(module)
+            if transitive:
+                return sorted(self.graph.closure(module))
+            return sorted(self.graph.edges.get(module, set()))
+
+    def dependents(self, module: str, transitive: bool = False) -> List[str]:
+        with self.lock:
+            module = self.resolve_module(module)
+            if transitive:
+                return sorted(self.graph.dependents(module))
+            return sorted(self.graph.reverse_edges.get(module, set()))
+
+    def cycles(self) -> List[List[str]]:
+        with self.lock:
+            return self.cycle_tracker.cycles()
+
+    def search(self, query: str, match: str = 'exact', limit: int = 20) -> List[dict]:
+        """Find class and function definitions (see ``pydeptree symbols``)"""
+        with self.lock:
+            if self._symbols is None:
+                self._symbols = SymbolIndex(self.graph)
+            return [hit.to_dict() for hit in self._symbols.search(query, match, limit)]
+
+    def impact(self, paths: Iterable[str]) -> dict:
+        """Get the modules affected by changes to some files: their modules and all importers"""
+        with self.lock:
+            changed, unknown = set(), []
+            for path in paths:
+                try:
+                    changed.add(self.resolve_module(path))
+                except QueryError:
+                    unknown.append(path)
+            affected = set(changed)
+            for module in changed:
+                affected |= self.graph.dependents(module)
+            return {
+                'changed': sorted(changed),
+                'affected': sorted(affected),
+                'paths': sorted(self.graph.paths[module] for module in affected),
+                'unknown': unknown,
+            }
+
+    def call(self, method: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Run a query by name, with parameters from a request"""
+        if method not in QUERY_METHODS:
+            raise QueryError(f"Unknown method: {method}")
+        params = dict(params or {})
+        unexpected = set(params) - set(QUERY_METHODS[method])
+        if unexpected:
+            raise QueryError(f"Unexpected parameters for {method}: {', '.join(sorted(unexpected))}")
+        try:
+            return getattr(self, method)(**params)
+        except TypeError as e:
+            raise QueryError(f"Invalid parameters for {method}: {e}") from e
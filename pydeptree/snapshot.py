@@ -0,0 +1,220 @@
+"""
+Analysis snapshots: a project's module records and lint counts at one point in time
+
+A snapshot is taken from the work tree or from any git revision, and can be
+saved as JSON so that later comparisons do not need to analyze it again.
+"""
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from .analysis import AnalysisCache, ModuleRecord
+from .git import GitError, find_git_root
+from .graph import ProjectGraph
+from .lint import lint_files, split_issues
+from .options import rev_option
+from .project import iter_python_files
+from .revision import BlobAnalyzer, list_revision_files, resolve_commit
+
+console = Console()
+
+SNAPSHOT_FORMAT = 1
+
+LintCounts = Tuple[int, int]  # Errors and warnings
+
+
+@dataclass
+class ProjectSnapshot:
+    """Analysis of every module of a project, from the work tree or a git revision"""
+    project_root: Path
+    records: Dict[str, ModuleRecord]  # By path relative to the project root
+    blobs: Dict[str, str] = field(default_factory=dict)  # Git blob id by path, for revisions
+    lint: Optional[Dict[str, LintCounts]] = None  # Lint counts by path, if linted
+    revision: Optional[str] = None  # Commit id, for revisions
+    _graph: Optional[ProjectGraph] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def graph(self) -> ProjectGraph:
+        if self._graph is None:
+            self._graph = ProjectGraph.from_records(self.project_root, self.records)
+        return self._graph
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """Get the project-wide metrics of the snapshot
+
+        Lint totals are ``None`` when the snapshot was not linted.
+        """
+        graph = self.graph
+        records = list(self.records.values())
+        closure_sizes = graph.closure_sizes()
+        linted = self.lint is not None
+        return {
+            'modules': len(records),
+            'edges': sum(len(targets) for targets in graph.edges.values()),
+            'cycles': len(graph.cycles()),
+            'average_complexity': (round(sum(r.complexity for r in records) / len(records), 2)
+                                   if records else 0.0),
+            'max_closure': max(closure_sizes.values(), default=0),
+            'lint_errors': sum(errors for errors, _ in self.lint.values()) if linted else None,
+            'lint_warnings': (sum(warnings for _, warnings in self.lint.values())
+                              if linted else None),
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            'format': SNAPSHOT_FORMAT,
+            'revision': self.revision,
+            'records': {rel_path: record.to_dict()
+                        for rel_path, record in sorted(self.records.items())},
+            'blobs': dict(sorted(self.blobs.items())),
+            'lint': None if self.lint is None else {
+                rel_path: list(counts) for rel_path, counts in sorted(self.lint.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, project_root: Path, data: dict) -> 'ProjectSnapshot':
+        if data.get('format') != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported snapshot format: {data.get('format')!r}")
+        lint = data.get('lint')
+        return cls(
+            project_root=Path(project_root),
+            records={rel_path: ModuleRecord.from_dict(record)
+                     for rel_path, record in data['records'].items()},
+            blobs=dict(data.get('blobs') or {}),
+            lint=None if lint is None else {rel_path: tuple(counts)
+                                            for rel_path, counts in lint.items()},
+            revision=data.get('revision'),
+        )
+
+    def save(self, path: Path) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), separators=(',', ':')), encoding='utf-8')
+
+    @classmethod
+    def load(cls, path: Path, project_root: Path) -> 'ProjectSnapshot':
+        """Read a saved snapshot, raising ``ValueError`` if it is not one"""
+        try:
+            data = json.loads(Path(path).read_text(encoding='utf-8'))
+            return cls.from_dict(project_root, data)
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"{path} is not a pydeptree snapshot") from e
+
+
+def snapshot_work_tree(project_root: Path, lint: bool = False) -> ProjectSnapshot:
+    """Take a snapshot of the work tree, through the analysis cache and a single ruff run"""
+    project_root = Path(project_root).resolve()
+    cache = AnalysisCache(project_root)
+    records = {}
+    try:
+        for file_path in iter_python_files(project_root):
+            records[file_path.relative_to(project_root).as_posix()] = cache.analyze(file_path)
+        cache.commit()
+    finally:
+        cache.close()
+
+    counts = None
+    if lint:
+        by_path = lint_files([project_root / rel_path for rel_path in records], project_root)
+        if by_path is not None:
+            counts = {}
+            for rel_path in records:
+                issues = by_path.get((project_root / rel_path).resolve(), [])
+                errors, warnings = split_issues(issues)
+                counts[rel_path] = (len(errors), len(warnings))
+    return ProjectSnapshot(project_root, records, lint=counts)
+
+
+def snapshot_revision(project_root: Path, rev: str, lint: bool = False,
+                      analyzer: Optional[BlobAnalyzer] = None) -> ProjectSnapshot:
+    """Take a snapshot of a git revision without checking it out
+
+    Pass the same ``analyzer`` for several revisions of a repository to
+    analyze and lint each distinct blob only once.
+    """
+    project_root = Path(project_root).resolve()
+    git_root = find_git_root(project_root)
+    commit = resolve_commit(git_root, rev)
+    files = list_revision_files(git_root, project_root, commit)
+
+    own_analyzer = analyzer is None
+    if own_analyzer:
+        analyzer = BlobAnalyzer(git_root, project_root)
+    try:
+        records = analyzer.analyze_files(files)
+        counts = analyzer.lint_files(files) if lint else None
+    finally:
+        if own_analyzer:
+            analyzer.close()
+
+    if counts is not None and any(value is None for value in counts.values()):
+        counts = None  # ruff could not run
+    return ProjectSnapshot(project_root, records, blobs=files, lint=counts, revision=commit)
+
+
+def take_snapshot(project_root: Path, rev: Optional[str] = None, lint: bool = False,
+                  analyzer: Optional[BlobAnalyzer] = None) -> ProjectSnapshot:
+    """Take a snapshot of a git revision, or of the work tree if ``rev`` is ``None``"""
+    if rev is None:
+        return snapshot_work_tree(project_root, lint)
+    return snapshot_revision(project_root, rev, lint, analyzer)
+
+
+SUMMARY_LABELS = {
+    'modules': 'Modules',
+    'edges': 'Import edges',
+    'cycles': 'Import cycles',
+    'average_complexity': 'Average complexity',
+    'max_closure': 'Largest import closure',
+    'lint_errors': 'Lint errors',
+    'lint_warnings': 'Lint warnings',
+}
+
+
+def display_summary(snapshot: ProjectSnapshot, title: str) -> None:
+    table = Table(title=title, show_header=True, header_style='bold magenta')
+    table.add_column('Metric', style='cyan')
+    table.add_column('Value', justify='right')
+    for key, value in snapshot.summary().items():
+        if value is not None:
+            table.add_row(SUMMARY_LABELS[key], str(value))
+    console.print(table)
+
+
+@click.command('snapshot')
+@click.option('-r', '--root', 'project_root',
+              type=click.Path(exists=True, file_okay=False, path_type=Path), default='.',
+              help='Project root directory (default: current directory)')
+@rev_option
+@click.option('--lint', is_flag=True, help='Also record ruff error and warning counts')
+@click.option('-o', '--output', type=click.Path(dir_okay=False, path_type=Path),
+              help='Save the snapshot to this file, for "pydeptree diff"')
+@click.option('--json', 'as_json', is_flag=True, help='Output the summary as JSON')
+def snapshot(project_root: Path, rev: Optional[str], lint: bool, output: Optional[Path],
+             as_json: bool):
+    """Summarize the whole project's import graph and metrics, optionally saving them
+
+    With --rev the files are read straight from git, so any tag or branch can
+    be analyzed without checking it out.
+    """
+    try:
+        result = take_snapshot(project_root, rev, lint)
+    except GitError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+
+    if output is not None:
+        result.save(output)
+    if as_json:
+        click.echo(json.dumps({'revision': result.revision, **result.summary()}, indent=2))
+        return
+
+    display_summary(result, f"Snapshot of {rev}" if rev else 'Snapshot of the work tree')
+    if lint and result.lint is None:
+        console.print('[yellow]ruff is not available; lint counts were skipped[/yellow]')
+    if output is not None:
+        console.print(f"[green]Saved snapshot of {len(result.records)} modules to {output}[/green]")
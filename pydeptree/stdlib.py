@@ -0,0 +1,130 @@
+"""
+Standard library module classification per Python version
+
+On Python 3.10+ the running interpreter's ``sys.stdlib_module_names`` is
+authoritative. For older interpreters, and for ``--target-python`` versions
+other than the running one, a per-version table is derived from the 3.7
+module index plus the modules added and removed by each release (see the
+"New Modules" and "Removed" sections of each What's New document).
+"""
+import sys
+from functools import lru_cache
+from typing import Dict, FrozenSet, Optional, Set, Tuple
+
+PythonVersion = Tuple[int, int]
+
+# Top-level standard library modules of Python 3.7, including the private
+# modules that third-party code commonly imports
+_STDLIB_3_7 = frozenset({
+    '__future__', '_abc', '_ast', '_asyncio', '_bisect', '_blake2', '_bootlocale', '_bz2',
+    '_codecs', '_codecs_cn', '_codecs_hk', '_codecs_iso2022', '_codecs_jp', '_codecs_kr',
+    '_codecs_tw', '_collections', '_collections_abc', '_compat_pickle', '_compression',
+    '_contextvars', '_crypt', '_csv', '_ctypes', '_curses', '_curses_panel', '_datetime',
+    '_dbm', '_decimal', '_dummy_thread', '_elementtree', '_frozen_importlib',
+    '_frozen_importlib_external', '_functools', '_gdbm', '_hashlib', '_heapq', '_imp', '_io',
+    '_json', '_locale', '_lsprof', '_lzma', '_markupbase', '_md5', '_msi', '_multibytecodec',
+    '_multiprocessing', '_opcode', '_operator', '_osx_support', '_overlapped', '_pickle',
+    '_posixsubprocess', '_py_abc', '_pydecimal', '_pyio', '_queue', '_random', '_scproxy',
+    '_sha1', '_sha256', '_sha3', '_sha512', '_signal', '_sitebuiltins', '_socket', '_sqlite3',
+    '_sre', '_ssl', '_stat', '_string', '_strptime', '_struct', '_symtable', '_thread',
+    '_threading_local', '_tkinter', '_tracemalloc', '_uuid', '_warnings', '_weakref',
+    '_weakrefset', '_winapi',
+    'abc', 'aifc', 'antigravity', 'argparse', 'array', 'ast', 'asynchat', 'asyncio',
+    'asyncore', 'atexit', 'audioop', 'base64', 'bdb', 'binascii', 'binhex', 'bisect',
+    'builtins', 'bz2', 'cProfile', 'calendar', 'cgi', 'cgitb', 'chunk', 'cmath', 'cmd',
+    'code', 'codecs', 'codeop', 'collections', 'colorsys', 'compileall', 'concurrent',
+    'configparser', 'contextlib', 'contextvars', 'copy', 'copyreg', 'crypt', 'csv', 'ctypes',
+    'curses', 'dataclasses', 'datetime', 'dbm', 'decimal', 'difflib', 'dis', 'distutils',
+    'doctest', 'dummy_threading', 'email', 'encodings', 'ensurepip', 'enum', 'errno',
+    'faulthandler', 'fcntl', 'filecmp', 'fileinput', 'fnmatch', 'formatter', 'fractions',
+    'ftplib', 'functools', 'gc', 'genericpath', 'getopt', 'getpass', 'gettext', 'glob', 'grp',
+    'gzip', 'hashlib', 'heapq', 'hmac', 'html', 'http', 'idlelib', 'imaplib', 'imghdr', 'imp',
+    'importlib', 'inspect', 'io', 'ipaddress', 'itertools', 'json', 'keyword', 'lib2to3',
+    'linecache', 'locale', 'logging', 'lzma', 'macpath', 'mailbox', 'mailcap', 'marshal',
+    'math', 'mimetypes', 'mmap', 'modulefinder', 'msilib', 'msvcrt', 'multiprocessing',
+    'netrc', 'nis', 'nntplib', 'nt', 'ntpath', 'nturl2path', 'numbers', 'opcode', 'operator',
+    'optparse', 'os', 'ossaudiodev', 'parser', 'pathlib', 'pdb', 'pickle', 'pickletools',
+    'pipes', 'pkgutil', 'platform', 'plistlib', 'poplib', 'posix', 'posixpath', 'pprint',
+    'profile', 'pstats', 'pty', 'pwd', 'py_compile', 'pyclbr', 'pydoc', 'pydoc_data',
+    'pyexpat', 'queue', 'quopri', 'random', 're', 'readline', 'reprlib', 'resource',
+    'rlcompleter', 'runpy', 'sched', 'secrets', 'select', 'selectors', 'shelve', 'shlex',
+    'shutil', 'signal', 'site', 'smtpd', 'smtplib', 'sndhdr', 'socket', 'socketserver', 'spwd',
+    'sqlite3', 'sre_compile', 'sre_constants', 'sre_parse', 'ssl', 'stat', 'statistics',
+    'string', 'stringprep', 'struct', 'subprocess', 'sunau', 'symbol', 'symtable', 'sys',
+    'sysconfig', 'syslog', 'tabnanny', 'tarfile', 'telnetlib', 'tempfile', 'termios',
+    'textwrap', 'this', 'threading', 'time', 'timeit', 'tkinter', 'token', 'tokenize',
+    'trace', 'traceback', 'tracemalloc', 'tty', 'turtle', 'turtledemo', 'types', 'typing',
+    'unicodedata', 'unittest', 'urllib', 'uu', 'uuid', 'venv', 'warnings', 'wave', 'weakref',
+    'webbrowser', 'winreg', 'winsound', 'wsgiref', 'xdrlib', 'xml', 'xmlrpc', 'zipapp',
+    'zipfile', 'zipimport', 'zlib',
+})
+
+# Modules added and removed by each release after 3.7
+_STDLIB_CHANGES: Dict[PythonVersion, Tuple[Set[str], Set[str]]] = {
+    (3, 8): ({'_posixshmem'}, {'macpath'}),
+    (3, 9): ({'graphlib', 'zoneinfo', '_zoneinfo', '_aix_support'},
+             {'_dummy_thread', 'dummy_threading'}),
+    (3, 10): ({'_bootsubprocess', '_statistics', '_typing'},
+              {'formatter', 'parser', 'symbol', '_bootlocale'}),
+    (3, 11): ({'tomllib', '_tokenize'}, {'binhex'}),
+    (3, 12): ({'_pydatetime', '_pylong'},
+              {'asynchat', 'asyncore', 'distutils', 'imp', 'smtpd'}),
+    (3, 13): ({'_pyrepl', '_interpreters'},
+              {'aifc', 'audioop', 'cgi', 'cgitb', 'chunk', 'crypt', 'imghdr', 'lib2to3',
+               'mailcap', 'msilib', 'nis', 'nntplib', 'ossaudiodev', 'pipes', 'sndhdr', 'spwd',
+               'sunau', 'telnetlib', 'uu', 'xdrlib', '_crypt', '_msi'}),
+    (3, 14): ({'annotationlib', 'compression', '_zstd'}, set()),
+}
+
+# Not listed in sys.stdlib_module_names, but never a third-party dependency
+_ALWAYS_STDLIB = frozenset({'__main__', 'test'})
+
+
+def parse_python_version(version: str) -> PythonVersion:
+    """Parse a version such as '3.9' or '3.11.4' into a (major, minor) tuple"""
+    parts = version.strip().split('.')
+    try:
+        major, minor = int(parts[0]), int(parts[1])
+    except (IndexError, ValueError) as e:
+        raise ValueError(f"Invalid Python version: {version!r} (expected e.g. 3.9)") from e
+    return major, minor
+
+
+def _table_for_version(version: PythonVersion) -> FrozenSet[str]:
+    """Build the fallback stdlib table for a Python version"""
+    modules = set(_STDLIB_3_7)
+    for release in sorted(_STDLIB_CHANGES):
+        if release > version:
+            break
+        added, removed = _STDLIB_CHANGES[release]
+        modules |= added
+        modules -= removed
+    return frozenset(modules | _ALWAYS_STDLIB)
+
+
+@lru_cache(maxsize=None)
+def get_stdlib_modules(target_python: Optional[PythonVersion] = None) -> FrozenSet[str]:
+    """Get the top-level standard library module names for a Python version
+
+    Defaults to the running interpreter, which uses ``sys.stdlib_module_names``
+    when available (3.10+).
+    """
+    running = sys.version_info[:2]
+    if target_python is None or tuple(target_python) == running:
+        names = getattr(sys, 'stdlib_module_names', None)
+        if names is not None:
+            return frozenset(names) | _ALWAYS_STDLIB
+        return _table_for_version(running)
+    return _table_for_version(tuple(target_python))
+
+
+# Built once for the running interpreter; used by is_stdlib_module's fast path
+STDLIB_MODULES = get_stdlib_modules()
+
+
+def is_stdlib_module(module_name: str, target_python: Optional[PythonVersion] = None) -> bool:
+    """Check if a (top-level) module is part of the Python standard library"""
+    top_level = module_name.partition('.')[0]
+    if target_python is None:
+        return top_level in STDLIB_MODULES
+    return top_level in get_stdlib_modules(tuple(target_python))
@@ -0,0 +1,201 @@
+"""
+Project-wide symbol index with definition lookup
+"""
+import bisect
+import difflib
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from .graph import ProjectGraph, build_project_graph
+from .options import open_project_graph, rev_option
+
+console = Console()
+
+
+@dataclass
+class SymbolEntry:
+    """A class or function definition located in the project"""
+    module: str
+    qualname: str
+    name: str
+    kind: str
+    path: str
+    lineno: int
+    end_lineno: int
+    complexity: int
+
+
+@dataclass
+class SymbolHit:
+    """A symbol matching a query, with its module's place in the import graph"""
+    symbol: SymbolEntry
+    fan_in: int
+    fan_out: int
+    imported_by: List[str]
+    score: float = 1.0
+
+    def to_dict(self) -> dict:
+        data = asdict(self.symbol)
+        data.update(fan_in=self.fan_in, fan_out=self.fan_out,
+                    imported_by=self.imported_by, score=round(self.score, 3))
+        return data
+
+
+class SymbolIndex:
+    """Index of every class and function definition in a project"""
+
+    def __init__(self, graph: ProjectGraph):
+        self.graph = graph
+        self.entries: List[SymbolEntry] = []
+        self._by_key: Dict[str, List[SymbolEntry]] = {}
+
+        for module, record in sorted(graph.records.items()):
+            for definition in record.definitions:
+                entry = SymbolEntry(
+                    module=module,
+                    qualname=definition.qualname,
+                    name=definition.name,
+                    kind=definition.kind,
+                    path=graph.paths[module],
+                    lineno=definition.lineno,
+                    end_lineno=definition.end_lineno,
+                    complexity=definition.complexity,
+                )
+                self.entries.append(entry)
+
+                # A symbol can be looked up by name, qualified name or full dotted path
+                keys = {entry.name, entry.qualname, f"{module}.{entry.qualname}"}
+                for key in keys:
+                    self._by_key.setdefault(key, []).append(entry)
+
+        self._sorted_keys = sorted(self._by_key)
+
+    @classmethod
+    def build(cls, project_root: Path) -> 'SymbolIndex':
+        """Build the index for a project using the analysis cache"""
+        return cls(build_project_graph(project_root))
+
+    def _hit(self, entry: SymbolEntry, score: float = 1.0) -> SymbolHit:
+        return SymbolHit(
+            symbol=entry,
+            fan_in=self.graph.fan_in(entry.module),
+            fan_out=self.graph.fan_out(entry.module),
+            imported_by=sorted(self.graph.reverse_edges.get(entry.module, ())),
+            score=score,
+        )
+
+    def _unique_hits(self, keys: List[str], score: float = 1.0) -> List[SymbolHit]:
+        hits = []
+        seen = set()
+        for key in keys:
+            for entry in self._by_key.get(key, ()):
+                identity = (entry.module, entry.qualname, entry.lineno)
+                if identity not in seen:
+                    seen.add(identity)
+                    hits.append(self._hit(entry, score))
+        return hits
+
+    def exact(self, name: str) -> List[SymbolHit]:
+        """Find symbols by name, qualified name or dotted path"""
+        return self._unique_hits([name])
+
+    def prefix(self, prefix: str) -> List[SymbolHit]:
+        """Find symbols whose name, qualified name or dotted path starts with a prefix"""
+        start = bisect.bisect_left(self._sorted_keys, prefix)
+        keys = []
+        for key in self._sorted_keys[start:]:
+            if not key.startswith(prefix):
+                break
+            keys.append(key)
+        return self._unique_hits(keys)
+
+    def fuzzy(self, query: str, limit: int = 20, cutoff: float = 0.6) -> List[SymbolHit]:
+        """Find symbols with names similar to a query"""
+        hits = []
+        seen = set()
+        lowered = {}
+        for key in self._sorted_keys:
+            lowered.setdefault(key.lower(), []).append(key)
+
+        matches = difflib.get_close_matches(query.lower(), list(lowered), n=limit, cutoff=cutoff)
+        for match in matches:
+            score = difflib.SequenceMatcher(None, query.lower(), match).ratio()
+            for hit in self._unique_hits(lowered[match], score):
+                identity = (hit.symbol.module, hit.symbol.qualname, hit.symbol.lineno)
+                if identity not in seen:
+                    seen.add(identity)
+                    hits.append(hit)
+        return hits[:limit]
+
+    def search(self, query: str, match: str = 'exact', limit: int = 20) -> List[SymbolHit]:
+        """Query the index using an 'exact', 'prefix' or 'fuzzy' match"""
+        if match == 'prefix':
+            return self.prefix(query)[:limit]
+        if match == 'fuzzy':
+            return self.fuzzy(query, limit=limit)
+        return self.exact(query)[:limit]
+
+
+def display_symbol_hits(hits: List[SymbolHit], query: str) -> None:
+    """Display symbol lookup results as a table"""
+    if not hits:
+        console.print(f"[yellow]No symbols found for '{query}'[/yellow]")
+        return
+
+    table = Table(title=f"Symbols matching '{query}'", show_header=True, header_style="bold cyan")
+    table.add_column("Symbol", style="cyan")
+    table.add_column("Kind", style="dim")
+    table.add_column("Location", style="green")
+    table.add_column("Complexity", justify="right")
+    table.add_column("Fan-in", justify="right")
+    table.add_column("Fan-out", justify="right")
+    table.add_column("Imported By", style="dim")
+
+    for hit in hits:
+        symbol = hit.symbol
+        importers = ", ".join(hit.imported_by[:3])
+        if len(hit.imported_by) > 3:
+            importers += f" (+{len(hit.imported_by) - 3} more)"
+        table.add_row(
+            f"{symbol.module}.{symbol.qualname}",
+            symbol.kind,
+            f"{symbol.path}:{symbol.lineno}-{symbol.end_lineno}",
+            str(symbol.complexity),
+            str(hit.fan_in),
+            str(hit.fan_out),
+            importers or "-",
+        )
+
+    console.print(table)
+
+
+@click.command('symbols')
+@click.argument('query')
+@click.option('-r', '--root', 'project_root',
+              type=click.Path(exists=True, file_okay=False, path_type=Path), default='.',
+              help='Project root directory (default: current directory)')
+@click.option('-m', '--match', 'match', type=click.Choice(['exact', 'prefix', 'fuzzy']),
+              default='exact', help='How to match QUERY against symbol names (default: exact)')
+@click.option('-n', '--limit', default=20, help='Maximum number of results (default: 20)')
+@rev_option
+@click.option('--json', 'as_json', is_flag=True, help='Output results as JSON')
+def symbols(query: str, project_root: Path, match: str, limit: int, rev: Optional[str],
+            as_json: bool):
+    """Find where classes and functions are defined and who depends on them
+
+    QUERY can be a bare name, a qualified name (Class.method) or a dotted
+    path (package.module.Class).
+    """
+    index = SymbolIndex(open_project_graph(project_root, rev))
+    hits = index.search(query, match=match, limit=limit)
+
+    if as_json:
+        click.echo(json.dumps([hit.to_dict() for hit in hits], indent=2))
+    else:
+        display_symbol_hits(hits, query)
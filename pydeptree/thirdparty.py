@@ -0,0 +1,372 @@
+"""
+Import graphs of installed third-party distributions
+
+Every module a distribution installed is scanned once for its module-level
+imports. The result is cached in the per-user cache keyed by distribution
+name, version and the file hashes listed in its RECORD, so installs of the
+same files are shared by every project and environment on a machine.
+"""
+import json
+import sqlite3
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import click
+from rich.console import Console
+from rich.table import Table
+from rich.tree import Tree
+
+from .analysis import ModuleRecord, analyze_imports
+from .cache import ensure_schema, open_user_cache_db
+from .environment import DistributionIndex, DistributionInfo, format_size, normalize_name
+from .graph import ProjectGraph, build_project_graph
+from .options import (
+    environment_options,
+    infer_target_python,
+    open_environment_index,
+    target_python_option,
+)
+from .stdlib import PythonVersion, is_stdlib_module
+
+console = Console()
+
+THIRDPARTY_NAME = 'thirdparty'
+THIRDPARTY_VERSION = 2
+THIRDPARTY_DB_NAME = 'thirdparty.sqlite3'
+
+_TABLES = ('distribution_modules',)
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS distribution_modules '
+    '(name TEXT NOT NULL, version TEXT NOT NULL, record_digest TEXT NOT NULL, data TEXT NOT NULL, '
+    'PRIMARY KEY (name, version, record_digest))',
+)
+
+# A module of a distribution, identified by the distribution's normalized name
+LoadedModule = Tuple[str, str]
+
+
+def external_import_targets(graph: ProjectGraph, module: str,
+                            local_names: Set[str]) -> Iterator[str]:
+    """Yield the dotted names a module imports from outside its graph
+
+    For ``from package import name`` both ``package`` and ``package.name``
+    are yielded, since ``name`` may be a submodule.
+    """
+    for ref in graph.records[module].imports:
+        if ref.level or not ref.module or ref.module.partition('.')[0] in local_names:
+            continue
+        yield ref.module
+        for name in ref.names:
+            yield f"{ref.module}.{name}"
+
+
+def scan_distribution(info: DistributionInfo) -> Dict[str, ModuleRecord]:
+    """Analyze the imports of every module a distribution installed, keyed by relative path"""
+    records = {}
+    for rel_path, path in info.module_files():
+        if rel_path.endswith('.py'):
+            try:
+                source = path.read_text(encoding='utf-8')
+            except (OSError, UnicodeDecodeError):
+                continue
+            records[rel_path] = analyze_imports(source)
+        else:
+            # Extension modules count towards the footprint but cannot be scanned
+            try:
+                records[rel_path] = ModuleRecord(size=path.stat().st_size, lines=0)
+            except OSError:
+                continue
+    return records
+
+
+@dataclass
+class ImportFootprint:
+    """What importing a third-party package statically loads"""
+    import_name: str
+    distribution: str
+    version: str
+    modules: int = 0  # Modules loaded, across all distributions
+    size: int = 0  # Bytes of those modules' files
+    own_modules: int = 0  # Modules loaded from the imported distribution itself
+    own_size: int = 0
+    distributions: List[str] = field(default_factory=list)  # Other distributions loaded
+
+
+class DistributionGraphs:
+    """Import graphs of the distributions in an environment, built on demand and cached"""
+
+    def __init__(self, index: DistributionIndex, conn: Optional[sqlite3.Connection] = None,
+                 target_python: Optional[PythonVersion] = None):
+        self.index = index
+        self.target_python = target_python
+        self.conn = conn if conn is not None else open_user_cache_db(THIRDPARTY_DB_NAME)
+        ensure_schema(self.conn, THIRDPARTY_NAME, THIRDPARTY_VERSION, _TABLES, _SCHEMA)
+        self._graphs: Dict[str, Optional[ProjectGraph]] = {}
+        self._local_names: Dict[str, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _load_records(self, info: DistributionInfo) -> Dict[str, ModuleRecord]:
+        key = (normalize_name(info.name), info.version, info.record_digest())
+        row = self.conn.execute('SELECT data FROM distribution_modules '
+                                'WHERE name = ? AND version = ? AND record_digest = ?',
+                                key).fetchone()
+        if row is not None:
+            try:
+                records = {path: ModuleRecord.from_dict(data)
+                           for path, data in json.loads(row[0]).items()}
+                self.hits += 1
+                return records
+            except (ValueError, TypeError):
+                pass
+
+        self.misses += 1
+        records = scan_distribution(info)
+        data = json.dumps({path: record.to_dict() for path, record in records.items()},
+                          separators=(',', ':'))
+        self.conn.execute('INSERT OR REPLACE INTO distribution_modules '
+                          '(name, version, record_digest, data) VALUES (?, ?, ?, ?)', key + (data,))
+        self.conn.commit()
+        return records
+
+    def graph(self, dist_key: str) -> Optional[ProjectGraph]:
+        """Get the internal import graph of an installed distribution"""
+        if dist_key not in self._graphs:
+            info = self.index.distributions.get(dist_key)
+            if info is None:
+                self._graphs[dist_key] = None
+            else:
+                graph = ProjectGraph.from_records(info.location or Path('.'),
+                                                  self._load_records(info))
+                self._graphs[dist_key] = graph
+                self._local_names[dist_key] = graph.local_top_level_names()
+        return self._graphs[dist_key]
+
+    def provider(self, module: str) -> Optional[str]:
+        """Get the normalized name of the distribution providing a dotted module name"""
+        top_level = module.partition('.')[0]
+        providers = list(self.index.import_map().get(top_level, ()))
+        if not providers and normalize_name(top_level) in self.index.distributions:
+            providers = [normalize_name(top_level)]
+        if len(providers) > 1:
+            # Namespace packages (e.g. 'google') are split over several distributions
+            for key in providers:
+                graph = self.graph(key)
+                if graph is not None and module in graph.paths:
+                    return key
+        return providers[0] if providers else None
+
+    def loaded_modules(self, module: str) -> Set[LoadedModule]:
+        """Get every module, across distributions, statically loaded by importing a module
+
+        Importing a module also imports its parent packages. Only imports
+        made at module level are followed.
+        """
+        return self.load([module])
+
+    def load(self, modules: Iterable[str]) -> Set[LoadedModule]:
+        """Get every module statically loaded by importing some installed modules"""
+        stack: List[LoadedModule] = []
+        for module in modules:
+            if is_stdlib_module(module, self.target_python):
+                continue
+            provider = self.provider(module)
+            if provider is not None:
+                stack.append((provider, module))
+
+        loaded: Set[LoadedModule] = set()
+        while stack:
+            dist_key, name = stack.pop()
+            graph = self.graph(dist_key)
+            if graph is None:
+                continue
+            target = graph.containing_module(name)
+            if target is None or (dist_key, target) in loaded:
+                continue
+            loaded.add((dist_key, target))
+
+            parts = target.split('.')
+            for i in range(1, len(parts)):
+                stack.append((dist_key, '.'.join(parts[:i])))
+            for dependency in graph.edges.get(target, ()):
+                stack.append((dist_key, dependency))
+            for external in external_import_targets(graph, target, self._local_names[dist_key]):
+                if is_stdlib_module(external, self.target_python):
+                    continue
+                provider = self.provider(external)
+                if provider is not None:
+                    stack.append((provider, external))
+
+        return loaded
+
+    def footprint(self, import_name: str) -> Optional[ImportFootprint]:
+        """Count the modules and bytes statically loaded by importing a top-level package"""
+        dist_key = self.provider(import_name)
+        if dist_key is None:
+            return None
+        info = self.index.distributions[dist_key]
+        footprint = ImportFootprint(import_name=import_name, distribution=info.name,
+                                    version=info.version)
+
+        others = set()
+        for loaded_key, module in self.loaded_modules(import_name):
+            size = self._graphs[loaded_key].records[module].size
+            footprint.modules += 1
+            footprint.size += size
+            if loaded_key == dist_key:
+                footprint.own_modules += 1
+                footprint.own_size += size
+            else:
+                others.add(self.index.distributions[loaded_key].name)
+
+        footprint.distributions = sorted(others, key=str.lower)
+        return footprint
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+
+def display_import_footprints(footprints: List[ImportFootprint], console: Console) -> None:
+    """Display the footprint of each external import, heaviest first"""
+    if not footprints:
+        return
+
+    table = Table(title="Third-party Footprint (statically loaded at import)",
+                  show_header=True, header_style="bold cyan")
+    table.add_column("Import", style="cyan")
+    table.add_column("Distribution", style="green")
+    table.add_column("Modules", justify="right")
+    table.add_column("Size", justify="right")
+    table.add_column("Own Modules", justify="right", style="dim")
+    table.add_column("Pulls In", style="dim")
+
+    for footprint in sorted(footprints, key=lambda item: (-item.size, item.import_name)):
+        pulls_in = ", ".join(footprint.distributions[:4])
+        if len(footprint.distributions) > 4:
+            pulls_in += f" (+{len(footprint.distributions) - 4} more)"
+        table.add_row(
+            footprint.import_name,
+            f"{footprint.distribution} {footprint.version}",
+            str(footprint.modules),
+            format_size(footprint.size),
+            str(footprint.own_modules),
+            pulls_in,
+        )
+
+    console.print(table)
+
+
+@dataclass
+class DistributionLoad:
+    """The modules of one distribution loaded by an import"""
+    name: str
+    version: str
+    modules: List[str] = field(default_factory=list)
+    size: int = 0
+
+
+def summarize_loaded(graphs: DistributionGraphs,
+                     loaded: Set[LoadedModule]) -> List[DistributionLoad]:
+    """Group loaded modules by distribution, largest first"""
+    loads: Dict[str, DistributionLoad] = {}
+    for dist_key, module in loaded:
+        info = graphs.index.distributions[dist_key]
+        load = loads.setdefault(dist_key, DistributionLoad(name=info.name, version=info.version))
+        load.modules.append(module)
+        load.size += graphs.graph(dist_key).records[module].size
+
+    for load in loads.values():
+        load.modules.sort()
+    return sorted(loads.values(), key=lambda load: (-load.size, load.name.lower()))
+
+
+def project_module_imports(graph: ProjectGraph, module: str) -> Tuple[Set[str], Set[str]]:
+    """Get the project modules a module loads and the external modules they import"""
+    project_modules = graph.closure(module) | {module}
+    local_names = graph.local_top_level_names()
+    external = set()
+    for name in project_modules:
+        external.update(external_import_targets(graph, name, local_names))
+    return project_modules, external
+
+
+def display_loaded_modules(module: str, loads: List[DistributionLoad], show_modules: bool,
+                           project_modules: int = 0) -> None:
+    """Display what importing a module loads, per distribution"""
+    if not loads and not project_modules:
+        console.print(f"[yellow]No installed or project module named '{module}'[/yellow]")
+        return
+
+    if show_modules:
+        tree = Tree(f"[bold]import {module}[/bold]")
+        for load in loads:
+            branch = tree.add(f"[cyan]{load.name}[/cyan] [dim]({load.version}, "
+                              f"{len(load.modules)} modules, {format_size(load.size)})[/dim]")
+            for name in load.modules:
+                branch.add(name)
+        console.print(tree)
+    else:
+        table = Table(title=f"import {module}", show_header=True, header_style="bold cyan")
+        table.add_column("Distribution", style="cyan")
+        table.add_column("Version", style="green")
+        table.add_column("Modules", justify="right")
+        table.add_column("Size", justify="right")
+        for load in loads:
+            table.add_row(load.name, load.version, str(len(load.modules)), format_size(load.size))
+        console.print(table)
+
+    total_modules = sum(len(load.modules) for load in loads)
+    total_size = sum(load.size for load in loads)
+    summary = f"\n[bold]{total_modules}[/bold] third-party modules ({format_size(total_size)}) " \
+              f"from [bold]{len(loads)}[/bold] distributions"
+    if project_modules:
+        summary += f", plus {project_modules} project module{'s' if project_modules != 1 else ''}"
+    console.print(summary)
+
+
+@click.command('loads')
+@click.argument('module')
+@click.option('-r', '--root', 'project_root',
+              type=click.Path(exists=True, file_okay=False, path_type=Path), default=None,
+              help='Project root, to resolve MODULE as a project module first')
+@click.option('-m', '--modules', 'show_modules', is_flag=True, help='List every loaded module')
+@environment_options
+@target_python_option
+@click.option('--json', 'as_json', is_flag=True, help='Output the result as JSON')
+def loads(module: str, project_root: Optional[Path], show_modules: bool,
+          target_interpreter: Optional[Path], site_packages: Sequence[Path],
+          target_python: Optional[PythonVersion], as_json: bool):
+    """Show what importing MODULE statically loads from installed packages
+
+    MODULE is an installed module (e.g. pandas or requests.adapters) or, with
+    --root, a module of the project, whose imports are then followed into
+    site-packages. Installed packages are scanned once and cached per user,
+    keyed by name, version and file hashes.
+    """
+    index = open_environment_index(target_interpreter, site_packages)
+    target_python = infer_target_python(index, target_python)
+
+    project_modules: Set[str] = set()
+    starts = [module]
+    if project_root is not None:
+        graph = build_project_graph(project_root)
+        if module in graph.paths:
+            project_modules, external = project_module_imports(graph, module)
+            starts = sorted(external)
+
+    graphs = DistributionGraphs(index, target_python=target_python)
+    try:
+        loaded = summarize_loaded(graphs, graphs.load(starts))
+    finally:
+        graphs.close()
+
+    if as_json:
+        click.echo(json.dumps({
+            'module': module,
+            'project_modules': sorted(project_modules),
+            'distributions': [asdict(load) for load in loaded],
+        }, indent=2))
+    else:
+        display_loaded_modules(module, loaded, show_modules, len(project_modules))
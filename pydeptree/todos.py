@@ -0,0 +1,123 @@
+"""
+Project-wide TODO/FIXME report built from the analysis cache
+"""
+import json
+import posixpath
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from .analysis import TODO_TAGS
+from .graph import ProjectGraph
+from .options import open_project_graph, rev_option
+
+console = Console()
+
+
+@dataclass
+class TodoItem:
+    """A TODO-style marker found in the project"""
+    tag: str
+    text: str
+    path: str
+    line: int
+
+    @property
+    def directory(self) -> str:
+        return posixpath.dirname(self.path) or '.'
+
+
+def collect_todos(graph: ProjectGraph, tags: Optional[Sequence[str]] = None) -> List[TodoItem]:
+    """Collect the TODO markers of every module in a project graph"""
+    wanted = {tag.upper() for tag in tags} if tags else None
+    items = []
+
+    for module, record in graph.records.items():
+        for line, todo_text in record.todos:
+            tag, _, text = todo_text.partition(':')
+            if wanted is not None and tag not in wanted:
+                continue
+            items.append(TodoItem(tag=tag, text=text.strip(), path=graph.paths[module], line=line))
+
+    return items
+
+
+def sort_todos(items: List[TodoItem], sort_by: str = 'type') -> List[TodoItem]:
+    """Sort TODO items by 'type', 'directory' or 'file'"""
+    if sort_by == 'directory':
+        return sorted(items, key=lambda item: (item.directory, item.path, item.line))
+    if sort_by == 'file':
+        return sorted(items, key=lambda item: (item.path, item.line))
+    tag_order = {tag: i for i, tag in enumerate(TODO_TAGS)}
+    return sorted(items,
+                  key=lambda item: (tag_order.get(item.tag, len(tag_order)), item.path, item.line))
+
+
+def group_todos(items: List[TodoItem], group_by: str) -> Dict[str, List[TodoItem]]:
+    """Group sorted TODO items under their type, directory or file"""
+    groups: Dict[str, List[TodoItem]] = {}
+    for item in items:
+        if group_by == 'directory':
+            name = item.directory
+        elif group_by == 'file':
+            name = item.path
+        else:
+            name = item.tag
+        groups.setdefault(name, []).append(item)
+    return groups
+
+
+def display_todos_report(items: List[TodoItem], sort_by: str) -> None:
+    """Display TODO items grouped by the sort key, with counts per group"""
+    if not items:
+        console.print("[green]No TODO comments found![/green]")
+        return
+
+    table = Table(title="TODO/FIXME Comments", show_header=True, header_style="bold cyan")
+    table.add_column("Type", style="bright_blue")
+    table.add_column("Location", style="green")
+    table.add_column("Text")
+
+    for name, group in group_todos(items, sort_by).items():
+        table.add_section()
+        table.add_row(f"[bold]{name}[/bold] ({len(group)})", "", "")
+        for item in group:
+            table.add_row(item.tag, f"{item.path}:{item.line}", item.text)
+
+    console.print(table)
+
+    counts: Dict[str, int] = {}
+    for item in items:
+        counts[item.tag] = counts.get(item.tag, 0) + 1
+    summary = ", ".join(f"{tag}: {count}" for tag, count in sorted(counts.items()))
+    console.print(f"\nFound [cyan]{len(items)}[/cyan] markers ({summary})")
+
+
+@click.command('todos')
+@click.option('-r', '--root', 'project_root',
+              type=click.Path(exists=True, file_okay=False, path_type=Path), default='.',
+              help='Project root directory (default: current directory)')
+@click.option('--sort', 'sort_by', type=click.Choice(['type', 'directory', 'file']), default='type',
+              help='Sort and group markers by type, directory or file (default: type)')
+@click.option('-t', '--tag', 'tags', multiple=True,
+              type=click.Choice(TODO_TAGS, case_sensitive=False),
+              help='Only show markers of this type (repeatable)')
+@rev_option
+@click.option('--json', 'as_json', is_flag=True, help='Output markers as JSON')
+def todos(project_root: Path, sort_by: str, tags: Sequence[str], rev: Optional[str], as_json: bool):
+    """Report TODO/FIXME/HACK markers across the whole project
+
+    Markers are extracted from comments and docstrings and cached per file,
+    so files that have not changed since the last run are not re-read.
+    """
+    graph = open_project_graph(project_root, rev)
+    items = sort_todos(collect_todos(graph, tags), sort_by)
+
+    if as_json:
+        click.echo(json.dumps([asdict(item) for item in items], indent=2))
+    else:
+        display_todos_report(items, sort_by)
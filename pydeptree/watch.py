@@ -0,0 +1,114 @@
+"""
+Detect changed Python files in a project, for watch mode and long-running services
+
+Uses ``watchfiles`` (inotify, FSEvents, ReadDirectoryChangesW) when it is
+installed and falls back to polling file fingerprints with the standard
+library otherwise.
+"""
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from .cache import file_fingerprint
+from .project import is_project_source, iter_python_files
+
+DEFAULT_POLL_INTERVAL = 0.5  # Seconds between fingerprint scans
+
+
+def import_watchfiles():
+    """Import ``watchfiles`` on first use, so importing this module stays cheap"""
+    try:
+        import watchfiles
+    except ImportError:  # Optional dependency: pip install pydeptree[watch]
+        return None
+    return watchfiles
+
+
+def snapshot_fingerprints(project_root: Path) -> Dict[str, List[int]]:
+    """Get the fingerprint of every Python file in a project, keyed by relative path"""
+    root = Path(project_root)
+    snapshot = {}
+    for path in iter_python_files(root):
+        fingerprint = file_fingerprint(path)
+        if fingerprint is not None:
+            snapshot[path.relative_to(root).as_posix()] = fingerprint
+    return snapshot
+
+
+def changed_paths(old: Dict[str, List[int]], new: Dict[str, List[int]]) -> Set[str]:
+    """Get the relative paths added, removed or modified between two snapshots"""
+    return {path for path in old.keys() | new.keys() if old.get(path) != new.get(path)}
+
+
+class PollingWatcher:
+    """Watch a project by comparing file fingerprints at a fixed interval"""
+
+    def __init__(self, project_root: Path, interval: float = DEFAULT_POLL_INTERVAL):
+        self.project_root = Path(project_root)
+        self.interval = interval
+        self.snapshot = snapshot_fingerprints(self.project_root)
+
+    def poll(self) -> Set[str]:
+        """Get the files changed since the last call, without waiting"""
+        snapshot = snapshot_fingerprints(self.project_root)
+        changed = changed_paths(self.snapshot, snapshot)
+        self.snapshot = snapshot
+        return changed
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """Block until some files change (or the timeout expires) and return their relative paths"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = self.poll()
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval if deadline is None else
+                       max(0.0, min(self.interval, deadline - time.monotonic())))
+
+    def close(self) -> None:
+        pass
+
+
+class NativeWatcher:
+    """Watch a project through the operating system's file notifications (needs ``watchfiles``)"""
+
+    def __init__(self, project_root: Path, interval: float = DEFAULT_POLL_INTERVAL):
+        self.project_root = Path(project_root).resolve()
+        self.interval = interval
+        self._changes = import_watchfiles().watch(
+            self.project_root,
+            watch_filter=self._is_source,
+            rust_timeout=int(interval * 1000),
+            yield_on_timeout=True,
+        )
+
+    def _is_source(self, change, path: str) -> bool:
+        try:
+            return is_project_source(Path(path).relative_to(self.project_root).as_posix())
+        except ValueError:
+            return False
+
+    def poll(self) -> Set[str]:
+        return self.wait(0)
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for changes in self._changes:
+            if changes:
+                return {Path(path).relative_to(self.project_root).as_posix() for _, path in changes}
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+        return set()
+
+    def close(self) -> None:
+        self._changes.close()
+
+
+def create_watcher(project_root: Path, interval: float = DEFAULT_POLL_INTERVAL,
+                   polling: bool = False):
+    """Create the best available watcher; ``polling`` forces the standard-library fallback"""
+    if not polling and import_watchfiles() is not None:
+        return NativeWatcher(project_root, interval)
+    return PollingWatcher(project_root, interval)
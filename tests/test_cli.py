@@ -1,7 +1,7 @@
 import pytest
 from pathlib import Path
 from click.testing import CliRunner
-from pydeptree.cli import main, parse_imports, is_project_module
+from pydeptree.cli import cli, main, parse_imports, is_project_module
 
 
 class TestCLI:
@@ -66,4 +66,23 @@ import local_module
         assert is_project_module("my_module", tmp_path) == True
         assert is_project_module("my_package", tmp_path) == True
         assert is_project_module("os", tmp_path) == False
-        assert is_project_module("sys", tmp_path) == False
\ No newline at end of file
+        assert is_project_module("sys", tmp_path) == False
+
+
+class TestCommandGroup:
+    def test_file_argument_runs_default_command(self, tmp_path):
+        main_file = tmp_path / "main.py"
+        main_file.write_text("import helper\n")
+        (tmp_path / "helper.py").write_text("")
+
+        runner = CliRunner()
+        result = runner.invoke(cli, [str(main_file)])
+        assert result.exit_code == 0
+        assert 'helper.py' in result.output
+
+    def test_group_help_lists_commands(self):
+        runner = CliRunner()
+        result = runner.invoke(cli, ['--help'])
+        assert result.exit_code == 0
+        assert 'analyze' in result.output
+        assert 'symbols' in result.output
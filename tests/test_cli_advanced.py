@@ -9,6 +9,10 @@ from pydeptree.cli_advanced import (
     detect_file_type, 
     get_file_type_color, 
     get_file_type_icon,
+    aggregate_side_effects,
+    analyze_file,
+    format_import_statement,
+    weigh_lazy_imports,
     FileInfo
 )
 
@@ -205,4 +209,102 @@ class TestIntegrationWithSampleConfig:
             # Should not crash and should include config files if they exist
             assert result.exit_code == 0
             if (sample_project / 'config.py').exists() or (sample_project / 'utils' / 'config.py').exists():
-                assert '⚙️' in result.output  # Config icon should appear
\ No newline at end of file
+                assert '⚙️' in result.output  # Config icon should appear
+
+
+class TestLazyCandidates:
+    """Test the --lazy-candidates report"""
+
+    def make_project(self, tmp_path):
+        (tmp_path / 'pkg').mkdir()
+        (tmp_path / 'pkg' / '__init__.py').write_text('')
+        (tmp_path / 'pkg' / 'heavy.py').write_text('from pkg import deep\n')
+        (tmp_path / 'pkg' / 'deep.py').write_text('X = 1\n')
+        (tmp_path / 'main.py').write_text(
+            'import json\nfrom pkg import heavy\n\ndef main():\n    return heavy, json\n')
+        return tmp_path
+
+    @patch('pydeptree.cli_advanced.run_ruff_check', return_value=(0, 0))
+    def test_weigh_lazy_imports(self, mock_ruff, tmp_path):
+        root = self.make_project(tmp_path)
+        info = analyze_file(root / 'main.py', root, check_git=False, collect_lazy_imports=True)
+        assert [lazy.ref.lineno for lazy in info.lazy_imports] == [1, 2]
+
+        rows = weigh_lazy_imports({'main.py': info}, root)
+        assert [(row[1].ref.lineno, row[2], row[3]) for row in rows] == [(2, 2, 0), (1, 0, 0)]
+
+    def test_format_import_statement(self, tmp_path):
+        root = self.make_project(tmp_path)
+        (root / 'other.py').write_text('import numpy as np\nimport os.path\n'
+                                       'def f():\n    return np, os\n')
+        with patch('pydeptree.cli_advanced.run_ruff_check', return_value=(0, 0)):
+            info = analyze_file(root / 'other.py', root, check_git=False, collect_lazy_imports=True)
+        assert [format_import_statement(lazy.ref, lazy.names) for lazy in info.lazy_imports] == [
+            'import numpy as np', 'import os.path']
+
+    @patch('pydeptree.cli_advanced.run_ruff_check', return_value=(0, 0))
+    def test_only_collected_on_request(self, mock_ruff, tmp_path):
+        root = self.make_project(tmp_path)
+        assert analyze_file(root / 'main.py', root, check_git=False).lazy_imports == []
+
+        # A failure in the lazy import pass leaves the other metrics alone
+        with patch('pydeptree.cli_advanced.find_lazy_imports', side_effect=RecursionError):
+            info = analyze_file(root / 'main.py', root, check_git=False, collect_lazy_imports=True)
+        assert info.lazy_imports == []
+        assert (info.imports, info.functions) == (2, 1)
+
+    @patch('pydeptree.cli_advanced.run_ruff_check', return_value=(0, 0))
+    def test_cli_flag(self, mock_ruff, tmp_path):
+        root = self.make_project(tmp_path)
+        result = CliRunner().invoke(cli, [str(root / 'main.py'), '--lazy-candidates',
+                                          '--no-check-git', '--no-check-lint', '--no-show-stats'])
+        assert result.exit_code == 0, result.output
+        assert 'Lazy Import Candidates' in result.output
+        assert 'from pkg import heavy' in result.output
+
+    @pytest.mark.parametrize('target, label', [('3.11', True), ('3.10', False)])
+    @patch('pydeptree.cli_advanced.run_ruff_check', return_value=(0, 0))
+    def test_stdlib_label_follows_target_python(self, mock_ruff, tmp_path, target, label):
+        (tmp_path / 'main.py').write_text('import tomllib\n\ndef load():\n    return tomllib\n')
+        result = CliRunner().invoke(cli, [str(tmp_path / 'main.py'), '--lazy-candidates',
+                                          '--target-python', target, '--no-check-git',
+                                          '--no-check-lint', '--no-show-stats'])
+        assert result.exit_code == 0, result.output
+        row = next(line for line in result.output.splitlines() if 'import tomllib' in line)
+        assert ('stdlib' in row) == label  # tomllib was added in 3.11
+
+
+class TestSideEffectsReport:
+    """Test module-level side effects aggregated over the dependency tree"""
+
+    @patch('pydeptree.cli_advanced.run_ruff_check', return_value=(0, 0))
+    def test_aggregate_side_effects(self, mock_ruff, tmp_path):
+        (tmp_path / 'main.py').write_text('import a\nimport b\nsetup()\n')
+        (tmp_path / 'a.py').write_text('import shared\nCONFIG = open("x").read()\n')
+        (tmp_path / 'b.py').write_text('import shared\n')
+        (tmp_path / 'shared.py').write_text('for i in range(3):\n    pass\nregister()\n')
+
+        file_stats = {name: analyze_file(tmp_path / name, tmp_path, check_git=False,
+                                         collect_side_effects=True)
+                      for name in ('main.py', 'a.py', 'b.py', 'shared.py')}
+        assert [effect.kind for effect in file_stats['a.py'].side_effects] == ['io']
+        assert len(file_stats['shared.py'].side_effects) == 2
+
+        totals = aggregate_side_effects(file_stats, tmp_path)
+        # shared.py is imported twice but counted once
+        assert totals == {'main.py': 4, 'a.py': 3, 'b.py': 2, 'shared.py': 2}
+
+    @patch('pydeptree.cli_advanced.run_ruff_check', return_value=(0, 0))
+    def test_opt_in(self, mock_ruff, tmp_path):
+        (tmp_path / 'main.py').write_text('import a\nsetup()\n')
+        (tmp_path / 'a.py').write_text('register()\n')
+        args = [str(tmp_path / 'main.py'), '--no-check-git', '--no-check-lint']
+
+        result = CliRunner().invoke(cli, args)
+        assert result.exit_code == 0, result.output
+        assert 'Side Effects' not in result.output
+        assert not (tmp_path / '.pydeptree_cache').exists()
+
+        result = CliRunner().invoke(cli, args + ['--show-side-effects'])
+        assert result.exit_code == 0, result.output
+        assert 'Import-Time Side Effects' in result.output
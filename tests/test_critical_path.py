@@ -0,0 +1,94 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from pydeptree.cli import cli
+from pydeptree.critical_path import CriticalPathAnalysis, load_weights_file, static_weights
+from pydeptree.graph import build_project_graph
+
+
+@pytest.fixture
+def project(tmp_path):
+    # main -> light, main -> heavy -> (big, cycle_a <-> cycle_b)
+    (tmp_path / 'main.py').write_text('import light\nimport heavy\n')
+    (tmp_path / 'light.py').write_text('X = 1\n')
+    (tmp_path / 'heavy.py').write_text('import big\nimport cycle_a\n')
+    (tmp_path / 'big.py').write_text('X = 1\n' * 50)
+    (tmp_path / 'cycle_a.py').write_text('import cycle_b\n')
+    (tmp_path / 'cycle_b.py').write_text('import cycle_a\n' + 'Y = 2\n' * 5)
+    return tmp_path
+
+
+class TestCriticalPath:
+    """Test the longest weighted import chain"""
+
+    def test_static_weights(self, project):
+        graph = build_project_graph(project)
+        assert static_weights(graph, 'lines')['big'] == 50
+        assert static_weights(graph, 'statements')['heavy'] == 2
+        assert static_weights(graph, 'bytes')['light'] == 6
+
+    def test_critical_path(self, project):
+        graph = build_project_graph(project)
+        analysis = CriticalPathAnalysis(graph, static_weights(graph, 'lines'))
+        critical = analysis.critical_path('main')
+        assert critical.steps == [['main'], ['heavy'], ['big']]
+        assert critical.weight == 2 + 2 + 50
+
+    def test_cycle_is_one_step(self, project):
+        graph = build_project_graph(project)
+        weights = {'main': 1, 'heavy': 1, 'big': 1, 'cycle_a': 10, 'cycle_b': 10}
+        critical = CriticalPathAnalysis(graph, weights).critical_path('main')
+        assert sorted(critical.steps[-1]) == ['cycle_a', 'cycle_b']
+        assert critical.weight == 22
+
+    def test_lazy_candidates(self, project):
+        graph = build_project_graph(project)
+        analysis = CriticalPathAnalysis(graph, static_weights(graph, 'lines'))
+        candidates = analysis.lazy_candidates('main')
+        # Deferring 'import heavy' leaves only main -> light
+        assert candidates[0].imports == [('main', 'heavy', [2])]
+        assert candidates[0].new_weight == 2 + 1
+        # Deferring 'import big' falls back to the cycle (7 lines)
+        assert candidates[1].imports == [('heavy', 'big', [1])]
+        assert candidates[1].new_weight == 2 + 2 + 7
+        assert candidates[1].saving == 50 - 7
+
+    def test_load_weights_file(self, tmp_path):
+        log = tmp_path / 'importtime.log'
+        log.write_text('import time:       300 |        300 |   big\n'
+                       'import time:        50 |        350 | main\n')
+        assert load_weights_file(log) == {'big': 300.0, 'main': 50.0}
+
+        timings = tmp_path / 'timings.json'
+        timings.write_text(json.dumps({'timings': [{'module': 'big', 'self_us': 7,
+                                                    'cumulative_us': 7}]}))
+        assert load_weights_file(timings) == {'big': 7.0}
+
+        plain = tmp_path / 'weights.json'
+        plain.write_text('{"big": 3}')
+        assert load_weights_file(plain) == {'big': 3.0}
+
+
+class TestCriticalPathCommand:
+    """Test the critical-path command"""
+
+    def test_json(self, project):
+        result = CliRunner().invoke(cli, ['critical-path', 'main', '-r', str(project), '--json'])
+        assert result.exit_code == 0, result.output
+        data = json.loads(result.output)
+        assert data['unit'] == 'lines'
+        assert data['critical_path']['weight'] == 54
+        assert data['lazy_candidates'][0]['imports'][0] == ['main', 'heavy', [2]]
+
+    def test_table(self, project):
+        result = CliRunner().invoke(cli, ['critical-path', str(project / 'main.py'),
+                                          '-r', str(project)])
+        assert result.exit_code == 0, result.output
+        assert 'Critical import path' in result.output
+        assert 'Imports to make lazy' in result.output
+
+    def test_unknown_entry(self, project):
+        result = CliRunner().invoke(cli, ['critical-path', 'missing', '-r', str(project)])
+        assert result.exit_code != 0
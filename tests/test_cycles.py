@@ -0,0 +1,121 @@
+import random
+
+import pytest
+
+from pydeptree.cycles import CycleTracker
+from pydeptree.graph import strongly_connected_components
+
+
+def expected_cycles(edges):
+    return sorted(component for component in strongly_connected_components(edges)
+                  if len(component) > 1)
+
+
+def reachable(node, edges):
+    seen, stack = set(), list(edges[node])
+    while stack:
+        current = stack.pop()
+        if current not in seen:
+            seen.add(current)
+            stack.extend(edges[current])
+    seen.discard(node)
+    return seen
+
+
+def assert_consistent(tracker):
+    assert tracker.cycles() == expected_cycles(tracker.successors)
+    for source, targets in tracker.successors.items():
+        for target in targets:
+            assert (tracker.component_of[source] == tracker.component_of[target]
+                    or tracker.precedes(source, target))
+
+
+class TestCycleTracker:
+    """Test incremental cycle maintenance"""
+
+    def test_initial_graph(self):
+        tracker = CycleTracker({'a': {'b'}, 'b': {'a', 'c'}, 'c': set()})
+        assert tracker.cycles() == [['a', 'b']]
+        assert tracker.cycle_of('a') == {'b'}
+        assert tracker.cycle_of('c') == set()
+        assert_consistent(tracker)
+
+    def test_insertion_forms_cycle(self):
+        tracker = CycleTracker({'a': {'b'}, 'b': {'c'}, 'c': set()})
+        change = tracker.add_edge('c', 'a')
+        assert change.formed == [['a', 'b', 'c']]
+        assert change.dissolved == []
+        assert_consistent(tracker)
+
+    def test_insertion_in_order_is_free(self):
+        tracker = CycleTracker({'a': {'b'}, 'b': set()})
+        assert not tracker.add_edge('a', 'c')
+        assert not tracker.add_edge('b', 'c')
+        assert_consistent(tracker)
+
+    def test_deletion_dissolves_cycle(self):
+        tracker = CycleTracker({'a': {'b'}, 'b': {'c'}, 'c': {'a'}})
+        change = tracker.remove_edge('c', 'a')
+        assert change.dissolved == [['a', 'b', 'c']]
+        assert change.formed == []
+        assert tracker.cycles() == []
+        assert_consistent(tracker)
+
+    def test_deletion_shrinks_cycle(self):
+        tracker = CycleTracker({'a': {'b'}, 'b': {'a', 'c'}, 'c': {'a'}})
+        change = tracker.remove_edge('b', 'c')
+        assert change.dissolved == [['a', 'b', 'c']]
+        assert change.formed == [['a', 'b']]
+        assert_consistent(tracker)
+
+    def test_batch_reports_net_change(self):
+        tracker = CycleTracker({'a': {'b'}, 'b': {'a'}})
+        # Replacing an edge of a cycle with another keeps the same cycle
+        change = tracker.update(added=[('b', 'c'), ('c', 'a')], removed=[('b', 'a')])
+        assert change.formed == [['a', 'b', 'c']]
+        assert change.dissolved == [['a', 'b']]
+        assert not tracker.update(added=[('b', 'a')], removed=[('b', 'a')])
+        assert_consistent(tracker)
+
+    def test_remove_node(self):
+        tracker = CycleTracker({'a': {'b'}, 'b': {'c'}, 'c': {'a'}})
+        change = tracker.remove_node('b')
+        assert change.dissolved == [['a', 'b', 'c']]
+        assert 'b' not in tracker.component_of
+        assert_consistent(tracker)
+
+    def test_merge_keeps_bystanders_in_order(self):
+        tracker = CycleTracker({node: set() for node in 'abcdefg'})
+        for source, target in [('c', 'f'), ('c', 'g'), ('a', 'c'), ('b', 'g')]:
+            tracker.add_edge(source, target)
+        # a, c and f merge; b and g sit between them in the order and must stay before and after
+        change = tracker.add_edge('f', 'a')
+        assert change.formed == [['a', 'c', 'f']]
+        assert_consistent(tracker)
+
+    @pytest.mark.parametrize('seed', range(8))
+    def test_random_updates_match_recomputation(self, seed):
+        rng = random.Random(seed)
+        nodes = [f"m{i}" for i in range(30)]
+        tracker = CycleTracker({node: set() for node in nodes})
+        edges = set()
+        for _ in range(300):
+            added, removed = [], []
+            for _ in range(rng.randint(1, 4)):
+                if edges and rng.random() < 0.4:
+                    edge = rng.choice(sorted(edges))
+                    edges.discard(edge)
+                    removed.append(edge)
+                else:
+                    source, target = rng.sample(nodes, 2)
+                    if (source, target) not in edges:
+                        edges.add((source, target))
+                        added.append((source, target))
+            before = expected_cycles(tracker.successors)
+            change = tracker.update(added=added, removed=removed)
+            after = expected_cycles(tracker.successors)
+            assert change.formed == sorted(c for c in after if c not in before)
+            assert change.dissolved == sorted(c for c in before if c not in after)
+            assert_consistent(tracker)
+        sizes = tracker.closure_sizes()
+        assert all(sizes[node] == len(reachable(node, tracker.successors)) for node in nodes)
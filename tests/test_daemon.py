@@ -0,0 +1,99 @@
+import json
+import socket
+import threading
+
+import pytest
+from click.testing import CliRunner
+
+from pydeptree.cli import cli
+from pydeptree.daemon import DaemonError, DaemonServer, query_daemon
+from pydeptree.service import ProjectService
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='needs Unix domain sockets')
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    project = tmp_path / 'project'
+    project.mkdir()
+    (project / 'main.py').write_text('import helpers\n')
+    (project / 'helpers.py').write_text('def helper():\n    pass\n')
+
+    socket_path = tmp_path / 'd.sock'
+    server = DaemonServer(socket_path, ProjectService(project), poll_interval=0.05)
+    thread = threading.Thread(target=server.serve, daemon=True)
+    thread.start()
+    yield project, socket_path
+    server.shutdown()
+    thread.join(timeout=5)
+
+
+class TestDaemon:
+    """Test the Unix socket daemon"""
+
+    def test_query(self, daemon):
+        project, socket_path = daemon
+        assert query_daemon(socket_path, 'status')['modules'] == 2
+        assert query_daemon(socket_path, 'dependents', {'module': 'helpers'}) == ['main']
+
+    def test_error(self, daemon):
+        _, socket_path = daemon
+        with pytest.raises(DaemonError, match='Unknown module'):
+            query_daemon(socket_path, 'metrics', {'module': 'missing'})
+
+    @pytest.mark.parametrize('reply', [b'not json\n', b'{"res', b'{"version": 1}\n', b'[1, 2]\n'])
+    def test_invalid_reply(self, tmp_path, reply):
+        # Another program listening on the socket, or a truncated reply
+        socket_path = tmp_path / 'other.sock'
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+            listener.bind(str(socket_path))
+            listener.listen(1)
+
+            def answer():
+                connection, _ = listener.accept()
+                with connection:
+                    connection.recv(4096)
+                    connection.sendall(reply)
+
+            thread = threading.Thread(target=answer, daemon=True)
+            thread.start()
+            with pytest.raises(DaemonError, match='Invalid reply'):
+                query_daemon(socket_path, 'status', timeout=5)
+            thread.join(timeout=5)
+
+    def test_raw_json_lines(self, daemon):
+        _, socket_path = daemon
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(socket_path))
+            sock.sendall(b'{"method": "cycles"}\n{"method": "edges"}\nnot json\n')
+            reader = sock.makefile('rb')
+            assert json.loads(reader.readline()) == {'result': []}
+            assert json.loads(reader.readline()) == {'result': [['main', 'helpers']]}
+            assert 'error' in json.loads(reader.readline())
+
+    def test_picks_up_changes(self, daemon):
+        project, socket_path = daemon
+        version = query_daemon(socket_path, 'status')['version']
+        (project / 'helpers.py').write_text('import main\n')
+        for _ in range(100):
+            if query_daemon(socket_path, 'status')['version'] > version:
+                break
+            threading.Event().wait(0.05)
+        assert query_daemon(socket_path, 'cycles') == [['helpers', 'main']]
+
+    def test_already_running(self, daemon):
+        project, socket_path = daemon
+        with pytest.raises(DaemonError, match='already listening'):
+            DaemonServer(socket_path, ProjectService(project))
+
+    def test_query_command(self, daemon):
+        project, socket_path = daemon
+        result = CliRunner().invoke(cli, ['query', 'dependencies', 'main.py', '-r', str(project),
+                                          '--socket', str(socket_path)])
+        assert result.exit_code == 0, result.output
+        assert json.loads(result.output) == ['helpers']
+
+    def test_query_without_daemon(self, tmp_path):
+        result = CliRunner().invoke(cli, ['query', 'status',
+                                          '--socket', str(tmp_path / 'none.sock')])
+        assert result.exit_code == 1
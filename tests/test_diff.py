@@ -0,0 +1,110 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+from click.testing import CliRunner
+
+from pydeptree.cli import cli
+from pydeptree.diff import compare_snapshots, load_sides
+from pydeptree.git import find_git_root
+from pydeptree.revision import BlobAnalyzer
+from pydeptree.snapshot import take_snapshot
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason='needs git')
+
+
+def git(repo, *args):
+    subprocess.run(['git', *args], cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git(tmp_path, 'init', '-q')
+    git(tmp_path, 'config', 'user.email', 'dev@example.com')
+    git(tmp_path, 'config', 'user.name', 'Dev')
+    (tmp_path / 'app').mkdir()
+    (tmp_path / 'app' / '__init__.py').write_text('')
+    (tmp_path / 'app' / 'models.py').write_text('class User:\n    pass\n')
+    (tmp_path / 'app' / 'views.py').write_text('from app import models\n')
+    (tmp_path / 'app' / 'legacy.py').write_text('from app import models\n')
+    (tmp_path / 'main.py').write_text('import app.views\n')
+    git(tmp_path, 'add', '.')
+    git(tmp_path, 'commit', '-q', '-m', 'initial')
+    git(tmp_path, 'tag', 'v1')
+
+    git(tmp_path, 'rm', '-q', 'app/legacy.py')
+    (tmp_path / 'app' / 'models.py').write_text(
+        'import main\n\n\nclass User:\n'
+        '    def name(self):\n        if self:\n            return 1\n')
+    (tmp_path / 'app' / 'api.py').write_text('from app import views\n')
+    git(tmp_path, 'add', '.')
+    git(tmp_path, 'commit', '-q', '-m', 'api')
+    return tmp_path
+
+
+def run_diff(repo, *args):
+    result = CliRunner().invoke(cli, ['diff', *args, '-r', str(repo), '--json'])
+    assert result.exit_code == 0, result.output
+    return json.loads(result.output)
+
+
+class TestDiff:
+    """Test comparing the import graph of two versions of a project"""
+
+    def test_revisions(self, repo):
+        diff = run_diff(repo, 'v1', 'HEAD')
+        assert diff['added_modules'] == ['app.api']
+        assert diff['removed_modules'] == ['app.legacy']
+        assert diff['added_edges'] == [['app.api', 'app.views'], ['app.models', 'main']]
+        assert diff['removed_edges'] == [['app.legacy', 'app.models']]
+        assert diff['new_cycles'] == [['app.models', 'app.views', 'main']]
+        assert diff['broken_cycles'] == []
+        assert diff['summary']['cycles'] == [0, 1]
+
+    def test_changed_module_metrics(self, repo):
+        diff = run_diff(repo, 'v1', 'HEAD')
+        assert [change['module'] for change in diff['changed_modules']] == ['app.models']
+        change = diff['changed_modules'][0]
+        assert change['lines'] == [2, 7]
+        assert change['complexity'][1] > change['complexity'][0]
+        assert change['lint_errors'] is None
+
+    def test_reverse_direction(self, repo):
+        diff = run_diff(repo, 'HEAD', 'v1')
+        assert diff['removed_modules'] == ['app.api']
+        assert diff['broken_cycles'] == [['app.models', 'app.views', 'main']]
+
+    def test_no_changes(self, repo):
+        diff = run_diff(repo, 'HEAD', 'HEAD')
+        assert diff['added_edges'] == diff['removed_edges'] == diff['changed_modules'] == []
+
+    def test_snapshot_side(self, repo, tmp_path):
+        path = tmp_path / 'v1.json'
+        take_snapshot(repo, 'v1').save(path)
+        assert run_diff(repo, str(path), 'HEAD') == run_diff(repo, 'v1', 'HEAD')
+
+    def test_snapshot_seeds_shared_blobs(self, repo, tmp_path):
+        path = tmp_path / 'v1.json'
+        take_snapshot(repo, 'v1').save(path)
+        before, after = load_sides(repo, (str(path), 'HEAD'))
+        # Unchanged blobs reuse the snapshot's records instead of being parsed again
+        assert after.records['main.py'] is before.records['main.py']
+
+    def test_shared_blobs_are_analyzed_once(self, repo):
+        with BlobAnalyzer(find_git_root(repo), repo) as analyzer:
+            compare_snapshots(take_snapshot(repo, 'v1', analyzer=analyzer),
+                              take_snapshot(repo, 'HEAD', analyzer=analyzer))
+        # Five files at v1, then only the changed models.py and the new api.py
+        assert len(analyzer.records) == 6
+
+    def test_unknown_revision(self, repo):
+        result = CliRunner().invoke(cli, ['diff', 'v1', 'nope', '-r', str(repo)])
+        assert result.exit_code == 1
+        assert 'Unknown revision' in result.output
+
+    def test_table_output(self, repo):
+        result = CliRunner().invoke(cli, ['diff', 'v1', 'HEAD', '-r', str(repo)])
+        assert result.exit_code == 0
+        assert 'New import cycle' in result.output
+        assert 'app.api' in result.output
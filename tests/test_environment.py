@@ -0,0 +1,235 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from pydeptree.cli_advanced import (
+    build_package_dependency_tree,
+    cli,
+    generate_requirements_content,
+    get_package_info,
+)
+from pydeptree.environment import (
+    DistributionIndex,
+    find_site_packages,
+    format_pin,
+    get_environment_index,
+    is_extra_requirement,
+    normalize_name,
+    parse_requirement_name,
+    site_packages_python_version,
+)
+
+
+def make_dist(site_dir, name, version, requires=(), top_level=None, files=None, archive_hash=None):
+    """Create a minimal .dist-info directory"""
+    dist_info = site_dir / f"{name}-{version}.dist-info"
+    dist_info.mkdir(parents=True)
+    metadata = ["Metadata-Version: 2.1", f"Name: {name}", f"Version: {version}"]
+    metadata += [f"Requires-Dist: {requirement}" for requirement in requires]
+    (dist_info / 'METADATA').write_text('\n'.join(metadata) + '\n')
+    if top_level is not None:
+        (dist_info / 'top_level.txt').write_text('\n'.join(top_level) + '\n')
+    if files is not None:
+        (dist_info / 'RECORD').write_text(''.join(f"{path},,\n" for path in files))
+    if archive_hash is not None:
+        direct_url = {'url': f"file:///wheels/{name}.whl",
+                      'archive_info': {'hashes': {'sha256': archive_hash}}}
+        (dist_info / 'direct_url.json').write_text(json.dumps(direct_url))
+    return dist_info
+
+
+@pytest.fixture
+def site_dir(tmp_path):
+    site = tmp_path / 'site-packages'
+    make_dist(site, 'PyYAML', '6.0.1', top_level=['_yaml', 'yaml'])
+    make_dist(site, 'rich', '13.7.0',
+              requires=['pygments<3,>=2.13', 'ipywidgets>=7; extra == "jupyter"'],
+              files=['rich/__init__.py', 'rich/console.py', 'rich-13.7.0.dist-info/METADATA'])
+    make_dist(site, 'Pygments', '2.17.2', top_level=['pygments'], archive_hash='abc123')
+    return site
+
+
+class TestRequirementParsing:
+    """Test requirement string helpers"""
+
+    def test_normalize_name(self):
+        assert normalize_name('PyYAML') == 'pyyaml'
+        assert normalize_name('zope.interface') == 'zope-interface'
+        assert normalize_name('typing_extensions') == 'typing-extensions'
+
+    def test_parse_requirement_name(self):
+        assert parse_requirement_name('rich>=12; python_version<"4"') == 'rich'
+        assert parse_requirement_name('requests[socks] ==2.31') == 'requests'
+        assert parse_requirement_name('') is None
+
+    def test_extra_requirement(self):
+        assert is_extra_requirement('ipywidgets>=7; extra == "jupyter"')
+        assert not is_extra_requirement('colorama; sys_platform == "win32"')
+
+    def test_format_pin(self):
+        assert format_pin('rich', '13.7.0') == 'rich==13.7.0'
+        assert format_pin('rich', '13.7.0', '>=') == 'rich>=13.7.0'
+        assert format_pin('rich', '13.7.0', '~=') == 'rich~=13.7.0'
+        assert format_pin('pkg', '5', '~=') == 'pkg>=5'
+        assert format_pin('pkg', None) == 'pkg'
+
+
+class TestDistributionIndex:
+    """Test the in-process distribution index"""
+
+    def test_lookup_by_distribution_name(self, site_dir):
+        index = DistributionIndex(paths=[str(site_dir)])
+        assert index.get('pyyaml').version == '6.0.1'
+        assert index.get('PyYAML').name == 'PyYAML'
+
+    def test_lookup_by_import_name(self, site_dir):
+        index = DistributionIndex(paths=[str(site_dir)])
+        assert index.get('yaml').name == 'PyYAML'
+        assert index.get('pygments').name == 'Pygments'
+        assert index.get('missing') is None
+
+    def test_namespace_package_providers(self, site_dir):
+        make_dist(site_dir, 'protobuf', '4.25.0', top_level=['google'],
+                  files=['google/protobuf/__init__.py', 'google/_upb/_message.abi3.so'])
+        make_dist(site_dir, 'google-auth', '2.28.0', top_level=['google'],
+                  files=['google/auth/__init__.py', 'google/oauth2/id_token.py'])
+        index = DistributionIndex(paths=[str(site_dir)])
+        assert index.get('google.auth.transport').name == 'google-auth'
+        assert index.get('google.oauth2.id_token').name == 'google-auth'
+        assert index.get('google._upb._message').name == 'protobuf'
+        # The namespace itself belongs to both, so no single distribution is picked
+        assert index.get('google') is None
+        providers = index.providers('google')
+        assert sorted(info.name for info in providers) == ['google-auth', 'protobuf']
+        assert index.distribution_name('google.protobuf') == 'protobuf'
+
+    def test_top_level_from_record(self, site_dir):
+        index = DistributionIndex(paths=[str(site_dir)])
+        assert index.get('rich').top_level_names() == ['rich']
+
+    def test_dependencies_exclude_extras(self, site_dir):
+        index = DistributionIndex(paths=[str(site_dir)])
+        assert index.get('rich').dependencies == ['pygments']
+
+    def test_archive_hash(self, site_dir):
+        index = DistributionIndex(paths=[str(site_dir)])
+        assert index.get('pygments').archive_hash() == 'sha256:abc123'
+        assert index.get('rich').archive_hash() is None
+
+    def test_resolve(self, site_dir):
+        index = DistributionIndex(paths=[str(site_dir)])
+        resolved = index.resolve(['yaml', 'rich', 'nope'])
+        assert resolved['yaml'].name == 'PyYAML'
+        assert resolved['nope'] is None
+
+
+class TestGenerateRequirements:
+    """Test requirements.txt generation from the batch resolver"""
+
+    def test_uses_distribution_names_and_pins(self, site_dir):
+        index = DistributionIndex(paths=[str(site_dir)])
+        with patch('pydeptree.cli_advanced.get_default_index', return_value=index), \
+                patch('pydeptree.cli_advanced.get_installed_package_version') as pip_show:
+            content = generate_requirements_content(
+                {'app.py': {'yaml', 'rich', 'unknown_pkg'}}, add_comments=False, pin='~=')
+        pip_show.assert_not_called()
+        lines = content.splitlines()
+        assert 'PyYAML~=6.0.1' in lines
+        assert 'rich~=13.7.0' in lines
+        assert 'unknown_pkg  # Version not found' in lines
+
+    def test_one_line_per_distribution(self, site_dir):
+        index = DistributionIndex(paths=[str(site_dir)])
+        with patch('pydeptree.cli_advanced.get_default_index', return_value=index):
+            content = generate_requirements_content(
+                {'a.py': {'yaml', '_yaml'}, 'b.py': {'yaml', 'rich'}})
+        lines = content.splitlines()
+        assert '# Found 2 external dependencies in 2 files' in lines
+        assert lines[-2:] == ['PyYAML==6.0.1  # Used in: a.py, b.py',
+                              'rich==13.7.0  # Used in: b.py']
+
+    def test_hashes(self, site_dir):
+        index = DistributionIndex(paths=[str(site_dir)])
+        with patch('pydeptree.cli_advanced.get_default_index', return_value=index):
+            content = generate_requirements_content(
+                {'app.py': {'pygments'}}, include_hashes=True, pin='>=')
+        lines = content.splitlines()
+        assert '# Used in: app.py' in lines
+        position = lines.index('Pygments==2.17.2 \\')
+        assert lines[position + 1] == '    --hash=sha256:abc123'
+
+    def test_hashes_are_all_or_nothing(self, site_dir):
+        index = DistributionIndex(paths=[str(site_dir)])
+        with patch('pydeptree.cli_advanced.get_default_index', return_value=index):
+            content = generate_requirements_content(
+                {'app.py': {'pygments', 'rich'}}, include_hashes=True, pin='>=')
+        lines = content.splitlines()
+        # pip refuses a file where only some requirements have a hash
+        assert '--hash' not in '\n'.join(line for line in lines if not line.startswith('#'))
+        assert '# --hash omitted: no archive hash recorded for rich' in lines
+        assert 'Pygments>=2.17.2  # Used in: app.py' in lines
+
+
+class TestTargetEnvironment:
+    """Test reading a virtualenv that is not the running one"""
+
+    def make_venv(self, tmp_path, layout='posix'):
+        venv = tmp_path / 'venv'
+        if layout == 'posix':
+            site = venv / 'lib' / 'python3.9' / 'site-packages'
+            python = venv / 'bin' / 'python'
+        else:
+            site = venv / 'Lib' / 'site-packages'
+            python = venv / 'Scripts' / 'python.exe'
+        site.mkdir(parents=True)
+        python.parent.mkdir(parents=True)
+        python.write_text('')
+        (venv / 'pyvenv.cfg').write_text('home = /usr/bin\n')
+        make_dist(site, 'requests', '2.31.0', requires=['idna<4,>=2.5'])
+        make_dist(site, 'idna', '3.6')
+        return venv, python, site
+
+    def test_find_site_packages_posix(self, tmp_path):
+        venv, python, site = self.make_venv(tmp_path)
+        assert find_site_packages(python) == [site]
+        assert find_site_packages(venv) == [site]
+        assert site_packages_python_version(site) == (3, 9)
+
+    def test_find_site_packages_windows(self, tmp_path):
+        venv, python, site = self.make_venv(tmp_path, layout='windows')
+        assert find_site_packages(python) == [site]
+        assert site_packages_python_version(site) is None
+
+    def test_environment_index(self, tmp_path):
+        _, python, site = self.make_venv(tmp_path)
+        index = get_environment_index(python)
+        assert index.paths == [str(site)]
+        assert index.get('requests').version == '2.31.0'
+
+        with pytest.raises(ValueError):
+            get_environment_index(tmp_path / 'missing' / 'bin' / 'python')
+
+    def test_package_info_without_subprocess(self, tmp_path):
+        _, python, _ = self.make_venv(tmp_path)
+        index = get_environment_index(python)
+        with patch('pydeptree.cli_advanced.subprocess.run') as run:
+            tree = build_package_dependency_tree({'requests'}, index=index)
+        run.assert_not_called()
+        assert tree['requests']['version'] == '2.31.0'
+        assert tree['requests']['dependencies']['idna']['version'] == '3.6'
+        assert get_package_info('missing', index)['version'] is None
+
+    def test_cli_python_option(self, tmp_path):
+        _, python, _ = self.make_venv(tmp_path)
+        project = tmp_path / 'project'
+        project.mkdir()
+        (project / 'main.py').write_text('import requests\n')
+
+        runner = CliRunner()
+        result = runner.invoke(cli, [str(project / 'main.py'), '--python', str(python),
+                                     '--analyze-deps', '--no-check-lint', '--no-check-git'])
+        assert result.exit_code == 0, result.output
+        assert 'requests' in result.output
+        assert '2.31.0' in result.output
@@ -0,0 +1,302 @@
+import ast
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from pydeptree.analysis import (
+    AnalysisCache,
+    analyze_source,
+    collect_definitions,
+    find_lazy_imports,
+    find_side_effects,
+)
+from pydeptree.graph import ProjectGraph, build_project_graph
+
+
+def make_project(root: Path) -> Path:
+    (root / "main.py").write_text("from app import service\nimport app.models.user\n")
+    app = root / "app"
+    app.mkdir()
+    (app / "__init__.py").write_text("")
+    (app / "service.py").write_text("from .models import user\nfrom . import helpers\n")
+    (app / "helpers.py").write_text("import os\nfrom .service import run\n")
+    models = app / "models"
+    models.mkdir()
+    (models / "__init__.py").write_text("")
+    (models / "user.py").write_text("from ..helpers import slugify\n")
+    return root
+
+
+class TestAnalyzeSource:
+    """Test the single-pass source analysis"""
+
+    def test_definitions_are_nested(self):
+        record = analyze_source(
+            "class Client:\n"
+            "    def get(self):\n"
+            "        if True:\n"
+            "            return 1\n"
+            "\n"
+            "async def fetch():\n"
+            "    def inner():\n"
+            "        pass\n"
+        )
+        qualnames = [(d.qualname, d.kind) for d in record.definitions]
+        assert qualnames == [
+            ("Client", "class"),
+            ("Client.get", "function"),
+            ("fetch", "async function"),
+            ("fetch.inner", "function"),
+        ]
+        get = record.definitions[1]
+        assert (get.lineno, get.end_lineno, get.complexity) == (2, 4, 2)
+        assert record.functions == 2
+        assert record.classes == 1
+
+    def test_syntax_error(self):
+        record = analyze_source("def broken(:\n")
+        assert record.syntax_error
+        assert record.definitions == []
+
+    def test_collect_definitions_inside_blocks(self):
+        import ast
+        tree = ast.parse("if True:\n    def guarded():\n        pass\n")
+        assert [d.qualname for d in collect_definitions(tree)] == ["guarded"]
+
+
+class TestLazyImports:
+    """Test detection of imports only used inside functions"""
+
+    def lazy(self, source):
+        return {c.ref.lineno: c for c in find_lazy_imports(ast.parse(source))}
+
+    def test_function_only_uses(self):
+        lazy = self.lazy(
+            "import json\n"
+            "import numpy as np\n"
+            "from .models import User\n"
+            "import os\n"
+            "PATH = os.sep\n"
+            "def dump():\n"
+            "    return json.dumps(np.zeros(3))\n"
+            "class Service:\n"
+            "    def get(self):\n"
+            "        return User\n"
+        )
+        assert sorted(lazy) == [1, 2, 3]
+        assert lazy[2].names == ["np"]
+        assert lazy[3].ref.level == 1 and lazy[3].ref.names == ["User"]
+        assert lazy[3].functions == ["Service.get"]
+
+    def test_import_time_uses(self):
+        lazy = self.lazy(
+            "import a, b, c, d, e\n"
+            "__all__ = ['e']\n"
+            "@a.register\n"
+            "def f(x=b.DEFAULT) -> c.Type:\n"
+            "    return a, b, c, d, e\n"
+            "class K(d.Base):\n"
+            "    pass\n"
+        )
+        assert lazy == {}
+
+    def test_postponed_annotations_and_type_checking(self):
+        lazy = self.lazy(
+            "from __future__ import annotations\n"
+            "from typing import TYPE_CHECKING\n"
+            "import json\n"
+            "if TYPE_CHECKING:\n"
+            "    import pandas\n"
+            "def f(x: json.JSONDecoder) -> pandas.DataFrame:\n"
+            "    return json.loads(x), pandas\n"
+        )
+        assert list(lazy) == [3]
+
+    def test_module_loaded_elsewhere_is_skipped(self):
+        lazy = self.lazy(
+            "import os\n"
+            "from os import path\n"
+            "SEP = path.sep\n"
+            "def f():\n"
+            "    return os.getcwd()\n"
+        )
+        assert lazy == {}
+
+
+class TestSideEffects:
+    """Test detection of work done at import time"""
+
+    def effects(self, source):
+        return [(effect.lineno, effect.kind) for effect in find_side_effects(ast.parse(source))]
+
+    def test_kinds(self):
+        source = (
+            '"""Docstring"""\n'
+            "import logging\n"
+            "logger = logging.getLogger(__name__)\n"
+            "CONFIG = open('config.yml').read()\n"
+            "DATA = requests.get(URL).json()\n"
+            "SQUARES = [i * i for i in range(10)]\n"
+            "register()\n"
+            "for name in NAMES:\n"
+            "    pass\n"
+            "TABLE = (" + ", ".join(map(str, range(150))) + ")\n"
+            "handler = lambda: open('x')\n"
+        )
+        assert self.effects(source) == [(4, "io"), (5, "io"), (6, "loop"), (7, "call"),
+                                        (8, "loop"), (10, "literal")]
+
+    def test_skipped_blocks(self):
+        source = (
+            "class Model:\n"
+            "    CACHE = load()\n"
+            "    def method(self):\n"
+            "        open('x')\n"
+            "try:\n"
+            "    connect()\n"
+            "except ImportError:\n"
+            "    pass\n"
+            "if TYPE_CHECKING:\n"
+            "    setup()\n"
+            "if __name__ == '__main__':\n"
+            "    main()\n"
+        )
+        assert self.effects(source) == [(2, "call"), (6, "io")]
+
+
+class TestAnalysisCache:
+    """Test the fingerprint-keyed analysis cache"""
+
+    def test_unchanged_files_are_not_reanalyzed(self, tmp_path):
+        module = tmp_path / "mod.py"
+        module.write_text("def a():\n    pass\n")
+
+        cache = AnalysisCache(tmp_path)
+        cache.analyze(module)
+        cache.close()
+
+        cache = AnalysisCache(tmp_path)
+        record = cache.analyze(module)
+        assert (cache.hits, cache.misses) == (1, 0)
+        assert record.functions == 1
+
+        module.write_text("def a():\n    pass\n\ndef b():\n    pass\n")
+        stat = module.stat()
+        os.utime(module, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert cache.analyze(module).functions == 2
+        assert cache.misses == 1
+        cache.close()
+
+    @pytest.mark.skipif(shutil.which("git") is None, reason="needs git")
+    def test_clean_git_files_are_keyed_by_blob_id(self, tmp_path):
+        for args in (["init", "-q"], ["config", "user.email", "dev@example.com"],
+                     ["config", "user.name", "Dev"]):
+            subprocess.run(["git", *args], cwd=tmp_path, check=True)
+        module = tmp_path / "mod.py"
+        module.write_text("def a():\n    pass\n")
+        (tmp_path / "new.py").write_text("")
+        subprocess.run(["git", "add", "mod.py"], cwd=tmp_path, check=True)
+        subprocess.run(["git", "commit", "-q", "-m", "initial"], cwd=tmp_path, check=True)
+
+        cache = AnalysisCache(tmp_path)
+        assert list(cache.blob_ids) == ["mod.py"]  # new.py is untracked
+        cache.analyze(module)
+        cache.close()
+
+        # A fresh clone gives files new mtimes; the blob id still matches
+        stat = module.stat()
+        os.utime(module, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        cache = AnalysisCache(tmp_path)
+        assert cache.analyze(module).functions == 1
+        assert (cache.hits, cache.misses) == (1, 0)
+        cache.close()
+
+        # Modified files fall back to the mtime and size fingerprint
+        module.write_text("def a():\n    pass\n\ndef b():\n    pass\n")
+        cache = AnalysisCache(tmp_path)
+        assert "mod.py" not in cache.blob_ids
+        assert cache.analyze(module).functions == 2
+        assert cache.misses == 1
+        cache.close()
+
+
+class TestProjectGraph:
+    """Test import resolution and graph queries"""
+
+    def test_edges(self, tmp_path):
+        graph = build_project_graph(make_project(tmp_path))
+
+        assert graph.edges["main"] == {"app.service", "app.models.user"}
+        assert graph.edges["app.service"] == {"app.models.user", "app.helpers"}
+        assert graph.edges["app.helpers"] == {"app.service"}
+        assert graph.edges["app.models.user"] == {"app.helpers"}
+        assert graph.fan_in("app.helpers") == 2
+        assert graph.fan_out("main") == 2
+
+    def test_closure_and_dependents(self, tmp_path):
+        graph = build_project_graph(make_project(tmp_path))
+
+        assert graph.closure("main") == {"app.service", "app.models.user", "app.helpers"}
+        assert graph.dependents("app.models.user") == {"main", "app.service", "app.helpers"}
+
+    def test_cycles(self, tmp_path):
+        graph = build_project_graph(make_project(tmp_path))
+        assert graph.cycles() == [["app.helpers", "app.models.user", "app.service"]]
+
+    def test_from_records(self, tmp_path):
+        graph = ProjectGraph.from_records(tmp_path, {
+            "a.py": analyze_source("import b\n"),
+            "b.py": analyze_source("import os\n"),
+        })
+        assert graph.edges == {"a": {"b"}, "b": set()}
+        assert graph.cycles() == []
+
+    def test_relative_import_beyond_top_level(self, tmp_path):
+        graph = ProjectGraph.from_records(tmp_path, {
+            "pkg/__init__.py": analyze_source(""),
+            "pkg/sub/__init__.py": analyze_source(""),
+            "pkg/sub/mod.py": analyze_source("from ...sub import mod\n"),
+            "pkg/sub/deep.py": analyze_source("from .... import pkg\n"),
+            "sub/mod.py": analyze_source(""),
+        })
+        # Three dots reach the top of the project; four reach above it and resolve to nothing
+        assert graph.edges["pkg.sub.mod"] == {"sub.mod"}
+        assert graph.edges["pkg.sub.deep"] == set()
+
+    def test_src_layout(self, tmp_path):
+        pkg = tmp_path / "src" / "pkg"
+        pkg.mkdir(parents=True)
+        (pkg / "__init__.py").write_text("")
+        (pkg / "a.py").write_text("import pkg.b\n")
+        (pkg / "b.py").write_text("from pkg import a\nfrom pkg.a import run\n")
+        (tmp_path / "main.py").write_text("import pkg\nimport src.pkg.b\n")
+
+        graph = build_project_graph(tmp_path)
+        assert graph.edges["src.pkg.a"] == {"src.pkg.b"}
+        assert graph.edges["src.pkg.b"] == {"src.pkg.a"}
+        assert graph.edges["main"] == {"src.pkg", "src.pkg.b"}
+        assert graph.external_imports["src.pkg.a"] == set()
+        assert graph.cycles() == [["src.pkg.a", "src.pkg.b"]]
+
+    def test_top_level_module_wins_over_nested_package(self, tmp_path):
+        graph = ProjectGraph.from_records(tmp_path, {
+            "main.py": analyze_source("import pkg\n"),
+            "pkg.py": analyze_source(""),
+            "src/pkg/__init__.py": analyze_source(""),
+        })
+        assert graph.edges["main"] == {"pkg"}
+
+    def test_external_imports(self, tmp_path):
+        graph = ProjectGraph.from_records(tmp_path, {
+            "main.py": analyze_source(
+                "import os.path\nimport requests\nfrom yaml import safe_load\nimport pkg\n"),
+            "src/pkg/__init__.py": analyze_source("from . import util\nimport src\n"),
+            "src/pkg/util.py": analyze_source("from pkg import thing\n"),
+        })
+        assert graph.external_imports["main"] == {"os", "requests", "yaml"}
+        assert graph.external_imports["src.pkg"] == set()
+        assert graph.external_imports["src.pkg.util"] == set()
+        assert graph.all_external_imports()["requests"] == {"main"}
@@ -0,0 +1,121 @@
+import csv
+import json
+import shutil
+import subprocess
+
+import pytest
+from click.testing import CliRunner
+
+from pydeptree.cli import cli
+from pydeptree.git import find_git_root
+from pydeptree.history import walk_history
+from pydeptree.revision import BlobAnalyzer
+from pydeptree.snapshot import take_snapshot
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason='needs git')
+
+
+def git(repo, *args):
+    subprocess.run(['git', *args], cwd=repo, check=True, capture_output=True)
+
+
+def commit(repo, message, files):
+    for name, content in files.items():
+        path = repo / name
+        if content is None:
+            path.unlink()
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+    git(repo, 'add', '-A')
+    git(repo, 'commit', '-q', '-m', message)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git(tmp_path, 'init', '-q')
+    git(tmp_path, 'config', 'user.email', 'dev@example.com')
+    git(tmp_path, 'config', 'user.name', 'Dev')
+    commit(tmp_path, 'docs', {'README.md': 'docs\n'})
+    commit(tmp_path, 'app', {'app/__init__.py': '', 'app/models.py': 'class User:\n    pass\n',
+                             'main.py': 'import app.models\n'})
+    commit(tmp_path, 'views', {'app/views.py': 'from app import models\n'})
+    commit(tmp_path, 'cycle', {'app/models.py': 'import app.views\n\nclass User:\n    pass\n'})
+    commit(tmp_path, 'complexity', {'main.py': 'import app.models\n\nif True:\n    pass\n'})
+    commit(tmp_path, 'fix', {'app/models.py': 'class User:\n    pass\n', 'app/views.py': None})
+    return tmp_path
+
+
+def series(points, key):
+    return [getattr(point, key) for point in points]
+
+
+class TestHistory:
+    """Test the time series of metrics across commits"""
+
+    def test_every_commit(self, repo):
+        points = walk_history(repo, None)
+        assert series(points, 'modules') == [0, 3, 4, 4, 4, 3]
+        assert series(points, 'edges') == [0, 1, 2, 3, 3, 1]
+        assert series(points, 'cycles') == [0, 0, 0, 1, 1, 0]
+        assert series(points, 'max_closure') == [0, 1, 1, 2, 2, 1]
+        assert points[4].average_complexity > points[3].average_complexity
+
+    def test_matches_snapshots(self, repo):
+        for point in walk_history(repo, None):
+            summary = take_snapshot(repo, point.commit).summary()
+            assert {key: summary[key] for key in ('modules', 'edges', 'cycles', 'max_closure')} == \
+                {'modules': point.modules, 'edges': point.edges, 'cycles': point.cycles,
+                 'max_closure': point.max_closure}
+
+    def test_from_and_every(self, repo):
+        head = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=repo, capture_output=True,
+                              text=True).stdout.strip()
+        points = walk_history(repo, 'HEAD~3', every=2)
+        # The start, every second commit after it, and always the last one
+        assert len(points) == 3
+        assert series(points, 'cycles') == [0, 1, 0]
+        assert points[-1].commit == head
+
+    def test_blobs_are_analyzed_once(self, repo):
+        with BlobAnalyzer(find_git_root(repo), repo, use_cache=False) as analyzer:
+            walk_history(repo, None, analyzer=analyzer)
+        # Distinct versions: __init__, 2 of main.py, 2 of models.py (the fix restores the
+        # first), views.py
+        assert len(analyzer.records) == 6
+
+    def test_first_parent_merges(self, repo):
+        git(repo, 'checkout', '-q', '-b', 'feature')
+        commit(repo, 'api', {'app/api.py': 'import app.models\n'})
+        commit(repo, 'more', {'app/extra.py': ''})
+        git(repo, 'checkout', '-q', '-')
+        commit(repo, 'unrelated', {'README.md': 'more docs\n'})
+        git(repo, 'merge', '-q', '--no-ff', 'feature', '-m', 'merge')
+
+        points = walk_history(repo, 'HEAD~2')
+        # The feature commits are folded into the merge
+        assert series(points, 'modules') == [3, 3, 5]
+        assert points[-1].edges == 2
+
+    def test_subdirectory_project(self, repo):
+        points = walk_history(repo / 'app', None)
+        assert series(points, 'modules') == [0, 2, 3, 3, 3, 2]
+
+    def test_csv_output(self, repo, tmp_path):
+        output = tmp_path / 'history.csv'
+        result = CliRunner().invoke(cli, ['history', '-r', str(repo), '--every', '2',
+                                          '-o', str(output)])
+        assert result.exit_code == 0
+        rows = list(csv.DictReader(output.open()))
+        assert [row['modules'] for row in rows] == ['3', '4', '3']
+        assert rows[0]['lint_errors'] == ''
+
+    def test_json_output(self, repo):
+        result = CliRunner().invoke(cli, ['history', '-r', str(repo), '--from', 'HEAD~1', '--json'])
+        assert result.exit_code == 0
+        assert [point['cycles'] for point in json.loads(result.output)] == [1, 0]
+
+    def test_unknown_revision(self, repo):
+        result = CliRunner().invoke(cli, ['history', '-r', str(repo), '--from', 'nope'])
+        assert result.exit_code == 1
+        assert 'Unknown revision' in result.output
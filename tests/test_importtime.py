@@ -0,0 +1,114 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from pydeptree.cli import cli
+from pydeptree.graph import build_project_graph
+from pydeptree.importtime import (
+    build_importtime_tree,
+    check_budgets,
+    format_us,
+    parse_budget_file,
+    parse_budget_value,
+    parse_importtime,
+    run_importtime,
+)
+from pydeptree.project import resolve_entry
+
+SAMPLE_LOG = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        300 |     app.helpers
+import time:      1500 |       1800 |   app
+import time:        50 |       2100 | main
+import time:        10 |         10 | app
+"""
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / 'main.py').write_text('import app\nimport json\n')
+    (tmp_path / 'app').mkdir()
+    (tmp_path / 'app' / '__init__.py').write_text('from . import helpers\n')
+    (tmp_path / 'app' / 'helpers.py').write_text('X = 1\n')
+    return tmp_path
+
+
+class TestParseImporttime:
+    """Test parsing of -X importtime logs"""
+
+    def test_parse(self):
+        timings = parse_importtime(SAMPLE_LOG)
+        assert set(timings) == {'_io', 'app.helpers', 'app', 'main'}
+        assert timings['app'].self_us == 1500
+        assert timings['app'].cumulative_us == 1800
+        assert timings['main'].depth == 0
+        assert timings['app'].depth == 1
+        assert timings['app.helpers'].depth == 2
+
+    def test_format_us(self):
+        assert format_us(999) == '999us'
+        assert format_us(1500) == '1.5ms'
+        assert format_us(2_500_000) == '2.50s'
+
+
+class TestBudgets:
+    """Test import time budgets"""
+
+    def test_parse_budget_value(self):
+        assert parse_budget_value('150ms') == 150_000
+        assert parse_budget_value('0.5s') == 500_000
+        assert parse_budget_value('800us') == 800
+        assert parse_budget_value('20') == 20_000
+        with pytest.raises(ValueError):
+            parse_budget_value('fast')
+
+    def test_parse_budget_file(self, tmp_path):
+        path = tmp_path / 'budget.txt'
+        path.write_text('# Startup budget\nmain: 2ms\napp.* = 100us\n* 1s\n')
+        assert parse_budget_file(path) == [('main', 2000), ('app.*', 100), ('*', 1_000_000)]
+
+        path.write_text(json.dumps({'main': '1ms'}))
+        assert parse_budget_file(path) == [('main', 1000)]
+
+        path.write_text('main\n')
+        with pytest.raises(ValueError):
+            parse_budget_file(path)
+
+    def test_check_budgets(self):
+        timings = parse_importtime(SAMPLE_LOG)
+        violations = check_budgets(timings, [('app.*', 100), ('main', 5000), ('*', 1000)])
+        assert [(v.module, v.pattern) for v in violations] == [('app', '*'),
+                                                               ('app.helpers', 'app.*')]
+
+
+class TestImporttimeTree:
+    """Test the timing overlay on the import tree"""
+
+    def test_tree_sorted_by_cost(self, project):
+        graph = build_project_graph(project)
+        tree = build_importtime_tree(graph, 'main', parse_importtime(SAMPLE_LOG))
+        labels = [str(node.label) for node in tree.children]
+        assert labels[0].startswith('app/__init__.py  1.8ms')
+        assert str(tree.children[0].children[0].label).startswith('app/helpers.py  300us')
+
+    def test_resolve_entry(self, project):
+        helpers = str(project / 'app' / 'helpers.py')
+        assert resolve_entry(helpers, project) == ('app.helpers', project)
+        assert resolve_entry('app.helpers', project) == ('app.helpers', project)
+
+    def test_run_importtime(self, project):
+        timings, returncode, _ = run_importtime('main', project)
+        assert returncode == 0
+        assert {'main', 'app', 'app.helpers'} <= set(timings)
+
+    def test_command_budget_exit_status(self, project):
+        budget = project / 'budget.txt'
+        budget.write_text('main 1us\n')
+        runner = CliRunner()
+        result = runner.invoke(cli, ['importtime', 'main', '-r', str(project),
+                                     '--budget', str(budget), '--json'])
+        assert result.exit_code == 1
+        data = json.loads(result.output)
+        assert data['violations'][0]['module'] == 'main'
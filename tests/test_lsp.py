@@ -0,0 +1,215 @@
+import io
+
+import pytest
+
+from pydeptree.lsp import (
+    SHOW_DEPENDENTS_COMMAND,
+    LanguageServer,
+    imports_at_line,
+    read_message,
+    write_message,
+)
+from pydeptree.rules import (
+    ForbiddenImport,
+    load_forbidden_imports,
+    module_matches,
+    parse_forbidden_import,
+)
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / 'app').mkdir()
+    (tmp_path / 'app' / '__init__.py').write_text('')
+    (tmp_path / 'app' / 'models.py').write_text('import os\n\nclass User:\n    pass\n')
+    (tmp_path / 'app' / 'views.py').write_text('from app import models\n')
+    (tmp_path / 'main.py').write_text('import app.views\n')
+    return tmp_path
+
+
+def encode(*messages):
+    stream = io.BytesIO()
+    for message in messages:
+        write_message(stream, dict(message, jsonrpc='2.0'))
+    stream.seek(0)
+    return stream
+
+
+def decode(stream):
+    stream.seek(0)
+    messages = []
+    while True:
+        message = read_message(stream)
+        if message is None:
+            return messages
+        messages.append(message)
+
+
+def run_session(project, *messages, rules=()):
+    initialize = {'id': 0, 'method': 'initialize', 'params': {'rootUri': project.as_uri()}}
+    end = [{'id': 99, 'method': 'shutdown'}, {'method': 'exit'}]
+    output = io.BytesIO()
+    server = LanguageServer(encode(initialize, *messages, *end), output, rules=rules, watch=False)
+    exit_code = server.run()
+    return exit_code, decode(output)
+
+
+def open_document(path, text=None):
+    return {'method': 'textDocument/didOpen', 'params': {'textDocument': {
+        'uri': path.as_uri(), 'languageId': 'python', 'version': 1,
+        'text': path.read_text() if text is None else text}}}
+
+
+def responses(messages):
+    return {message['id']: message for message in messages if 'id' in message}
+
+
+def diagnostics(messages, path):
+    published = [message['params']['diagnostics'] for message in messages
+                 if message.get('method') == 'textDocument/publishDiagnostics'
+                 and message['params']['uri'] == path.as_uri()]
+    return published[-1] if published else None
+
+
+class TestRules:
+    """Test forbidden import rules"""
+
+    def test_patterns(self):
+        assert module_matches('app.models', 'app.models')
+        assert module_matches('app.models', 'app.models.user')
+        assert not module_matches('app.models', 'app.modelsx')
+        assert module_matches('app.*', 'app.views')
+        assert parse_forbidden_import('app.models:app.views') == ForbiddenImport('app.models',
+                                                                                 'app.views')
+        with pytest.raises(ValueError):
+            parse_forbidden_import('app.models')
+
+    def test_pyproject(self, tmp_path):
+        (tmp_path / 'pyproject.toml').write_text(
+            '[tool.pydeptree]\n'
+            'forbidden-imports = [{from = "app", to = "tests", reason = "no test code"}]\n')
+        assert load_forbidden_imports(tmp_path) == [ForbiddenImport('app', 'tests', 'no test code')]
+        (tmp_path / 'pyproject.toml').write_text(
+            '[tool.pydeptree]\nforbidden-imports = [{from = "app"}]\n')
+        with pytest.raises(ValueError):
+            load_forbidden_imports(tmp_path)
+
+
+class TestLanguageServer:
+    """Test the LSP subset over in-memory streams"""
+
+    def test_lifecycle(self, project):
+        exit_code, messages = run_session(project)
+        result = responses(messages)[0]['result']
+        assert result['capabilities']['hoverProvider'] is True
+        assert responses(messages)[99]['result'] is None
+        assert exit_code == 0
+
+    def test_requests_before_initialize(self, project):
+        output = io.BytesIO()
+        hover = encode({'id': 1, 'method': 'textDocument/hover', 'params': {}})
+        LanguageServer(hover, output, watch=False).run()
+        assert decode(output)[0]['error']['code'] == -32002
+
+    def test_malformed_notification_is_logged(self, project):
+        models = project / 'app' / 'models.py'
+        broken = {'method': 'textDocument/didOpen',
+                  'params': {'textDocument': {'uri': models.as_uri()}}}
+        exit_code, messages = run_session(project, broken, open_document(models, 'import main\n'))
+        errors = [message['params']['message'] for message in messages
+                  if message.get('method') == 'window/logMessage'
+                  and message['params']['type'] == 1]
+        assert errors == ["pydeptree: textDocument/didOpen failed: KeyError('text')"]
+        # The server kept going: the next notification was handled and shutdown answered
+        assert [d['code'] for d in diagnostics(messages, models)] == ['import-cycle']
+        assert exit_code == 0
+
+    def test_disk_change_errors_are_logged(self, project):
+        output = io.BytesIO()
+        server = LanguageServer(encode(), output, project_root=project, watch=False)
+        server.initialize({})
+        server.publish_diagnostics = lambda: 1 / 0
+        server._on_disk_change({'main.py'})
+        assert 'ZeroDivisionError' in decode(output)[-1]['params']['message']
+
+    def test_unsaved_buffer_creates_cycle(self, project):
+        models = project / 'app' / 'models.py'
+        views = project / 'app' / 'views.py'
+        change = {'method': 'textDocument/didChange', 'params': {
+            'textDocument': {'uri': models.as_uri(), 'version': 2},
+            'contentChanges': [{'text': 'import os\nfrom app import views\n'}]}}
+        _, messages = run_session(project, open_document(views), open_document(models), change)
+
+        models_diagnostics = diagnostics(messages, models)
+        assert [d['code'] for d in models_diagnostics] == ['import-cycle']
+        assert models_diagnostics[0]['message'] == ('Import cycle: '
+                                                    'app.models → app.views → app.models')
+        assert models_diagnostics[0]['range']['start']['line'] == 1
+        assert [d['code'] for d in diagnostics(messages, views)] == ['import-cycle']
+        # Nothing was written to disk
+        assert models.read_text() == 'import os\n\nclass User:\n    pass\n'
+
+    def test_close_reverts_to_disk(self, project):
+        models = project / 'app' / 'models.py'
+        close = {'method': 'textDocument/didClose',
+                 'params': {'textDocument': {'uri': models.as_uri()}}}
+        dependents = {'id': 1, 'method': 'workspace/executeCommand', 'params': {
+            'command': SHOW_DEPENDENTS_COMMAND, 'arguments': ['main']}}
+        _, messages = run_session(project, open_document(models, 'import main\n'), close,
+                                  dependents)
+        assert diagnostics(messages, models) == []
+        assert responses(messages)[1]['result'] == []
+
+    def test_forbidden_import(self, project):
+        views = project / 'app' / 'views.py'
+        _, messages = run_session(project, open_document(views),
+                                  rules=[ForbiddenImport('app.views', 'app.models',
+                                                         'use the service layer')])
+        [diagnostic] = diagnostics(messages, views)
+        assert diagnostic['code'] == 'forbidden-import'
+        assert diagnostic['severity'] == 1
+        assert 'use the service layer' in diagnostic['message']
+
+    def test_hover(self, project):
+        views = project / 'app' / 'views.py'
+        models = project / 'app' / 'models.py'
+        hover = {'id': 1, 'method': 'textDocument/hover', 'params': {
+            'textDocument': {'uri': views.as_uri()}, 'position': {'line': 0, 'character': 17}}}
+        hover_os = {'id': 2, 'method': 'textDocument/hover', 'params': {
+            'textDocument': {'uri': models.as_uri()}, 'position': {'line': 0, 'character': 8}}}
+        hover_blank = {'id': 3, 'method': 'textDocument/hover', 'params': {
+            'textDocument': {'uri': models.as_uri()}, 'position': {'line': 1, 'character': 0}}}
+        _, messages = run_session(project, open_document(views), open_document(models),
+                                  hover, hover_os, hover_blank)
+        result = responses(messages)
+        hover_text = result[1]['result']['contents']['value']
+        assert hover_text.startswith('**app.models** · `app/models.py`')
+        assert 'imported by 1 (2 transitively)' in hover_text
+        assert result[2]['result']['contents']['value'] == '**os** · standard library module'
+        assert result[3]['result'] is None
+
+    def test_show_dependents(self, project):
+        models = project / 'app' / 'models.py'
+        command = {'id': 1, 'method': 'workspace/executeCommand', 'params': {
+            'command': SHOW_DEPENDENTS_COMMAND, 'arguments': [models.as_uri(), True]}}
+        unknown = {'id': 2, 'method': 'workspace/executeCommand', 'params': {
+            'command': SHOW_DEPENDENTS_COMMAND, 'arguments': ['missing']}}
+        _, messages = run_session(project, command, unknown)
+        result = responses(messages)
+        assert [entry['module'] for entry in result[1]['result']] == ['app.views', 'main']
+        assert result[1]['result'][0]['uri'] == (project / 'app' / 'views.py').as_uri()
+        assert result[2]['error']['code'] == -32602
+
+
+class TestImportsAtLine:
+    """Test finding the import statement under the cursor"""
+
+    def test_multiline_import(self):
+        text = 'from app import (\n    models,\n    views,\n)\nx = 1\n'
+        [ref] = imports_at_line(text, 2)
+        assert (ref.module, ref.names) == ('app', ['models', 'views'])
+        assert imports_at_line(text, 4) == []
+
+    def test_unparsable_buffer(self):
+        [ref] = imports_at_line('import json\ndef broken(:\n', 0)
+        assert ref.module == 'json'
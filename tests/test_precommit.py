@@ -0,0 +1,121 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+from click.testing import CliRunner
+
+from pydeptree.analysis import AnalysisCache
+from pydeptree.cli import cli
+from pydeptree.lint import lint_files
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason='needs git')
+
+
+def git(repo, *args):
+    subprocess.run(['git', *args], cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git(tmp_path, 'init', '-q')
+    git(tmp_path, 'config', 'user.email', 'dev@example.com')
+    git(tmp_path, 'config', 'user.name', 'Dev')
+    (tmp_path / 'app').mkdir()
+    (tmp_path / 'app' / '__init__.py').write_text('')
+    (tmp_path / 'app' / 'models.py').write_text('class User:\n    pass\n')
+    (tmp_path / 'app' / 'views.py').write_text('from app import models\n')
+    (tmp_path / 'main.py').write_text('import app.views\n')
+    git(tmp_path, 'add', '.')
+    git(tmp_path, 'commit', '-q', '-m', 'initial')
+    return tmp_path
+
+
+def run_precommit(repo, *args):
+    result = CliRunner().invoke(cli, ['precommit', '-r', str(repo), '--json', *args])
+    return result.exit_code, json.loads(result.output)
+
+
+class TestPrecommit:
+    """Test the pre-commit check of staged files"""
+
+    def test_no_staged_files(self, repo):
+        exit_code, report = run_precommit(repo, '--no-lint')
+        assert exit_code == 0
+        assert report['files'] == []
+
+    def test_new_cycle(self, repo):
+        (repo / 'app' / 'models.py').write_text('import main\n\nclass User:\n    pass\n')
+        git(repo, 'add', 'app/models.py')
+        exit_code, report = run_precommit(repo, '--no-lint')
+        assert exit_code == 1
+        assert [f['path'] for f in report['files']] == ['app/models.py']
+        assert report['new_cycles'] == [['app.models', 'main', 'app.views', 'app.models']]
+
+    def test_only_staged_content_counts(self, repo):
+        # The cycle exists in the work tree but is not staged
+        (repo / 'app' / 'models.py').write_text('class User:\n    name = "x"\n')
+        git(repo, 'add', 'app/models.py')
+        (repo / 'app' / 'models.py').write_text('import main\n')
+        exit_code, report = run_precommit(repo, '--no-lint')
+        assert exit_code == 0
+        assert report['new_cycles'] == []
+
+    def test_existing_cycle_is_not_reported(self, repo):
+        (repo / 'app' / 'models.py').write_text('import main\n')
+        git(repo, 'commit', '-q', '-am', 'cycle')
+        (repo / 'app' / 'models.py').write_text('import main\nimport os\n')
+        git(repo, 'add', 'app/models.py')
+        exit_code, report = run_precommit(repo, '--no-lint')
+        assert exit_code == 0
+
+    def test_forbidden_import(self, repo):
+        (repo / 'app' / 'helpers.py').write_text('from app import views\n')
+        git(repo, 'add', 'app/helpers.py')
+        exit_code, report = run_precommit(repo, '--no-lint', '--forbid', 'app.helpers:app.views')
+        assert exit_code == 1
+        assert report['forbidden_imports'][0]['target'] == 'app.views'
+
+    def test_max_complexity(self, repo):
+        (repo / 'main.py').write_text('import app.views\n\nif True:\n    if False:\n        pass\n')
+        git(repo, 'add', 'main.py')
+        assert run_precommit(repo, '--no-lint', '--max-complexity', '2')[0] == 1
+        assert run_precommit(repo, '--no-lint', '--max-complexity', '3')[0] == 0
+
+    def test_lint_staged_version(self, repo):
+        if lint_files([repo / 'main.py'], repo) is None:
+            pytest.skip('needs ruff')
+        (repo / 'main.py').write_text('import app.views\n\ndef broken(:\n')
+        git(repo, 'add', 'main.py')
+        (repo / 'main.py').write_text('import app.views\n')
+        exit_code, report = run_precommit(repo)
+        assert exit_code == 1
+        assert report['files'][0]['errors'] >= 1
+
+        (repo / 'main.py').write_text('import app.views\n\nVALUE = 1\n')
+        git(repo, 'add', 'main.py')
+        exit_code, report = run_precommit(repo)
+        assert report['files'][0]['errors'] == 0
+
+    def test_not_a_repository(self, tmp_path):
+        result = CliRunner().invoke(cli, ['precommit', '-r', str(tmp_path)])
+        assert result.exit_code == 1
+
+    def test_only_the_import_closure_is_analyzed(self, repo, monkeypatch):
+        (repo / 'unrelated.py').write_text('import app.views\n')
+        git(repo, 'add', 'unrelated.py')
+        git(repo, 'commit', '-q', '-m', 'unrelated')
+        analyzed = []
+        original = AnalysisCache.analyze
+
+        def analyze(self, path, *args, **kwargs):
+            analyzed.append(path.relative_to(repo).as_posix())
+            return original(self, path, *args, **kwargs)
+
+        monkeypatch.setattr(AnalysisCache, 'analyze', analyze)
+        (repo / 'app' / 'views.py').write_text('from app import models\nimport main\n')
+        git(repo, 'add', 'app/views.py')
+        exit_code, report = run_precommit(repo, '--no-lint')
+        assert exit_code == 1
+        assert report['new_cycles'] == [['app.views', 'main', 'app.views']]
+        assert sorted(analyzed) == ['app/models.py', 'main.py']  # Not unrelated.py
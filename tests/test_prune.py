@@ -0,0 +1,87 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from pydeptree.cli import cli
+from pydeptree.environment import DistributionIndex, format_size
+from pydeptree.graph import build_project_graph
+from pydeptree.prune import build_prune_report
+from tests.test_environment import make_dist
+
+
+@pytest.fixture
+def site_dir(tmp_path):
+    site = tmp_path / 'site-packages'
+    make_dist(site, 'requests', '2.31.0', requires=['idna<4,>=2.5'])
+    make_dist(site, 'idna', '3.6')
+    make_dist(site, 'pip', '23.3')
+    make_dist(site, 'boto3', '1.34.0', requires=['botocore'],
+              files=['boto3/__init__.py', 'boto3/session.py'])
+    make_dist(site, 'botocore', '1.34.0', files=['botocore/__init__.py'])
+    (site / 'boto3').mkdir()
+    (site / 'boto3' / '__init__.py').write_text('x' * 100)
+    (site / 'boto3' / 'session.py').write_text('x' * 50)
+    (site / 'botocore').mkdir()
+    (site / 'botocore' / '__init__.py').write_text('x' * 1000)
+    return site
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / 'project'
+    root.mkdir()
+    (root / 'main.py').write_text('import requests\nimport json\nimport missing_pkg\n')
+    return root
+
+
+class TestPruneReport:
+    """Test the installed-but-unreachable distribution report"""
+
+    def test_prunable_distributions(self, project, site_dir):
+        index = DistributionIndex(paths=[str(site_dir)])
+        report = build_prune_report(build_project_graph(project), index)
+
+        assert report.roots == ['requests', 'pip']
+        assert report.reachable == {'idna': 'requests', 'pip': 'pip', 'requests': 'requests'}
+        prunable = [(dist.name, dist.size) for dist in report.prunable]
+        assert prunable == [('botocore', 1000), ('boto3', 150)]
+        assert report.prunable[0].required_by == ['boto3']
+        assert report.prunable_size == 1150
+        assert report.unresolved_imports == ['missing_pkg']
+
+    def test_namespace_packages(self, project, site_dir):
+        make_dist(site_dir, 'protobuf', '4.25.0', top_level=['google'],
+                  files=['google/protobuf/__init__.py'])
+        make_dist(site_dir, 'google-auth', '2.28.0', top_level=['google'],
+                  files=['google/auth/__init__.py', 'google/oauth2/credentials.py'])
+        index = DistributionIndex(paths=[str(site_dir)])
+
+        (project / 'main.py').write_text('import google.auth\n'
+                                         'from google.oauth2 import credentials\n')
+        report = build_prune_report(build_project_graph(project), index, keep=())
+        assert report.roots == ['google-auth']
+        assert 'protobuf' in [dist.name for dist in report.prunable]
+
+        # The bare namespace could come from either, so neither is reported as prunable
+        (project / 'main.py').write_text('import google\n')
+        report = build_prune_report(build_project_graph(project), index, keep=())
+        assert report.roots == ['google-auth', 'protobuf']
+
+    def test_keep(self, project, site_dir):
+        index = DistributionIndex(paths=[str(site_dir)])
+        report = build_prune_report(build_project_graph(project), index, keep=['boto3'])
+        assert [dist.name for dist in report.prunable] == ['pip']
+
+    def test_command(self, project, site_dir):
+        runner = CliRunner()
+        result = runner.invoke(cli, ['prune-report', '-r', str(project),
+                                     '--site-packages', str(site_dir), '--json'])
+        assert result.exit_code == 0, result.output
+        assert json.loads(result.output)['prunable_size'] == 1150
+
+    def test_format_size(self):
+        assert format_size(512) == '512B'
+        assert format_size(2048) == '2.0KB'
+        assert format_size(5 * 1024 * 1024) == '5.0MB'
+        assert format_size(3 * 1024 ** 3) == '3.0GB'
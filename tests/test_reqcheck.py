@@ -0,0 +1,150 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from pydeptree.cli import cli
+from pydeptree.environment import DistributionIndex
+from pydeptree.graph import build_project_graph
+from pydeptree.reqcheck import (
+    check_requirements,
+    find_requirement_sources,
+    load_declared_requirements,
+    parse_requirements_txt,
+    parse_setup_cfg,
+    tomllib,
+)
+from tests.test_environment import make_dist
+
+
+@pytest.fixture
+def site_dir(tmp_path):
+    site = tmp_path / 'site-packages'
+    make_dist(site, 'requests', '2.31.0', requires=['idna<4,>=2.5', 'urllib3<3'])
+    make_dist(site, 'idna', '3.6')
+    make_dist(site, 'urllib3', '2.1.0')
+    make_dist(site, 'PyYAML', '6.0.1', top_level=['yaml'])
+    make_dist(site, 'Django', '4.2', top_level=['django'])
+    return site
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / 'project'
+    (root / 'app').mkdir(parents=True)
+    (root / 'app' / '__init__.py').write_text('')
+    (root / 'app' / 'http.py').write_text('import requests\nimport idna\nfrom . import config\n')
+    (root / 'app' / 'config.py').write_text('import os\nimport yaml\nimport toml\n')
+    (root / 'tests').mkdir()
+    (root / 'tests' / 'test_http.py').write_text('import pytest\nfrom app import http\n')
+    (root / 'requirements.txt').write_text(
+        '# Runtime\n'
+        'requests>=2.25 \\\n'
+        '    --hash=sha256:abc\n'
+        'Django==4.2  # unused\n'
+        '-c constraints.txt\n'
+        '--index-url https://example.com/simple\n'
+    )
+    (root / 'requirements-dev.txt').write_text('-r requirements.txt\npytest>=7\n')
+    (root / 'setup.cfg').write_text(
+        '[metadata]\nname = project\n\n'
+        '[options]\ninstall_requires =\n    PyYAML>=6\n\n'
+        '[options.extras_require]\ndocs =\n    sphinx\n'
+    )
+    return root
+
+
+class TestRequirementSources:
+    """Test parsing of requirement sources"""
+
+    def test_find_sources(self, project):
+        names = [path.name for path in find_requirement_sources(project)]
+        assert names == ['requirements-dev.txt', 'requirements.txt', 'setup.cfg']
+
+    def test_requirements_txt(self, project):
+        requirements = parse_requirements_txt(project / 'requirements-dev.txt', project)
+        by_name = {requirement.name: requirement for requirement in requirements}
+        assert set(by_name) == {'requests', 'Django', 'pytest'}
+        assert by_name['requests'].requirement == 'requests>=2.25'
+        assert by_name['requests'].source == 'requirements.txt:2'
+        assert by_name['requests'].group is None
+        assert by_name['pytest'].group == 'dev'
+
+    def test_editable_and_url_requirements(self, tmp_path):
+        path = tmp_path / 'requirements.txt'
+        path.write_text('-e git+https://example.com/repo.git#egg=mylib\n'
+                        'https://example.com/pkg.zip#egg=otherlib\n'
+                        'thing @ https://example.com/thing.whl\n')
+        requirements = parse_requirements_txt(path, tmp_path)
+        assert [r.name for r in requirements] == ['mylib', 'otherlib', 'thing']
+
+    def test_setup_cfg(self, project):
+        requirements = parse_setup_cfg(project / 'setup.cfg', project)
+        assert [(r.name, r.group) for r in requirements] == [('PyYAML', None), ('sphinx', 'docs')]
+
+    @pytest.mark.skipif(tomllib is None, reason='needs tomllib or tomli')
+    def test_pyproject_toml(self, tmp_path):
+        (tmp_path / 'pyproject.toml').write_text(
+            '[project]\nname = "demo"\ndependencies = ["rich>=12"]\n'
+            '[project.optional-dependencies]\ndev = ["pytest"]\n'
+            '[tool.poetry.dependencies]\npython = "^3.8"\nclick = "^8"\n'
+        )
+        requirements, warnings = load_declared_requirements(tmp_path)
+        assert warnings == []
+        assert [(r.name, r.group) for r in requirements] == [
+            ('rich', None), ('pytest', 'dev'), ('click', None)]
+
+
+class TestCheckRequirements:
+    """Test classification of declared requirements against imports"""
+
+    def test_report(self, project, site_dir):
+        index = DistributionIndex(paths=[str(site_dir)])
+        declared, _ = load_declared_requirements(project)
+        report = check_requirements(build_project_graph(project), declared, index)
+
+        assert sorted(status.name for status in report.used) == ['PyYAML', 'pytest', 'requests']
+        assert [status.name for status in report.unused] == ['Django']
+        assert [status.name for status in report.missing] == ['toml']
+        assert [(status.name, status.via) for status in report.transitive] == [('idna', 'requests')]
+        assert report.missing[0].modules == ['app/config.py']
+        assert report.has_problems
+
+    def test_namespace_packages(self, tmp_path, site_dir):
+        make_dist(site_dir, 'protobuf', '4.25.0', top_level=['google'],
+                  files=['google/protobuf/__init__.py', 'google/protobuf/message.py'])
+        make_dist(site_dir, 'google-auth', '2.28.0', top_level=['google'],
+                  files=['google/auth/__init__.py', 'google/auth/transport/requests.py'])
+        root = tmp_path / 'ns'
+        root.mkdir()
+        (root / 'main.py').write_text('import google.auth\n'
+                                      'from google.auth.transport import requests\n')
+        (root / 'requirements.txt').write_text('google-auth\n')
+
+        index = DistributionIndex(paths=[str(site_dir)])
+        declared, _ = load_declared_requirements(root)
+        report = check_requirements(build_project_graph(root), declared, index)
+        assert [status.name for status in report.used] == ['google-auth']
+        assert report.used[0].imports == ['google.auth', 'google.auth.transport']
+        assert not report.unused and not report.missing
+
+        # Both distributions provide the bare namespace: it counts for the declared one
+        (root / 'main.py').write_text('import google\nfrom google.protobuf import message\n')
+        report = check_requirements(build_project_graph(root), declared, index)
+        assert [status.name for status in report.used] == ['google-auth']
+        assert [status.name for status in report.missing] == ['protobuf']
+
+    def test_ignore(self, project, site_dir):
+        index = DistributionIndex(paths=[str(site_dir)])
+        declared, _ = load_declared_requirements(project)
+        report = check_requirements(build_project_graph(project), declared, index,
+                                    ignore=['django', 'toml'])
+        assert not report.has_problems
+
+    def test_command(self, project, site_dir):
+        runner = CliRunner()
+        result = runner.invoke(cli, ['reqcheck', '-r', str(project),
+                                     '--site-packages', str(site_dir), '--json', '--strict'])
+        assert result.exit_code == 1
+        data = json.loads(result.output)
+        assert [status['name'] for status in data['unused']] == ['Django']
@@ -0,0 +1,162 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+from click.testing import CliRunner
+
+from pydeptree.analysis import AnalysisCache, analyze_source
+from pydeptree.cli import cli
+from pydeptree.git import find_git_root
+from pydeptree.lint import lint_files
+from pydeptree.revision import (
+    BlobAnalyzer,
+    build_revision_graph,
+    list_revision_files,
+    resolve_commit,
+)
+from pydeptree.snapshot import ProjectSnapshot, take_snapshot
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason='needs git')
+
+
+def git(repo, *args):
+    subprocess.run(['git', *args], cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git(tmp_path, 'init', '-q')
+    git(tmp_path, 'config', 'user.email', 'dev@example.com')
+    git(tmp_path, 'config', 'user.name', 'Dev')
+    (tmp_path / 'app').mkdir()
+    (tmp_path / 'app' / '__init__.py').write_text('')
+    (tmp_path / 'app' / 'models.py').write_text('class User:\n    pass\n')
+    (tmp_path / 'app' / 'views.py').write_text('from app import models\n\n# TODO: paginate\n')
+    (tmp_path / 'main.py').write_text('import app.views\n')
+    (tmp_path / 'README.md').write_text('docs\n')
+    git(tmp_path, 'add', '.')
+    git(tmp_path, 'commit', '-q', '-m', 'initial')
+    git(tmp_path, 'tag', 'v1')
+
+    # The next commit and the work tree both differ from v1
+    (tmp_path / 'app' / 'models.py').write_text('import main\n')
+    (tmp_path / 'app' / 'views.py').write_text('from app import models\n')
+    git(tmp_path, 'commit', '-q', '-am', 'cycle')
+    (tmp_path / 'app' / 'extra.py').write_text('import app.models\n')
+    return tmp_path
+
+
+class TestRevisionGraph:
+    """Test reading a project from a git revision"""
+
+    def test_list_revision_files(self, repo):
+        git_root = find_git_root(repo)
+        files = list_revision_files(git_root, repo, resolve_commit(git_root, 'v1'))
+        assert sorted(files) == ['app/__init__.py', 'app/models.py', 'app/views.py', 'main.py']
+        assert all(len(oid) == 40 for oid in files.values())
+
+    def test_subdirectory_project(self, repo):
+        git_root = find_git_root(repo)
+        files = list_revision_files(git_root, repo / 'app', resolve_commit(git_root, 'v1'))
+        assert sorted(files) == ['__init__.py', 'models.py', 'views.py']
+
+    def test_graph_at_revision(self, repo):
+        old = build_revision_graph(repo, 'v1')
+        new = build_revision_graph(repo, 'HEAD')
+        assert old.cycles() == []
+        assert new.cycles() == [['app.models', 'app.views', 'main']]
+        assert 'app.extra' not in new.paths  # Untracked work tree files are not part of a revision
+
+    def test_blobs_are_analyzed_once(self, repo):
+        git_root = find_git_root(repo)
+        with BlobAnalyzer(git_root, repo) as analyzer:
+            build_revision_graph(repo, 'v1', analyzer)
+            build_revision_graph(repo, 'HEAD', analyzer)
+        # __init__.py and main.py are shared; models.py and views.py changed
+        assert len(analyzer.records) == 6
+
+    def test_existing_cache_is_read(self, repo):
+        git_root = find_git_root(repo)
+        with BlobAnalyzer(git_root, repo) as analyzer:
+            build_revision_graph(repo, 'HEAD', analyzer)
+        assert not (repo / '.pydeptree_cache').exists()  # No cache yet, and none is created
+
+        cache = AnalysisCache(repo)
+        oid = cache.blob_ids['main.py']
+        cache.put_blob(oid, analyze_source('import os\n'))
+        cache.close()
+        with BlobAnalyzer(git_root, repo) as analyzer:
+            assert analyzer.analyze(oid).imports[0].module == 'os'  # Taken from the cache
+
+    def test_unknown_revision(self, repo):
+        result = CliRunner().invoke(cli, ['todos', '-r', str(repo), '--rev', 'nope'])
+        assert result.exit_code == 2
+        assert 'Unknown revision' in result.output
+
+
+class TestRevisionCommands:
+    """Test --rev on the project-wide commands"""
+
+    def test_todos(self, repo):
+        result = CliRunner().invoke(cli, ['todos', '-r', str(repo), '--rev', 'v1', '--json'])
+        assert result.exit_code == 0
+        assert [item['text'] for item in json.loads(result.output)] == ['paginate']
+
+        result = CliRunner().invoke(cli, ['todos', '-r', str(repo), '--rev', 'HEAD', '--json'])
+        assert json.loads(result.output) == []
+
+    def test_symbols(self, repo):
+        result = CliRunner().invoke(cli, ['symbols', 'User', '-r', str(repo), '--rev', 'v1',
+                                          '--json'])
+        assert result.exit_code == 0
+        assert json.loads(result.output)[0]['module'] == 'app.models'
+
+    def test_work_tree_is_untouched(self, repo):
+        before = {path: path.read_bytes() for path in repo.rglob('*.py')}
+        CliRunner().invoke(cli, ['snapshot', '-r', str(repo), '--rev', 'v1', '--json'])
+        CliRunner().invoke(cli, ['todos', '-r', str(repo), '--rev', 'HEAD~1'])
+        assert {path: path.read_bytes() for path in repo.rglob('*.py')} == before
+        assert not (repo / '.pydeptree_cache').exists()
+
+
+class TestSnapshot:
+    """Test taking, saving and loading analysis snapshots"""
+
+    def test_summary(self, repo):
+        summary = take_snapshot(repo, 'HEAD').summary()
+        assert summary['modules'] == 4
+        assert summary['cycles'] == 1
+        assert summary['max_closure'] == 2  # Each module of the cycle imports the other two
+        assert summary['lint_errors'] is None
+
+    def test_save_and_load(self, repo, tmp_path):
+        snapshot = take_snapshot(repo, 'v1')
+        path = tmp_path / 'v1.json'
+        snapshot.save(path)
+        loaded = ProjectSnapshot.load(path, repo)
+        assert loaded.records == snapshot.records
+        assert loaded.blobs == snapshot.blobs
+        assert loaded.summary() == snapshot.summary()
+
+    def test_load_invalid(self, tmp_path):
+        path = tmp_path / 'other.json'
+        path.write_text('{"name": "x"}')
+        with pytest.raises(ValueError):
+            ProjectSnapshot.load(path, tmp_path)
+
+    def test_work_tree_snapshot(self, repo):
+        result = CliRunner().invoke(cli, ['snapshot', '-r', str(repo), '--json'])
+        assert result.exit_code == 0
+        assert json.loads(result.output)['modules'] == 5
+
+    def test_lint_revision(self, repo):
+        if lint_files([repo / 'main.py'], repo) is None:
+            pytest.skip('needs ruff')
+        (repo / 'main.py').write_text('def broken(:\n')
+        git(repo, 'commit', '-q', '-am', 'broken')
+        (repo / 'main.py').write_text('import app.views\n')
+
+        # The committed file differs from the work tree, so it is linted through stdin
+        assert take_snapshot(repo, 'HEAD', lint=True).lint['main.py'][0] >= 1
+        assert take_snapshot(repo, 'v1', lint=True).lint['main.py'][0] == 0
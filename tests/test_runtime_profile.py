@@ -0,0 +1,125 @@
+import cProfile
+import tracemalloc
+
+import pytest
+from click.testing import CliRunner
+
+from pydeptree.cli_advanced import cli
+from pydeptree.graph import build_project_graph
+from pydeptree.runtime_profile import (
+    FileCost,
+    RuntimeProfile,
+    attribute_profile,
+    load_profile_data,
+    match_project_file,
+)
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / 'main.py').write_text('import pkg.heavy\n')
+    (tmp_path / 'pkg').mkdir()
+    (tmp_path / 'pkg' / '__init__.py').write_text('')
+    (tmp_path / 'pkg' / 'heavy.py').write_text('from pkg import deep\n')
+    (tmp_path / 'pkg' / 'deep.py').write_text(
+        'def work():\n    return sum(i * i for i in range(20000))\n'
+        'def allocate():\n    return [bytearray(50000) for _ in range(4)]\n')
+    return tmp_path
+
+
+def run_deep(project):
+    """Run pkg/deep.py's code so profilers attribute it to that file"""
+    path = project / 'pkg' / 'deep.py'
+    namespace = {}
+    exec(compile(path.read_text(), str(path), 'exec'), namespace)
+    return namespace
+
+
+class TestLoadProfileData:
+    """Test reading pstats dumps and tracemalloc snapshots"""
+
+    def test_pstats(self, project, tmp_path):
+        namespace = run_deep(project)
+        profiler = cProfile.Profile()
+        profiler.runcall(namespace['work'])
+        profiler.dump_stats(str(tmp_path / 'run.prof'))
+
+        profile = load_profile_data([tmp_path / 'run.prof'])
+        assert profile.has_time and not profile.has_memory
+        cost = profile.files[str(project / 'pkg' / 'deep.py')]
+        assert cost.time > 0
+        assert cost.calls > 1
+
+    def test_tracemalloc(self, project, tmp_path):
+        namespace = run_deep(project)
+        tracemalloc.start()
+        try:
+            kept = namespace['allocate']()
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        snapshot.dump(str(tmp_path / 'memory.snap'))
+
+        profile = load_profile_data([tmp_path / 'memory.snap'])
+        assert profile.has_memory and not profile.has_time
+        assert profile.files[str(project / 'pkg' / 'deep.py')].memory >= 4 * 50000
+        del kept
+
+    def test_invalid_file(self, tmp_path):
+        (tmp_path / 'bogus.prof').write_text('not a profile')
+        with pytest.raises(ValueError):
+            load_profile_data([tmp_path / 'bogus.prof'])
+
+
+class TestAttribution:
+    """Test attributing profiled files to modules and subtrees"""
+
+    def test_match_project_file(self):
+        rel_paths = ['pkg/deep.py', 'deep.py', 'main.py']
+        assert match_project_file('/srv/app/pkg/deep.py', rel_paths) == 'pkg/deep.py'
+        assert match_project_file('/srv/app/deep.py', rel_paths) == 'deep.py'
+        assert match_project_file('C:\\app\\main.py', rel_paths) == 'main.py'
+        assert match_project_file('/usr/lib/python3/json/__init__.py', rel_paths) is None
+
+    def test_attribute_profile(self, project):
+        graph = build_project_graph(project)
+        profile = RuntimeProfile(files={
+            '/container/app/pkg/deep.py': FileCost(time=2.0, calls=10, memory=1000),
+            str(project / 'pkg' / 'heavy.py'): FileCost(time=0.5, calls=1, memory=10),
+            '/usr/lib/python3/json/decoder.py': FileCost(time=9.0),
+        }, has_time=True, has_memory=True)
+
+        profiles = attribute_profile(profile, graph)
+        assert profiles['pkg.deep'].time == 2.0
+        assert profiles['pkg.heavy'].time == 0.5
+        assert profiles['pkg.heavy'].cumulative_time == 2.5
+        assert profiles['main'].time == 0.0
+        assert profiles['main'].cumulative_time == 2.5
+        assert profiles['main'].cumulative_memory == 1010
+        assert 'pkg' not in profiles
+
+
+class TestProfileDataOption:
+    """Test the --profile-data option of the advanced CLI"""
+
+    def test_overlay(self, project, tmp_path, monkeypatch):
+        monkeypatch.setattr('pydeptree.cli_advanced.run_ruff_check', lambda *args, **kwargs: (0, 0))
+        namespace = run_deep(project)
+        profiler = cProfile.Profile()
+        profiler.runcall(namespace['work'])
+        profiler.dump_stats(str(tmp_path / 'run.prof'))
+
+        result = CliRunner().invoke(cli, [str(project / 'main.py'), '--no-check-git',
+                                          '--no-check-lint',
+                                          '--profile-data', str(tmp_path / 'run.prof')])
+        assert result.exit_code == 0, result.output
+        assert 'Runtime Profile' in result.output
+        assert '⏱' in result.output
+
+    def test_bad_profile(self, project, tmp_path):
+        (tmp_path / 'bogus.prof').write_text('not a profile')
+        result = CliRunner().invoke(cli, [str(project / 'main.py'), '--no-check-git',
+                                          '--no-check-lint',
+                                          '--profile-data', str(tmp_path / 'bogus.prof')])
+        assert result.exit_code == 2
+        assert '--profile-data' in result.output
@@ -0,0 +1,125 @@
+import os
+import subprocess
+from unittest.mock import MagicMock, patch
+
+from click.testing import CliRunner
+
+from pydeptree.cli_advanced import build_search_pattern, cli
+from pydeptree.search_index import (
+    TrigramIndex,
+    extract_trigrams,
+    required_literals,
+    required_trigrams,
+)
+
+
+class TestTrigramExtraction:
+    """Test trigram and required-literal extraction"""
+
+    def test_extract_trigrams_lowercases(self):
+        assert extract_trigrams("AbCd") == {"abc", "bcd"}
+        assert extract_trigrams("ab") == set()
+
+    def test_literal_pattern(self):
+        assert required_literals("validate") == ["validate"]
+
+    def test_regex_pattern_keeps_mandatory_literals(self):
+        literals = required_literals(r"class\s+UserModel(Base)?")
+        assert "class" in literals
+        assert "UserModel" in literals
+        assert "Base" not in literals
+
+    def test_repeat_with_minimum_is_required(self):
+        assert "abc" in required_literals(r"(abc)+x")
+        assert required_literals(r"(abc)*") == []
+
+    def test_alternation_gives_no_trigrams(self):
+        assert required_trigrams("foo|bar") == set()
+
+    def test_invalid_regex_gives_no_trigrams(self):
+        assert required_trigrams("foo(") == set()
+
+
+class TestTrigramIndex:
+    """Test the persistent, incremental trigram index"""
+
+    def make_project(self, tmp_path):
+        (tmp_path / "a.py").write_text("def validate_user():\n    pass\n")
+        (tmp_path / "b.py").write_text("class Order:\n    pass\n")
+        pkg = tmp_path / "pkg"
+        pkg.mkdir()
+        (pkg / "__init__.py").write_text("")
+        (pkg / "c.py").write_text("VALIDATE = True\n")
+        return tmp_path
+
+    def test_candidates_for_literal(self, tmp_path):
+        root = self.make_project(tmp_path)
+        index = TrigramIndex(root)
+        assert index.update() == 4
+
+        candidates = index.candidates("validate")
+        assert candidates == {root.resolve() / "a.py", root.resolve() / "pkg" / "c.py"}
+        index.close()
+
+    def test_candidates_for_regex(self, tmp_path):
+        root = self.make_project(tmp_path)
+        index = TrigramIndex(root)
+        index.update()
+
+        assert index.candidates(build_search_pattern("Ord.*", "class")) == {
+            root.resolve() / "b.py"
+        }
+        assert index.candidates("a|b") is None
+        index.close()
+
+    def test_incremental_update(self, tmp_path):
+        root = self.make_project(tmp_path)
+        index = TrigramIndex(root)
+        index.update()
+        assert index.update() == 0
+
+        b_file = root / "b.py"
+        b_file.write_text("def validate_order():\n    pass\n")
+        stat = b_file.stat()
+        os.utime(b_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        (root / "a.py").unlink()
+
+        assert index.update() == 1
+        assert index.candidates("validate") == {
+            root.resolve() / "b.py",
+            root.resolve() / "pkg" / "c.py",
+        }
+        index.close()
+
+    def test_index_persists_between_runs(self, tmp_path):
+        root = self.make_project(tmp_path)
+        TrigramIndex(root).update()
+
+        index = TrigramIndex(root)
+        assert index.update() == 0
+        assert index.candidates("class Order") == {root.resolve() / "b.py"}
+        index.close()
+
+
+class TestSearchIndexCLI:
+    """Test the --search-index option of the advanced CLI"""
+
+    def test_search_with_index(self, tmp_path):
+        real_run = subprocess.run
+
+        def fake_run(args, *rest, **kwargs):
+            # Fake ruff only; git still runs for the analysis cache
+            if args[0] == 'git':
+                return real_run(args, *rest, **kwargs)
+            return MagicMock(returncode=0, stdout='[]', stderr='')
+
+        (tmp_path / "main.py").write_text("import helper\n")
+        (tmp_path / "helper.py").write_text("def needle():\n    pass\n")
+
+        runner = CliRunner()
+        with patch('pydeptree.cli_advanced.subprocess.run', side_effect=fake_run):
+            result = runner.invoke(cli, [str(tmp_path / "main.py"), '--search', 'needle',
+                                         '--search-index', '--no-check-git', '--no-check-lint'])
+        assert result.exit_code == 0
+        assert 'Search index: 1 candidate files' in result.output
+        assert 'Found 1 matches' in result.output
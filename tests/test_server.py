@@ -0,0 +1,86 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from pydeptree.server import QueryHTTPServer, parse_request_path
+from pydeptree.service import ProjectService, QueryError
+
+
+@pytest.fixture
+def server(tmp_path):
+    (tmp_path / 'main.py').write_text('import helpers\n')
+    (tmp_path / 'helpers.py').write_text('def helper():\n    pass\n')
+
+    server = QueryHTTPServer(('127.0.0.1', 0), ProjectService(tmp_path), allow_origin='*')
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join(timeout=5)
+
+
+def fetch(server, path, headers=None):
+    host, port = server.server_address[:2]
+    request = urllib.request.Request(f"http://{host}:{port}{path}", headers=headers or {})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, response.headers, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        body = e.read()
+        return e.code, e.headers, json.loads(body) if body else None
+
+
+class TestParseRequestPath:
+    """Test the mapping of URLs to queries"""
+
+    def test_module_and_params(self):
+        assert parse_request_path('/dependents/app.models?transitive=1') == (
+            'dependents', {'module': 'app.models', 'transitive': True})
+        assert parse_request_path('/tree/app%2Fmodels.py?depth=2') == (
+            'tree', {'module': 'app/models.py', 'depth': 2})
+        assert parse_request_path('/impact?paths=a.py&paths=b.py') == (
+            'impact', {'paths': ['a.py', 'b.py']})
+        assert parse_request_path('/') == ('status', {})
+
+    def test_invalid_value(self):
+        with pytest.raises(QueryError):
+            parse_request_path('/search?query=x&limit=many')
+
+
+class TestQueryHTTPServer:
+    """Test the JSON endpoints"""
+
+    def test_endpoints(self, server):
+        status, headers, body = fetch(server, '/dependents/helpers')
+        assert status == 200
+        assert body == ['main']
+        assert headers['Content-Type'] == 'application/json'
+        assert headers['Access-Control-Allow-Origin'] == '*'
+        assert fetch(server, '/edges')[2] == [['main', 'helpers']]
+        assert fetch(server, '/metrics/helpers.py')[2]['functions'] == 1
+        assert fetch(server, '/search?query=help&match=prefix')[2][0]['name'] == 'helper'
+
+    def test_errors(self, server):
+        assert fetch(server, '/metrics/missing')[0] == 404
+        assert fetch(server, '/bogus')[0] == 404
+        assert fetch(server, '/tree/main?depth=deep')[0] == 400
+        assert fetch(server, '/cycles?unexpected=1')[0] == 400
+
+    def test_etag(self, server, tmp_path):
+        _, headers, _ = fetch(server, '/cycles')
+        etag = headers['ETag']
+        status, headers, body = fetch(server, '/cycles', {'If-None-Match': etag})
+        assert status == 304
+        assert body is None
+        assert fetch(server, '/cycles', {'If-None-Match': f'W/{etag}'})[0] == 304
+
+        (tmp_path / 'helpers.py').write_text('import main\n')
+        server.service.refresh()
+        status, headers, body = fetch(server, '/cycles', {'If-None-Match': etag})
+        assert status == 200
+        assert headers['ETag'] != etag
+        assert body == [['helpers', 'main']]
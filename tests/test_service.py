@@ -0,0 +1,87 @@
+import pytest
+
+from pydeptree.service import ProjectService, QueryError
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / 'main.py').write_text('import app.service\n')
+    (tmp_path / 'app').mkdir()
+    (tmp_path / 'app' / '__init__.py').write_text('')
+    (tmp_path / 'app' / 'service.py').write_text('from app import models\n\ndef get():\n    pass\n')
+    (tmp_path / 'app' / 'models.py').write_text('class User:\n    pass\n')
+    return tmp_path
+
+
+class TestProjectService:
+    """Test the incrementally refreshed in-memory graph"""
+
+    def test_queries(self, project):
+        service = ProjectService(project)
+        assert service.status()['modules'] == 4
+        assert service.dependencies('main', transitive=True) == ['app.models', 'app.service']
+        assert service.dependents('app/models.py') == ['app.service']
+        models = str(project / 'app' / 'models.py')
+        assert service.dependents(models, transitive=True) == ['app.service', 'main']
+        assert service.tree('main')['children'][0]['children'][0]['module'] == 'app.models'
+        assert service.metrics('app.service')['functions'] == 1
+        assert service.search('User')[0]['module'] == 'app.models'
+        assert service.cycles() == []
+        assert ['app.service', 'app.models'] in service.edges()
+
+    def test_impact(self, project):
+        service = ProjectService(project)
+        impact = service.impact(['app/models.py', 'docs/readme.py'])
+        assert impact['changed'] == ['app.models']
+        assert impact['affected'] == ['app.models', 'app.service', 'main']
+        assert impact['unknown'] == ['docs/readme.py']
+
+    def test_refresh_updates_edges_of_changed_files(self, project):
+        service = ProjectService(project)
+        version = service.version
+        assert service.refresh() == set()
+        assert service.version == version
+
+        (project / 'app' / 'models.py').write_text('import main\n\nclass User:\n    pass\n')
+        assert service.refresh() == {'app/models.py'}
+        assert service.version == version + 1
+        assert service.cycles() == [['app.models', 'app.service', 'main']]
+        assert service.last_cycle_change.formed == [['app.models', 'app.service', 'main']]
+        assert service.dependents('main') == ['app.models']
+
+        (project / 'app' / 'models.py').write_text('class User:\n    pass\n')
+        service.refresh()
+        assert service.last_cycle_change.dissolved == [['app.models', 'app.service', 'main']]
+        assert service.cycles() == []
+
+    def test_refresh_rebuilds_when_files_are_added(self, project):
+        service = ProjectService(project)
+        (project / 'app' / 'extra.py').write_text('from app import models\n')
+        (project / 'main.py').unlink()
+        assert service.refresh() == {'app/extra.py', 'main.py'}
+        assert service.dependents('app.models') == ['app.extra', 'app.service']
+        with pytest.raises(QueryError):
+            service.metrics('main')
+
+    def test_call(self, project):
+        service = ProjectService(project)
+        assert service.call('dependents', {'module': 'app.models'}) == ['app.service']
+        with pytest.raises(QueryError):
+            service.call('refresh')
+        with pytest.raises(QueryError):
+            service.call('tree', {'module': 'main', 'bogus': 1})
+
+    def test_unsaved_sources(self, project):
+        service = ProjectService(project)
+        service.update_source('app/models.py', 'import main\n')
+        assert service.cycles() == [['app.models', 'app.service', 'main']]
+        # A buffer that does not parse keeps its last imports
+        service.update_source('app/models.py', 'import main\ndef broken(:\n')
+        assert service.dependencies('app.models') == ['main']
+        # Disk changes to a file with an open buffer are ignored until it is discarded
+        (project / 'app' / 'models.py').write_text('import os\n')
+        service.refresh()
+        assert service.dependencies('app.models') == ['main']
+        service.discard_source('app/models.py')
+        assert service.dependencies('app.models') == []
+        assert service.cycles() == []
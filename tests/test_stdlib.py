@@ -0,0 +1,60 @@
+import sys
+
+import pytest
+
+from pydeptree.cli_advanced import FileInfo, extract_external_dependencies
+from pydeptree.stdlib import (
+    STDLIB_MODULES,
+    get_stdlib_modules,
+    is_stdlib_module,
+    parse_python_version,
+)
+
+
+class TestStdlibClassification:
+    """Test per-version standard library tables"""
+
+    def test_running_interpreter(self):
+        assert is_stdlib_module('os')
+        assert is_stdlib_module('os.path')
+        assert is_stdlib_module('__future__')
+        assert not is_stdlib_module('requests')
+        assert isinstance(STDLIB_MODULES, frozenset)
+
+    @pytest.mark.skipif(not hasattr(sys, 'stdlib_module_names'), reason='Python 3.10+ only')
+    def test_uses_interpreter_names(self):
+        assert get_stdlib_modules() >= frozenset(sys.stdlib_module_names)
+
+    def test_new_modules(self):
+        assert not is_stdlib_module('zoneinfo', (3, 8))
+        assert is_stdlib_module('zoneinfo', (3, 9))
+        assert is_stdlib_module('graphlib', (3, 9))
+        assert not is_stdlib_module('tomllib', (3, 10))
+        assert is_stdlib_module('tomllib', (3, 11))
+
+    def test_removed_modules(self):
+        assert is_stdlib_module('distutils', (3, 11))
+        assert not is_stdlib_module('distutils', (3, 12))
+        assert is_stdlib_module('imp', (3, 7))
+        assert not is_stdlib_module('telnetlib', (3, 13))
+
+    def test_parse_python_version(self):
+        assert parse_python_version('3.9') == (3, 9)
+        assert parse_python_version('3.11.4') == (3, 11)
+        with pytest.raises(ValueError):
+            parse_python_version('three')
+
+
+class TestExternalDependencies:
+    """Test external dependency extraction with a target Python version"""
+
+    def test_target_python(self, tmp_path):
+        module = tmp_path / 'app.py'
+        module.write_text('import tomllib\nimport requests\nimport os\n')
+        file_stats = {str(module): FileInfo(module, 0, 0, 0, 0, 0, 'other')}
+
+        deps = extract_external_dependencies(file_stats, tmp_path, (3, 10))
+        assert deps[str(module)] == {'tomllib', 'requests'}
+
+        deps = extract_external_dependencies(file_stats, tmp_path, (3, 11))
+        assert deps[str(module)] == {'requests'}
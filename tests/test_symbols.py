@@ -0,0 +1,77 @@
+import json
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from pydeptree.cli import cli
+from pydeptree.symbols import SymbolIndex
+
+
+def make_project(root: Path) -> Path:
+    (root / "main.py").write_text("from services import api\n")
+    services = root / "services"
+    services.mkdir()
+    (services / "__init__.py").write_text("")
+    (services / "api.py").write_text(
+        "class APIClient:\n"
+        "    def get_data(self):\n"
+        "        return 1\n"
+        "\n"
+        "    def get_user(self):\n"
+        "        return 2\n"
+        "\n"
+        "def get_client():\n"
+        "    return APIClient()\n"
+    )
+    return root
+
+
+class TestSymbolIndex:
+    """Test symbol lookups"""
+
+    def test_exact_lookup(self, tmp_path):
+        index = SymbolIndex.build(make_project(tmp_path))
+
+        hits = index.exact("get_data")
+        assert len(hits) == 1
+        hit = hits[0]
+        assert hit.symbol.module == "services.api"
+        assert hit.symbol.qualname == "APIClient.get_data"
+        assert (hit.symbol.lineno, hit.symbol.end_lineno) == (2, 3)
+        assert hit.fan_in == 1
+        assert hit.imported_by == ["main"]
+
+    def test_lookup_by_qualified_and_dotted_name(self, tmp_path):
+        index = SymbolIndex.build(make_project(tmp_path))
+        assert len(index.exact("APIClient.get_user")) == 1
+        assert len(index.exact("services.api.get_client")) == 1
+
+    def test_prefix_lookup(self, tmp_path):
+        index = SymbolIndex.build(make_project(tmp_path))
+        names = sorted(hit.symbol.qualname for hit in index.prefix("get_"))
+        assert names == ["APIClient.get_data", "APIClient.get_user", "get_client"]
+
+    def test_fuzzy_lookup(self, tmp_path):
+        index = SymbolIndex.build(make_project(tmp_path))
+        hits = index.fuzzy("apiclent")
+        assert hits[0].symbol.qualname == "APIClient"
+
+
+class TestSymbolsCommand:
+    """Test the 'pydeptree symbols' command"""
+
+    def test_json_output(self, tmp_path):
+        runner = CliRunner()
+        result = runner.invoke(cli, ["symbols", "get_client", "--root", str(make_project(tmp_path)),
+                                     "--json"])
+        assert result.exit_code == 0
+        data = json.loads(result.output)
+        assert data[0]["path"] == "services/api.py"
+        assert data[0]["fan_in"] == 1
+
+    def test_table_output(self, tmp_path):
+        runner = CliRunner()
+        result = runner.invoke(cli, ["symbols", "nothing_here", "--root",
+                                     str(make_project(tmp_path))])
+        assert result.exit_code == 0
+        assert "No symbols found" in result.output
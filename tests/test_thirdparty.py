@@ -0,0 +1,155 @@
+import json
+import sqlite3
+
+import pytest
+from click.testing import CliRunner
+
+from pydeptree.analysis import analyze_imports
+from pydeptree.cli import cli
+from pydeptree.environment import DistributionIndex
+from pydeptree.graph import build_project_graph
+from pydeptree.project import module_name_for_path
+from pydeptree.thirdparty import DistributionGraphs, project_module_imports, summarize_loaded
+from tests.test_environment import make_dist
+
+
+def install(site, name, version, files, requires=()):
+    """Create a distribution and the module files it lists in RECORD"""
+    make_dist(site, name, version, requires=requires, files=list(files))
+    for rel_path, content in files.items():
+        path = site / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+@pytest.fixture
+def site_dir(tmp_path):
+    site = tmp_path / 'site-packages'
+    install(site, 'heavy', '1.0', {
+        'heavy/__init__.py': 'import os\nfrom .core import run\nfrom heavy import util\n',
+        'heavy/core.py': 'import light\n\ndef run():\n    import lazy\n',
+        'heavy/util.py': 'from typing import TYPE_CHECKING\nif TYPE_CHECKING:\n    import lazy\n',
+        'heavy/unused.py': 'x = 1\n' * 100,
+        'heavy/_speedups.cpython-311-x86_64-linux-gnu.so': 'b' * 500,
+    }, requires=['light'])
+    install(site, 'light', '2.0', {
+        'light/__init__.py': 'from light.sub import thing\n',
+        'light/sub/__init__.py': '',
+        'light/sub/thing.py': 'VALUE = 1\n',
+    })
+    install(site, 'lazy', '0.1', {'lazy.py': 'pass\n'})
+    return site
+
+
+@pytest.fixture
+def graphs(site_dir):
+    conn = sqlite3.connect(':memory:')
+    graphs = DistributionGraphs(DistributionIndex(paths=[str(site_dir)]), conn=conn)
+    yield graphs
+    graphs.close()
+
+
+class TestModuleLevelImports:
+    """Test the imports-only analysis used for installed packages"""
+
+    def test_skips_functions_and_type_checking(self):
+        record = analyze_imports(
+            'import a\n'
+            'try:\n    import b\nexcept ImportError:\n    b = None\n'
+            'def f():\n    import c\n'
+            'if TYPE_CHECKING:\n    import d\nelse:\n    import e\n'
+            'class K:\n    import g\n'
+        )
+        assert [ref.module for ref in record.imports] == ['a', 'b', 'e', 'g']
+
+    def test_extension_module_name(self):
+        extension = 'pkg/_speedups.cpython-311-x86_64-linux-gnu.so'
+        assert module_name_for_path(extension) == 'pkg._speedups'
+        assert module_name_for_path('pkg/native.pyd') == 'pkg.native'
+
+
+class TestDistributionGraphs:
+    """Test import footprints of installed distributions"""
+
+    def test_loaded_modules(self, graphs):
+        loaded = graphs.loaded_modules('heavy')
+        assert loaded == {
+            ('heavy', 'heavy'), ('heavy', 'heavy.core'), ('heavy', 'heavy.util'),
+            ('light', 'light'), ('light', 'light.sub'), ('light', 'light.sub.thing'),
+        }
+
+    def test_submodule_loads_parents(self, graphs):
+        assert ('light', 'light') in graphs.loaded_modules('light.sub.thing')
+
+    def test_footprint(self, graphs, site_dir):
+        footprint = graphs.footprint('heavy')
+        assert footprint.distribution == 'heavy'
+        assert footprint.modules == 6
+        assert footprint.own_modules == 3
+        assert footprint.distributions == ['light']
+        expected_size = sum((site_dir / path).stat().st_size for path in (
+            'heavy/__init__.py', 'heavy/core.py', 'heavy/util.py',
+            'light/__init__.py', 'light/sub/__init__.py', 'light/sub/thing.py'))
+        assert footprint.size == expected_size
+        assert graphs.footprint('not_installed') is None
+
+    def test_cached_per_version(self, site_dir):
+        conn = sqlite3.connect(':memory:')
+        index = DistributionIndex(paths=[str(site_dir)])
+        first = DistributionGraphs(index, conn=conn)
+        first.footprint('heavy')
+        assert first.misses == 2 and first.hits == 0
+
+        # Installed files of a given version are never scanned again
+        (site_dir / 'heavy' / 'core.py').write_text('')
+        second = DistributionGraphs(index, conn=conn)
+        assert second.footprint('heavy').modules == 6
+        assert second.misses == 0 and second.hits == 2
+
+    def test_cache_key_includes_record_hashes(self, site_dir):
+        conn = sqlite3.connect(':memory:')
+        index = DistributionIndex(paths=[str(site_dir)])
+        DistributionGraphs(index, conn=conn).footprint('lazy')
+
+        # Same name and version, different files: the RECORD digest changes
+        record = next(site_dir.glob('lazy-*.dist-info')) / 'RECORD'
+        record.write_text(record.read_text() + 'lazy_extra.py,sha256=abc,6\n')
+        (site_dir / 'lazy_extra.py').write_text('pass\n')
+        rescanned = DistributionGraphs(DistributionIndex(paths=[str(site_dir)]), conn=conn)
+        rescanned.footprint('lazy')
+        assert rescanned.misses == 1
+
+    def test_summarize_loaded(self, graphs):
+        loads = summarize_loaded(graphs, graphs.loaded_modules('heavy'))
+        assert sorted(load.name for load in loads) == ['heavy', 'light']
+        assert next(load for load in loads if load.name == 'light').modules == [
+            'light', 'light.sub', 'light.sub.thing']
+
+
+class TestLoadsCommand:
+    """Test following project imports into site-packages"""
+
+    def test_project_module_imports(self, tmp_path):
+        project = tmp_path / 'project'
+        project.mkdir()
+        (project / 'main.py').write_text('import helpers\nimport heavy.core\n')
+        (project / 'helpers.py').write_text('from light.sub import thing\nimport os\n')
+        graph = build_project_graph(project)
+        modules, external = project_module_imports(graph, 'main')
+        assert modules == {'main', 'helpers'}
+        assert {'heavy.core', 'light.sub', 'light.sub.thing', 'os'} <= external
+
+    def test_command(self, tmp_path, site_dir, monkeypatch):
+        monkeypatch.setenv('PYDEPTREE_CACHE_DIR', str(tmp_path / 'cache'))
+        project = tmp_path / 'project'
+        project.mkdir()
+        (project / 'main.py').write_text('from light.sub import thing\n')
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ['loads', 'main', '-r', str(project),
+                                     '--site-packages', str(site_dir), '--json'])
+        assert result.exit_code == 0, result.output
+        data = json.loads(result.output)
+        assert data['project_modules'] == ['main']
+        assert data['distributions'][0]['modules'] == ['light', 'light.sub', 'light.sub.thing']
+        assert (tmp_path / 'cache' / 'shared' / 'thirdparty.sqlite3').exists()
@@ -0,0 +1,89 @@
+import json
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from pydeptree.analysis import find_todos
+from pydeptree.cli import cli
+from pydeptree.graph import build_project_graph
+from pydeptree.todos import collect_todos, sort_todos
+
+
+def make_project(root: Path) -> Path:
+    (root / "main.py").write_text("# TODO: wire up logging\nimport pkg.worker\n")
+    pkg = root / "pkg"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("")
+    (pkg / "worker.py").write_text(
+        'def run():\n'
+        '    """Run the worker.\n'
+        '\n'
+        '    FIXME: retries are not implemented\n'
+        '    """\n'
+        '    return "# TODO: not a comment"  # HACK: temporary\n'
+    )
+    return root
+
+
+class TestFindTodos:
+    """Test tokenize-based TODO extraction"""
+
+    def test_comments(self):
+        assert find_todos("x = 1  # TODO: fix this\n# fixme later\n") == [
+            (1, "TODO: fix this"),
+            (2, "FIXME: later"),
+        ]
+
+    def test_multiline_docstring(self):
+        content = 'def f():\n    """Summary.\n\n    FIXME: handle errors\n    """\n'
+        assert find_todos(content) == [(4, "FIXME: handle errors")]
+
+    def test_single_line_docstring(self):
+        source = '"""TODO: document this module"""\n'
+        assert find_todos(source) == [(1, "TODO: document this module")]
+
+    def test_prose_in_docstrings_is_ignored(self):
+        content = '"""\nNote that this is fine.\nNote: but this is a marker\n"""\n'
+        assert find_todos(content) == [(3, "NOTE: but this is a marker")]
+
+    def test_markers_in_plain_strings_are_ignored(self):
+        assert find_todos('url = "page#TODO"\n') == []
+
+    def test_untokenizable_file_falls_back_to_comments(self):
+        content = "# TODO: first\ndef broken(:\n    # HACK: after the error\n"
+        assert find_todos(content) == [(1, "TODO: first"), (3, "HACK: after the error")]
+
+
+class TestTodosReport:
+    """Test the project-wide TODO report"""
+
+    def test_collect_and_sort_by_type(self, tmp_path):
+        items = sort_todos(collect_todos(build_project_graph(make_project(tmp_path))), 'type')
+        assert [(item.tag, item.path, item.line) for item in items] == [
+            ("TODO", "main.py", 1),
+            ("FIXME", "pkg/worker.py", 4),
+            ("HACK", "pkg/worker.py", 6),
+        ]
+
+    def test_sort_by_directory(self, tmp_path):
+        items = sort_todos(collect_todos(build_project_graph(make_project(tmp_path))), 'directory')
+        assert [item.directory for item in items] == [".", "pkg", "pkg"]
+
+    def test_filter_by_tag(self, tmp_path):
+        items = collect_todos(build_project_graph(make_project(tmp_path)), tags=["hack"])
+        assert [item.text for item in items] == ["temporary"]
+
+    def test_command_json(self, tmp_path):
+        runner = CliRunner()
+        result = runner.invoke(cli, ["todos", "--root", str(make_project(tmp_path)), "--json",
+                                     "--sort", "file"])
+        assert result.exit_code == 0
+        assert [item["path"] for item in json.loads(result.output)] == [
+            "main.py", "pkg/worker.py", "pkg/worker.py"
+        ]
+
+    def test_command_table(self, tmp_path):
+        runner = CliRunner()
+        result = runner.invoke(cli, ["todos", "--root", str(make_project(tmp_path))])
+        assert result.exit_code == 0
+        assert "Found 3 markers" in result.output
@@ -0,0 +1,102 @@
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from pydeptree.cli_advanced import FileAnalysisCache, build_dependency_tree, cli
+from pydeptree.watch import PollingWatcher, changed_paths, create_watcher, snapshot_fingerprints
+
+
+def make_project(root):
+    (root / 'main.py').write_text('import helpers\n')
+    (root / 'helpers.py').write_text('X = 1\n')
+    (root / '.venv').mkdir()
+    (root / '.venv' / 'ignored.py').write_text('')
+    return root
+
+
+class TestPollingWatcher:
+    """Test change detection by fingerprint polling"""
+
+    def test_snapshot(self, tmp_path):
+        snapshot = snapshot_fingerprints(make_project(tmp_path))
+        assert set(snapshot) == {'main.py', 'helpers.py'}
+
+    def test_changed_paths(self):
+        old = {'a.py': [1, 10], 'b.py': [1, 10]}
+        new = {'a.py': [2, 11], 'c.py': [1, 10]}
+        assert changed_paths(old, new) == {'a.py', 'b.py', 'c.py'}
+
+    def test_poll(self, tmp_path):
+        root = make_project(tmp_path)
+        watcher = PollingWatcher(root, interval=0.01)
+        assert watcher.poll() == set()
+
+        (root / 'helpers.py').write_text('X = 2\nY = 3\n')
+        (root / 'new.py').write_text('')
+        (root / 'main.py').unlink()
+        assert watcher.poll() == {'helpers.py', 'new.py', 'main.py'}
+        assert watcher.poll() == set()
+
+    def test_wait_timeout(self, tmp_path):
+        watcher = PollingWatcher(make_project(tmp_path), interval=0.01)
+        assert watcher.wait(timeout=0.05) == set()
+
+    def test_create_watcher_polling(self, tmp_path):
+        watcher = create_watcher(make_project(tmp_path), polling=True)
+        assert isinstance(watcher, PollingWatcher)
+        watcher.close()
+
+
+class TestFileAnalysisCache:
+    """Test that watch mode only re-analyzes changed files"""
+
+    @patch('pydeptree.cli_advanced.run_ruff_check', return_value=(0, 0))
+    def test_only_changed_files_are_analyzed(self, mock_ruff, tmp_path):
+        root = make_project(tmp_path)
+        cache = FileAnalysisCache()
+
+        _, file_stats, total = build_dependency_tree(root / 'main.py', root, 3, check_git=False,
+                                                     analysis_cache=cache)
+        assert total == 2
+        assert cache.analyzed == 2
+
+        cache.reset_counts()
+        build_dependency_tree(root / 'main.py', root, 3, check_git=False, analysis_cache=cache)
+        assert cache.analyzed == 0
+
+        # A new edge appears without re-analyzing main.py's neighbours
+        (root / 'helpers.py').write_text('import extra\nX = 1\n')
+        (root / 'extra.py').write_text('Y = 2\n')
+        cache.reset_counts()
+        _, file_stats, total = build_dependency_tree(root / 'main.py', root, 3, check_git=False,
+                                                     analysis_cache=cache)
+        assert total == 3
+        assert cache.analyzed == 2
+        assert file_stats[str(root / 'helpers.py')].imports == 1
+
+
+class TestWatchMode:
+    """Test the --watch loop of pydeptree-advanced"""
+
+    def test_changes_during_first_render_are_seen(self, tmp_path):
+        root = make_project(tmp_path)
+        polled = []
+
+        def lint_and_edit(file_path, detailed=False):
+            # Saved while the first render is still running
+            (root / 'helpers.py').write_text('X = 2\nY = 3\n')
+            return 0, 0
+
+        def wait(watcher, timeout=None):
+            if polled:
+                raise KeyboardInterrupt
+            polled.append(watcher.poll())
+            return polled[-1]
+
+        with patch('pydeptree.cli_advanced.run_ruff_check', side_effect=lint_and_edit), \
+                patch('pydeptree.watch.import_watchfiles', return_value=None), \
+                patch.object(PollingWatcher, 'wait', wait):
+            result = CliRunner().invoke(cli, [str(root / 'main.py'), '--watch',
+                                              '--no-check-git', '--no-show-stats'])
+        assert result.exit_code == 0, result.output
+        assert polled == [{'helpers.py'}]